@@ -0,0 +1,854 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous FDSN web service client based on :mod:`asyncio`.
+
+The :class:`AsyncClient` has the same queries as the
+:class:`~obspy.clients.fdsn.client.Client` as coroutines, so that it can be
+used in applications running an event loop (e.g. asynchronous web services)
+without blocking it, and many requests can be sent concurrently. It requires
+Python 3.5 or newer.
+
+>>> import asyncio
+>>> from obspy import UTCDateTime
+>>> from obspy.clients.fdsn.async_client import AsyncClient
+>>> async def main():
+...     async with AsyncClient("IRIS") as client:
+...         t = UTCDateTime("2010-02-27T06:45:00.000")
+...         requests = [client.get_waveforms("IU", station, "00", "LHZ", t,
+...                                          t + 60)
+...                     for station in ("ANMO", "AFI", "COLA")]
+...         return await asyncio.gather(*requests)
+>>> streams = asyncio.get_event_loop().run_until_complete(
+...     main())  # doctest: +SKIP
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import asyncio
+import functools
+import gzip
+import hashlib
+import inspect
+import io
+import os
+import socket
+import ssl
+import warnings
+from collections import OrderedDict
+from urllib.parse import urljoin, urlsplit
+from urllib.request import (getproxies, parse_http_list, parse_keqv_list,
+                            proxy_bypass)
+
+import obspy
+from obspy import read_inventory
+from .client import (NO_REDIRECT_MSG, RETRY_HTTP_CODES, Client,
+                     _get_retry_wait, _read_mseed, _read_quakeml,
+                     raise_on_error, split_bulk_string)
+from .header import (DEFAULT_USER_AGENT, FDSNException, FDSNNoDataException,
+                     FDSNRedirectException)
+
+
+# maximum number of redirects followed for one request
+MAX_REDIRECTS = 10
+
+# HTTP codes of redirects
+REDIRECT_HTTP_CODES = (301, 302, 303, 307, 308)
+
+# hash functions of the supported HTTP digest authentication algorithms
+DIGEST_ALGORITHMS = {"MD5": hashlib.md5, "SHA-256": hashlib.sha256}
+
+
+async def _run_in_executor(func, *args):
+    """
+    Run a blocking function (parsing, file I/O) in the default executor of
+    the event loop, so that other requests are not stalled meanwhile.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
+
+
+def _digest_authorization(challenge, method, target, user, password):
+    """
+    Return the ``Authorization`` header answering a HTTP digest
+    authentication challenge (RFC 7616, without ``auth-int`` protection) or
+    ``None`` if the challenge is not supported.
+
+    :type challenge: str
+    :param challenge: Value of the ``WWW-Authenticate`` header.
+    :type target: str
+    :param target: Path and query of the request.
+    """
+    scheme, _, challenge = challenge.partition(" ")
+    if scheme.lower() != "digest":
+        return None
+    params = parse_keqv_list(parse_http_list(challenge))
+    algorithm = params.get("algorithm", "MD5")
+    session = algorithm.upper().endswith("-SESS")
+    hash_function = DIGEST_ALGORITHMS.get(
+        algorithm.upper()[:-5] if session else algorithm.upper())
+    qops = [qop.strip() for qop in params.get("qop", "").split(",")
+            if qop.strip()]
+    if hash_function is None or "nonce" not in params or \
+            (qops and "auth" not in qops):
+        return None
+
+    def h(value):
+        return hash_function(value.encode("utf-8")).hexdigest()
+
+    realm, nonce = params.get("realm", ""), params["nonce"]
+    cnonce = os.urandom(8).hex()
+    ha1 = h("%s:%s:%s" % (user, realm, password))
+    if session:
+        ha1 = h("%s:%s:%s" % (ha1, nonce, cnonce))
+    ha2 = h("%s:%s" % (method, target))
+    fields = [("username", user), ("realm", realm), ("nonce", nonce),
+              ("uri", target)]
+    if qops:
+        nc = "00000001"
+        response = h(":".join([ha1, nonce, nc, cnonce, "auth", ha2]))
+        fields.append(("response", response))
+        extra = ['qop=auth', 'nc=%s' % nc, 'cnonce="%s"' % cnonce]
+    else:
+        fields.append(("response", h(":".join([ha1, nonce, ha2]))))
+        extra = []
+    if "opaque" in params:
+        fields.append(("opaque", params["opaque"]))
+    items = ['%s="%s"' % field for field in fields]
+    items.append("algorithm=%s" % algorithm)
+    return "Digest " + ", ".join(items + extra)
+
+
+class _Response(object):
+    """
+    Response of :class:`AsyncHTTPConnectionPool`, readable like the HTTP
+    errors of :mod:`urllib` by :func:`~obspy.clients.fdsn.client.
+    raise_on_error`.
+    """
+    def __init__(self, code, headers, body):
+        self.code = code
+        self.headers = headers
+        self.body = body
+
+    def read(self):
+        return self.body
+
+
+class _Headers(dict):
+    """
+    Response headers with case-insensitive :meth:`get`.
+    """
+    def get(self, key, default=None):
+        return dict.get(self, key.lower(), default)
+
+
+class _ConnectionClosed(Exception):
+    """
+    The server closed the connection before sending a response.
+    """
+    pass
+
+
+class AsyncHTTPConnectionPool(object):
+    """
+    Minimal asynchronous HTTP/1.1 client keeping connections open for reuse.
+
+    The number of connections open at the same time is limited in total and
+    per host. Further requests wait until a connection is free.
+
+    :type max_connections: int
+    :param max_connections: Maximum number of concurrent requests.
+    :type max_connections_per_host: int
+    :param max_connections_per_host: Maximum number of concurrent requests
+        to the same host and port.
+    :type ssl_context: :class:`ssl.SSLContext`
+    :param ssl_context: Context for HTTPS connections, defaults to
+        :func:`ssl.create_default_context`.
+    """
+    def __init__(self, max_connections=100, max_connections_per_host=10,
+                 ssl_context=None):
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.ssl_context = ssl_context
+        # number of opened and reused connections, mainly for testing and
+        # debugging
+        self.opened = 0
+        self.reused = 0
+        self._loop = None
+        self._reset()
+
+    def _reset(self):
+        # semaphores and connections belong to the event loop they were
+        # created in
+        self._idle = {}
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    def _get_semaphores(self, key):
+        loop = asyncio.get_event_loop()
+        if loop is not self._loop:
+            self._close_idle()
+            self._reset()
+            self._loop = loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        if key not in self._host_semaphores:
+            self._host_semaphores[key] = asyncio.Semaphore(
+                self.max_connections_per_host)
+        return self._host_semaphores[key], self._semaphore
+
+    async def request(self, method, url, headers=None, body=None,
+                      timeout=None, auth=None, follow_redirects=True):
+        """
+        Send a request and return the response, following redirects.
+
+        Unlike the standard library, redirects of POST requests are followed
+        with the same method and body, like by the
+        :class:`~obspy.clients.fdsn.client.Client`.
+
+        :type timeout: float
+        :param timeout: Maximum time in seconds to wait for connecting and
+            each read from the server.
+        :type auth: tuple(str, str)
+        :param auth: User and password to answer HTTP digest authentication
+            challenges with. Only challenges of the host of ``url`` are
+            answered.
+        :type follow_redirects: bool
+        :param follow_redirects: If ``False``, redirects are returned
+            instead of followed.
+        :rtype: :class:`_Response`
+        """
+        origin = None
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise ValueError("Unsupported URL scheme: '%s'" % url)
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            key = (parts.scheme, parts.hostname, port)
+            if origin is None:
+                origin = key
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            response = await self._request(key, parts.netloc, method, target,
+                                           headers or {}, body, timeout)
+            if response.code == 401 and auth is not None and key == origin:
+                authorization = _digest_authorization(
+                    response.headers.get("www-authenticate", ""), method,
+                    target, *auth)
+                if authorization is not None:
+                    headers = dict(headers or {})
+                    headers["Authorization"] = authorization
+                    response = await self._request(
+                        key, parts.netloc, method, target, headers, body,
+                        timeout)
+            location = response.headers.get("location")
+            if response.code in REDIRECT_HTTP_CODES and location and \
+                    follow_redirects:
+                url = urljoin(url, location)
+                continue
+            return response
+        raise FDSNException("Too many redirects for '%s'." % url)
+
+    async def _request(self, key, netloc, method, target, headers, body,
+                       timeout):
+        host_semaphore, semaphore = self._get_semaphores(key)
+        async with host_semaphore:
+            async with semaphore:
+                return await self._send(key, netloc, method, target, headers,
+                                        body, timeout)
+
+    async def _send(self, key, netloc, method, target, headers, body,
+                    timeout):
+        lines = ["%s %s HTTP/1.1" % (method, target), "Host: %s" % netloc,
+                 "Connection: keep-alive"]
+        lines.extend("%s: %s" % item for item in headers.items())
+        if body is not None:
+            lines.append("Content-Type: application/x-www-form-urlencoded")
+            lines.append("Content-Length: %d" % len(body))
+        request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+        if body is not None:
+            request += body
+
+        while True:
+            connection = self._get_idle(key)
+            reused = connection is not None
+            if connection is None:
+                connection = await asyncio.wait_for(
+                    asyncio.open_connection(
+                        key[1], key[2],
+                        ssl=self._get_ssl_context() if key[0] == "https"
+                        else None),
+                    timeout)
+            reader, writer = connection
+            try:
+                writer.write(request)
+                await writer.drain()
+                response, keep_alive = await self._read_response(
+                    reader, method, timeout)
+            except (_ConnectionClosed, ConnectionError):
+                writer.close()
+                # the server closed the idle connection in the meantime, try
+                # again with a new one
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            break
+
+        if keep_alive:
+            self._idle.setdefault(key, []).append(connection)
+        else:
+            writer.close()
+        return response
+
+    def _get_ssl_context(self):
+        if self.ssl_context is None:
+            self.ssl_context = ssl.create_default_context()
+        return self.ssl_context
+
+    def _get_idle(self, key):
+        connections = self._idle.get(key)
+        while connections:
+            reader, writer = connections.pop()
+            if reader.at_eof():
+                writer.close()
+                continue
+            self.reused += 1
+            return reader, writer
+        self.opened += 1
+        return None
+
+    async def _read_response(self, reader, method, timeout):
+        """
+        Read a response and return it and whether the connection can be
+        reused.
+        """
+        async def readline():
+            return await asyncio.wait_for(reader.readline(), timeout)
+
+        async def readexactly(n):
+            return await asyncio.wait_for(reader.readexactly(n), timeout)
+
+        status_line = await readline()
+        if not status_line:
+            raise _ConnectionClosed()
+        version, code = status_line.split(None, 2)[:2]
+        code = int(code)
+        headers = _Headers()
+        while True:
+            line = await readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get("connection", "").lower()
+        if version == b"HTTP/1.0":
+            keep_alive = connection == "keep-alive"
+        else:
+            keep_alive = connection != "close"
+
+        if method == "HEAD" or code in (204, 304) or 100 <= code < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await readline()).split(b";")[0], 16)
+                if size == 0:
+                    # skip trailers
+                    while (await readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await readexactly(size))
+                await readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await readexactly(int(headers["content-length"]))
+        else:
+            body = await asyncio.wait_for(reader.read(), timeout)
+            keep_alive = False
+
+        if headers.get("content-encoding", "").lower() == "gzip":
+            body = await _run_in_executor(gzip.decompress, body)
+        return _Response(code, headers, body), keep_alive
+
+    def _close_idle(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle = {}
+
+    async def close(self):
+        """
+        Close all idle connections.
+        """
+        self._close_idle()
+
+
+def _bind_arguments(method, args, kwargs):
+    """
+    Return all arguments (with defaults) and the additional keyword
+    arguments of a call of a query method of
+    :class:`~obspy.clients.fdsn.client.Client`.
+    """
+    bound = inspect.signature(method).bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    extra = arguments.pop("kwargs", {})
+    return arguments, extra
+
+
+def _query_method(method):
+    """
+    Give a coroutine the signature and the documentation of the query method
+    of :class:`~obspy.clients.fdsn.client.Client` with the same name.
+    """
+    def decorator(coroutine):
+        coroutine.__signature__ = inspect.signature(method)
+        coroutine.__doc__ = (
+            "Coroutine version of :meth:`Client.%s() "
+            "<obspy.clients.fdsn.client.Client.%s>`, with the same arguments."
+            "\n" % (method.__name__, method.__name__))
+        return coroutine
+    return decorator
+
+
+class AsyncClient(Client):
+    """
+    Asynchronous FDSN web service request client.
+
+    All queries are coroutines. The service discovery is done on the first
+    query (or by awaiting :meth:`discover_services`), not on initialization.
+    Use the client as asynchronous context manager or call :meth:`close`
+    when done, to close the connections kept open for reuse.
+
+    Restricted data can be requested with HTTP digest authentication, using
+    credentials or an EIDA token as for the
+    :class:`~obspy.clients.fdsn.client.Client`. A token given on
+    initialization is exchanged for credentials on the first query. Proxies
+    are not supported, requests are always sent directly to the server,
+    ignoring the ``http_proxy`` and ``https_proxy`` environment variables.
+
+    :type base_url: str
+    :param base_url: Base URL of FDSN web service compatible server
+        (e.g. "http://service.iris.edu") or key string for recognized
+        server.
+    :type major_versions: dict
+    :param major_versions: Custom major version numbers for individual
+        services, see :class:`~obspy.clients.fdsn.client.Client`.
+    :type user: str
+    :param user: User name of HTTP Digest Authentication for access to
+        restricted data.
+    :type password: str
+    :param password: Password of HTTP Digest Authentication for access to
+        restricted data.
+    :type user_agent: str
+    :param user_agent: The user agent for all requests.
+    :type debug: bool
+    :param debug: Debug flag.
+    :type timeout: float
+    :param timeout: Maximum time (in seconds) to wait for connecting and each
+        read from the server.
+    :type service_mappings: dict
+    :param service_mappings: Custom endpoints of the services, see
+        :class:`~obspy.clients.fdsn.client.Client`.
+    :type force_redirect: bool
+    :param force_redirect: Follow redirects even if credentials are given,
+        see :class:`~obspy.clients.fdsn.client.Client`.
+    :type eida_token: str
+    :param eida_token: Token for EIDA authentication mechanism, see
+        :meth:`set_eida_token`. If a token is provided, options ``user`` and
+        ``password`` must not be used.
+    :type cache: :class:`~obspy.clients.fdsn.cache.ResponseCache` or str
+    :param cache: Cache of the responses of the web services, see
+        :class:`~obspy.clients.fdsn.client.Client`.
+    :type max_connections: int
+    :param max_connections: Maximum number of requests in flight at the
+        same time, further requests wait for a free connection.
+    :type max_connections_per_host: int
+    :param max_connections_per_host: Maximum number of requests in flight
+        to the same host at the same time.
+    :type discover_services: bool
+    :param discover_services: If ``False``, no service discovery is
+        performed and default parameter support is assumed.
+    """
+    def __init__(self, base_url="IRIS", major_versions=None, user=None,
+                 password=None, user_agent=DEFAULT_USER_AGENT, debug=False,
+                 timeout=120, service_mappings=None, force_redirect=False,
+                 eida_token=None, cache=None, max_connections=100,
+                 max_connections_per_host=10, discover_services=True):
+        if eida_token is not None and (user is not None or
+                                       password is not None):
+            msg = ("EIDA authentication token provided, but "
+                   "user and password are also given.")
+            raise FDSNException(msg)
+        Client.__init__(self, base_url=base_url,
+                        major_versions=major_versions, user=user,
+                        password=password, user_agent=user_agent,
+                        debug=debug, timeout=timeout,
+                        service_mappings=service_mappings,
+                        force_redirect=force_redirect, cache=cache,
+                        _discover_services=False)
+        self._http = AsyncHTTPConnectionPool(
+            max_connections=max_connections,
+            max_connections_per_host=max_connections_per_host)
+        self._discovery = None
+        self._services_discovered = not discover_services
+        # the token is exchanged for credentials on the first query
+        self._eida_token = eida_token
+        self._token_exchange = None
+        self._warn_on_proxy()
+
+    def __str__(self):
+        return Client.__str__(self).replace("FDSN Webservice Client",
+                                            "Asynchronous FDSN Webservice "
+                                            "Client", 1)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """
+        Close all connections kept open for reuse.
+        """
+        await self._http.close()
+
+    def _set_opener(self, user, password):
+        # Requests are sent by the connection pool, which answers digest
+        # authentication challenges itself.
+        if user is not None and password is not None:
+            self._auth = (user, password)
+        else:
+            self._auth = None
+        self._follow_redirects = (user is None and password is None) or \
+            self._force_redirect is True
+
+    def _warn_on_proxy(self):
+        parts = urlsplit(self.base_url)
+        proxy = getproxies().get(parts.scheme)
+        if proxy and not proxy_bypass(parts.hostname):
+            msg = ("Proxies are not supported by the AsyncClient, requests "
+                   "to '%s' are sent directly and not via the proxy '%s'." %
+                   (self.base_url, proxy))
+            warnings.warn(msg)
+
+    async def set_eida_token(self, token, validate=True):
+        """
+        Coroutine version of :meth:`Client.set_eida_token()
+        <obspy.clients.fdsn.client.Client.set_eida_token>`.
+        """
+        if not self._services_discovered:
+            await self.discover_services()
+        url, data = await _run_in_executor(
+            functools.partial(self._get_eida_token_request, token,
+                              validate=validate))
+        response = await self._download_async(url, data=data,
+                                              use_cache=False)
+        self.set_credentials(*self._parse_eida_credentials(
+            response.getvalue()))
+
+    async def discover_services(self):
+        """
+        Discover the available services, see
+        :meth:`Client._discover_services()
+        <obspy.clients.fdsn.client.Client._discover_services>`.
+
+        Concurrent calls share one discovery.
+        """
+        if self._discovery is None or self._discovery.done() and \
+                self._discovery.exception() is not None:
+            self._discovery = asyncio.ensure_future(self._discover())
+        await asyncio.shield(self._discovery)
+        self._services_discovered = True
+
+    async def _discover(self):
+        urls = self._get_discovery_urls()
+        if self._load_discovered_services(urls):
+            return
+
+        async def download(url):
+            # services not found are cached too
+            code, data = await self._download_url_async(
+                url, timeout=10, cache_codes=(200, 404))
+            if code == 200:
+                return url, data.getvalue()
+            # Pass on the redirect exception.
+            if isinstance(data, FDSNRedirectException):
+                return url, data
+            return url, None
+
+        results = await asyncio.gather(*[download(url) for url in urls])
+        await _run_in_executor(self._set_discovered_services, urls, results)
+
+    async def _ensure_services(self):
+        if not self._services_discovered:
+            await self.discover_services()
+        if self._eida_token is not None:
+            # Concurrent queries share one token exchange.
+            if self._token_exchange is None:
+                self._token_exchange = asyncio.ensure_future(
+                    self.set_eida_token(self._eida_token))
+            await asyncio.shield(self._token_exchange)
+            self._eida_token = None
+
+    async def _download_url_async(self, url, data=None, use_gzip=True,
+                                  use_cache=True, timeout=None,
+                                  cache_codes=(200,)):
+        """
+        Coroutine version of :meth:`Client._download_url()
+        <obspy.clients.fdsn.client.Client._download_url>` returning the HTTP
+        code and the data as :class:`io.BytesIO` or an exception.
+        """
+        cache = self._get_cache(use_cache)
+        if cache is not None:
+            cached = await _run_in_executor(cache.get, url, data)
+            if cached is not None:
+                code, response = cached
+                if self.debug is True:
+                    print("Loaded %s from cache" % url)
+                return code, io.BytesIO(response)
+
+        if self.debug is True:
+            print("Downloading %s %s requesting gzip compression" % (
+                url, "with" if use_gzip else "without"))
+        headers = dict(self.request_headers)
+        if use_gzip:
+            headers["Accept-Encoding"] = "gzip"
+        try:
+            response = await self._http.request(
+                "GET" if data is None else "POST", url, headers=headers,
+                body=data, timeout=self.timeout if timeout is None
+                else timeout, auth=self._auth,
+                follow_redirects=self._follow_redirects)
+        except asyncio.TimeoutError:
+            return None, socket.timeout("timed out")
+        except Exception as e:
+            if self.debug is True:
+                print("Error while downloading: %s" % url)
+            return None, e
+        if self.debug is True:
+            print("Downloaded %s with HTTP code: %i" % (url, response.code))
+        if response.code in REDIRECT_HTTP_CODES and \
+                response.headers.get("location"):
+            return None, FDSNRedirectException(NO_REDIRECT_MSG)
+
+        if cache is not None and response.code in cache_codes:
+            await _run_in_executor(
+                cache.put, url, data, response.code,
+                response.body if response.code == 200 else b"")
+        if response.code != 200:
+            return response.code, response
+        return 200, io.BytesIO(response.body)
+
+    async def _download_async(self, url, data=None, use_gzip=True,
+                              use_cache=True):
+        code, data = await self._download_url_async(
+            url, data=data, use_gzip=use_gzip, use_cache=use_cache)
+        raise_on_error(code, data)
+        return data
+
+    async def _download_with_retries_async(self, url, data, retries):
+        """
+        Coroutine version of :meth:`Client._download_with_retries()
+        <obspy.clients.fdsn.client.Client._download_with_retries>`.
+        """
+        for attempt in range(retries + 1):
+            code, response = await self._download_url_async(url, data=data)
+            if code == 204:
+                return None
+            if attempt < retries and (code is None or
+                                      code in RETRY_HTTP_CODES):
+                wait = _get_retry_wait(response, attempt)
+                if self.debug:
+                    print("Retrying %s in %.1f seconds after HTTP code %s" % (
+                        url, wait, code))
+                await asyncio.sleep(wait)
+                continue
+            raise_on_error(code, response)
+            return response
+
+    async def _download_bulk_chunks_async(self, url, bulk, chunk_size,
+                                          retries):
+        """
+        Download a bulk request, split into chunks sent concurrently if
+        ``chunk_size`` is given, and return the data of all chunks with data
+        in the order of the chunks.
+        """
+        chunks = split_bulk_string(bulk, chunk_size)
+        results = await asyncio.gather(*[
+            self._download_with_retries_async(url, chunk, retries)
+            for chunk in chunks])
+        results = [result for result in results if result is not None]
+        if not results:
+            raise FDSNNoDataException("No data available for request.")
+        return results
+
+    @_query_method(Client.get_events)
+    async def get_events(self, *args, **kwargs):
+        arguments, kwargs = _bind_arguments(Client.get_events,
+                                            (self,) + args, kwargs)
+        await self._ensure_services()
+        url = self._get_query_url("event", arguments, kwargs)
+
+        data_stream = await self._download_async(url)
+        return await _run_in_executor(self._read_response, data_stream,
+                                      arguments["filename"], _read_quakeml)
+
+    @_query_method(Client.get_stations)
+    async def get_stations(self, *args, **kwargs):
+        arguments, kwargs = _bind_arguments(Client.get_stations,
+                                            (self,) + args, kwargs)
+        await self._ensure_services()
+        url = self._get_query_url("station", arguments, kwargs)
+
+        data_stream = await self._download_async(url)
+        return await _run_in_executor(self._read_response, data_stream,
+                                      arguments["filename"], read_inventory)
+
+    @_query_method(Client.get_waveforms)
+    async def get_waveforms(self, *args, **kwargs):
+        arguments, kwargs = _bind_arguments(Client.get_waveforms,
+                                            (self,) + args, kwargs)
+        await self._ensure_services()
+        url = self._get_query_url("dataselect", arguments, kwargs)
+
+        data_stream = await self._download_async(url, use_gzip=False)
+        filename = arguments["filename"]
+        st = await _run_in_executor(self._read_response, data_stream,
+                                    filename, _read_mseed)
+        if filename:
+            return
+        if arguments["attach_response"]:
+            await self._attach_responses_async(st)
+        self._attach_dataselect_url_to_stream(st)
+        st.trim(arguments["starttime"], arguments["endtime"])
+        return st
+
+    async def _attach_responses_async(self, st):
+        """
+        Coroutine version of :meth:`Client._attach_responses()
+        <obspy.clients.fdsn.client.Client._attach_responses>`, requesting
+        the responses of all channels concurrently.
+        """
+        netids = {}
+        for tr in st:
+            if tr.id not in netids:
+                netids[tr.id] = (tr.stats.starttime, tr.stats.endtime)
+                continue
+            netids[tr.id] = (
+                min(tr.stats.starttime, netids[tr.id][0]),
+                max(tr.stats.endtime, netids[tr.id][1]))
+
+        requests = []
+        for key, value in netids.items():
+            net, sta, loc, chan = key.split(".")
+            starttime, endtime = value
+            requests.append(self.get_stations(
+                network=net, station=sta, location=loc, channel=chan,
+                starttime=starttime, endtime=endtime, level="response"))
+        inventories = []
+        for result in await asyncio.gather(*requests,
+                                           return_exceptions=True):
+            if isinstance(result, Exception):
+                warnings.warn(str(result))
+            else:
+                inventories.append(result)
+        await _run_in_executor(st.attach_response, inventories)
+
+    async def get_waveforms_bulk(self, bulk, quality=None, minimumlength=None,
+                                 longestonly=None, filename=None,
+                                 attach_response=False, chunk_size=None,
+                                 retries=3, **kwargs):
+        """
+        Coroutine version of :meth:`Client.get_waveforms_bulk()
+        <obspy.clients.fdsn.client.Client.get_waveforms_bulk>`.
+
+        If ``chunk_size`` is given, the request is split into requests of at
+        most ``chunk_size`` lines, which are all sent concurrently (limited
+        by the maximum number of connections of the client). All requests
+        are retried ``retries`` times after temporary errors.
+        """
+        await self._ensure_services()
+        arguments = OrderedDict(
+            quality=quality,
+            minimumlength=minimumlength,
+            longestonly=longestonly
+        )
+        url, bulk = self._get_bulk_request("dataselect", bulk, arguments)
+
+        chunks = await self._download_bulk_chunks_async(url, bulk, chunk_size,
+                                                        retries)
+        if filename:
+            await _run_in_executor(self._write_chunks_to_file_object,
+                                   filename, chunks)
+            return
+        st = obspy.Stream()
+        for stream in await asyncio.gather(*[
+                _run_in_executor(self._read_response, data_stream, None,
+                                 _read_mseed)
+                for data_stream in chunks]):
+            st += stream
+        if attach_response:
+            await self._attach_responses_async(st)
+        self._attach_dataselect_url_to_stream(st)
+        return st
+
+    async def get_stations_bulk(self, bulk, level=None,
+                                includerestricted=None,
+                                includeavailability=None, filename=None,
+                                chunk_size=None, retries=3, **kwargs):
+        """
+        Coroutine version of :meth:`Client.get_stations_bulk()
+        <obspy.clients.fdsn.client.Client.get_stations_bulk>`.
+
+        If ``chunk_size`` is given, the request is split into requests of at
+        most ``chunk_size`` lines, which are all sent concurrently (limited
+        by the maximum number of connections of the client). All requests
+        are retried ``retries`` times after temporary errors.
+        """
+        await self._ensure_services()
+        arguments = OrderedDict(
+            level=level,
+            includerestriced=includerestricted,
+            includeavailability=includeavailability
+        )
+        url, bulk = self._get_bulk_request("station", bulk, arguments)
+
+        chunks = await self._download_bulk_chunks_async(url, bulk, chunk_size,
+                                                        retries)
+        if len(chunks) == 1:
+            # Works with text and StationXML data.
+            return await _run_in_executor(self._read_response, chunks[0],
+                                          filename, read_inventory)
+        return await _run_in_executor(self._merge_inventories, chunks,
+                                      filename)
+
+    async def get_webservice_version(self, service):
+        """
+        Coroutine version of :meth:`Client.get_webservice_version()
+        <obspy.clients.fdsn.client.Client.get_webservice_version>`.
+        """
+        await self._ensure_services()
+        if service not in self.services:
+            msg = "Service '%s' not available for current client." % service
+            raise ValueError(msg)
+        url = self._build_url(service, "version")
+        version = (await self._download_async(url)).getvalue()
+        return list(map(int, version.split(b".")))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
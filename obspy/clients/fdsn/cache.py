@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache of FDSN web service responses.
+
+Repeated requests for the same station metadata, event lists or waveforms
+(e.g. when re-running notebooks or batch jobs) are answered from files in a
+local directory instead of the data center.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import warnings
+from collections import OrderedDict
+
+if PY2:
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit, urlunsplit
+else:
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# suffix of the files of cached responses
+CACHE_FILE_SUFFIX = ".fdsn"
+
+
+def get_default_cache_path():
+    """
+    Return the default directory of the response cache, ``obspy/fdsn`` in the
+    cache directory of the user (``$XDG_CACHE_HOME`` or ``~/.cache``).
+
+    :rtype: str
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or \
+        os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "obspy", "fdsn")
+
+
+def normalize_url(url):
+    """
+    Return a normalized version of a request URL, so that equivalent
+    requests get the same cache key.
+
+    Scheme and host are converted to lower case and the query parameters are
+    sorted.
+
+    >>> print(normalize_url(
+    ...     "HTTP://Service.IRIS.edu/fdsnws/station/1/query?sta=ANMO&net=IU"))
+    http://service.iris.edu/fdsnws/station/1/query?net=IU&sta=ANMO
+
+    :type url: str
+    :rtype: str
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                       parts.path or "/", query, ""))
+
+
+def get_cache_key(url, data=None):
+    """
+    Return the cache key of a request, the hash of the normalized URL and the
+    body of POST requests.
+
+    :type url: str
+    :param url: Request URL.
+    :type data: bytes
+    :param data: Body of POST requests, ``None`` for GET requests.
+    :rtype: str
+    """
+    sha = hashlib.sha256(normalize_url(url).encode("utf-8"))
+    if data is not None:
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        # lines separated by CRLF or followed by blank lines request the same
+        sha.update(b"\n")
+        sha.update(b"\n".join(line.strip() for line in data.splitlines()
+                              if line.strip()))
+    return sha.hexdigest()
+
+
+class ResponseCache(object):
+    """
+    Cache of FDSN web service responses in a local directory.
+
+    Every response is stored in its own file (the HTTP code in the first
+    line, followed by the body), named by the hash of the normalized request
+    URL and POST body. The modification time of a file is the time the
+    response was downloaded, its access time the time it was last used.
+    Responses older than ``ttl`` are downloaded again. If the cached
+    responses exceed ``max_size``, the least recently used ones are deleted.
+
+    Several clients, also in different processes, can share a cache
+    directory.
+
+    >>> from obspy.clients.fdsn import Client
+    >>> from obspy.clients.fdsn.cache import ResponseCache
+    >>> cache = ResponseCache("fdsn_cache", ttl=3600)  # doctest: +SKIP
+    >>> client = Client("IRIS", cache=cache)  # doctest: +SKIP
+    >>> print(cache.stats)  # doctest: +SKIP
+    OrderedDict([('hits', 0), ('misses', 5), ('stores', 5), ...])
+
+    :type path: str
+    :param path: Directory of the cache, created (only accessible by the
+        current user) if it does not exist. Defaults to ``obspy/fdsn`` in the
+        cache directory of the user, see :func:`get_default_cache_path`.
+    :type ttl: float
+    :param ttl: Time in seconds after which cached responses expire.
+        ``None`` keeps responses until they are evicted.
+    :type max_size: int
+    :param max_size: Maximum size of all cached responses in bytes.
+        ``None`` disables the size limit.
+    """
+    def __init__(self, path=None, ttl=86400, max_size=1024 ** 3):
+        if path is None:
+            path = get_default_cache_path()
+        self.path = os.path.abspath(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        if not os.path.isdir(self.path):
+            # cached responses can contain data not meant for other users
+            os.makedirs(self.path, 0o700)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._size = sum(size for _, _, size in self._entries())
+
+    def __repr__(self):
+        return "ResponseCache(%r, ttl=%r, max_size=%r)" % (
+            self.path, self.ttl, self.max_size)
+
+    def _filename(self, key):
+        return os.path.join(self.path, key + CACHE_FILE_SUFFIX)
+
+    def _entries(self):
+        """
+        Return filename, access time and size of all cached responses.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                # removed by another client in the meantime
+                continue
+            entries.append((filename, stat.st_atime, stat.st_size))
+        return entries
+
+    def _remove(self, filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    @property
+    def stats(self):
+        """
+        Statistics of the cache.
+
+        Numbers of cache hits, misses, stored and evicted responses since the
+        cache object was created and the number and total size in bytes of
+        the responses currently in the cache.
+
+        :rtype: :class:`collections.OrderedDict`
+        """
+        entries = self._entries()
+        return OrderedDict([
+            ("hits", self.hits), ("misses", self.misses),
+            ("stores", self.stores), ("evictions", self.evictions),
+            ("entries", len(entries)),
+            ("size", sum(size for _, _, size in entries))])
+
+    def get(self, url, data=None):
+        """
+        Return the HTTP code and the body of the cached response of a request
+        or ``None``.
+
+        :type url: str
+        :param url: Request URL.
+        :type data: bytes
+        :param data: Body of POST requests.
+        :rtype: tuple(int, bytes)
+        """
+        filename = self._filename(get_cache_key(url, data))
+        try:
+            mtime = os.stat(filename).st_mtime
+            now = time.time()
+            if self.ttl is not None and now - mtime > self.ttl:
+                self._remove(filename)
+                response = None
+            else:
+                with open(filename, "rb") as fh:
+                    code = int(fh.readline())
+                    response = code, fh.read()
+                # mark as recently used, keeping the download time
+                os.utime(filename, (now, mtime))
+        except (IOError, OSError, ValueError):
+            response = None
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def put(self, url, data, code, response):
+        """
+        Store the response of a request.
+
+        Problems writing to the cache only raise a warning, as the response
+        is available anyway.
+
+        :type url: str
+        :param url: Request URL.
+        :type data: bytes
+        :param data: Body of POST requests, ``None`` for GET requests.
+        :type code: int
+        :param code: HTTP code of the response.
+        :type response: bytes
+        :param response: Body of the response.
+        """
+        response = ("%d\n" % code).encode() + response
+        if self.max_size is not None and len(response) > self.max_size:
+            return
+        filename = self._filename(get_cache_key(url, data))
+        tmp_filename = None
+        try:
+            # write to a temporary file first, so that other clients never
+            # read incomplete responses
+            fd, tmp_filename = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(response)
+            # the size of a replaced response is freed
+            try:
+                replaced_size = os.path.getsize(filename)
+            except OSError:
+                replaced_size = 0
+            if hasattr(os, "replace"):
+                os.replace(tmp_filename, filename)
+            else:
+                self._remove(filename)
+                os.rename(tmp_filename, filename)
+        except (IOError, OSError) as e:
+            if tmp_filename is not None:
+                self._remove(tmp_filename)
+            warnings.warn("Could not write to FDSN response cache '%s': %s" %
+                          (self.path, str(e)))
+            return
+        with self._lock:
+            self.stores += 1
+            self._size += len(response) - replaced_size
+            evict = self.max_size is not None and self._size > self.max_size
+        if evict:
+            self._evict()
+
+    def _evict(self):
+        """
+        Delete the least recently used responses until the cache is below
+        its maximum size.
+        """
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda x: x[1])
+            size = sum(size_ for _, _, size_ in entries)
+            for filename, _, size_ in entries:
+                if size <= self.max_size:
+                    break
+                self._remove(filename)
+                size -= size_
+                self.evictions += 1
+            self._size = size
+
+    def clear(self):
+        """
+        Delete all cached responses.
+        """
+        with self._lock:
+            for filename, _, _ in self._entries():
+                self._remove(filename)
+            self._size = 0
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -22,14 +22,18 @@ import re
 from socket import timeout as socket_timeout
 import textwrap
 import threading
+import time
 import warnings
 from collections import OrderedDict
+from multiprocessing.dummy import Pool as ThreadPool
 
 from lxml import etree
 
 import obspy
 from obspy import UTCDateTime, read_inventory
 from obspy.core.compatibility import urlparse, collections_abc
+from .cache import ResponseCache
+from .connection_pool import ConnectionPool, get_keep_alive_handlers
 from .header import (DEFAULT_PARAMETERS, DEFAULT_USER_AGENT, FDSNWS,
                      OPTIONAL_PARAMETERS, PARAMETER_ALIASES, URL_MAPPINGS,
                      WADL_PARAMETERS_NOT_TO_BE_PARSED, DEFAULT_SERVICES,
@@ -48,6 +52,15 @@ else:
 
 DEFAULT_SERVICE_VERSIONS = {'dataselect': 1, 'station': 1, 'event': 1}
 
+# HTTP codes of temporary errors, on which the chunks of bulk requests are
+# retried
+RETRY_HTTP_CODES = (429, 500, 502, 503, 504)
+# seconds to wait before retrying a chunk the first time, doubled for every
+# further retry
+RETRY_BACKOFF = 1.0
+# maximum number of seconds to wait before a retry
+RETRY_MAX_WAIT = 60.0
+
 
 class CustomRedirectHandler(urllib_request.HTTPRedirectHandler):
     """
@@ -80,6 +93,13 @@ class CustomRedirectHandler(urllib_request.HTTPRedirectHandler):
             unverifiable=True)
 
 
+NO_REDIRECT_MSG = (
+    "Requests with credentials (username, password) are not being "
+    "redirected by default to improve security. To force redirects "
+    "and if you trust the data center, set `force_redirect` to True "
+    "when initializing the Client.")
+
+
 class NoRedirectionHandler(urllib_request.HTTPRedirectHandler):
     """
     Handler that does not direct!
@@ -88,11 +108,7 @@ class NoRedirectionHandler(urllib_request.HTTPRedirectHandler):
         """
         Copied and modified from the standard library.
         """
-        raise FDSNRedirectException(
-            "Requests with credentials (username, password) are not being "
-            "redirected by default to improve security. To force redirects "
-            "and if you trust the data center, set `force_redirect` to True "
-            "when initializing the Client.")
+        raise FDSNRedirectException(NO_REDIRECT_MSG)
 
 
 class Client(object):
@@ -139,7 +155,7 @@ class Client(object):
     def __init__(self, base_url="IRIS", major_versions=None, user=None,
                  password=None, user_agent=DEFAULT_USER_AGENT, debug=False,
                  timeout=120, service_mappings=None, force_redirect=False,
-                 eida_token=None, _discover_services=True):
+                 eida_token=None, cache=None, _discover_services=True):
         """
         Initializes an FDSN Web Service client.
 
@@ -201,6 +217,15 @@ class Client(object):
             used. This mechanism is only available on select EIDA nodes. The
             token can be provided in form of the PGP message as a string, or
             the filename of a local file with the PGP message in it.
+        :type cache: :class:`~obspy.clients.fdsn.cache.ResponseCache` or str
+        :param cache: Cache of the responses of the web services, either a
+            :class:`~obspy.clients.fdsn.cache.ResponseCache` (which can be
+            shared by several clients) or the directory of a new cache with
+            default settings. Successful requests (including the service
+            discovery) are then answered from the cache if the same request
+            has been sent before. By default nothing is cached. Requests
+            with credentials (see :meth:`set_credentials` and
+            :meth:`set_eida_token`) are never cached.
         :type _discover_services: bool
         :param _discover_services: By default the client will query information
             about the FDSN endpoint when it is instantiated.  In certain cases,
@@ -213,6 +238,9 @@ class Client(object):
         self.user = user
         self.timeout = timeout
         self._force_redirect = force_redirect
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache)
+        self.cache = cache
 
         # Cache for the webservice versions. This makes interactive use of
         # the client more convenient.
@@ -236,6 +264,9 @@ class Client(object):
 
         self.base_url = base_url
 
+        # Idle connections are kept open and reused by all requests of this
+        # client.
+        self._connection_pool = ConnectionPool()
         self._set_opener(user, password)
 
         self.request_headers = {"User-Agent": user_agent}
@@ -339,6 +370,7 @@ class Client(object):
             handlers.append(CustomRedirectHandler())
         else:
             handlers.append(NoRedirectionHandler())
+        handlers.extend(get_keep_alive_handlers(self._connection_pool))
 
         # Don't install globally to not mess with other codes.
         self._url_opener = urllib_request.build_opener(*handlers)
@@ -349,6 +381,17 @@ class Client(object):
         """
         Use the token to get credentials.
         """
+        url, data = self._get_eida_token_request(token, validate=validate)
+        # Already does the error checking with fdsnws semantics.
+        response = self._download(url=url, data=data, use_gzip=True,
+                                  return_string=True, use_cache=False)
+        return self._parse_eida_credentials(response)
+
+    def _get_eida_token_request(self, token, validate=True):
+        """
+        Return URL and body of the request exchanging a token for
+        credentials.
+        """
         if not self._has_eida_auth:
             msg = ("EIDA token authentication requested but service at '{}' "
                    "does not specify /dataselect/auth in the "
@@ -381,11 +424,12 @@ class Client(object):
         if urlparse(url).scheme != "https":
             msg = 'This should not happen, please file a bug report.'
             raise Exception(msg)
+        return url, token.encode()
 
-        # Already does the error checking with fdsnws semantics.
-        response = self._download(url=url, data=token.encode(),
-                                  use_gzip=True, return_string=True)
-
+    def _parse_eida_credentials(self, response):
+        """
+        Return user and password of the response to a token request.
+        """
         user, password = response.decode().split(':')
         if self.debug:
             print('Got temporary user/pw: {}/{}'.format(user, password))
@@ -514,25 +558,10 @@ class Client(object):
         non-default parameters that the webservice does not support will raise
         an error.
         """
-        if "event" not in self.services:
-            msg = "The current client does not have an event service."
-            raise ValueError(msg)
-
-        locs = locals()
-        setup_query_dict('event', locs, kwargs)
-
-        url = self._create_url_from_parameters(
-            "event", DEFAULT_PARAMETERS['event'], kwargs)
+        url = self._get_query_url("event", locals(), kwargs)
 
         data_stream = self._download(url)
-        data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            cat = obspy.read_events(data_stream, format="quakeml")
-            data_stream.close()
-            return cat
+        return self._read_response(data_stream, filename, _read_quakeml)
 
     def get_stations(self, starttime=None, endtime=None, startbefore=None,
                      startafter=None, endbefore=None, endafter=None,
@@ -712,26 +741,11 @@ class Client(object):
         non-default parameters that the webservice does not support will raise
         an error.
         """
-        if "station" not in self.services:
-            msg = "The current client does not have a station service."
-            raise ValueError(msg)
-
-        locs = locals()
-        setup_query_dict('station', locs, kwargs)
-
-        url = self._create_url_from_parameters(
-            "station", DEFAULT_PARAMETERS['station'], kwargs)
+        url = self._get_query_url("station", locals(), kwargs)
 
         data_stream = self._download(url)
-        data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            # This works with XML and StationXML data.
-            inventory = read_inventory(data_stream)
-            data_stream.close()
-            return inventory
+        # This works with XML and StationXML data.
+        return self._read_response(data_stream, filename, read_inventory)
 
     def get_waveforms(self, network, station, location, channel, starttime,
                       endtime, quality=None, minimumlength=None,
@@ -825,35 +839,75 @@ class Client(object):
         non-default parameters that the webservice does not support will raise
         an error.
         """
-        if "dataselect" not in self.services:
-            msg = "The current client does not have a dataselect service."
+        url = self._get_query_url("dataselect", locals(), kwargs)
+
+        # Gzip not worth it for MiniSEED and most likely disabled for this
+        # route in any case.
+        data_stream = self._download(url, use_gzip=False)
+        st = self._read_response(data_stream, filename, _read_mseed)
+        if filename:
+            return
+        if attach_response:
+            self._attach_responses(st)
+        self._attach_dataselect_url_to_stream(st)
+        st.trim(starttime, endtime)
+        return st
+
+    def _get_query_url(self, service, locs, kwargs):
+        """
+        Return the query URL of a service for the arguments of a ``get_*()``
+        method.
+
+        :type locs: dict
+        :param locs: Arguments of the method (i.e. its ``locals()``).
+        :type kwargs: dict
+        :param kwargs: Additional keyword arguments of the method.
+        """
+        if service not in self.services:
+            msg = "The current client does not have %s %s service." % (
+                "an" if service == "event" else "a", service)
             raise ValueError(msg)
 
-        locs = locals()
-        setup_query_dict('dataselect', locs, kwargs)
+        setup_query_dict(service, locs, kwargs)
 
         # Special location handling. Convert empty strings to "--".
-        if "location" in kwargs and not kwargs["location"]:
+        if service == "dataselect" and "location" in kwargs and \
+                not kwargs["location"]:
             kwargs["location"] = "--"
 
-        url = self._create_url_from_parameters(
-            "dataselect", DEFAULT_PARAMETERS['dataselect'], kwargs)
+        return self._create_url_from_parameters(
+            service, DEFAULT_PARAMETERS[service], kwargs)
 
-        # Gzip not worth it for MiniSEED and most likely disabled for this
-        # route in any case.
-        data_stream = self._download(url, use_gzip=False)
+    def _get_bulk_request(self, service, bulk, arguments):
+        """
+        Return the query URL of a service and the body of a bulk request.
+        """
+        if service not in self.services:
+            msg = "The current client does not have a %s service." % service
+            raise ValueError(msg)
+
+        bulk = get_bulk_string(bulk, arguments)
+        return self._build_url(service, "query"), bulk
+
+    def _read_response(self, data_stream, filename, read):
+        """
+        Write the downloaded data to the given file or parse it with the
+        given function.
+
+        :type data_stream: :class:`io.BytesIO`
+        :param data_stream: Downloaded data, closed afterwards.
+        :param read: Function returning the parsed data of a file-like
+            object.
+        :returns: Parsed data or ``None`` if it was written to file.
+        """
         data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            st = obspy.read(data_stream, format="MSEED")
+        try:
+            if filename:
+                self._write_to_file_object(filename, data_stream)
+                return None
+            return read(data_stream)
+        finally:
             data_stream.close()
-            if attach_response:
-                self._attach_responses(st)
-            self._attach_dataselect_url_to_stream(st)
-            st.trim(starttime, endtime)
-            return st
 
     def _attach_responses(self, st):
         """
@@ -883,7 +937,8 @@ class Client(object):
 
     def get_waveforms_bulk(self, bulk, quality=None, minimumlength=None,
                            longestonly=None, filename=None,
-                           attach_response=False, **kwargs):
+                           attach_response=False, chunk_size=None, threads=1,
+                           retries=3, **kwargs):
         r"""
         Query the dataselect service of the client. Bulk request.
 
@@ -976,6 +1031,14 @@ class Client(object):
             information to each trace. This can be used to remove response
             using :meth:`~obspy.core.stream.Stream.remove_response`.
 
+        Large requests can be split into smaller requests that are sent in
+        parallel, see ``chunk_size`` and ``threads``. The data of every
+        chunk is parsed (or written to ``filename``) as soon as it and all
+        chunks before it have arrived:
+
+        >>> st = client.get_waveforms_bulk(bulk, chunk_size=1, threads=3) \
+        ...     # doctest: +SKIP
+
         :type bulk: str, file or list of lists
         :param bulk: Information about the requested data. See above for
             details.
@@ -1000,6 +1063,20 @@ class Client(object):
             in the result set. A warning will be shown if a response can not be
             found for a channel. Does nothing if output to a file was
             specified.
+        :type chunk_size: int
+        :param chunk_size: If given, the request is split into requests of at
+            most ``chunk_size`` lines (i.e. items of ``bulk``) each, which are
+            sent ``threads`` at a time.
+        :type threads: int
+        :param threads: Number of requests sent in parallel. If ``threads`` is
+            larger than one and no ``chunk_size`` is given, the request is
+            split evenly into ``threads`` requests.
+        :type retries: int
+        :param retries: Number of times a chunk of a split request is retried
+            after temporary errors (timeouts, connection errors and HTTP
+            codes 429, 500, 502, 503 and 504), waiting one, two, four etc.
+            seconds or as long as requested by the server in between. Chunks
+            without any data are skipped.
 
         Any additional keyword arguments will be passed to the webservice as
         additional arguments. If you pass one of the default parameters and the
@@ -1007,35 +1084,40 @@ class Client(object):
         non-default parameters that the webservice does not support will raise
         an error.
         """
-        if "dataselect" not in self.services:
-            msg = "The current client does not have a dataselect service."
-            raise ValueError(msg)
-
         arguments = OrderedDict(
             quality=quality,
             minimumlength=minimumlength,
             longestonly=longestonly
         )
-        bulk = get_bulk_string(bulk, arguments)
-
-        url = self._build_url("dataselect", "query")
-
-        data_stream = self._download(url,
-                                     data=bulk)
-        data_stream.seek(0, 0)
-        if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
-        else:
-            st = obspy.read(data_stream, format="MSEED")
-            data_stream.close()
+        url, bulk = self._get_bulk_request("dataselect", bulk, arguments)
+
+        if chunk_size is not None or threads > 1:
+            chunks = self._download_bulk_chunks(url, bulk, chunk_size,
+                                                threads, retries)
+            if filename:
+                self._write_chunks_to_file_object(filename, chunks)
+                return
+            st = obspy.Stream()
+            for data_stream in chunks:
+                st += self._read_response(data_stream, None, _read_mseed)
             if attach_response:
                 self._attach_responses(st)
             self._attach_dataselect_url_to_stream(st)
             return st
 
+        data_stream = self._download(url,
+                                     data=bulk)
+        st = self._read_response(data_stream, filename, _read_mseed)
+        if filename:
+            return
+        if attach_response:
+            self._attach_responses(st)
+        self._attach_dataselect_url_to_stream(st)
+        return st
+
     def get_stations_bulk(self, bulk, level=None, includerestricted=None,
-                          includeavailability=None, filename=None, **kwargs):
+                          includeavailability=None, filename=None,
+                          chunk_size=None, threads=1, retries=3, **kwargs):
         r"""
         Query the station service of the client. Bulk request.
 
@@ -1145,7 +1227,23 @@ class Client(object):
         :type filename: str or file
         :param filename: If given, the downloaded data will be saved there
             instead of being parsed to an ObsPy object. Thus it will contain
-            the raw data from the webservices.
+            the raw data from the webservices. If the request is split into
+            several requests, their merged inventory is written as StationXML
+            instead.
+        :type chunk_size: int
+        :param chunk_size: If given, the request is split into requests of at
+            most ``chunk_size`` lines (i.e. items of ``bulk``) each, which are
+            sent ``threads`` at a time.
+        :type threads: int
+        :param threads: Number of requests sent in parallel. If ``threads`` is
+            larger than one and no ``chunk_size`` is given, the request is
+            split evenly into ``threads`` requests.
+        :type retries: int
+        :param retries: Number of times a chunk of a split request is retried
+            after temporary errors (timeouts, connection errors and HTTP
+            codes 429, 500, 502, 503 and 504), waiting one, two, four etc.
+            seconds or as long as requested by the server in between. Chunks
+            without any data are skipped.
 
         Any additional keyword arguments will be passed to the webservice as
         additional arguments. If you pass one of the default parameters and the
@@ -1153,31 +1251,41 @@ class Client(object):
         non-default parameters that the webservice does not support will raise
         an error.
         """
-        if "station" not in self.services:
-            msg = "The current client does not have a station service."
-            raise ValueError(msg)
-
         arguments = OrderedDict(
             level=level,
             includerestriced=includerestricted,
             includeavailability=includeavailability
         )
-        bulk = get_bulk_string(bulk, arguments)
+        url, bulk = self._get_bulk_request("station", bulk, arguments)
 
-        url = self._build_url("station", "query")
+        if chunk_size is not None or threads > 1:
+            return self._merge_inventories(
+                self._download_bulk_chunks(url, bulk, chunk_size, threads,
+                                           retries),
+                filename)
 
         data_stream = self._download(url,
                                      data=bulk)
-        data_stream.seek(0, 0)
+        # Works with text and StationXML data.
+        return self._read_response(data_stream, filename, read_inventory)
+
+    def _merge_inventories(self, chunks, filename):
+        """
+        Merge the inventories of the chunks of a split station request and
+        write them to the given file or return them.
+        """
+        inv = None
+        for data_stream in chunks:
+            # Works with text and StationXML data.
+            chunk_inv = self._read_response(data_stream, None, read_inventory)
+            if inv is None:
+                inv = chunk_inv
+            else:
+                inv += chunk_inv
         if filename:
-            self._write_to_file_object(filename, data_stream)
-            data_stream.close()
+            inv.write(filename, format="STATIONXML")
             return
-        else:
-            # Works with text and StationXML data.
-            inv = obspy.read_inventory(data_stream)
-            data_stream.close()
-            return inv
+        return inv
 
     def _write_to_file_object(self, filename_or_object, data_stream):
         if hasattr(filename_or_object, "write"):
@@ -1186,6 +1294,25 @@ class Client(object):
         with open(filename_or_object, "wb") as fh:
             fh.write(data_stream.read())
 
+    def _write_chunks_to_file_object(self, filename_or_object, chunks):
+        """
+        Write the data of all chunks of a split bulk request one after
+        another. A file is only created once the first chunk has arrived.
+        """
+        fh = None
+        try:
+            for data_stream in chunks:
+                if fh is None:
+                    if hasattr(filename_or_object, "write"):
+                        fh = filename_or_object
+                    else:
+                        fh = open(filename_or_object, "wb")
+                fh.write(data_stream.read())
+                data_stream.close()
+        finally:
+            if fh is not None and fh is not filename_or_object:
+                fh.close()
+
     def _create_url_from_parameters(self, service, default_params, parameters):
         """
         """
@@ -1389,14 +1516,112 @@ class Client(object):
 
         print("\n".join(msg))
 
-    def _download(self, url, return_string=False, data=None, use_gzip=True):
-        code, data = download_url(
-            url, opener=self._url_opener, headers=self.request_headers,
-            debug=self.debug, return_string=return_string, data=data,
-            timeout=self.timeout, use_gzip=use_gzip)
+    def _download(self, url, return_string=False, data=None, use_gzip=True,
+                  use_cache=True):
+        code, data = self._download_url(
+            url, return_string=return_string, data=data, use_gzip=use_gzip,
+            use_cache=use_cache)
         raise_on_error(code, data)
         return data
 
+    def _get_cache(self, use_cache=True):
+        """
+        Return the response cache to use for a request, if any.
+
+        Requests of clients with credentials are never cached, the cache key
+        does not include the credentials and cached restricted data would be
+        returned to any other client sharing the cache.
+        """
+        if not use_cache or self.user is not None:
+            return None
+        return self.cache
+
+    def _download_url(self, url, return_string=False, data=None,
+                      use_gzip=True, use_cache=True, timeout=None,
+                      cache_codes=(200,)):
+        """
+        Like :func:`download_url` with the settings of the client, but
+        answered from the response cache of the client if possible.
+
+        Responses with one of the given HTTP codes are stored in the cache.
+        Cached responses of other codes than 200 are returned with the body
+        as bytes.
+        """
+        cache = self._get_cache(use_cache)
+        if cache is not None:
+            cached = cache.get(url, data)
+            if cached is not None:
+                code, response = cached
+                if self.debug is True:
+                    print("Loaded %s from cache" % url)
+                if code == 200 and return_string is False:
+                    response = io.BytesIO(response)
+                return code, response
+        code, response = download_url(
+            url, opener=self._url_opener, headers=self.request_headers,
+            debug=self.debug, return_string=return_string, data=data,
+            timeout=self.timeout if timeout is None else timeout,
+            use_gzip=use_gzip)
+        if cache is not None and code in cache_codes:
+            if code != 200:
+                response = b""
+            cache.put(url, data, code, response if return_string is not False
+                      else response.getvalue())
+        return code, response
+
+    def _download_with_retries(self, url, data, retries):
+        """
+        Download with retries after temporary errors.
+
+        :rtype: :class:`io.BytesIO`
+        :returns: The downloaded data or ``None`` if there is no data.
+        """
+        for attempt in range(retries + 1):
+            code, response = self._download_url(url, data=data)
+            if code == 204:
+                return None
+            if attempt < retries and (code is None or
+                                      code in RETRY_HTTP_CODES):
+                wait = _get_retry_wait(response, attempt)
+                if self.debug:
+                    print("Retrying %s in %.1f seconds after HTTP code %s" % (
+                        url, wait, code))
+                time.sleep(wait)
+                continue
+            raise_on_error(code, response)
+            return response
+
+    def _download_bulk_chunks(self, url, bulk, chunk_size, threads,
+                              retries):
+        """
+        Download a bulk request split into several requests, which are sent
+        in parallel.
+
+        Yields the data of all chunks with data as :class:`io.BytesIO` in the
+        order of the chunks, each as soon as it and all chunks before it have
+        been downloaded.
+        """
+        if threads < 1:
+            raise ValueError("'threads' must be at least one.")
+        chunks = split_bulk_string(bulk, chunk_size, threads)
+        pool = ThreadPool(min(threads, len(chunks)))
+        found_data = False
+        try:
+            for data_stream in pool.imap(
+                    lambda chunk: self._download_with_retries(url, chunk,
+                                                              retries),
+                    chunks):
+                if data_stream is None:
+                    continue
+                found_data = True
+                data_stream.seek(0, 0)
+                yield data_stream
+        finally:
+            pool.terminate()
+            pool.join()
+        if not found_data:
+            raise FDSNNoDataException("No data available for request.")
+
     def _build_url(self, service, resource_type, parameters={}):
         """
         Builds the correct URL.
@@ -1419,41 +1644,24 @@ class Client(object):
         They are discovered by downloading the corresponding WADL files. If a
         WADL does not exist, the services are assumed to be non-existent.
         """
-        services = ["dataselect", "event", "station"]
-        # omit manually deactivated services
-        for service, custom_target in self._service_mappings.items():
-            if custom_target is None:
-                services.remove(service)
-        urls = [self._build_url(service, "application.wadl")
-                for service in services]
-        if "event" in services:
-            urls.append(self._build_url("event", "catalogs"))
-            urls.append(self._build_url("event", "contributors"))
-
-        # Access cache if available.
-        url_hash = frozenset(urls)
-        if url_hash in self.__service_discovery_cache:
-            if self.debug is True:
-                print("Loading discovered services from cache.")
-            self.services = copy.deepcopy(
-                self.__service_discovery_cache[url_hash])
+        urls = self._get_discovery_urls()
+        if self._load_discovered_services(urls):
             return
 
         # Request all in parallel.
         wadl_queue = queue.Queue()
 
-        headers = self.request_headers
-        debug = self.debug
-        opener = self._url_opener
+        download = self._download_url
 
         def get_download_thread(url):
             class ThreadURL(threading.Thread):
                 def run(self):
                     # Catch 404s.
                     try:
-                        code, data = download_url(
-                            url, opener=opener, headers=headers,
-                            debug=debug)
+                        # services not found are cached too
+                        code, data = download(url, return_string=True,
+                                              timeout=10,
+                                              cache_codes=(200, 404))
                         if code == 200:
                             wadl_queue.put((url, data))
                         # Pass on the redirect exception.
@@ -1479,15 +1687,61 @@ class Client(object):
         for thread in threads:
             thread.join(15)
 
+        self._set_discovered_services(
+            urls, [wadl_queue.get() for _ in range(wadl_queue.qsize())])
+
+    def _get_discovery_urls(self):
+        """
+        Return the URLs of the WADL files (and event catalogs and
+        contributors) of all services that are not deactivated.
+        """
+        services = ["dataselect", "event", "station"]
+        # omit manually deactivated services
+        for service, custom_target in self._service_mappings.items():
+            if custom_target is None:
+                services.remove(service)
+        urls = [self._build_url(service, "application.wadl")
+                for service in services]
+        if "event" in services:
+            urls.append(self._build_url("event", "catalogs"))
+            urls.append(self._build_url("event", "contributors"))
+        return urls
+
+    def _load_discovered_services(self, urls):
+        """
+        Set the services discovered before for the same URLs, if any.
+
+        :rtype: bool
+        :returns: Whether the services were found in the cache.
+        """
+        # Access cache if available.
+        url_hash = frozenset(urls)
+        if url_hash in self.__service_discovery_cache:
+            if self.debug is True:
+                print("Loading discovered services from cache.")
+            self.services = copy.deepcopy(
+                self.__service_discovery_cache[url_hash])
+            return True
+        return False
+
+    def _set_discovered_services(self, urls, results):
+        """
+        Set the services of the client from the downloaded WADL files etc.
+
+        :type urls: list of str
+        :param urls: URLs of the service discovery.
+        :type results: list of tuple
+        :param results: URL and downloaded data of each URL, ``None`` if
+            there is nothing at the URL, a :class:`FDSNRedirectException` for
+            refused redirects or ``"timeout"``.
+        """
         self.services = {}
 
         # Collect the redirection exceptions to be able to raise nicer
         # exceptions.
         redirect_messages = set()
 
-        for _ in range(wadl_queue.qsize()):
-            item = wadl_queue.get()
-            url, wadl = item
+        for url, wadl in results:
 
             # Just a safety measure.
             if hasattr(wadl, "decode"):
@@ -1549,7 +1803,7 @@ class Client(object):
         # Cache.
         if self.debug is True:
             print("Storing discovered services in cache.")
-        self.__service_discovery_cache[url_hash] = \
+        self.__service_discovery_cache[frozenset(urls)] = \
             copy.deepcopy(self.services)
 
     def get_webservice_version(self, service):
@@ -1596,6 +1850,14 @@ class Client(object):
             tr.stats._fdsnws_dataselect_url = url
 
 
+def _read_quakeml(data_stream):
+    return obspy.read_events(data_stream, format="quakeml")
+
+
+def _read_mseed(data_stream):
+    return obspy.read(data_stream, format="MSEED")
+
+
 def convert_to_string(value):
     """
     Takes any value and converts it to a string compliant with the FDSN
@@ -1879,6 +2141,62 @@ def parse_simple_xml(xml_string):
     return {root.tag.lower(): set(children)}
 
 
+def split_bulk_string(bulk, chunk_size=None, chunks=1):
+    r"""
+    Split a bulk request into several requests.
+
+    Lines with parameters (e.g. ``quality=B``) are part of all requests, the
+    other lines are distributed in order.
+
+    >>> bulk = (b"quality=B\n"
+    ...         b"IU ANMO * BHZ 2010-02-27 2010-02-28\n"
+    ...         b"IU AFI * BHZ 2010-02-27 2010-02-28\n"
+    ...         b"GR GRA1 * BHZ 2010-02-27 2010-02-28")
+    >>> for request in split_bulk_string(bulk, chunk_size=2):
+    ...     print(request.decode())
+    ...     print("---")
+    quality=B
+    IU ANMO * BHZ 2010-02-27 2010-02-28
+    IU AFI * BHZ 2010-02-27 2010-02-28
+    ---
+    quality=B
+    GR GRA1 * BHZ 2010-02-27 2010-02-28
+    ---
+
+    :type bulk: bytes
+    :param bulk: Bulk request as returned by :func:`get_bulk_string`.
+    :type chunk_size: int
+    :param chunk_size: Maximum number of lines (without parameters) per
+        request.
+    :type chunks: int
+    :param chunks: Number of requests if no ``chunk_size`` is given.
+    :rtype: list of bytes
+    """
+    lines = [line.strip() for line in bulk.splitlines()]
+    parameters = [line for line in lines if b"=" in line]
+    lines = [line for line in lines if line and b"=" not in line]
+    if chunk_size is None:
+        chunk_size = -(-len(lines) // chunks)
+    chunk_size = max(chunk_size, 1)
+    return [b"\n".join(parameters + lines[i:i + chunk_size])
+            for i in range(0, max(len(lines), 1), chunk_size)]
+
+
+def _get_retry_wait(response, attempt):
+    """
+    Return the number of seconds to wait before retrying a request, as
+    requested by the server with a ``Retry-After`` header or growing
+    exponentially with the number of attempts.
+    """
+    headers = getattr(response, "headers", None)
+    retry_after = headers.get("Retry-After") if headers is not None else None
+    try:
+        wait = float(retry_after)
+    except (TypeError, ValueError):
+        wait = RETRY_BACKOFF * 2 ** attempt
+    return min(max(wait, 0.0), RETRY_MAX_WAIT)
+
+
 def get_bulk_string(bulk, arguments):
     # If its an iterable, we build up the query string from it
     # StringIO objects also have __iter__ so check for 'read' as well
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent HTTP connections for the FDSN web service client.
+
+:mod:`urllib` opens a new connection for every request and closes it after
+the response has been read. The handlers in this module keep the connections
+open (HTTP keep-alive) and reuse them for subsequent requests to the same
+host, which saves the TCP (and TLS) handshakes when sending many small
+requests to a data center.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import socket
+import threading
+
+if PY2:
+    import httplib as http_client
+    import urllib2 as urllib_request
+else:
+    import http.client as http_client
+    import urllib.request as urllib_request
+
+
+class ConnectionPool(object):
+    """
+    Thread-safe pool of idle persistent HTTP connections.
+
+    :type maxsize: int
+    :param maxsize: Maximum number of idle connections kept per host.
+        Connections are not limited while they are in use, only the number of
+        connections waiting for reuse is.
+    """
+    def __init__(self, maxsize=10):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._idle = {}
+        # number of opened and reused connections, mainly for testing and
+        # debugging
+        self.opened = 0
+        self.reused = 0
+
+    def get(self, key):
+        """
+        Return an idle connection for the given key or ``None``.
+        """
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                self.reused += 1
+                return connections.pop()
+            self.opened += 1
+            return None
+
+    def put(self, key, connection):
+        """
+        Return a connection, whose last response has been read completely,
+        to the pool.
+        """
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.maxsize:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def clear(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class _PooledResponse(http_client.HTTPResponse):
+    """
+    HTTP response that returns its connection to the pool once the body has
+    been read completely.
+    """
+    _release = None
+    _reusable = True
+
+    def close(self):
+        if self.fp is not None:
+            # closed before the body has been read completely, the rest of
+            # the body would be read as response of the next request
+            self._reusable = False
+        super(_PooledResponse, self).close()
+
+    def _close_conn(self):
+        super(_PooledResponse, self)._close_conn()
+        release, self._release = self._release, None
+        if release is not None and self._reusable and not self.will_close:
+            release()
+
+
+class _KeepAliveMixin(object):
+    """
+    Replaces :meth:`urllib.request.AbstractHTTPHandler.do_open` with a version
+    that takes connections from a :class:`ConnectionPool` and does not close
+    them after the request.
+    """
+    def _open_pooled(self, http_class, req, **http_conn_args):
+        host = req.host
+        if not host:
+            raise urllib_request.URLError('no host given')
+        if req._tunnel_host:
+            # connections through proxy tunnels are not pooled
+            return self.do_open(http_class, req, **http_conn_args)
+
+        key = (http_class, host, req.timeout)
+        headers = dict(req.unredirected_hdrs)
+        headers.update((k, v) for k, v in req.headers.items()
+                       if k not in headers)
+        headers["Connection"] = "keep-alive"
+        headers = dict((name.title(), val) for name, val in headers.items())
+
+        while True:
+            connection = self.pool.get(key)
+            reused = connection is not None
+            if connection is None:
+                connection = http_class(host, timeout=req.timeout,
+                                        **http_conn_args)
+                connection.response_class = _PooledResponse
+            connection.set_debuglevel(self._debuglevel)
+            try:
+                connection.request(
+                    req.get_method(), req.selector, req.data, headers,
+                    encode_chunked=req.has_header('Transfer-encoding'))
+                response = connection.getresponse()
+            except (socket.error, http_client.HTTPException) as e:
+                connection.close()
+                # the server closed the idle connection in the meantime, try
+                # again with a new one
+                if reused and not isinstance(e, socket.timeout):
+                    continue
+                if isinstance(e, http_client.HTTPException):
+                    raise
+                raise urllib_request.URLError(e)
+            except Exception:
+                connection.close()
+                raise
+            break
+
+        if response.will_close:
+            connection.close()
+        else:
+            response._release = \
+                lambda: self.pool.put(key, connection)
+        response.url = req.get_full_url()
+        response.msg = response.reason
+        return response
+
+
+class KeepAliveHTTPHandler(_KeepAliveMixin, urllib_request.HTTPHandler):
+    """
+    HTTP handler reusing the connections of a :class:`ConnectionPool`.
+
+    :type pool: :class:`ConnectionPool`
+    :param pool: Pool of idle connections, can be shared between handlers
+        and openers.
+    """
+    def __init__(self, pool, debuglevel=0):
+        urllib_request.HTTPHandler.__init__(self, debuglevel=debuglevel)
+        self.pool = pool
+
+    def http_open(self, req):
+        return self._open_pooled(http_client.HTTPConnection, req)
+
+
+class KeepAliveHTTPSHandler(_KeepAliveMixin, urllib_request.HTTPSHandler):
+    """
+    HTTPS handler reusing the connections of a :class:`ConnectionPool`.
+
+    :type pool: :class:`ConnectionPool`
+    :param pool: Pool of idle connections, can be shared between handlers
+        and openers.
+    """
+    def __init__(self, pool, debuglevel=0, context=None):
+        urllib_request.HTTPSHandler.__init__(self, debuglevel=debuglevel,
+                                             context=context)
+        self.pool = pool
+
+    def https_open(self, req):
+        return self._open_pooled(http_client.HTTPSConnection, req,
+                                 context=self._context)
+
+
+def get_keep_alive_handlers(pool):
+    """
+    Return the handlers to add to an :mod:`urllib` opener to reuse the
+    connections of the given pool.
+
+    Returns an empty list on Python 2, where connections are not reused.
+
+    :type pool: :class:`ConnectionPool`
+    :rtype: list
+    """
+    if PY2:
+        return []
+    return [KeepAliveHTTPHandler(pool), KeepAliveHTTPSHandler(pool)]
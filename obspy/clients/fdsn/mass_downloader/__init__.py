@@ -412,6 +412,32 @@ value in agreement with some data centers.
 ...              threads_per_client=3, mseed_storage=mseed_storage,
 ...              stationxml_storage=stationxml_storage)  # doctest: +SKIP
 
+Long running downloads can keep a journal of their progress in a SQLite
+database. If such a download is restarted, it skips all time intervals that
+were already downloaded or rejected by the quality checks, downloads files
+again that were incomplete when the download stopped and does not parse the
+existing StationXML files again. With ``adaptive=True`` the number of threads
+and the chunk size of every data center follow its throughput and errors,
+starting with the given values (or the ones learned in an earlier run with
+the same journal).
+
+>>> mdl.download(domain, restrictions, mseed_storage=mseed_storage,
+...              stationxml_storage=stationxml_storage,
+...              journal="download_journal.sqlite",
+...              adaptive=True)  # doctest: +SKIP
+
+Data centers offering a ``fdsnws-availability`` service can tell which time
+intervals actually have data before any waveforms are requested. With
+``availability=True`` the availability of all channels is requested in bulk
+from every data center and time intervals without data are not requested at
+all. Alternatively, pass the
+:class:`~obspy.clients.filesystem.tsindex.Client` of a local tsindex database
+describing the available data.
+
+>>> mdl.download(domain, restrictions, mseed_storage=mseed_storage,
+...              stationxml_storage=stationxml_storage,
+...              availability=True)  # doctest: +SKIP
+
 
 How it Works
 ------------
@@ -435,7 +461,9 @@ and downloading whatever it offers. A bit more detail:
    b) Channel and location priorities are applied resulting in a single
       instrument per station.
 
-   c) Any already existing network + station combinations are discarded.
+   c) Any already existing network + station combinations are discarded. If
+      desired, time intervals without data according to a data availability
+      service are discarded as well.
 
    d) If the availability for the particular client is considered reliable it
       will perform the minimum distance filtering now. If no stations have
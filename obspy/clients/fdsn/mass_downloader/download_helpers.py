@@ -28,8 +28,10 @@ import timeit
 
 if sys.version_info.major == 2:
     from itertools import ifilterfalse as filterfalse
+    import Queue as queue  # NOQA
 else:
     from itertools import filterfalse
+    import queue
 
 import numpy as np
 
@@ -211,11 +213,15 @@ class Station(_SlotsEqualityComparisionObject):
                            self.miss_station_information.keys()]),
             channels=channels)
 
-    def prepare_stationxml_download(self, stationxml_storage, logger):
+    def prepare_stationxml_download(self, stationxml_storage, logger,
+                                    journal=None):
         """
         Figure out what to download.
 
         :param stationxml_storage:
+        :param journal: If given, the contents of existing StationXML files
+            are taken from this journal unless the files changed.
+        :type journal: :class:`~.journal.DownloadJournal`
         """
         # Determine what channels actually want to have station information.
         # This will be a tuple of location code, channel code, starttime,
@@ -257,7 +263,10 @@ class Station(_SlotsEqualityComparisionObject):
             # necessary information, nothing will happen. Otherwise it will
             # be overwritten.
             else:
-                info = utils.get_stationxml_contents(filename)
+                if journal is not None:
+                    info = journal.get_stationxml_contents(filename)
+                else:
+                    info = utils.get_stationxml_contents(filename)
                 for c_id, times in self.want_station_information.items():
                     # Get the temporal range of information in the file.
                     c_info = [_i for _i in info if
@@ -334,7 +343,7 @@ class Station(_SlotsEqualityComparisionObject):
             else:
                 self.stationxml_status = STATUS.IGNORE
 
-    def prepare_mseed_download(self, mseed_storage):
+    def prepare_mseed_download(self, mseed_storage, journal=None):
         """
         Loop through all channels of the station and distribute filenames
         and the current status of the channel.
@@ -344,7 +353,14 @@ class Station(_SlotsEqualityComparisionObject):
         Possible statuses after method execution are IGNORE, EXISTS, and
         NEEDS_DOWNLOADING.
 
+        With a journal, files that were still being downloaded when an
+        earlier run stopped are downloaded again. Intervals rejected by
+        the QC checks of an earlier run and intervals that failed too often
+        are ignored.
+
         :param mseed_storage:
+        :param journal: The journal of earlier runs.
+        :type journal: :class:`~.journal.DownloadJournal`
         """
         for channel in self.channels:
             for interval in channel.intervals:
@@ -354,8 +370,24 @@ class Station(_SlotsEqualityComparisionObject):
                     interval.end)
                 if interval.filename is True:
                     interval.status = STATUS.IGNORE
-                elif os.path.exists(interval.filename):
-                    interval.status = STATUS.EXISTS
+                    continue
+                entry = None
+                if journal is not None:
+                    entry = journal.get_interval(interval.filename)
+                if os.path.exists(interval.filename):
+                    if entry is not None and \
+                            entry.status == STATUS.NEEDS_DOWNLOADING:
+                        # Possibly incomplete.
+                        utils.safe_delete(interval.filename)
+                        interval.status = STATUS.NEEDS_DOWNLOADING
+                    else:
+                        interval.status = STATUS.EXISTS
+                elif entry is not None and (
+                        entry.status == STATUS.DOWNLOAD_REJECTED or (
+                            entry.status == STATUS.DOWNLOAD_FAILED and
+                            journal.max_attempts is not None and
+                            entry.attempts >= journal.max_attempts)):
+                    interval.status = STATUS.IGNORE
                 else:
                     if not os.path.exists(os.path.dirname(interval.filename)):
                         os.makedirs(os.path.dirname(interval.filename))
@@ -488,9 +520,12 @@ class ClientDownloadHelper(object):
     :param mseed_storage: The MiniSEED storage settings.
     :param stationxml_storage: The StationXML storage settings.
     :param logger: An active logger instance.
+    :type journal: :class:`~.journal.DownloadJournal`
+    :param journal: Optional journal recording the progress of the
+        download, to be able to resume it.
     """
     def __init__(self, client, client_name, restrictions, domain,
-                 mseed_storage, stationxml_storage, logger):
+                 mseed_storage, stationxml_storage, logger, journal=None):
         self.client = client
         self.client_name = client_name
         self.restrictions = restrictions
@@ -498,8 +533,11 @@ class ClientDownloadHelper(object):
         self.mseed_storage = mseed_storage
         self.stationxml_storage = stationxml_storage
         self.logger = logger
+        self.journal = journal
         self.stations = {}
         self.is_availability_reliable = None
+        # Only set by adaptive MiniSEED downloads.
+        self.concurrency = None
 
     def __bool__(self):
         return bool(len(self))
@@ -532,7 +570,8 @@ class ClientDownloadHelper(object):
         downloading.
         """
         for station in self.stations.values():
-            station.prepare_mseed_download(mseed_storage=self.mseed_storage)
+            station.prepare_mseed_download(mseed_storage=self.mseed_storage,
+                                           journal=self.journal)
 
     def filter_stations_based_on_minimum_distance(
             self, existing_client_dl_helpers):
@@ -658,7 +697,7 @@ class ClientDownloadHelper(object):
         for station in self.stations.values():
             station.prepare_stationxml_download(
                 stationxml_storage=self.stationxml_storage,
-                logger=self.logger)
+                logger=self.logger, journal=self.journal)
 
     def download_stationxml(self, threads=3):
         """
@@ -722,7 +761,10 @@ class ClientDownloadHelper(object):
 
             # Extract information about that file.
             try:
-                info = utils.get_stationxml_contents(filename)
+                if self.journal is not None:
+                    info = self.journal.get_stationxml_contents(filename)
+                else:
+                    info = utils.get_stationxml_contents(filename)
             # Sometimes some services choose to not return XML files - guard
             # against it and just delete the file. At subsequent runs the
             # mass downloader will attempt to download it again.
@@ -782,7 +824,8 @@ class ClientDownloadHelper(object):
                              e_time - s_time,
                              (download_size / 1024.0) / (e_time - s_time)))
 
-    def download_mseed(self, chunk_size_in_mb=25, threads_per_client=3):
+    def download_mseed(self, chunk_size_in_mb=25, threads_per_client=3,
+                       adaptive=False):
         """
         Actually download MiniSEED data.
 
@@ -790,6 +833,10 @@ class ClientDownloadHelper(object):
             size.
         :param threads_per_client: Threads to launch per client. 3 seems to
             be a value in agreement with some data centers.
+        :param adaptive: Adapt the number of threads and the chunk size to
+            the throughput and errors of the client, see
+            :class:`~.utils.AdaptiveConcurrency`. Starts with the values
+            learned in earlier runs if a journal is used.
         """
         # Estimate the download size to have equally sized chunks.
         channel_sampling_rate = {
@@ -798,10 +845,8 @@ class ClientDownloadHelper(object):
             "R": 0.001, "P": 0.0001, "T": 0.00001, "Q": 0.000001, "A": 5000,
             "O": 5000}
 
-        # Split into chunks of about equal size in terms of filesize.
-        chunks = []
-        chunks_curr = []
-        curr_chunks_mb = 0
+        # Time intervals to download with their estimated size in MB.
+        pending = collections.deque()
 
         # Don't request more than 50 chunks at once to not choke the servers.
         max_chunk_length = 50
@@ -826,22 +871,14 @@ class ClientDownloadHelper(object):
                     # some downloading.
                     if interval.status != STATUS.NEEDS_DOWNLOADING:
                         continue
-                    chunks_curr.append((
-                        sta.network, sta.station, cha.location, cha.channel,
-                        interval.start, interval.end, interval.filename))
                     # Assume that each sample needs 4 byte, STEIM
                     # compression reduces size to about a third.
                     # chunk size is in MB
                     duration = interval.end - interval.start
-                    curr_chunks_mb += \
-                        sr * duration * 4.0 / 3.0 / 1024.0 / 1024.0
-                    if curr_chunks_mb >= chunk_size_in_mb or \
-                            len(chunks_curr) >= max_chunk_length:
-                        chunks.append(chunks_curr)
-                        chunks_curr = []
-                        curr_chunks_mb = 0
-        if chunks_curr:
-            chunks.append(chunks_curr)
+                    pending.append((
+                        (sta.network, sta.station, cha.location, cha.channel,
+                         interval),
+                        sr * duration * 4.0 / 3.0 / 1024.0 / 1024.0))
 
         keys = sorted(counter.keys())
         for key in keys:
@@ -850,40 +887,134 @@ class ClientDownloadHelper(object):
                 "downloading: %s" % (self.client_name, counter[key],
                                      key.upper()))
 
-        if not chunks:
+        if not pending:
             return
 
-        def star_download_mseed(args):
+        if self.journal is not None:
+            # Files of these intervals are incomplete if the download stops.
+            self.journal.update_intervals(self.client_name,
+                                          [_i[0] for _i in pending])
+
+        def next_chunk(size_in_mb):
             """
-            Star maps the arguments to the
-            utils.download_and_split_mseed_bulk() function.
+            Split off the next chunk of about the given size in terms of
+            filesize.
 
-            :param args: The arguments to be passed.
+            :param size_in_mb: The desired size of the chunk.
+            """
+            chunk = []
+            chunk_mb = 0
+            while pending and chunk_mb < size_in_mb and \
+                    len(chunk) < max_chunk_length:
+                item, item_mb = pending.popleft()
+                chunk.append(item)
+                chunk_mb += item_mb
+            return chunk
+
+        def download_chunk(chunk):
             """
+            Maps a chunk to the utils.download_and_split_mseed_bulk()
+            function.
+
+            Returns the chunk, the downloaded bytes, the duration of the
+            download, and whether it failed.
+
+            :param chunk: The chunk to download.
+            """
+            start = timeit.default_timer()
             try:
-                ret_val = utils.download_and_split_mseed_bulk(
-                    *args, logger=self.logger)
+                filenames = utils.download_and_split_mseed_bulk(
+                    self.client, self.client_name,
+                    [_i[:4] + (_i[4].start, _i[4].end, _i[4].filename)
+                     for _i in chunk], logger=self.logger)
             except utils.ERRORS as e:
-                msg = ("Client '%s' - " % args[1]) + str(e)
-                if "no data available" in msg.lower():
-                    self.logger.info(msg.split("Detailed response")[0].strip())
-                else:
+                msg = ("Client '%s' - " % self.client_name) + str(e)
+                if "no data available" not in msg.lower():
                     self.logger.error(msg)
-                return []
-            return ret_val
+                    return chunk, 0, timeit.default_timer() - start, True
+                self.logger.info(msg.split("Detailed response")[0].strip())
+                filenames = []
+            nbytes = sum(os.path.getsize(_i) for _i in filenames
+                         if os.path.exists(_i))
+            return chunk, nbytes, timeit.default_timer() - start, False
+
+        def download_adaptively():
+            """
+            Download the chunks with as many threads and of the size the
+            concurrency controller currently allows. Yields the results of
+            download_chunk() in the order of completion.
+            """
+            pool = ThreadPool(self.concurrency.max_threads)
+            done = queue.Queue()
 
-        pool = ThreadPool(min(threads_per_client, len(chunks)))
+            def run(chunk):
+                try:
+                    done.put((download_chunk(chunk), None))
+                except Exception as e:
+                    done.put((None, e))
+
+            running = 0
+            try:
+                while pending or running:
+                    while pending and running < self.concurrency.threads:
+                        pool.apply_async(run, (next_chunk(
+                            self.concurrency.chunk_size_in_mb), ))
+                        running += 1
+                    result, exception = done.get()
+                    running -= 1
+                    if exception is not None:
+                        raise exception
+                    self.concurrency.update(*result[1:])
+                    yield result
+            finally:
+                pool.close()
 
         d_start = timeit.default_timer()
-        pool.map(
-            star_download_mseed,
-            [(self.client, self.client_name, chunk) for chunk in chunks])
-        pool.close()
+        if adaptive:
+            settings = None
+            if self.journal is not None:
+                settings = self.journal.get_provider_settings(
+                    self.client_name)
+            if settings is None:
+                settings = (threads_per_client, chunk_size_in_mb)
+            self.concurrency = utils.AdaptiveConcurrency(
+                threads=settings[0], chunk_size_in_mb=settings[1],
+                max_threads=max(10, threads_per_client))
+            pool = None
+            results = download_adaptively()
+        else:
+            chunks = []
+            while pending:
+                chunks.append(next_chunk(chunk_size_in_mb))
+            pool = ThreadPool(min(threads_per_client, len(chunks)))
+            results = pool.imap_unordered(download_chunk, chunks)
+
+        # With a journal, every chunk is checked and recorded as soon as it
+        # is downloaded, so that nothing is lost if the download stops.
+        downloaded_bytes, discarded_bytes = 0, 0
+        for chunk, _, _, _ in results:
+            if self.journal is None:
+                continue
+            sizes = self._check_downloaded_data([_i[-1] for _i in chunk])
+            downloaded_bytes += sizes[0]
+            discarded_bytes += sizes[1]
+            self.journal.update_intervals(self.client_name, chunk)
+        if pool is not None:
+            pool.close()
         d_end = timeit.default_timer()
 
-        self.logger.info("Client '%s' - Launching basic QC checks..." %
-                         self.client_name)
-        downloaded_bytes, discarded_bytes = self._check_downloaded_data()
+        if self.concurrency is not None:
+            self.logger.info("Client '%s' - Adapted download settings: %s." %
+                             (self.client_name, self.concurrency))
+            if self.journal is not None:
+                self.journal.set_provider_settings(
+                    self.client_name, self.concurrency.threads,
+                    self.concurrency.chunk_size_in_mb)
+
+        if self.journal is None:
+            self.logger.info("Client '%s' - Launching basic QC checks..." %
+                             self.client_name)
+            downloaded_bytes, discarded_bytes = self._check_downloaded_data()
         total_bytes = downloaded_bytes + discarded_bytes
 
         self.logger.info("Client '%s' - Downloaded %.1f MB [%.2f KB/sec] of "
@@ -929,91 +1060,97 @@ class ClientDownloadHelper(object):
         for station in self.stations.values():
             station.sanitize_downloads(logger=self.logger)
 
-    def _check_downloaded_data(self):
+    def _check_downloaded_data(self, intervals=None):
         """
         Read the downloaded data, set the proper status flags and remove
         data that does not meet the QC criteria. It just checks the
         downloaded data for minimum length and gaps/overlaps.
 
         Returns the downloaded_bytes and the discarded_bytes.
+
+        :param intervals: Only check these time intervals instead of all
+            time intervals of all stations.
+        :type intervals: list of :class:`~.TimeInterval` objects
         """
+        if intervals is None:
+            intervals = [interval for sta in self.stations.values()
+                         for cha in sta.channels
+                         for interval in cha.intervals]
         downloaded_bytes = 0
         discarded_bytes = 0
-        for sta in self.stations.values():
-            for cha in sta.channels:
-                for interval in cha.intervals:
-                    # The status of the interval should not have changed if
-                    # it did not require downloading in the first place.
-                    if interval.status != STATUS.NEEDS_DOWNLOADING:
-                        continue
+        for interval in intervals:
+            # The status of the interval should not have changed if
+            # it did not require downloading in the first place.
+            if interval.status != STATUS.NEEDS_DOWNLOADING:
+                continue
 
-                    # If the file does not exist, mark the time interval as
-                    # download failed.
-                    if not os.path.exists(interval.filename):
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
+            # If the file does not exist, mark the time interval as
+            # download failed.
+            if not os.path.exists(interval.filename):
+                interval.status = STATUS.DOWNLOAD_FAILED
+                continue
 
-                    size = os.path.getsize(interval.filename)
-                    if size == 0:
-                        self.logger.warning("Zero byte file '%s'. Will be "
-                                            "deleted." % interval.filename)
-                        utils.safe_delete(interval.filename)
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
+            size = os.path.getsize(interval.filename)
+            if size == 0:
+                self.logger.warning("Zero byte file '%s'. Will be "
+                                    "deleted." % interval.filename)
+                utils.safe_delete(interval.filename)
+                interval.status = STATUS.DOWNLOAD_FAILED
+                continue
 
-                    # Guard against faulty files.
-                    try:
-                        st = obspy.read(interval.filename, headonly=True)
-                    except Exception as e:
-                        self.logger.warning(
-                            "Could not read file '%s' due to: %s\n"
-                            "Will be discarded." % (interval.filename, str(e)))
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
+            # Guard against faulty files.
+            try:
+                st = obspy.read(interval.filename, headonly=True)
+            except Exception as e:
+                self.logger.warning(
+                    "Could not read file '%s' due to: %s\n"
+                    "Will be discarded." % (interval.filename, str(e)))
+                utils.safe_delete(interval.filename)
+                discarded_bytes += size
+                interval.status = STATUS.DOWNLOAD_FAILED
+                continue
 
-                    # Valid files with no data.
-                    if len(st) == 0:
-                        self.logger.warning(
-                            "Empty file '%s'. Will be deleted." %
-                            interval.filename)
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_FAILED
-                        continue
+            # Valid files with no data.
+            if len(st) == 0:
+                self.logger.warning(
+                    "Empty file '%s'. Will be deleted." %
+                    interval.filename)
+                utils.safe_delete(interval.filename)
+                discarded_bytes += size
+                interval.status = STATUS.DOWNLOAD_FAILED
+                continue
 
-                    # If user did not want gappy files, remove them.
-                    if self.restrictions.reject_channels_with_gaps is True and\
-                            len(st) > 1:
-                        self.logger.info(
-                            "File '%s' has %i traces and thus contains "
-                            "gaps or overlaps. Will be deleted." % (
-                                interval.filename, len(st)))
-                        utils.safe_delete(interval.filename)
-                        discarded_bytes += size
-                        interval.status = STATUS.DOWNLOAD_REJECTED
-                        continue
+            # If user did not want gappy files, remove them.
+            if self.restrictions.reject_channels_with_gaps is True and\
+                    len(st) > 1:
+                self.logger.info(
+                    "File '%s' has %i traces and thus contains "
+                    "gaps or overlaps. Will be deleted." % (
+                        interval.filename, len(st)))
+                utils.safe_delete(interval.filename)
+                discarded_bytes += size
+                interval.status = STATUS.DOWNLOAD_REJECTED
+                continue
+
+            if self.restrictions.minimum_length:
+                duration = sum([tr.stats.endtime - tr.stats.starttime
+                                for tr in st])
+                expected_min_duration = \
+                    self.restrictions.minimum_length * \
+                    (interval.end - interval.start)
+                if duration < expected_min_duration:
+                    self.logger.info(
+                        "File '%s' has only %.2f seconds of data. "
+                        "%.2f are required. File will be deleted." %
+                        (interval.filename, duration,
+                         expected_min_duration))
+                    utils.safe_delete(interval.filename)
+                    discarded_bytes += size
+                    interval.status = STATUS.DOWNLOAD_REJECTED
+                    continue
 
-                    if self.restrictions.minimum_length:
-                        duration = sum([tr.stats.endtime - tr.stats.starttime
-                                        for tr in st])
-                        expected_min_duration = \
-                            self.restrictions.minimum_length * \
-                            (interval.end - interval.start)
-                        if duration < expected_min_duration:
-                            self.logger.info(
-                                "File '%s' has only %.2f seconds of data. "
-                                "%.2f are required. File will be deleted." %
-                                (interval.filename, duration,
-                                 expected_min_duration))
-                            utils.safe_delete(interval.filename)
-                            discarded_bytes += size
-                            interval.status = STATUS.DOWNLOAD_REJECTED
-                            continue
-
-                    downloaded_bytes += size
-                    interval.status = STATUS.DOWNLOADED
+            downloaded_bytes += size
+            interval.status = STATUS.DOWNLOADED
         return downloaded_bytes, discarded_bytes
 
     def _parse_miniseed_filenames(self, filenames, restrictions):
@@ -1247,6 +1384,81 @@ class ClientDownloadHelper(object):
             self.client_name, len(self.stations),
             sum([len(_i.channels) for _i in self.stations.values()])))
 
+    def check_availability(self, availability=True):
+        """
+        Remove all time intervals without any data according to a data
+        availability service, so that no waveform requests are sent for
+        them. Channels and stations left without time intervals are removed
+        as well.
+
+        The availability of all channels is requested in bulk. If the
+        service cannot be queried, nothing is removed.
+
+        :param availability: ``True`` to query the fdsnws-availability
+            service of the client, see
+            :func:`~.utils.get_fdsnws_availability`, or the client of a
+            local tsindex database with the availability of the data of
+            the client, see :func:`~.utils.get_tsindex_availability`.
+        :type availability: bool or
+            :class:`obspy.clients.filesystem.tsindex.Client`
+        """
+        bulk = []
+        for station in self.stations.values():
+            for channel in station.channels:
+                s, e = channel.temporal_bounds
+                bulk.append((station.network, station.station,
+                             channel.location, channel.channel, s, e))
+        if not bulk:
+            return
+
+        try:
+            start = time.time()
+            if availability is True:
+                spans = utils.get_fdsnws_availability(self.client, bulk)
+            else:
+                spans = utils.get_tsindex_availability(availability, bulk)
+            end = time.time()
+        except utils.ERRORS as e:
+            self.logger.warning(
+                "Client '%s' - Could not get the data availability, all "
+                "time intervals will be requested: %s" % (
+                    self.client_name, str(e)))
+            return
+        # Same as for the station availability.
+        except Exception as e:
+            self.logger.warning(
+                "Client '%s' - Could not get the data availability due to "
+                "unexpected exception, all time intervals will be "
+                "requested: %s" % (self.client_name, str(e)))
+            return
+
+        available = collections.defaultdict(list)
+        for _i in spans:
+            available[(_i.network, _i.station, _i.location,
+                       _i.channel)].append((_i.starttime, _i.endtime))
+
+        removed = 0
+        for key, station in list(self.stations.items()):
+            channels = []
+            for channel in station.channels:
+                c_spans = available[(station.network, station.station,
+                                     channel.location, channel.channel)]
+                intervals = [
+                    _i for _i in channel.intervals
+                    if any(s < _i.end and e > _i.start for s, e in c_spans)]
+                removed += len(channel.intervals) - len(intervals)
+                channel.intervals = intervals
+                if intervals:
+                    channels.append(channel)
+            station.channels = channels
+            if not channels:
+                del self.stations[key]
+
+        self.logger.info(
+            "Client '%s' - Data availability (%.2f seconds): Removed %i time "
+            "intervals without data, %i stations remain." % (
+                self.client_name, end - start, removed, len(self.stations)))
+
 
 if __name__ == '__main__':
     import doctest
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Persistent journal of the mass downloader.
+
+The journal is a small SQLite database recording the state of every time
+interval and the contents of every StationXML file, so that restarted
+downloads can skip work that was already done without looking at the files
+again.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import obspy
+
+from . import utils
+
+
+JournalEntry = collections.namedtuple(
+    "JournalEntry", ["status", "size", "attempts"])
+
+
+class DownloadJournal(object):
+    """
+    SQLite journal of a mass download.
+
+    Per MiniSEED file it stores the status of the time interval, the size of
+    the file and the number of failed download attempts. Per StationXML
+    file it stores the channels with response information together with the
+    size and the modification time of the file. Additionally, the
+    concurrency and chunk size learned for each provider by adaptive
+    downloads are kept, so that a restart continues with them.
+
+    The journal is only valid together with the files it describes and the
+    restrictions of the download. Delete it to start from scratch, e.g.
+    after changing the minimum length or gap restrictions.
+
+    >>> from obspy.clients.fdsn.mass_downloader import MassDownloader
+    >>> mdl = MassDownloader()  # doctest: +SKIP
+    >>> mdl.download(domain, restrictions, mseed_storage="waveforms",
+    ...              stationxml_storage="stations",
+    ...              journal="download.sqlite")  # doctest: +SKIP
+
+    :type filename: str
+    :param filename: The SQLite database, created if it does not exist.
+    :type max_attempts: int
+    :param max_attempts: Time intervals that failed to download this many
+        times are not requested again. ``None`` retries them in every run.
+    """
+    def __init__(self, filename, max_attempts=3):
+        self.filename = filename
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(filename, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS intervals ("
+                "filename TEXT PRIMARY KEY, client TEXT, network TEXT, "
+                "station TEXT, location TEXT, channel TEXT, starttime TEXT, "
+                "endtime TEXT, status TEXT, size INTEGER, "
+                "attempts INTEGER, updated REAL)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS stationxml ("
+                "filename TEXT PRIMARY KEY, size INTEGER, mtime REAL, "
+                "channels TEXT)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS providers ("
+                "client TEXT PRIMARY KEY, threads INTEGER, "
+                "chunk_size_in_mb REAL)")
+
+    def __repr__(self):
+        return "DownloadJournal(%r, max_attempts=%r)" % (self.filename,
+                                                         self.max_attempts)
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def get_interval(self, filename):
+        """
+        Return the journal entry of a MiniSEED file or ``None``.
+
+        :type filename: str
+        :param filename: The filename of the time interval.
+        :rtype: :class:`JournalEntry`
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, size, attempts FROM intervals "
+                "WHERE filename = ?", (filename, )).fetchone()
+        if row is None:
+            return None
+        return JournalEntry(*row)
+
+    def update_intervals(self, client_name, intervals):
+        """
+        Record the current status of time intervals in a single transaction.
+
+        The number of attempts of an interval is increased whenever it is
+        recorded as ``download_failed``.
+
+        :type client_name: str
+        :param client_name: The name of the client downloading the data.
+        :type intervals: list
+        :param intervals: Tuples of network, station, location and channel
+            codes and the :class:`~.download_helpers.TimeInterval`.
+        """
+        now = time.time()
+        rows = []
+        for network, station, location, channel, interval in intervals:
+            size = None
+            if interval.status in ("downloaded", "exists"):
+                try:
+                    size = os.path.getsize(interval.filename)
+                except OSError:
+                    pass
+            rows.append((interval.filename, client_name, network, station,
+                         location, channel, str(interval.start),
+                         str(interval.end), str(interval.status), size,
+                         1 if interval.status == "download_failed" else 0,
+                         now))
+        with self._lock, self._connection:
+            # Keep the number of earlier attempts.
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO intervals VALUES ("
+                "?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ? + COALESCE(("
+                "SELECT attempts FROM intervals WHERE filename = ?), 0), ?)",
+                [row[:11] + (row[0], row[11]) for row in rows])
+
+    def get_stationxml_contents(self, filename):
+        """
+        Return the channels with response information in a StationXML file.
+
+        The contents are only parsed with
+        :func:`~.utils.get_stationxml_contents` if the file is not in the
+        journal or changed since.
+
+        :type filename: str
+        :param filename: The path to the file.
+        :returns: list of :class:`~.utils.ChannelAvailability` objects.
+        """
+        stat = os.stat(filename)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime, channels FROM stationxml "
+                "WHERE filename = ?", (filename, )).fetchone()
+        if row is not None and row[0] == stat.st_size and \
+                row[1] == stat.st_mtime:
+            return [utils.ChannelAvailability(
+                network, station, location, channel,
+                obspy.UTCDateTime(ns=starttime), obspy.UTCDateTime(ns=endtime),
+                filename)
+                for network, station, location, channel, starttime, endtime
+                in json.loads(row[2])]
+
+        channels = utils.get_stationxml_contents(filename)
+        contents = json.dumps([
+            [_i.network, _i.station, _i.location, _i.channel,
+             _i.starttime.ns, _i.endtime.ns] for _i in channels])
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO stationxml VALUES (?, ?, ?, ?)",
+                (filename, stat.st_size, stat.st_mtime, contents))
+        return channels
+
+    def get_provider_settings(self, client_name):
+        """
+        Return the number of threads and the chunk size in MB learned for a
+        provider or ``None``.
+
+        :type client_name: str
+        :param client_name: The name of the client.
+        :rtype: tuple(int, float)
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT threads, chunk_size_in_mb FROM providers "
+                "WHERE client = ?", (client_name, )).fetchone()
+        return tuple(row) if row is not None else None
+
+    def set_provider_settings(self, client_name, threads, chunk_size_in_mb):
+        """
+        Store the number of threads and the chunk size in MB learned for a
+        provider.
+
+        :type client_name: str
+        :param client_name: The name of the client.
+        :type threads: int
+        :param threads: The number of parallel download requests.
+        :type chunk_size_in_mb: float
+        :param chunk_size_in_mb: The size of the bulk requests.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO providers VALUES (?, ?, ?)",
+                (client_name, threads, chunk_size_in_mb))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
@@ -25,6 +25,7 @@ from obspy.clients.fdsn.client import Client
 
 from . import utils
 from .download_helpers import ClientDownloadHelper, STATUS
+from .journal import DownloadJournal
 
 
 # Setup the logger.
@@ -112,7 +113,8 @@ class MassDownloader(object):
 
     def download(self, domain, restrictions, mseed_storage,
                  stationxml_storage, download_chunk_size_in_mb=20,
-                 threads_per_client=3, print_report=True):
+                 threads_per_client=3, print_report=True, journal=None,
+                 adaptive=False, availability=None):
         """
         Launch the actual data download.
 
@@ -136,7 +138,48 @@ class MassDownloader(object):
         :param threads_per_client: The number of download threads launched
             per client.
         :type threads_per_client: int
+        :param journal: Record the progress of the download in this SQLite
+            journal. Restarted downloads skip time intervals that were
+            already downloaded or rejected, download files again that were
+            incomplete when the download stopped, and do not parse existing
+            StationXML files again. See
+            :class:`~.journal.DownloadJournal`.
+        :type journal: str or :class:`~.journal.DownloadJournal`
+        :param adaptive: Adapt the number of download threads and the chunk
+            size of every client to its throughput and errors, starting with
+            ``threads_per_client`` and ``download_chunk_size_in_mb``. See
+            :class:`~.utils.AdaptiveConcurrency`.
+        :type adaptive: bool
+        :param availability: Before downloading any waveforms, remove all
+            time intervals without data according to the fdsnws-availability
+            service of every client (``True``) or a local tsindex database
+            (its client). See
+            :meth:`~.download_helpers.ClientDownloadHelper.check_availability`.
+        :type availability: bool or
+            :class:`obspy.clients.filesystem.tsindex.Client`
         """
+        if isinstance(journal, (str, bytes)):
+            journal = DownloadJournal(journal)
+            close_journal = True
+        else:
+            close_journal = False
+        try:
+            return self._download(
+                domain=domain, restrictions=restrictions,
+                mseed_storage=mseed_storage,
+                stationxml_storage=stationxml_storage,
+                download_chunk_size_in_mb=download_chunk_size_in_mb,
+                threads_per_client=threads_per_client,
+                print_report=print_report, journal=journal,
+                adaptive=adaptive, availability=availability)
+        finally:
+            if close_journal:
+                journal.close()
+
+    def _download(self, domain, restrictions, mseed_storage,
+                  stationxml_storage, download_chunk_size_in_mb,
+                  threads_per_client, print_report, journal, adaptive,
+                  availability):
         # The downloads from each client will be handled separately.
         # Nonetheless collect all in this dictionary.
         client_download_helpers = {}
@@ -161,7 +204,8 @@ class MassDownloader(object):
                 client=client, client_name=client_name,
                 restrictions=restrictions, domain=domain,
                 mseed_storage=mseed_storage,
-                stationxml_storage=stationxml_storage, logger=logger)
+                stationxml_storage=stationxml_storage, logger=logger,
+                journal=journal)
             existing_client_dl_helpers = list(
                 client_download_helpers.values())
             client_download_helpers[client_name] = helper
@@ -186,6 +230,17 @@ class MassDownloader(object):
                             client_name)
                 continue
 
+            # Remove time intervals without data before the minimum distance
+            # filtering so other stations can take the place of the removed
+            # ones.
+            if availability:
+                helper.check_availability(availability)
+                if not helper:
+                    logger.info("Client '%s' - No new data available "
+                                "according to the data availability." %
+                                client_name)
+                    continue
+
             # If the availability information is reliable, the filtering
             # will happen before the downloading.
             if helper.is_availability_reliable:
@@ -204,11 +259,16 @@ class MassDownloader(object):
             # Download MiniSEED data.
             helper.prepare_mseed_download()
             helper.download_mseed(chunk_size_in_mb=download_chunk_size_in_mb,
-                                  threads_per_client=threads_per_client)
+                                  threads_per_client=threads_per_client,
+                                  adaptive=adaptive)
 
             # Download StationXML data.
             helper.prepare_stationxml_download()
-            helper.download_stationxml()
+            if helper.concurrency is not None:
+                helper.download_stationxml(
+                    threads=helper.concurrency.threads)
+            else:
+                helper.download_stationxml()
 
             # Sanitize the downloaded things if desired. Assures that all
             # waveform data also has the corresponding station information.
@@ -31,7 +31,8 @@ else:
 import obspy
 from obspy.core import compatibility
 from obspy.core.util.base import NamedTemporaryFile
-from obspy.clients.fdsn.client import FDSNException
+from obspy.clients.fdsn.client import FDSNException, get_bulk_string
+from obspy.clients.fdsn.header import FDSNNoDataException
 from obspy.io.mseed.util import get_record_information
 
 
@@ -278,6 +279,101 @@ def download_and_split_mseed_bulk(client, client_name, chunks, logger):
     return sorted(open_files.keys())
 
 
+def get_fdsnws_availability(client, bulk, chunk_size=1000):
+    """
+    Query the time spans with data for the channels and time ranges of a
+    bulk request from the fdsnws-availability service of a data center.
+
+    :param client: An active client instance. The service is expected at
+        ``fdsnws/availability/1`` below its base URL, unless its
+        ``service_mappings`` contain an ``"availability"`` URL.
+    :param bulk: A list of tuples of network, station, location and channel
+        codes, start and end time.
+    :param chunk_size: Maximum number of lines per request.
+    :returns: list of ChannelAvailability objects without filenames.
+    """
+    mappings = getattr(client, "_service_mappings", None) or {}
+    if mappings.get("availability"):
+        url = mappings["availability"].rstrip("/") + "/query"
+    else:
+        url = "/".join((client.base_url, "fdsnws", "availability", "1",
+                        "query"))
+    channels = []
+    for i in range(0, len(bulk), chunk_size):
+        # One time span per channel regardless of quality and sampling rate.
+        data = get_bulk_string(bulk[i:i + chunk_size], collections.OrderedDict(
+            [("format", "text"), ("merge", "quality,samplerate")]))
+        try:
+            response = client._download(url, data=data)
+        except FDSNNoDataException:
+            continue
+        channels.extend(parse_availability_text(
+            response.read().decode("utf-8", errors="replace")))
+    return channels
+
+
+def parse_availability_text(text):
+    """
+    Parse the text format of the fdsnws-availability service.
+
+    The columns are taken from the header line, the first four are always
+    the network, station, location and channel codes. Empty location codes
+    can either be given as ``--`` or be left out.
+
+    >>> text = ("#Network Station Location Channel Earliest Latest\\n"
+    ...         "IU ANMO -- BHZ 2018-01-01T00:00:00Z 2018-01-01T01:00:00Z")
+    >>> print(parse_availability_text(text)[0].endtime)
+    2018-01-01T01:00:00.000000Z
+
+    :param text: The response of the service.
+    :returns: list of ChannelAvailability objects without filenames.
+    """
+    columns = None
+    channels = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            columns = [_i.lower() for _i in line[1:].split()]
+            continue
+        fields = line.split()
+        if columns is not None and len(fields) == len(columns) - 1:
+            fields.insert(2, "")
+        if columns is not None and "earliest" in columns:
+            earliest = fields[columns.index("earliest")]
+            latest = fields[columns.index("latest")]
+        else:
+            earliest, latest = fields[-2:]
+        location = fields[2] if fields[2] != "--" else ""
+        channels.append(ChannelAvailability(
+            fields[0], fields[1], location, fields[3],
+            obspy.UTCDateTime(earliest), obspy.UTCDateTime(latest), None))
+    return channels
+
+
+def get_tsindex_availability(tsindex_client, bulk):
+    """
+    Get the time spans with data for the channels and time ranges of a bulk
+    request from a local tsindex database.
+
+    :param tsindex_client: The client of the database.
+    :type tsindex_client: :class:`obspy.clients.filesystem.tsindex.Client`
+    :param bulk: A list of tuples of network, station, location and channel
+        codes, start and end time.
+    :returns: list of ChannelAvailability objects without filenames.
+    """
+    channels = []
+    for network, station, location, channel, starttime, endtime in bulk:
+        # Empty location codes would be wildcards otherwise.
+        for _i in tsindex_client.get_availability(
+                network, station, location or "--", channel, starttime,
+                endtime):
+            channels.append(ChannelAvailability(
+                _i[0], _i[1], _i[2], _i[3], _i[4], _i[5], None))
+    return channels
+
+
 class SphericalNearestNeighbour(object):
     """
     Spherical nearest neighbour queries using scipy's fast kd-tree
@@ -323,6 +419,107 @@ class SphericalNearestNeighbour(object):
         return cart_data
 
 
+class AdaptiveConcurrency(object):
+    """
+    Adapts the number of parallel requests and the size of the bulk request
+    chunks to the observed throughput and errors of a single provider.
+
+    Once as many requests as currently allowed have completed, the
+    throughput of this window (the mean rate per request times the number
+    of parallel requests) is compared with the one of the previous window.
+    One more parallel request is allowed if it did not degrade and one less
+    if it dropped by more than 10 percent. Any error halves the number of
+    parallel requests and the chunk size (additive increase, multiplicative
+    decrease). The chunk size follows the rate of single requests so that
+    each request takes about ``target_duration`` seconds.
+
+    :type threads: int
+    :param threads: Initial number of parallel requests.
+    :type chunk_size_in_mb: float
+    :param chunk_size_in_mb: Initial chunk size in MB.
+    :type max_threads: int
+    :param max_threads: Upper limit of parallel requests.
+    :type min_chunk_size_in_mb: float
+    :param min_chunk_size_in_mb: Lower limit of the chunk size in MB.
+    :type max_chunk_size_in_mb: float
+    :param max_chunk_size_in_mb: Upper limit of the chunk size in MB.
+    :type target_duration: float
+    :param target_duration: Desired duration of single requests in seconds.
+    """
+    def __init__(self, threads=3, chunk_size_in_mb=25, max_threads=10,
+                 min_chunk_size_in_mb=1.0, max_chunk_size_in_mb=200.0,
+                 target_duration=60.0):
+        self.max_threads = max_threads
+        self.min_chunk_size_in_mb = min_chunk_size_in_mb
+        self.max_chunk_size_in_mb = max_chunk_size_in_mb
+        self.target_duration = target_duration
+        self.threads = min(max(int(threads), 1), max_threads)
+        self.chunk_size_in_mb = min(max(chunk_size_in_mb,
+                                        min_chunk_size_in_mb),
+                                    max_chunk_size_in_mb)
+        self.requests = 0
+        self.errors = 0
+        self._throughput = None
+        self._reset_window()
+
+    def __str__(self):
+        return ("%i parallel requests, chunks of %.1f MB, %i of %i requests "
+                "failed" % (self.threads, self.chunk_size_in_mb, self.errors,
+                            self.requests))
+
+    def _reset_window(self):
+        self._window_requests = 0
+        self._window_bytes = 0
+        self._window_duration = 0.0
+
+    def update(self, nbytes, duration, error=False):
+        """
+        Record a completed request.
+
+        :type nbytes: int
+        :param nbytes: The number of downloaded bytes.
+        :type duration: float
+        :param duration: The duration of the request in seconds.
+        :type error: bool
+        :param error: Whether the request failed.
+        """
+        self.requests += 1
+        if error:
+            self.errors += 1
+            self.threads = max(self.threads // 2, 1)
+            self.chunk_size_in_mb = max(self.chunk_size_in_mb / 2.0,
+                                        self.min_chunk_size_in_mb)
+            # The throughput before the error is no useful reference.
+            self._throughput = None
+            self._reset_window()
+            return
+
+        # Requests without data tell nothing about the throughput.
+        if not nbytes or duration <= 0:
+            return
+
+        rate = nbytes / 1024.0 ** 2 / duration
+        target = min(max(rate * self.target_duration,
+                         self.min_chunk_size_in_mb),
+                     self.max_chunk_size_in_mb)
+        # Smooth it to not jump around too much.
+        self.chunk_size_in_mb = 0.5 * (self.chunk_size_in_mb + target)
+
+        self._window_requests += 1
+        self._window_bytes += nbytes
+        self._window_duration += duration
+        if self._window_requests < self.threads:
+            return
+        throughput = self._window_bytes / self._window_duration * \
+            self.threads
+        if self._throughput is None or throughput >= self._throughput:
+            self.threads = min(self.threads + 1, self.max_threads)
+        elif throughput < 0.9 * self._throughput:
+            self.threads = max(self.threads - 1, 1)
+        self._throughput = throughput
+        self._reset_window()
+
+
 def filter_channel_priority(channels, key, priorities=None):
     """
     This function takes a dictionary containing channels keys and returns a new
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+Minimal local FDSN web service for testing the clients without network
+access.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import hashlib
+import io
+import os
+import threading
+import time
+
+import numpy as np
+
+from obspy import Stream, Trace, UTCDateTime
+from obspy.core.event import Catalog, Event, Origin
+from obspy.core.inventory import Channel, Inventory, Network, Station
+
+if PY2:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urllib2 import parse_http_list, parse_keqv_list
+    from urlparse import parse_qs, urlsplit
+else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+    from urllib.request import parse_http_list, parse_keqv_list
+
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # keep-alive requires HTTP/1.1
+    protocol_version = "HTTP/1.1"
+    # headers and body are sent separately, which is delayed on persistent
+    # connections otherwise
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.mock._lock:
+            self.server.mock.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code, body=b"", content_type="text/plain", headers={}):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # single channel queries are handled like bulk requests with one line
+        query = parse_qs(urlsplit(self.path).query)
+        keys = ("network", "station", "location", "channel", "starttime",
+                "endtime")
+        if all(key in query for key in keys):
+            self._handle(" ".join(query[key][0] for key in keys).encode())
+        else:
+            self._handle(b"")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._handle(self.rfile.read(length))
+
+    def _handle(self, body):
+        mock = self.server.mock
+        with mock._lock:
+            mock.requests.append((self.command, self.path, body))
+            failure = mock.failures.pop(0) if mock.failures else None
+            mock.active += 1
+            mock.max_active = max(mock.max_active, mock.active)
+        try:
+            time.sleep(mock.delay)
+            self._respond(body, failure)
+        finally:
+            with mock._lock:
+                mock.active -= 1
+
+    def _respond(self, body, failure):
+        mock = self.server.mock
+        if failure is not None:
+            code, headers = failure
+            self._send(code, b"Error", headers=headers)
+            return
+        if "/queryauth" in self.path and mock.credentials is not None and \
+                not mock._check_digest(self.command, self.path,
+                                       self.headers.get("Authorization")):
+            self._send(401, b"Unauthorized", headers={
+                "WWW-Authenticate": 'Digest realm="%s", nonce="%s", '
+                'qop="auth", opaque="opaque", algorithm=MD5' % (
+                    mock.REALM, mock.NONCE)})
+            return
+        lines = [line.split() for line in body.decode().splitlines()
+                 if line.strip() and "=" not in line]
+        service = self.path.split("/")[2] if self.path.count("/") > 2 \
+            else None
+        if self.path.endswith("/application.wadl") and \
+                service in ("dataselect", "event", "station"):
+            with open(os.path.join(DATA, "%s.wadl" % service), "rb") as fh:
+                data = fh.read()
+            content_type = "application/xml"
+        elif self.path.startswith("/fdsnws/event/1/query"):
+            data = mock.events(parse_qs(urlsplit(self.path).query))
+            content_type = "application/xml"
+        elif self.path.startswith("/fdsnws/dataselect/1/query"):
+            data = mock.waveforms(lines)
+            content_type = "application/vnd.fdsn.mseed"
+        elif self.path.startswith("/fdsnws/station/1/query"):
+            data = mock.stations(lines)
+            content_type = "application/xml"
+        elif self.path.startswith("/fdsnws/availability/1/query"):
+            data = mock.availability(lines)
+            content_type = "text/plain"
+        else:
+            self._send(404, b"Not Found")
+            return
+        if not data:
+            self._send(204)
+            return
+        self._send(200, data, content_type)
+
+
+class MockFDSNServer(object):
+    """
+    Local FDSN web service answering dataselect and station bulk requests
+    with synthetic data, to be used as context manager.
+
+    Every requested channel gets one trace (with one sample per second) or
+    one station with one channel. Requests for network ``"XX"`` and for time
+    ranges within ``gaps`` are answered without data. The service discovery
+    finds the dataselect, event and station services. Event queries return
+    ``limit`` events (default one). A fdsnws-availability service answers
+    bulk queries in the text format.
+
+    >>> from obspy.clients.fdsn import Client
+    >>> with MockFDSNServer() as server:  # doctest: +SKIP
+    ...     client = Client(server.url, _discover_services=False)
+    ...     st = client.get_waveforms_bulk(bulk)
+
+    :ivar url: Base URL of the server.
+    :ivar connections: Number of connections opened by clients.
+    :ivar requests: Method, path and body of all requests.
+    :ivar failures: HTTP codes and headers to answer the next requests with,
+        e.g. ``[(503, {"Retry-After": "0"})]``.
+    :ivar delay: Seconds to wait before answering each request.
+    :ivar max_active: Maximum number of requests handled at the same time.
+    :ivar gaps: Start and end times of time ranges without data.
+    :ivar credentials: User and password required (with HTTP digest
+        authentication) for ``queryauth`` requests, not checked if ``None``.
+    """
+    REALM = "FDSN"
+    NONCE = "0123456789abcdef"
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.failures = []
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.gaps = []
+        self.credentials = None
+        self._lock = threading.Lock()
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler)
+        self._server.mock = self
+        self.url = "http://127.0.0.1:%d" % self._server.server_address[1]
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={"poll_interval": 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _check_digest(self, method, path, authorization):
+        """
+        Check the digest authorization header of a request.
+        """
+        if not authorization or not authorization.startswith("Digest "):
+            return False
+        params = parse_keqv_list(parse_http_list(authorization[7:]))
+
+        def h(value):
+            return hashlib.md5(value.encode()).hexdigest()
+
+        user, password = self.credentials
+        ha1 = h("%s:%s:%s" % (user, self.REALM, password))
+        ha2 = h("%s:%s" % (method, path))
+        expected = h(":".join([ha1, self.NONCE, params.get("nc", ""),
+                               params.get("cnonce", ""), "auth", ha2]))
+        return (params.get("username") == user and
+                params.get("uri") == path and
+                params.get("nonce") == self.NONCE and
+                params.get("qop") == "auth" and
+                params.get("response") == expected)
+
+    @staticmethod
+    def _parse_line(line):
+        network, station, location, channel, starttime, endtime = line
+        if location == "--":
+            location = ""
+        return (network, station, location, channel, UTCDateTime(starttime),
+                UTCDateTime(endtime))
+
+    def waveforms(self, lines):
+        """
+        Return MiniSEED data for the lines of a bulk request.
+        """
+        st = Stream()
+        for line in lines:
+            network, station, location, channel, starttime, endtime = \
+                self._parse_line(line)
+            if network == "XX" or not self._get_spans(starttime, endtime):
+                continue
+            npts = int(endtime - starttime) + 1
+            st.append(Trace(
+                data=np.arange(npts, dtype=np.int32),
+                header={"network": network, "station": station,
+                        "location": location, "channel": channel,
+                        "starttime": starttime, "sampling_rate": 1.0}))
+        if not st:
+            return b""
+        buf = io.BytesIO()
+        st.write(buf, format="MSEED")
+        return buf.getvalue()
+
+    def _get_spans(self, starttime, endtime):
+        """
+        Return the time spans with data between two times.
+        """
+        spans = [(starttime, endtime)]
+        for gap_start, gap_end in sorted(self.gaps):
+            start, end = spans.pop()
+            if gap_end < start or gap_start > end:
+                spans.append((start, end))
+                continue
+            if gap_start > start:
+                spans.append((start, gap_start))
+            if gap_end < end:
+                spans.append((gap_end, end))
+            if not spans:
+                break
+        return spans
+
+    def availability(self, lines):
+        """
+        Return the availability in the text format for the lines of a bulk
+        request.
+        """
+        rows = []
+        for line in lines:
+            network, station, location, channel, starttime, endtime = \
+                self._parse_line(line)
+            if network == "XX":
+                continue
+            for start, end in self._get_spans(starttime, endtime):
+                rows.append("%s %s %s %s %s %s" % (
+                    network, station, location or "--", channel, start, end))
+        if not rows:
+            return b""
+        return "\n".join(
+            ["#Network Station Location Channel Earliest Latest"] +
+            rows).encode()
+
+    def events(self, query):
+        """
+        Return QuakeML for the parameters of an event query.
+        """
+        count = int(query.get("limit", ["1"])[0])
+        if not count:
+            return b""
+        t = UTCDateTime(query.get("starttime", ["2018-01-01"])[0])
+        catalog = Catalog([
+            Event(origins=[Origin(time=t + i, latitude=1.0, longitude=2.0)])
+            for i in range(count)])
+        buf = io.BytesIO()
+        catalog.write(buf, format="QUAKEML")
+        return buf.getvalue()
+
+    def stations(self, lines):
+        """
+        Return StationXML for the lines of a bulk request.
+        """
+        networks = []
+        for line in lines:
+            network, station, location, channel, _, _ = \
+                self._parse_line(line)
+            if network == "XX":
+                continue
+            cha = Channel(channel, location, latitude=1.0, longitude=2.0,
+                          elevation=3.0, depth=0.0)
+            sta = Station(station, latitude=1.0, longitude=2.0,
+                          elevation=3.0, channels=[cha])
+            networks.append(Network(network, stations=[sta]))
+        if not networks:
+            return b""
+        buf = io.BytesIO()
+        Inventory(networks=networks, source="mock").write(
+            buf, format="STATIONXML")
+        return buf.getvalue()
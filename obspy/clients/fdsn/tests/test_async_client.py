@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the obspy.clients.fdsn.async_client.AsyncClient, using a local
+mock FDSN web service.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import hashlib
+import io
+import sys
+import threading
+import unittest
+import warnings
+
+import numpy as np
+
+from obspy import UTCDateTime, read
+from obspy.core.compatibility import mock
+from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.client import _read_mseed
+from obspy.clients.fdsn.header import (FDSNException, FDSNNoDataException,
+                                       FDSNRedirectException)
+from obspy.clients.fdsn.tests.mock_server import MockFDSNServer
+
+if not PY2 and sys.version_info >= (3, 5):
+    import asyncio
+    from obspy.clients.fdsn.async_client import (AsyncClient,
+                                                 _digest_authorization)
+
+
+T1 = UTCDateTime(2018, 1, 1)
+T2 = T1 + 9
+
+
+@unittest.skipIf(PY2 or sys.version_info < (3, 5),
+                 "the AsyncClient requires Python 3.5 or newer")
+class AsyncClientTestCase(unittest.TestCase):
+    """
+    Test cases for the AsyncClient.
+    """
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.server = MockFDSNServer().__enter__()
+        self.client = AsyncClient(self.server.url)
+        self.bulk = [("IU", "ST%02d" % i, "00", "BHZ", T1, T2)
+                     for i in range(10)]
+
+    def tearDown(self):
+        self._run(self.client.close())
+        self.server.__exit__()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def _run(self, *coroutines):
+        if len(coroutines) == 1:
+            return self.loop.run_until_complete(coroutines[0])
+        return self.loop.run_until_complete(asyncio.gather(*coroutines))
+
+    def test_queries(self):
+        """
+        Test that the queries give the same results as the Client.
+        """
+        client = Client(self.server.url)
+        try:
+            st, inv, cat = self._run(
+                self.client.get_waveforms("IU", "ANMO", "00", "BHZ", T1, T2),
+                self.client.get_stations(network="IU", station="ANMO",
+                                         location="00", channel="BHZ",
+                                         starttime=T1, endtime=T2),
+                self.client.get_events(starttime=T1, limit=3))
+            st_2 = client.get_waveforms("IU", "ANMO", "00", "BHZ", T1, T2)
+            self.assertEqual(st[0].id, st_2[0].id)
+            np.testing.assert_array_equal(st[0].data, st_2[0].data)
+            self.assertEqual(st[0].stats._fdsnws_dataselect_url,
+                             self.server.url + "/fdsnws/dataselect/1/query")
+            self.assertEqual(inv.networks, client.get_stations(
+                network="IU", station="ANMO", location="00", channel="BHZ",
+                starttime=T1, endtime=T2).networks)
+            self.assertEqual(len(cat), 3)
+            self.assertEqual(cat[2].origins[0].time, T1 + 2)
+        finally:
+            client._connection_pool.clear()
+        # positional arguments, aliases and unsupported parameters as in the
+        # Client
+        st = self._run(self.client.get_waveforms("IU", "ANMO", "00", "BHZ",
+                                                 T1, T2))
+        self.assertEqual(len(st), 1)
+        inv = self._run(self.client.get_stations(
+            net="IU", sta="ANMO", loc="00", cha="BHZ", starttime=T1,
+            endtime=T2))
+        self.assertEqual(inv[0].code, "IU")
+        with self.assertRaises(TypeError):
+            self._run(self.client.get_events(unknown=1))
+        with self.assertRaises(FDSNNoDataException):
+            self._run(self.client.get_events(limit=0))
+        buf = io.BytesIO()
+        self.assertIsNone(self._run(self.client.get_waveforms(
+            "IU", "ANMO", "00", "BHZ", T1, T2, filename=buf)))
+        buf.seek(0, 0)
+        self.assertEqual(read(buf)[0].id, "IU.ANMO.00.BHZ")
+
+    def test_service_discovery(self):
+        """
+        Test that concurrent first queries share one service discovery.
+        """
+        self._run(*[self.client.get_waveforms_bulk(self.bulk[i:i + 1])
+                    for i in range(10)])
+        wadl_requests = [path for _, path, _ in self.server.requests
+                         if "query" not in path]
+        self.assertEqual(len(wadl_requests), 5)
+        self.assertEqual(sorted(self.client.services),
+                         ["dataselect", "event", "station"])
+        # without discovery
+        client = AsyncClient(self.server.url, discover_services=False)
+        st = self._run(client.get_waveforms_bulk(self.bulk))
+        self.assertEqual(len(st), 10)
+        self._run(client.close())
+        self.assertEqual(len(self.server.requests), 16)
+
+    def test_concurrency_limits(self):
+        """
+        Test that requests are sent concurrently, at most as many as allowed
+        per host, and that the connections are reused.
+        """
+        self._run(self.client.discover_services())
+        self.server.delay = 0.05
+        self.server.connections = 0
+        results = self._run(*[
+            self.client.get_waveforms_bulk([bulk]) for bulk in self.bulk * 4])
+        self.assertEqual([st[0].stats.station for st in results],
+                         [bulk[1] for bulk in self.bulk * 4])
+        self.assertEqual(self.server.max_active, 10)
+        self.assertLessEqual(self.server.connections, 10)
+
+        client = AsyncClient(self.server.url, max_connections=20,
+                             max_connections_per_host=3)
+        self.server.max_active = 0
+        self._run(*[client.get_waveforms_bulk([bulk]) for bulk in self.bulk])
+        self.assertEqual(self.server.max_active, 3)
+        self.assertEqual(client._http.opened, 3)
+        self._run(client.close())
+
+    def test_closed_connections_are_replaced(self):
+        """
+        Test that idle connections closed by the server are replaced.
+        """
+        self._run(self.client.get_waveforms_bulk(self.bulk[:1]))
+        for connections in self.client._http._idle.values():
+            for _, writer in connections:
+                writer.get_extra_info("socket").shutdown(2)
+        st = self._run(self.client.get_waveforms_bulk(self.bulk[:1]))
+        self.assertEqual(len(st), 1)
+
+    @mock.patch("obspy.clients.fdsn.client.RETRY_BACKOFF", 0.0)
+    def test_bulk_in_chunks(self):
+        """
+        Test bulk requests split into concurrent chunks with retries.
+        """
+        self._run(self.client.discover_services())
+        self.server.requests = []
+        self.server.failures = [(503, {}), (429, {"Retry-After": "0"})]
+        bulk = self.bulk + [("XX", "A", "", "BHZ", T1, T2)]
+        st = self._run(self.client.get_waveforms_bulk(bulk, chunk_size=3))
+        self.assertEqual([tr.stats.station for tr in st],
+                         ["ST%02d" % i for i in range(10)])
+        self.assertEqual(len(self.server.requests), 6)
+        inv = self._run(self.client.get_stations_bulk(self.bulk, chunk_size=4))
+        self.assertEqual([sta.code for net in inv for sta in net],
+                         ["ST%02d" % i for i in range(10)])
+        buf = io.BytesIO()
+        self._run(self.client.get_waveforms_bulk(self.bulk, chunk_size=4,
+                                                 filename=buf))
+        buf.seek(0, 0)
+        self.assertEqual(len(read(buf)), 10)
+        # errors
+        with self.assertRaises(FDSNNoDataException):
+            self._run(self.client.get_waveforms_bulk(bulk[-1:]))
+        self.server.failures = [(400, {})]
+        with self.assertRaises(FDSNException):
+            self._run(self.client.get_waveforms_bulk(self.bulk))
+        self.server.failures = [(500, {})] * 2
+        with self.assertRaises(FDSNException):
+            self._run(self.client.get_waveforms_bulk(self.bulk, retries=1))
+
+    def test_parsing_in_executor(self):
+        """
+        Test that responses are parsed outside of the event loop, so that
+        the parsing of concurrent requests overlaps.
+        """
+        self._run(self.client.discover_services())
+        barrier = threading.Barrier(2, timeout=10)
+        threads = []
+
+        def read_mseed(*args, **kwargs):
+            threads.append(threading.current_thread())
+            # both parses have to run at the same time to pass the barrier
+            barrier.wait()
+            return _read_mseed(*args, **kwargs)
+
+        with mock.patch("obspy.clients.fdsn.async_client._read_mseed",
+                        side_effect=read_mseed):
+            results = self._run(*[
+                self.client.get_waveforms("IU", station, "00", "BHZ", T1, T2)
+                for station in ("ANMO", "AFI")])
+        self.assertEqual([st[0].stats.station for st in results],
+                         ["ANMO", "AFI"])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_authentication(self):
+        """
+        Test requests with HTTP digest authentication.
+        """
+        self.server.credentials = ("user", "secret")
+        client = AsyncClient(self.server.url, user="user", password="secret")
+        try:
+            st = self._run(client.get_waveforms("IU", "ANMO", "00", "BHZ",
+                                                T1, T2))
+            self.assertEqual(len(st), 1)
+            # challenged first, then authenticated
+            paths = [path.split("?")[0] for _, path, _ in self.server.requests
+                     if "dataselect" in path and "query" in path]
+            self.assertEqual(paths, ["/fdsnws/dataselect/1/queryauth"] * 2)
+            # wrong password
+            client.set_credentials("user", "wrong")
+            with self.assertRaises(FDSNException):
+                self._run(client.get_waveforms("IU", "ANMO", "00", "BHZ",
+                                               T1, T2))
+            # redirects are not followed with credentials by default
+            self.server.failures = [(302, {"Location": self.server.url})]
+            with self.assertRaisesRegex(FDSNException, "not being redirected"):
+                self._run(client.get_waveforms("IU", "ANMO", "00", "BHZ",
+                                               T1, T2))
+        finally:
+            self._run(client.close())
+        # refused redirects of the service discovery
+        Client._Client__service_discovery_cache.clear()
+        client = AsyncClient(self.server.url, user="user", password="secret")
+        self.server.failures = [(302, {"Location": self.server.url})] * 5
+        try:
+            with self.assertRaises(FDSNRedirectException):
+                self._run(client.discover_services())
+        finally:
+            self._run(client.close())
+        with self.assertRaises(FDSNException):
+            AsyncClient(self.server.url, user="user", password="secret",
+                        eida_token="token")
+
+    def test_digest_authorization(self):
+        """
+        Test the answers to HTTP digest authentication challenges.
+        """
+        challenge = ('Digest realm="FDSN", nonce="abc", qop="auth,auth-int",'
+                     ' algorithm=SHA-256-sess')
+        with mock.patch("os.urandom", return_value=b"\x00" * 8):
+            authorization = _digest_authorization(challenge, "GET", "/a",
+                                                  "user", "secret")
+        ha1 = hashlib.sha256(b"user:FDSN:secret").hexdigest()
+        ha1 = hashlib.sha256(
+            ("%s:abc:0000000000000000" % ha1).encode()).hexdigest()
+        ha2 = hashlib.sha256(b"GET:/a").hexdigest()
+        response = hashlib.sha256(
+            ("%s:abc:00000001:0000000000000000:auth:%s" % (ha1, ha2))
+            .encode()).hexdigest()
+        self.assertIn('response="%s"' % response, authorization)
+        self.assertIn("algorithm=SHA-256-sess", authorization)
+        for challenge in ('Basic realm="FDSN"',
+                          'Digest realm="FDSN", nonce="abc", qop="auth-int"',
+                          'Digest realm="FDSN", nonce="abc", algorithm=SHA'):
+            self.assertIsNone(_digest_authorization(challenge, "GET", "/a",
+                                                    "user", "secret"))
+
+    def test_eida_token(self):
+        """
+        Test that an EIDA token is exchanged for credentials once, on the
+        first query.
+        """
+        token = "-----BEGIN PGP MESSAGE-----\n...\n-----END PGP MESSAGE-----"
+        self.server.credentials = ("user", "secret")
+        client = AsyncClient(self.server.url, eida_token=token)
+        self._run(client.discover_services())
+        client.services["eida-auth"] = True
+        download = client._download_async
+
+        async def _download_async(url, data=None, **kwargs):
+            if url.endswith("/auth"):
+                self.assertEqual(data, token.encode())
+                self.assertFalse(kwargs["use_cache"])
+                return io.BytesIO(b"user:secret")
+            return await download(url, data=data, **kwargs)
+
+        try:
+            with mock.patch.object(client, "_download_async",
+                                   side_effect=_download_async) as p:
+                results = self._run(*[
+                    client.get_waveforms("IU", station, "00", "BHZ", T1, T2)
+                    for station in ("ANMO", "AFI")])
+            self.assertEqual(len(results), 2)
+            auth_urls = [call[0][0] for call in p.call_args_list
+                         if call[0][0].endswith("/auth")]
+            self.assertEqual(auth_urls, [self.server.url.replace(
+                "http://", "https://") + "/fdsnws/dataselect/1/auth"])
+            self.assertEqual(client.user, "user")
+        finally:
+            self._run(client.close())
+
+    def test_proxy_warning(self):
+        """
+        Test the warning that proxies are not used.
+        """
+        environ = {"http_proxy": "http://proxy:3128", "no_proxy": ""}
+        with mock.patch.dict("os.environ", environ, clear=True):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                AsyncClient(self.server.url)
+        self.assertEqual(len(w), 1)
+        self.assertIn("Proxies are not supported", str(w[0].message))
+        environ["no_proxy"] = "127.0.0.1"
+        with mock.patch.dict("os.environ", environ, clear=True):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                AsyncClient(self.server.url)
+        self.assertEqual(len(w), 0)
+
+
+def suite():
+    return unittest.makeSuite(AsyncClientTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
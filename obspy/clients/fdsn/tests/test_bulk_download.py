@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for persistent connections and split bulk requests of the
+obspy.clients.fdsn.client.Client, using a local mock FDSN web service.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import PY2
+
+import io
+import unittest
+
+import numpy as np
+
+from obspy import UTCDateTime, read, read_inventory
+from obspy.core.compatibility import mock
+from obspy.core.util.base import NamedTemporaryFile
+from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.client import split_bulk_string
+from obspy.clients.fdsn.header import FDSNException, FDSNNoDataException
+from obspy.clients.fdsn.tests.mock_server import MockFDSNServer
+
+
+T1 = UTCDateTime(2018, 1, 1)
+T2 = T1 + 9
+
+
+@unittest.skipIf(PY2, "connections are not reused on Python 2")
+class BulkDownloadTestCase(unittest.TestCase):
+    """
+    Test cases for connection pooling and split bulk requests.
+    """
+    def setUp(self):
+        self.server = MockFDSNServer().__enter__()
+        self.client = Client(self.server.url, _discover_services=False)
+        self.bulk = [("IU", "ST%02d" % i, "00", "BHZ", T1, T2)
+                     for i in range(10)]
+
+    def tearDown(self):
+        self.client._connection_pool.clear()
+        self.server.__exit__()
+
+    def _assert_same_traces(self, st1, st2):
+        self.assertEqual([tr.id for tr in st1], [tr.id for tr in st2])
+        for tr1, tr2 in zip(st1, st2):
+            self.assertEqual(tr1.stats.starttime, tr2.stats.starttime)
+            np.testing.assert_array_equal(tr1.data, tr2.data)
+
+    def test_connections_are_reused(self):
+        """
+        Test that subsequent requests use the same connection.
+        """
+        for bulk in self.bulk[:5]:
+            st = self.client.get_waveforms_bulk([bulk])
+            self.assertEqual(len(st), 1)
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.client._connection_pool.reused, 4)
+        # also after errors with a response body
+        with self.assertRaises(FDSNNoDataException):
+            self.client.get_waveforms_bulk([("XX", "A", "", "BHZ", T1, T2)])
+        self.client.get_stations_bulk(self.bulk[:1])
+        self.assertEqual(self.server.connections, 1)
+
+    def test_closed_connections_are_replaced(self):
+        """
+        Test that idle connections closed by the server are replaced.
+        """
+        self.client.get_waveforms_bulk(self.bulk[:1])
+        # close the idle connection from the server side
+        for connections in self.client._connection_pool._idle.values():
+            for connection in connections:
+                connection.sock.shutdown(2)
+        st = self.client.get_waveforms_bulk(self.bulk[:1])
+        self.assertEqual(len(st), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_split_bulk_string(self):
+        """
+        Test splitting bulk requests into chunks.
+        """
+        bulk = b"quality=B\nA\nB\nC\n\nD\nE\n"
+        self.assertEqual(split_bulk_string(bulk, 2),
+                         [b"quality=B\nA\nB", b"quality=B\nC\nD",
+                          b"quality=B\nE"])
+        self.assertEqual(split_bulk_string(bulk, chunks=2),
+                         [b"quality=B\nA\nB\nC", b"quality=B\nD\nE"])
+        self.assertEqual(split_bulk_string(bulk, chunks=10),
+                         [b"quality=B\n" + line
+                          for line in (b"A", b"B", b"C", b"D", b"E")])
+        self.assertEqual(split_bulk_string(b"quality=B", 2), [b"quality=B"])
+
+    def test_waveforms_in_chunks(self):
+        """
+        Test parallel waveform requests in chunks.
+        """
+        st = self.client.get_waveforms_bulk(self.bulk, chunk_size=3,
+                                            threads=3)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertLessEqual(self.server.connections, 3)
+        # the traces are in the order of the request
+        self.assertEqual([tr.stats.station for tr in st],
+                         ["ST%02d" % i for i in range(10)])
+        self.assertEqual(st[0].stats.npts, 10)
+        self._assert_same_traces(st, self.client.get_waveforms_bulk(self.bulk))
+        # split evenly into one request per thread
+        self.server.requests = []
+        st = self.client.get_waveforms_bulk(self.bulk, threads=2,
+                                            quality="B")
+        self.assertEqual(len(st), 10)
+        self.assertEqual(len(self.server.requests), 2)
+        for _, _, body in self.server.requests:
+            self.assertTrue(body.startswith(b"quality=B\n"))
+            self.assertEqual(len(body.splitlines()), 6)
+
+    def test_waveforms_in_chunks_to_file(self):
+        """
+        Test writing waveforms requested in chunks to files.
+        """
+        st = self.client.get_waveforms_bulk(self.bulk)
+        with NamedTemporaryFile() as tf:
+            self.client.get_waveforms_bulk(self.bulk, filename=tf.name,
+                                           chunk_size=4, threads=2)
+            self._assert_same_traces(read(tf.name), st)
+        buf = io.BytesIO()
+        self.client.get_waveforms_bulk(self.bulk, filename=buf,
+                                       chunk_size=4, threads=2)
+        buf.seek(0, 0)
+        self._assert_same_traces(read(buf), st)
+
+    def test_chunks_without_data(self):
+        """
+        Test that chunks without data are skipped and an exception is only
+        raised if there is no data at all.
+        """
+        bulk = [("XX", "A", "", "BHZ", T1, T2)] * 3 + self.bulk[:2]
+        st = self.client.get_waveforms_bulk(bulk, chunk_size=2, threads=2)
+        self.assertEqual([tr.stats.station for tr in st], ["ST00", "ST01"])
+        with NamedTemporaryFile() as tf:
+            tf.close()
+            with self.assertRaises(FDSNNoDataException):
+                self.client.get_waveforms_bulk(bulk[:3], chunk_size=1,
+                                               filename=tf.name)
+
+    @mock.patch("obspy.clients.fdsn.client.RETRY_BACKOFF", 0.0)
+    def test_retries(self):
+        """
+        Test retries after temporary errors.
+        """
+        self.server.failures = [(503, {}), (429, {"Retry-After": "0"})]
+        st = self.client.get_waveforms_bulk(self.bulk, chunk_size=5)
+        self.assertEqual(len(st), 10)
+        self.assertEqual(len(self.server.requests), 4)
+        # too many errors
+        self.server.failures = [(500, {})] * 3
+        with self.assertRaises(FDSNException):
+            self.client.get_waveforms_bulk(self.bulk, chunk_size=5,
+                                           retries=2)
+        # other errors are not retried
+        self.server.requests = []
+        self.server.failures = [(400, {})]
+        with self.assertRaises(FDSNException):
+            self.client.get_waveforms_bulk(self.bulk, chunk_size=10)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_stations_in_chunks(self):
+        """
+        Test parallel station requests in chunks.
+        """
+        inv = self.client.get_stations_bulk(self.bulk, chunk_size=3,
+                                            threads=2)
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(
+            [sta.code for net in inv for sta in net],
+            ["ST%02d" % i for i in range(10)])
+        with NamedTemporaryFile() as tf:
+            self.client.get_stations_bulk(self.bulk, chunk_size=3,
+                                          filename=tf.name)
+            self.assertEqual(read_inventory(tf.name).networks, inv.networks)
+
+
+def suite():
+    return unittest.makeSuite(BulkDownloadTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for the response cache of the obspy.clients.fdsn.client.Client.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import warnings
+
+from obspy import UTCDateTime
+from obspy.core.compatibility import mock
+from obspy.clients.fdsn import Client
+from obspy.clients.fdsn.cache import (ResponseCache, get_cache_key,
+                                      get_default_cache_path, normalize_url)
+from obspy.clients.fdsn.tests.mock_server import MockFDSNServer
+
+
+T1 = UTCDateTime(2018, 1, 1)
+T2 = T1 + 9
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """
+    Test cases for the response cache.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = MockFDSNServer().__enter__()
+
+    def tearDown(self):
+        self.server.__exit__()
+        shutil.rmtree(self.path)
+
+    def test_cache_key(self):
+        """
+        Test that equivalent requests have the same cache key.
+        """
+        url = "http://example.com/fdsnws/station/1/query?net=IU&sta=ANMO"
+        self.assertEqual(
+            normalize_url(url),
+            normalize_url("HTTP://EXAMPLE.com/fdsnws/station/1/query"
+                          "?sta=ANMO&net=IU"))
+        self.assertEqual(get_cache_key(url), get_cache_key(url))
+        self.assertNotEqual(get_cache_key(url), get_cache_key(url + "&x=1"))
+        self.assertNotEqual(get_cache_key(url), get_cache_key(url, b""))
+        self.assertEqual(get_cache_key(url, b"A\nB\n"),
+                         get_cache_key(url, b"A\r\n\r\nB"))
+        self.assertNotEqual(get_cache_key(url, b"A\nB"),
+                            get_cache_key(url, b"B\nA"))
+
+    def test_ttl_and_eviction(self):
+        """
+        Test expiry and eviction of the least recently used responses.
+        """
+        cache = ResponseCache(self.path, ttl=100, max_size=25)
+        for i in range(3):
+            cache.put("http://example.com/%d" % i, None, 200, b"x" * 7)
+            # access times with a resolution of seconds on some file systems
+            filename = cache._filename(
+                get_cache_key("http://example.com/%d" % i))
+            os.utime(filename, (time.time() - 10 + i, time.time()))
+        # the first one is evicted
+        self.assertIsNone(cache.get("http://example.com/0"))
+        self.assertEqual(cache.get("http://example.com/1"), (200, b"x" * 7))
+        cache.put("http://example.com/3", None, 200, b"y" * 7)
+        # now the second one is the most recently used one
+        self.assertIsNone(cache.get("http://example.com/2"))
+        self.assertEqual(cache.get("http://example.com/1"), (200, b"x" * 7))
+        self.assertEqual(
+            cache.stats, {"hits": 2, "misses": 2, "stores": 4,
+                          "evictions": 2, "entries": 2, "size": 22})
+        # too large responses are not cached
+        cache.put("http://example.com/4", None, 200, b"z" * 23)
+        self.assertIsNone(cache.get("http://example.com/4"))
+        # expired responses are removed
+        filename = cache._filename(get_cache_key("http://example.com/1"))
+        os.utime(filename, (time.time(), time.time() - 101))
+        self.assertIsNone(cache.get("http://example.com/1"))
+        self.assertFalse(os.path.exists(filename))
+        # a new cache object finds the remaining responses
+        cache = ResponseCache(self.path, ttl=None)
+        self.assertEqual(cache.get("http://example.com/3"), (200, b"y" * 7))
+        self.assertEqual(cache.stats["entries"], 1)
+        cache.clear()
+        self.assertEqual(cache.stats["entries"], 0)
+
+    def test_overwrite_and_failed_writes(self):
+        """
+        Test size accounting of replaced responses and that failed writes do
+        not leave temporary files behind.
+        """
+        cache = ResponseCache(self.path, max_size=25)
+        for i in range(5):
+            cache.put("http://example.com/0", None, 200, b"x" * 7)
+        self.assertEqual(cache._size, 11)
+        self.assertEqual(cache.evictions, 0)
+        self.assertEqual(cache.get("http://example.com/0"), (200, b"x" * 7))
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                cache.put("http://example.com/1", None, 200, b"y" * 7)
+        self.assertEqual(len(w), 1)
+        self.assertIn("disk full", str(w[0].message))
+        self.assertEqual(os.listdir(self.path),
+                         [os.path.basename(cache._filename(
+                             get_cache_key("http://example.com/0")))])
+        self.assertEqual(cache._size, 11)
+
+    def test_default_path(self):
+        """
+        Test that the default cache directory is private to the user.
+        """
+        cache_home = os.path.join(self.path, "home_cache")
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_home}):
+            self.assertEqual(get_default_cache_path(),
+                             os.path.join(cache_home, "obspy", "fdsn"))
+            cache = ResponseCache()
+        self.assertEqual(cache.path, os.path.join(cache_home, "obspy",
+                                                  "fdsn"))
+        self.assertTrue(os.path.isdir(cache.path))
+        if os.name == "posix":
+            self.assertEqual(os.stat(cache.path).st_mode & 0o077, 0)
+
+    def test_client_with_cache(self):
+        """
+        Test that repeated requests of clients are answered from the cache.
+        """
+        client = Client(self.server.url, cache=self.path)
+        self.assertIsInstance(client.cache, ResponseCache)
+        self.assertIn("dataselect", client.services)
+        self.assertIn("station", client.services)
+        inv = client.get_stations(network="IU", station="ANMO",
+                                  location="00", channel="BHZ",
+                                  starttime=T1, endtime=T2)
+        bulk = [("IU", "ANMO", "00", "BHZ", T1, T2)]
+        st = client.get_waveforms_bulk(bulk)
+        requests = len(self.server.requests)
+
+        # a new client with a new cache object in the same directory, as in
+        # a new process
+        client._connection_pool.clear()
+        Client._Client__service_discovery_cache.clear()
+        client = Client(self.server.url, cache=ResponseCache(self.path))
+        self.assertIn("dataselect", client.services)
+        self.assertEqual(client.get_stations(
+            network="IU", station="ANMO", location="00", channel="BHZ",
+            starttime=T1, endtime=T2), inv)
+        self.assertEqual(client.get_waveforms_bulk(bulk)[0].data.tolist(),
+                         st[0].data.tolist())
+        self.assertEqual(len(self.server.requests), requests)
+        stats = client.cache.stats
+        self.assertEqual(stats["misses"], 0)
+        self.assertGreaterEqual(stats["hits"], 4)
+
+        # responses without data are not cached
+        client.get_waveforms_bulk(bulk + [("XX", "A", "", "BHZ", T1, T2)])
+        self.assertEqual(len(self.server.requests), requests + 1)
+        client._connection_pool.clear()
+
+        # without cache
+        client = Client(self.server.url, _discover_services=False)
+        self.assertIsNone(client.cache)
+        client.get_waveforms_bulk(bulk)
+        self.assertEqual(len(self.server.requests), requests + 2)
+        client._connection_pool.clear()
+
+    def test_no_cache_with_credentials(self):
+        """
+        Requests with credentials are neither answered from nor stored in the
+        cache, restricted data must not be shared with other clients.
+        """
+        bulk = [("IU", "ANMO", "00", "BHZ", T1, T2)]
+        cache = ResponseCache(self.path)
+        client = Client(self.server.url, cache=cache)
+        client.get_waveforms_bulk(bulk)
+        stores = cache.stats["stores"]
+        client._connection_pool.clear()
+        client = Client(self.server.url, user="user", password="secret",
+                        cache=cache, _discover_services=False)
+        requests = len(self.server.requests)
+        for _ in range(2):
+            client.get_waveforms_bulk(bulk)
+        self.assertEqual(len(self.server.requests), requests + 2)
+        for _, path, _ in self.server.requests[-2:]:
+            self.assertIn("/queryauth", path)
+        self.assertEqual(cache.stats["stores"], stores)
+        self.assertEqual(cache.stats["hits"], 0)
+        client._connection_pool.clear()
+
+
+def suite():
+    return unittest.makeSuite(ResponseCacheTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -35,9 +35,12 @@ from obspy.clients.fdsn.mass_downloader.utils import (
     filter_channel_priority, get_stationxml_filename, get_mseed_filename,
     get_stationxml_contents, SphericalNearestNeighbour, safe_delete,
     download_stationxml, download_and_split_mseed_bulk,
-    _get_stationxml_contents_slow)
+    _get_stationxml_contents_slow, AdaptiveConcurrency,
+    parse_availability_text)
 from obspy.clients.fdsn.mass_downloader.download_helpers import (
     Channel, TimeInterval, Station, STATUS, ClientDownloadHelper)
+from obspy.clients.fdsn.mass_downloader.journal import DownloadJournal
+from obspy.clients.fdsn.tests.mock_server import MockFDSNServer
 
 
 class DomainTestCase(unittest.TestCase):
@@ -2796,6 +2799,304 @@ class DownloadHelperTestCase(unittest.TestCase):
                        mseed_storage="mseed", stationxml_storage="stationxml")
 
 
+class DownloadJournalTestCase(unittest.TestCase):
+    """
+    Test cases for the download journal and adaptive downloads.
+    """
+    def setUp(self):
+        self.data = os.path.join(os.path.dirname(__file__), "data")
+        self.path = tempfile.mkdtemp()
+        self.journal = DownloadJournal(os.path.join(self.path, "j.sqlite"))
+        self.server = MockFDSNServer().__enter__()
+        self.client = Client(self.server.url)
+        self.logger = mock.MagicMock()
+
+    def tearDown(self):
+        self.client._connection_pool.clear()
+        self.server.__exit__()
+        self.journal.close()
+        shutil.rmtree(self.path)
+
+    def _init_client(self):
+        t = obspy.UTCDateTime(2018, 1, 1)
+        stations = {}
+        for network, station in (("IU", "A"), ("IU", "B"), ("XX", "C")):
+            # Not adjacent, so that they are not merged in the requests.
+            intervals = [TimeInterval(t + _i * 3600, t + _i * 3600 + 59)
+                         for _i in range(3)]
+            stations[(network, station)] = Station(
+                network, station, 0, 0, [Channel("", "BHZ", intervals)])
+        helper = ClientDownloadHelper(
+            client=self.client, client_name="Mock",
+            restrictions=Restrictions(starttime=t, endtime=t + 7260),
+            domain=domain.GlobalDomain(),
+            mseed_storage=os.path.join(self.path, "mseed"),
+            stationxml_storage=os.path.join(self.path, "stationxml"),
+            logger=self.logger, journal=self.journal)
+        helper.stations = stations
+        helper.prepare_mseed_download()
+        return helper
+
+    @staticmethod
+    def _get_statuses(helper):
+        return {(sta.network, sta.station): [
+            _i.status for _i in sta.channels[0].intervals]
+            for sta in helper.stations.values()}
+
+    def test_resume_download(self):
+        """
+        Tests that restarted downloads continue according to the journal.
+        """
+        helper = self._init_client()
+        filenames = [_i.filename for _i in
+                     helper.stations[("IU", "A")].channels[0].intervals]
+        helper.download_mseed(chunk_size_in_mb=0.001)
+        self.assertEqual(len(self.server.requests), 5 + 9)
+        self.assertEqual(self._get_statuses(helper), {
+            ("IU", "A"): [STATUS.DOWNLOADED] * 3,
+            ("IU", "B"): [STATUS.DOWNLOADED] * 3})
+        entry = self.journal.get_interval(filenames[0])
+        self.assertEqual(entry.status, STATUS.DOWNLOADED)
+        self.assertEqual(entry.size, os.path.getsize(filenames[0]))
+        self.assertEqual(entry.attempts, 0)
+
+        # An interval rejected by the QC checks and one that was being
+        # downloaded when the download stopped.
+        rejected = TimeInterval(None, None, filenames[1],
+                                STATUS.DOWNLOAD_REJECTED)
+        incomplete = TimeInterval(None, None, filenames[2],
+                                  STATUS.NEEDS_DOWNLOADING)
+        self.journal.update_intervals("Mock", [
+            ("IU", "A", "", "BHZ", rejected),
+            ("IU", "A", "", "BHZ", incomplete)])
+        os.remove(filenames[1])
+        with open(filenames[2], "wb") as fh:
+            fh.write(b"incomplete")
+        helper = self._init_client()
+        self.assertEqual(self._get_statuses(helper), {
+            ("IU", "A"): [STATUS.EXISTS, STATUS.IGNORE,
+                          STATUS.NEEDS_DOWNLOADING],
+            ("IU", "B"): [STATUS.EXISTS] * 3,
+            ("XX", "C"): [STATUS.NEEDS_DOWNLOADING] * 3})
+        self.assertFalse(os.path.exists(filenames[2]))
+        helper.download_mseed()
+        self.assertEqual(self._get_statuses(helper)[("IU", "A")],
+                         [STATUS.EXISTS, STATUS.IGNORE, STATUS.DOWNLOADED])
+
+        # Failed intervals are given up after the maximum attempts.
+        helper = self._init_client()
+        self.assertEqual(self._get_statuses(helper)[("XX", "C")],
+                         [STATUS.NEEDS_DOWNLOADING] * 3)
+        helper.download_mseed()
+        helper = self._init_client()
+        self.assertEqual(self._get_statuses(helper)[("XX", "C")],
+                         [STATUS.IGNORE] * 3)
+        self.assertEqual(self.journal.get_interval(
+            helper.stations[("XX", "C")].channels[0].intervals[0].filename
+        ).attempts, 3)
+
+    def test_adaptive_download(self):
+        """
+        Tests adaptive downloads and that the learned settings are kept.
+        """
+        helper = self._init_client()
+        helper.download_mseed(chunk_size_in_mb=0.001, threads_per_client=2,
+                              adaptive=True)
+        self.assertEqual(self._get_statuses(helper), {
+            ("IU", "A"): [STATUS.DOWNLOADED] * 3,
+            ("IU", "B"): [STATUS.DOWNLOADED] * 3})
+        # Chunks are at least 1 MB, so everything is one request.
+        self.assertEqual(helper.concurrency.requests, 1)
+        self.assertEqual(helper.concurrency.threads, 2)
+        settings = self.journal.get_provider_settings("Mock")
+        self.assertEqual(settings, (helper.concurrency.threads,
+                                    helper.concurrency.chunk_size_in_mb))
+        # The next run starts with them.
+        self.journal.set_provider_settings("Mock", 4, 2.0)
+        helper = self._init_client()
+        with mock.patch("obspy.clients.fdsn.mass_downloader.utils."
+                        "AdaptiveConcurrency") as p:
+            p.return_value.threads = 4
+            p.return_value.max_threads = 10
+            p.return_value.chunk_size_in_mb = 2.0
+            helper.download_mseed(adaptive=True)
+        self.assertEqual(p.call_args[1]["threads"], 4)
+        self.assertEqual(p.call_args[1]["chunk_size_in_mb"], 2.0)
+
+    def test_adaptive_concurrency(self):
+        """
+        Tests the adaption of the threads and chunk sizes.
+        """
+        c = AdaptiveConcurrency(threads=2, chunk_size_in_mb=10,
+                                max_threads=4, target_duration=10)
+        mb = 1024 ** 2
+        # 1 MB/sec per request: the chunk size approaches 10 MB.
+        c.update(mb, 1.0)
+        self.assertEqual((c.threads, c.chunk_size_in_mb), (2, 10.0))
+        c.update(mb, 1.0)
+        self.assertEqual(c.threads, 3)
+        # Throughput holds with three threads, and more threads are tried.
+        for _ in range(3):
+            c.update(mb, 1.0)
+        self.assertEqual(c.threads, 4)
+        for _ in range(4):
+            c.update(mb, 1.0)
+        self.assertEqual(c.threads, 4)
+        # Degrading throughput, requests without data are no measure.
+        for _ in range(4):
+            c.update(mb, 2.0)
+            c.update(0, 5.0)
+        self.assertEqual(c.threads, 3)
+        self.assertAlmostEqual(c.chunk_size_in_mb, 5.0, 0)
+        # Errors halve everything.
+        chunk_size = c.chunk_size_in_mb
+        c.update(0, 1.0, error=True)
+        self.assertEqual(c.threads, 1)
+        self.assertEqual(c.chunk_size_in_mb, chunk_size / 2.0)
+        c.update(0, 1.0, error=True)
+        self.assertEqual(c.threads, 1)
+        self.assertEqual((c.requests, c.errors), (19, 2))
+
+    def test_stationxml_contents(self):
+        """
+        Tests that the contents of StationXML files are only parsed again
+        after the files changed.
+        """
+        filename = os.path.join(self.path, "AU.MEEK.xml")
+        shutil.copy(os.path.join(self.data, "AU.MEEK.xml"), filename)
+        contents = get_stationxml_contents(filename)
+        utils_path = "obspy.clients.fdsn.mass_downloader.utils."
+        with mock.patch(utils_path + "get_stationxml_contents",
+                        wraps=get_stationxml_contents) as p:
+            self.assertEqual(self.journal.get_stationxml_contents(filename),
+                             contents)
+            self.assertEqual(self.journal.get_stationxml_contents(filename),
+                             contents)
+            self.assertEqual(p.call_count, 1)
+            # A new journal object of the same database.
+            journal = DownloadJournal(self.journal.filename)
+            self.assertEqual(journal.get_stationxml_contents(filename),
+                             contents)
+            journal.close()
+            self.assertEqual(p.call_count, 1)
+            os.utime(filename, (0, 0))
+            self.assertEqual(self.journal.get_stationxml_contents(filename),
+                             contents)
+            self.assertEqual(p.call_count, 2)
+
+
+class AvailabilityTestCase(unittest.TestCase):
+    """
+    Test cases for the data availability pre-check.
+    """
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.server = MockFDSNServer().__enter__()
+        self.client = Client(self.server.url)
+        self.logger = mock.MagicMock()
+        self.t = obspy.UTCDateTime(2018, 1, 1)
+
+    def tearDown(self):
+        self.client._connection_pool.clear()
+        self.server.__exit__()
+        shutil.rmtree(self.path)
+
+    def _init_client(self):
+        stations = {}
+        for network, station in (("IU", "A"), ("IU", "B"), ("XX", "C")):
+            intervals = [
+                TimeInterval(self.t + _i * 3600, self.t + _i * 3600 + 59)
+                for _i in range(3)]
+            stations[(network, station)] = Station(
+                network, station, 0, 0, [Channel("", "BHZ", intervals)])
+        helper = ClientDownloadHelper(
+            client=self.client, client_name="Mock",
+            restrictions=Restrictions(starttime=self.t,
+                                      endtime=self.t + 7260),
+            domain=domain.GlobalDomain(),
+            mseed_storage=os.path.join(self.path, "mseed"),
+            stationxml_storage=os.path.join(self.path, "stationxml"),
+            logger=self.logger)
+        helper.stations = stations
+        return helper
+
+    def test_parse_availability_text(self):
+        """
+        Tests parsing the text format of fdsnws-availability.
+        """
+        text = (
+            "#Network Station Location Channel Quality SampleRate Earliest "
+            "Latest\n"
+            "IU ANMO 00 BHZ M 20.0 2018-01-01T00:00:00Z 2018-01-02T00:00:00Z\n"
+            "IU ANMO -- BHN M 20.0 2018-01-01T00:00:00Z 2018-01-02T00:00:00Z\n"
+            "\n"
+            "IU ANMO BHE M 20.0 2018-01-03T00:00:00Z 2018-01-04T00:00:00Z\n")
+        channels = parse_availability_text(text)
+        self.assertEqual(
+            [(_i.location, _i.channel) for _i in channels],
+            [("00", "BHZ"), ("", "BHN"), ("", "BHE")])
+        self.assertEqual(channels[2].starttime, obspy.UTCDateTime(2018, 1, 3))
+        self.assertEqual(channels[2].endtime, obspy.UTCDateTime(2018, 1, 4))
+        self.assertEqual(parse_availability_text(
+            "IU ANMO 00 BHZ 2018-01-01T00:00:00Z 2018-01-02T00:00:00Z"),
+            channels[:1])
+        self.assertEqual(parse_availability_text(""), [])
+
+    def test_check_availability(self):
+        """
+        Tests that time intervals without data are removed before any
+        waveforms are requested.
+        """
+        self.server.gaps = [(self.t + 3000, self.t + 4000)]
+        helper = self._init_client()
+        self.server.requests = []
+        helper.check_availability()
+        self.assertEqual(len(self.server.requests), 1)
+        method, path, body = self.server.requests[0]
+        self.assertEqual((method, path),
+                         ("POST", "/fdsnws/availability/1/query"))
+        self.assertIn(b"format=text", body)
+        self.assertIn(b"IU A -- BHZ", body)
+        self.assertEqual(sorted(helper.stations), [("IU", "A"), ("IU", "B")])
+        for station in helper.stations.values():
+            self.assertEqual(
+                [_i.start for _i in station.channels[0].intervals],
+                [self.t, self.t + 7200])
+
+        # All remaining intervals are downloaded.
+        helper.prepare_mseed_download()
+        self.server.requests = []
+        helper.download_mseed()
+        self.assertEqual(len(self.server.requests), 1)
+        for station in helper.stations.values():
+            self.assertEqual(
+                [_i.status for _i in station.channels[0].intervals],
+                [STATUS.DOWNLOADED] * 2)
+
+        # Nothing is removed if the service does not exist.
+        self.server.failures = [(404, {})]
+        helper = self._init_client()
+        helper.check_availability()
+        self.assertEqual(len(helper), 3)
+        self.assertEqual(self.logger.warning.call_count, 1)
+
+        # Or the availability of a local tsindex database.
+        tsindex_client = mock.MagicMock()
+        tsindex_client.get_availability.side_effect = \
+            lambda net, sta, loc, cha, t1, t2: [] if sta != "B" else [
+                (net, sta, "", cha, t1 + 3600, t1 + 3659)]
+        helper = self._init_client()
+        helper.check_availability(tsindex_client)
+        self.assertEqual(tsindex_client.get_availability.call_count, 3)
+        self.assertEqual(tsindex_client.get_availability.call_args_list[0][0],
+                         ("IU", "A", "--", "BHZ", self.t, self.t + 7259))
+        self.assertEqual(list(helper.stations), [("IU", "B")])
+        self.assertEqual(
+            [_i.start for _i in
+             helper.stations[("IU", "B")].channels[0].intervals],
+            [self.t + 3600])
+
+
 def suite():
     testsuite = unittest.TestSuite()
     testsuite.addTest(unittest.makeSuite(DomainTestCase, 'test'))
@@ -2806,6 +3107,8 @@ def suite():
     testsuite.addTest(unittest.makeSuite(DownloadHelperTestCase, 'test'))
     testsuite.addTest(unittest.makeSuite(ClientDownloadHelperTestCase, 'test'))
     testsuite.addTest(unittest.makeSuite(RestrictionsTestCase, 'test'))
+    testsuite.addTest(unittest.makeSuite(DownloadJournalTestCase, 'test'))
+    testsuite.addTest(unittest.makeSuite(AvailabilityTestCase, 'test'))
     return testsuite
 
 
@@ -25,16 +25,40 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import copy
+import math
 import warnings
 
-import numpy as np
-
 from obspy.core.event.resourceid import ResourceIdentifier
 from obspy.core.event.header import DataUsedWaveType, ATTRIBUTE_HAS_ERRORS
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
 
 
+# counts changes of attributes of all existing event type objects, used to
+# invalidate cached tables of catalogs
+_attribute_changes = 0
+
+
+def _deepcopy_without_init(self, *args, **kwargs):  # @UnusedVariable
+    """
+    Deep copy an AttribDict without calling __init__ and without the checks
+    of __setitem__, the values of the original are converted already.
+    """
+    new = self.__class__.__new__(self.__class__)
+    new.__dict__.update(self.defaults)
+    new.__dict__.update(copy.deepcopy(self.__dict__))
+    return new
+
+
+def _setstate_without_checks(self, adict):
+    """
+    Restore the state of a pickled AttribDict without the checks of
+    __setitem__.
+    """
+    self.__dict__.update(self.defaults)
+    self.__dict__.update(adict)
+
+
 class QuantityError(AttribDict):
     """
     Uncertainty information for a physical quantity.
@@ -59,10 +83,13 @@ class QuantityError(AttribDict):
     def __init__(self, uncertainty=None, lower_uncertainty=None,
                  upper_uncertainty=None, confidence_level=None):
         super(QuantityError, self).__init__()
-        self.uncertainty = uncertainty
-        self.lower_uncertainty = lower_uncertainty
-        self.upper_uncertainty = upper_uncertainty
-        self.confidence_level = confidence_level
+        # all values are None by default
+        for key, value in (("uncertainty", uncertainty),
+                           ("lower_uncertainty", lower_uncertainty),
+                           ("upper_uncertainty", upper_uncertainty),
+                           ("confidence_level", confidence_level)):
+            if value is not None:
+                self[key] = value
 
     def __bool__(self):
         """
@@ -95,6 +122,9 @@ class QuantityError(AttribDict):
     # Python 2 compatibility
     __nonzero__ = __bool__
 
+    __deepcopy__ = _deepcopy_without_init
+    __setstate__ = _setstate_without_checks
+
 
 def _bool(value):
     """
@@ -223,15 +253,18 @@ def _event_type_class_factory(class_name, class_attributes=[],
                     if kwargs.get("force_resource_id", False):
                         if value is None:
                             value = ResourceIdentifier()
-                setattr(self, key, value)
+                # All errors are QuantityError. If they are not set yet, set
+                # them now.
+                if key.endswith("_errors") and value is None:
+                    value = QuantityError()
+                if value is None:
+                    # nothing to convert or bind
+                    self.__dict__[key] = None
+                else:
+                    setattr(self, key, value)
             # Containers currently are simple lists.
             for name in self._containers:
                 setattr(self, name, list(kwargs.get(name, [])))
-            # All errors are QuantityError. If they are not set yet, set them
-            # now.
-            for key, _ in self._properties:
-                if key.endswith("_errors") and getattr(self, key) is None:
-                    setattr(self, key, QuantityError())
 
         def clear(self):
             super(AbstractEventType, self).clear()
@@ -314,6 +347,10 @@ def _event_type_class_factory(class_name, class_attributes=[],
         def copy(self):
             return copy.deepcopy(self)
 
+        # skip __init__, which would create and register a new resource id
+        __deepcopy__ = _deepcopy_without_init
+        __setstate__ = _setstate_without_checks
+
         def __repr__(self):
             return self.__str__(force_one_line=True)
 
@@ -354,6 +391,11 @@ def _event_type_class_factory(class_name, class_attributes=[],
             Custom property implementation that works if the class is
             inheriting from AttribDict.
             """
+            global _attribute_changes
+            # only count changes of attributes that were set before, i.e.
+            # not the initialization of new objects
+            if name in self.__dict__:
+                _attribute_changes += 1
             # avoid type casting of 'extra' attribute, to make it possible to
             # control ordering of extra tags by using an OrderedDict for
             # 'extra'.
@@ -361,12 +403,16 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 dict.__setattr__(self, name, value)
                 return
             # Pass to the parent method if not a custom property.
-            if name not in self._property_dict.keys():
+            if name not in self._property_dict:
                 AttribDict.__setattr__(self, name, value)
                 return
+            # If the value is None just set it.
+            if value is None:
+                self.__dict__[name] = None
+                return
             attrib_type = self._property_dict[name]
-            # If the value is None or already the correct type just set it.
-            if (value is not None) and (type(value) is not attrib_type):
+            # If the value is already the correct type just set it.
+            if type(value) is not attrib_type:
                 # If it is a dict, and the attrib_type is no dict, than all
                 # values will be assumed to be keyword arguments.
                 if isinstance(value, dict):
@@ -382,15 +428,17 @@ def _event_type_class_factory(class_name, class_attributes=[],
 
             # Make sure all floats are finite - otherwise this is most
             # likely a user error.
-            if attrib_type is float and value is not None:
-                if not np.isfinite(value):
+            if attrib_type is float:
+                if math.isinf(value) or math.isnan(value):
                     msg = "On %s object: Value '%s' for '%s' is " \
                           "not a finite floating point value." % (
                               type(self).__name__, str(value), name)
 
                     raise ValueError(msg)
 
-            AttribDict.__setattr__(self, name, value)
+            # values of properties have the right type now, so the checks of
+            # AttribDict.__setitem__ are not needed
+            self.__dict__[name] = value
             # if value is a resource id bind or unbind the resource_id
             if isinstance(value, ResourceIdentifier):
                 if name == "resource_id":  # bind the resource_id to self
@@ -398,6 +446,12 @@ def _event_type_class_factory(class_name, class_attributes=[],
                 else:  # else unbind to allow event scoping later
                     value._parent_key = None
 
+        def __setitem__(self, name, value):
+            global _attribute_changes
+            if name in self.__dict__:
+                _attribute_changes += 1
+            AttribDict.__setitem__(self, name, value)
+
     class AbstractEventTypeWithResourceID(AbstractEventType):
         def __init__(self, force_resource_id=True, *args, **kwargs):
             kwargs["force_resource_id"] = force_resource_id
@@ -23,13 +23,16 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import copy
+import glob
+import io
+import os
 import warnings
 
 import numpy as np
 
-from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import _read_from_plugin
-from obspy.core.util.base import ENTRY_POINTS, _generic_reader
+from obspy.core.util.base import (ENTRY_POINTS, _generic_reader,
+                                  _get_format_entry_point)
 from obspy.core.util.decorator import map_example_filename, uncompress_file
 from obspy.core.util.misc import buffered_load_entry_point
 from obspy.imaging.cm import obspy_sequential
@@ -38,6 +41,7 @@ from .base import CreationInfo
 from obspy.core.event import ResourceIdentifier
 
 from .event import Event
+from .table import CatalogTable
 
 EVENT_ENTRY_POINTS = ENTRY_POINTS['event']
 EVENT_ENTRY_POINTS_WRITE = ENTRY_POINTS['event_write']
@@ -96,6 +100,30 @@ class Catalog(object):
                                                  parent=self)
         self.__dict__.update(state)
 
+    def __getstate__(self):
+        """
+        Do not pickle cached tables.
+        """
+        state = self.__dict__.copy()
+        state.pop("_tables", None)
+        return state
+
+    def _get_table(self, preferred=True):
+        """
+        Return the table of origin and magnitude values of all events.
+
+        The table is built on first use and cached until the events or their
+        attributes are changed.
+
+        :rtype: :class:`~obspy.core.event.table.CatalogTable`
+        """
+        tables = self.__dict__.setdefault("_tables", {})
+        table = tables.get(preferred)
+        if table is None or not table.is_valid(self):
+            table = CatalogTable(self, preferred=preferred)
+            tables[preferred] = table
+        return table
+
     resource_id = property(_get_resource_id, _set_resource_id)
 
     def _get_creation_info(self):
@@ -295,6 +323,9 @@ class Catalog(object):
         Use ``inverse=True`` to return the Events that *do not* match the
         specified filter rules.
 
+        The values of the first origin and magnitude of all Events are
+        compared using a cached table, see :meth:`to_table`.
+
         :rtype: :class:`Catalog`
         :return: Filtered catalog. A new Catalog object with filtered
             Events as references to the original Events.
@@ -325,84 +356,109 @@ class Catalog(object):
         2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
         2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
         """
-        # Helper functions. Only first argument might be None. Avoid
-        # unorderable types by checking first shortcut on positive is None
-        # also for the greater stuff (is confusing but correct)
-        def _is_smaller(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return True
-            return False
-
-        def _is_smaller_or_equal(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return True
-            return False
-
-        def _is_greater(value_1, value_2):
-            if value_1 is None or value_1 <= value_2:
-                return False
-            return True
-
-        def _is_greater_or_equal(value_1, value_2):
-            if value_1 is None or value_1 < value_2:
-                return False
-            return True
-
-        # Map the function to the operators.
-        operator_map = {"<": _is_smaller,
-                        "<=": _is_smaller_or_equal,
-                        ">": _is_greater,
-                        ">=": _is_greater_or_equal}
-
         try:
             inverse = kwargs["inverse"]
         except KeyError:
             inverse = False
 
-        events = list(self.events)
+        table = self._get_table(preferred=False)
+        mask = np.ones(len(table.events), dtype=np.bool_)
         for arg in args:
             try:
                 key, operator, value = arg.split(" ", 2)
             except ValueError:
                 msg = "%s is not a valid filter rule." % arg
                 raise ValueError(msg)
-            if key == "magnitude":
-                temp_events = []
-                for event in events:
-                    if (event.magnitudes and event.magnitudes[0].mag and
-                        operator_map[operator](
-                            event.magnitudes[0].mag,
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ("longitude", "latitude", "depth", "time"):
-                temp_events = []
-                for event in events:
-                    if (event.origins and key in event.origins[0] and
-                        operator_map[operator](
-                            event.origins[0].get(key),
-                            UTCDateTime(value) if key == 'time' else
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            elif key in ('standard_error', 'azimuthal_gap',
-                         'used_station_count', 'used_phase_count'):
-                temp_events = []
-                for event in events:
-                    if (event.origins and event.origins[0].quality and
-                        key in event.origins[0].quality and
-                        operator_map[operator](
-                            event.origins[0].quality.get(key),
-                            float(value))):
-                        temp_events.append(event)
-                events = temp_events
-            else:
+            if key not in ("magnitude", "longitude", "latitude", "depth",
+                           "time", "standard_error", "azimuthal_gap",
+                           "used_station_count", "used_phase_count"):
                 msg = "%s is not a valid filter key" % key
                 raise ValueError(msg)
+            mask &= table.compare(key, operator, value)
         if inverse:
-            events = [ev for ev in self.events if ev not in events]
+            mask = ~mask
+        events = [table.events[i] for i in np.flatnonzero(mask)]
         return Catalog(events=events)
 
+    def to_table(self, preferred=True):
+        """
+        Returns the most important origin and magnitude values of all Events
+        as a NumPy structured array with one row per Event.
+
+        The array has the fields ``time`` (``datetime64[us]``), ``latitude``,
+        ``longitude``, ``depth``, ``magnitude``, ``magnitude_type``,
+        ``standard_error``, ``azimuthal_gap``, ``used_station_count``,
+        ``used_phase_count``, ``associated_station_count`` and
+        ``associated_phase_count``. Missing values are ``NaN``, ``NaT`` or
+        empty strings. The underlying table is cached and also used by
+        :meth:`filter` and :meth:`sort`.
+
+        :type preferred: bool
+        :param preferred: Use the preferred origin and magnitude of each
+            Event (falling back to the first ones). If ``False``, always use
+            the first origin and magnitude.
+        :rtype: :class:`numpy.ndarray`
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> table = cat.to_table()
+        >>> print(table["magnitude"].tolist())
+        [4.4, 4.3, 3.0]
+        >>> print(table["time"][0])
+        2012-04-04T14:21:42.300000
+        >>> print(round(table["magnitude"].mean(), 2))
+        3.9
+        """
+        return self._get_table(preferred=preferred).array.copy()
+
+    def sort(self, keys=["time"], reverse=False):
+        """
+        Sort the Events in the Catalog object.
+
+        The Events are sorted by the values of their preferred origin and
+        magnitude (see :meth:`to_table`), by the first key first and then by
+        the second key and so on. Events without a value are sorted to the
+        end, or to the beginning if ``reverse`` is ``True``.
+
+        :type keys: list, optional
+        :param keys: List of keys to sort by, valid keys are ``'time'``,
+            ``'latitude'``, ``'longitude'``, ``'depth'``, ``'magnitude'``,
+            ``'magnitude_type'``, ``'standard_error'``, ``'azimuthal_gap'``,
+            ``'used_station_count'``, ``'used_phase_count'``,
+            ``'associated_station_count'`` and ``'associated_phase_count'``.
+            Defaults to ``['time']``.
+        :type reverse: bool
+        :param reverse: Reverts sorting order to descending.
+
+        .. rubric:: Example
+
+        >>> from obspy.core.event import read_events
+        >>> cat = read_events()
+        >>> cat.sort(["magnitude"])  # doctest: +ELLIPSIS
+        <...Catalog object at 0x...>
+        >>> print(cat)
+        3 Event(s) in Catalog:
+        2012-04-04T14:08:46.000000Z | +38.017,  +37.736 | 3.0 ML | manual
+        2012-04-04T14:18:37.000000Z | +39.342,  +41.044 | 4.3 ML | manual
+        2012-04-04T14:21:42.300000Z | +41.818,  +79.689 | 4.4 mb | manual
+        """
+        table = self._get_table(preferred=True)
+        if not isinstance(keys, list) or \
+                any(key not in table.array.dtype.names for key in keys):
+            msg = "keys must be a list of strings out of: %s" % (
+                ", ".join(table.array.dtype.names))
+            raise ValueError(msg)
+        order = table.argsort(keys, reverse=reverse)
+        tables = [t for t in self.__dict__["_tables"].values()
+                  if t.is_valid(self)]
+        self.events[:] = [table.events[i] for i in order]
+        # keep valid tables in sync instead of rebuilding them
+        for t in tables:
+            t.reorder(order, self)
+        return self
+
     def copy(self):
         """
         Returns a deepcopy of the Catalog object.
@@ -812,6 +868,85 @@ def read_events(pathname_or_url=None, format=None, **kwargs):
         return _generic_reader(pathname_or_url, _read, format=format, **kwargs)
 
 
+@map_example_filename("pathname_or_url")
+def iread_events(pathname_or_url, format=None, **kwargs):
+    """
+    Read event files and yield the contained events one at a time.
+
+    Formats providing an incremental reader (e.g. ``"QUAKEML"``) are parsed
+    event by event, so that only a single event has to be kept in memory.
+    All other formats, URLs and compressed files are read completely with
+    :func:`~obspy.core.event.read_events` before the events are yielded.
+
+    :type pathname_or_url: str or file-like object
+    :param pathname_or_url: String containing a file name or a URL or a open
+        file-like object. Wildcards are allowed for a file name.
+    :type format: str
+    :param format: Format of the file to read (e.g. ``"QUAKEML"``), see
+        :func:`~obspy.core.event.read_events`.
+    :rtype: generator of :class:`~obspy.core.event.Event`
+
+    >>> from obspy.core.event import iread_events
+    >>> for event in iread_events("/path/to/neries_events.xml"):
+    ...     print(event.origins[0].time)  # doctest: +ELLIPSIS
+    2012-04-04T14:21:42.300000Z
+    2012-04-04T14:18:37.000000Z
+    2012-04-04T14:08:46.000000Z
+    """
+    if isinstance(pathname_or_url, bytes) and \
+            pathname_or_url.strip().startswith(b'<'):
+        # XML string
+        pathnames = [io.BytesIO(pathname_or_url)]
+    elif not isinstance(pathname_or_url, (str, native_str)):
+        # file-like object
+        pathnames = [pathname_or_url]
+    elif "://" in pathname_or_url[:10]:
+        # URL
+        for event in read_events(pathname_or_url, format=format, **kwargs):
+            yield event
+        return
+    else:
+        pathname = pathname_or_url
+        pathnames = sorted(glob.glob(pathname))
+        if not pathnames:
+            if glob.has_magic(pathname):
+                raise Exception("No file matching file pattern: %s" % pathname)
+            elif not os.path.isfile(pathname):
+                raise IOError(2, "No such file or directory", pathname)
+    for filename in pathnames:
+        for event in _iread(filename, format=format, **kwargs):
+            yield event
+
+
+def _iread(filename, format=None, **kwargs):
+    """
+    Yields the events of a single event file.
+    """
+    format_ep = None
+    try:
+        format_ep = _get_format_entry_point('event', filename, format=format)
+    except TypeError:
+        # compressed files are only detected when reading them at once
+        if not isinstance(filename, (str, native_str)):
+            raise
+    iter_format = None
+    if format_ep is not None:
+        try:
+            iter_format = buffered_load_entry_point(
+                format_ep.dist.key, 'obspy.plugin.event.%s' % format_ep.name,
+                'iterFormat')
+        except ImportError:
+            pass
+    if iter_format is None:
+        # format can only be read at once
+        for event in _read(filename, format=format, **kwargs):
+            yield event
+        return
+    for event in iter_format(filename, **kwargs):
+        event._format = format_ep.name
+        yield event
+
+
 @uncompress_file
 def _read(filename, format=None, **kwargs):
     """
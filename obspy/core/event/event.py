@@ -25,7 +25,7 @@ import copy
 
 from obspy.core.event.header import (
     EventType, EventTypeCertainty, EventDescriptionType)
-from obspy.core.event.resourceid import ResourceIdentifier
+from obspy.core.event.resourceid import ResourceIdentifier, _ResourceKey
 from obspy.core.util.misc import _yield_resource_id_parent_attr
 from obspy.imaging.source import plot_radiation_pattern, _setup_figure_and_axes
 
@@ -150,25 +150,39 @@ class Event(__Event):
         """
         Returns the preferred origin
         """
-        if self.preferred_origin_id is None:
-            return None
-        return self.preferred_origin_id.get_referred_object()
+        return self._get_preferred(self.preferred_origin_id, self.origins)
 
     def preferred_magnitude(self):
         """
         Returns the preferred magnitude
         """
-        if self.preferred_magnitude_id is None:
-            return None
-        return self.preferred_magnitude_id.get_referred_object()
+        return self._get_preferred(self.preferred_magnitude_id,
+                                   self.magnitudes)
 
     def preferred_focal_mechanism(self):
         """
         Returns the preferred focal mechanism
         """
-        if self.preferred_focal_mechanism_id is None:
+        return self._get_preferred(self.preferred_focal_mechanism_id,
+                                   self.focal_mechanisms)
+
+    def _get_preferred(self, resource_id, objects):
+        """
+        Returns the object the given preferred resource id refers to.
+
+        Resource ids which are not scoped to an event, e.g. those of events
+        created within :meth:`ResourceIdentifier.plain_ids()
+        <obspy.core.event.resourceid.ResourceIdentifier.plain_ids>`, are
+        looked up in the given objects of the event first.
+        """
+        if resource_id is None:
             return None
-        return self.preferred_focal_mechanism_id.get_referred_object()
+        if resource_id._parent_key is None:
+            # like scoping, prefer the last object with a duplicated id
+            for obj in reversed(objects):
+                if obj.resource_id == resource_id:
+                    return obj
+        return resource_id.get_referred_object()
 
     def plot(self, kind=[['ortho', 'beachball'], ['p_sphere', 's_sphere']],
              subplot_size=4.0, show=True, outfile=None, **kwargs):
@@ -289,8 +303,10 @@ class Event(__Event):
         cls = self.__class__
         result = cls.__new__(cls)
         memodict[id(self)] = result
+        # the values are already converted and all resource ids are bound
+        # by scoping the copy
         for k, v in self.__dict__.items():
-            setattr(result, k, copy.deepcopy(v, memodict))
+            result.__dict__[k] = copy.deepcopy(v, memodict)
         result.scope_resource_ids()
         return result
 
@@ -324,16 +340,21 @@ class Event(__Event):
         Ensure all resource_ids in event instance are event-scoped.
 
         This will ensure the resource_ids refer to objects in the event
-        structure when possible.
+        structure when possible. Does nothing within
+        :meth:`ResourceIdentifier.plain_ids()
+        <obspy.core.event.resourceid.ResourceIdentifier.plain_ids>`.
         """
+        if ResourceIdentifier._plain_ids_active():
+            return
         gen = _yield_resource_id_parent_attr(self)
+        parent_key = _ResourceKey.get_resource_key(id(self))
 
         for resource_id, parent, attr in gen:
             if attr == 'resource_id':
-                resource_id.set_referred_object(parent, parent=self,
+                resource_id.set_referred_object(parent, parent=parent_key,
                                                 warn=False)
             else:
-                resource_id._parent_key = self
+                resource_id._parent_key = parent_key
                 resource_id._object_id = None
 
 
@@ -15,6 +15,7 @@ from future.builtins import *  # NOQA
 from future.utils import native_str
 
 import re
+import threading
 import warnings
 from contextlib import contextmanager
 from copy import deepcopy
@@ -49,10 +50,51 @@ class _ResourceKey(object):
 
     @classmethod
     def get_resource_key(cls, unique_id):
-        if unique_id not in _ResourceKey._singleton_cache:
-            single = _ResourceKey()
-            _ResourceKey._singleton_cache[unique_id] = single
-        return _ResourceKey._singleton_cache[unique_id]
+        key = _ResourceKey._singleton_cache.get(unique_id)
+        if key is None:
+            key = _ResourceKey()
+            _ResourceKey._singleton_cache[unique_id] = key
+        return key
+
+
+class _ObjectKeyList(list):
+    """
+    A private list of the object keys bound to a resource id, oldest first.
+
+    Keys of objects that no longer exist are only removed from the end of the
+    list when looking up the newest object. To keep the list from growing
+    without bounds when objects are created and deleted repeatedly (e.g. by
+    copying catalogs), it is compacted each time it doubled in size.
+    """
+    __slots__ = ['limit']
+
+    def __init__(self):
+        super(_ObjectKeyList, self).__init__()
+        self.limit = 8
+
+    def add(self, object_key, id_object_map):
+        """
+        Append an object key unless it already is the last one.
+        """
+        if self and self[-1] == object_key:
+            return
+        self.append(object_key)
+        if len(self) > self.limit:
+            self.compact(id_object_map)
+            self.limit = max(8, 2 * len(self))
+
+    def compact(self, id_object_map):
+        """
+        Remove keys of objects that no longer exist and all but the last
+        occurrence of each key.
+        """
+        seen = set()
+        keys = []
+        for object_key in reversed(self):
+            if object_key not in seen and object_key in id_object_map:
+                seen.add(object_key)
+                keys.append(object_key)
+        self[:] = keys[::-1]
 
 
 class _ResourceKeyDescriptor(object):
@@ -68,8 +110,10 @@ class _ResourceKeyDescriptor(object):
         return getattr(instance, self.name, self.default)
 
     def __set__(self, instance, value):
+        if isinstance(value, _ResourceKey):
+            setattr(instance, self.name, value)
         # if an object was passed, use the id of the object for hash
-        if value is not None:
+        elif value is not None:
             if not isinstance(value, (int, str, native_str)):
                 value = id(value)
             setattr(instance, self.name, _ResourceKey.get_resource_key(value))
@@ -261,6 +305,20 @@ class ResourceIdentifier(object):
     Because ResourceIdentifier instances are hashed based on their id
     attribute, you should never change it once it has been set. Create a new
     ResourceIdentifier object instead.
+
+    .. rubric:: Plain Resource Identifiers
+
+    Registering the referred objects of millions of resource identifiers, e.g.
+    when reading, copying or unpickling large catalogs, takes a considerable
+    amount of time and memory. Within the :meth:`plain_ids` context no objects
+    are bound to resource identifiers and events are not scoped. The
+    preferred origin, magnitude and focal mechanism of such events are still
+    found by searching the objects of the event.
+
+    >>> with ResourceIdentifier.plain_ids():
+    ...     res_id = ResourceIdentifier(referred_object=event_object)
+    >>> print(res_id.get_referred_object())
+    None
     """
     # Class (not instance) attributes that keeps track of all resource
     # identifier instances throughout one Python run. Will only store weak
@@ -286,9 +344,13 @@ class ResourceIdentifier(object):
     # with by resource_id if they are not found via normal means.
     _get_object_hook = []
 
+    # Number of active plain_ids contexts of the current thread (in attribute
+    # "count"). While greater than zero, no objects are bound to resource
+    # ids in this thread.
+    _plain_ids = threading.local()
+
     # Set default _ResourceKey attributes and object_id.
     _parent_key = _ResourceKeyDescriptor('_parent_key')
-    _resource_key = _ResourceKeyDescriptor('_resource_key')
     _object_id = None
 
     def __init__(self, id=None, prefix="smi:local", referred_object=None,
@@ -302,10 +364,8 @@ class ResourceIdentifier(object):
             self.__dict__.update(id.__dict__)
             return
         else:
-            self.fixed = True
             self.id = id
-        # get resource and parent _ResourceKey singletons
-        self._resource_key = self.id
+        # the resource _ResourceKey singleton is only looked up when needed
         self._parent_key = parent
         # set referred object if one was provided.
         if referred_object is not None:
@@ -430,36 +490,47 @@ class ResourceIdentifier(object):
         :type parent: object, int
         """
 
+        if ResourceIdentifier._plain_ids_active():
+            return
+        id_order = ResourceIdentifier._id_order
+        id_object_map = ResourceIdentifier._id_object_map
+        resource_key = self._resource_key
         # Get the last object bound to this instance of ResourceIdentifier or
         # if there is None, get the last referred_object assigned the same
         # resource_id code.
-        id_order = ResourceIdentifier._id_order
-        old = ResourceIdentifier._id_object_map.get(self._object_key, None)
-        if old is None:  # Look for last object with same resource id.
-            try:
-                old_obj_id_key = id_order[self._resource_key][-1]
-                old = ResourceIdentifier._id_object_map[old_obj_id_key]
-            except (KeyError, IndexError):
-                pass
-        if warn and old is not None and old != referred_object:
-            msg = ('Warning, binding object to resource ID %s which '
-                   'is not equal to the last object bound to this '
-                   'resource_id') % self.id
-            warnings.warn(msg, UserWarning)
+        if warn:
+            old = id_object_map.get(self._object_key, None)
+            if old is None:  # Look for last object with same resource id.
+                try:
+                    old_obj_id_key = id_order[resource_key][-1]
+                    old = id_object_map[old_obj_id_key]
+                except (KeyError, IndexError):
+                    pass
+            if old is not None and old != referred_object:
+                msg = ('Warning, binding object to resource ID %s which '
+                       'is not equal to the last object bound to this '
+                       'resource_id') % self.id
+                warnings.warn(msg, UserWarning)
         # Set the object id to the new object, and update parent scoping tree.
         self._object_id = id(referred_object)
-        if parent is not None or self._parent_key is not None:
-            if parent is not None:
-                self._parent_key = parent
+        object_key = self._object_key
+        if parent is not None:
+            self._parent_key = parent
+        parent_key = self._parent_key
+        if parent_key is not None:
             id_tree = ResourceIdentifier._parent_id_tree
-            if self._parent_key not in id_tree:
-                id_tree[self._parent_key] = WeakKeyDictionary()
-            id_tree[self._parent_key][self._resource_key] = self._object_key
+            scope = id_tree.get(parent_key)
+            if scope is None:
+                scope = WeakKeyDictionary()
+                id_tree[parent_key] = scope
+            scope[resource_key] = object_key
         # Set the new id in id map and append referred_object to id_order.
-        ResourceIdentifier._id_object_map[self._object_key] = referred_object
-        if self._resource_key not in id_order:
-            id_order[self._resource_key] = []
-        id_order[self._resource_key].append(self._object_key)
+        id_object_map[object_key] = referred_object
+        rid_list = id_order.get(resource_key)
+        if rid_list is None:
+            rid_list = _ObjectKeyList()
+            id_order[resource_key] = rid_list
+        rid_list.add(object_key, id_object_map)
 
     @deprecated()
     def convert_id_to_quakeml_uri(self, authority_id="local"):
@@ -578,13 +649,36 @@ class ResourceIdentifier(object):
         memodict[id(self)] = new
         return new
 
+    def __getstate__(self):
+        """
+        The _ResourceKey instances are not pickled, they are only valid within
+        the current Python run.
+        """
+        state = self.__dict__.copy()
+        state.pop('_resource_key__', None)
+        state.pop('_parent_key__', None)
+        return state
+
     def __setstate__(self, state):
         """
         Make sure the resource_key follows the singleton pattern.
         """
+        # states pickled by older versions contain copies of the keys
+        state.pop('_resource_key__', None)
+        state.pop('_parent_key__', None)
         self.__dict__ = state
-        self._parent_key = None
-        self._resource_key = _ResourceKey.get_resource_key(self.id)
+
+    @property
+    def _resource_key(self):
+        """
+        The _ResourceKey singleton of the id, looked up on first access.
+        """
+        try:
+            return self.__dict__['_resource_key__']
+        except KeyError:
+            key = _ResourceKey.get_resource_key(self.id)
+            self.__dict__['_resource_key__'] = key
+            return key
 
     @property
     def _object_key(self):
@@ -616,16 +710,17 @@ class ResourceIdentifier(object):
 
     @id.setter
     def id(self, value):
-        self.fixed = True
         # XXX: no idea why I had to add bytes for PY2 here
         if not isinstance(value, (str, bytes)):
             msg = "attribute id needs to be a string."
             raise TypeError(msg)
-        if '_resource_key__' in self.__dict__:
+        # the id was already set if the instance is initialized
+        if 'fixed' in self.__dict__:
             msg = ('overwritting the id attribute of a ResourceIdentifier'
                    'object is very dangerous and will raise an exception in '
                    'a future version of obspy')
             warnings.warn(msg, UserWarning)
+        self.fixed = True
         self.__dict__["id"] = value
 
     @property
@@ -753,6 +848,44 @@ class ResourceIdentifier(object):
         else:
             cls._get_object_hook.clear()
 
+    @classmethod
+    @contextmanager
+    def plain_ids(cls):
+        """
+        Context manager to handle resource identifiers as plain ids.
+
+        Within the context, no objects are bound to resource identifiers and
+        :meth:`~obspy.core.event.Event.scope_resource_ids` does nothing. This
+        saves time and memory when reading, creating, copying or unpickling
+        large catalogs whose resource identifiers are not used to look up
+        objects. Events can be scoped later on by calling
+        :meth:`~obspy.core.event.Event.scope_resource_ids` after leaving the
+        context. The context only applies to the current thread.
+
+        >>> from obspy import read_events
+        >>> with ResourceIdentifier.plain_ids():
+        ...     cat = read_events("/path/to/neries_events.xml")
+        >>> event = cat[0]
+        >>> print(event.preferred_origin() is event.origins[0])
+        True
+        >>> for event in cat:
+        ...     event.scope_resource_ids()
+        """
+        state = cls._plain_ids
+        state.count = getattr(state, "count", 0) + 1
+        try:
+            yield
+        finally:
+            state.count -= 1
+
+    @classmethod
+    def _plain_ids_active(cls):
+        """
+        Return whether the current thread is within a :meth:`plain_ids`
+        context.
+        """
+        return getattr(cls._plain_ids, "count", 0) > 0
+
     @classmethod
     def _bind_class_state(cls, state_dict):
         """
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+obspy.core.event.table - Columnar view of a Catalog
+===================================================
+This module provides a table of the most important origin and magnitude
+values of all events of a catalog, stored as NumPy arrays. It is used to
+filter and sort large catalogs without looping over the events in Python.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (http://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import numpy as np
+
+from obspy.core.utcdatetime import UTCDateTime
+from . import base
+
+
+ORIGIN_KEYS = ("latitude", "longitude", "depth")
+QUALITY_KEYS = ("standard_error", "azimuthal_gap", "used_station_count",
+                "used_phase_count", "associated_station_count",
+                "associated_phase_count")
+FLOAT_KEYS = ORIGIN_KEYS + ("magnitude",) + QUALITY_KEYS
+
+
+class CatalogTable(object):
+    """
+    Table of origin and magnitude values of all events of a catalog.
+
+    The table stores a reference to all events and a NumPy structured array
+    with one row per event and the fields ``time`` (``datetime64[us]``),
+    ``latitude``, ``longitude``, ``depth``, ``magnitude``,
+    ``magnitude_type`` and the origin quality values ``standard_error``,
+    ``azimuthal_gap``, ``used_station_count``, ``used_phase_count``,
+    ``associated_station_count`` and ``associated_phase_count`` (all
+    ``float64``). Missing values are stored as ``NaN``, ``NaT`` or empty
+    strings.
+
+    :type catalog: :class:`~obspy.core.event.Catalog`
+    :param catalog: Catalog to build the table for.
+    :type preferred: bool
+    :param preferred: Use the preferred origin and magnitude of the events
+        (falling back to the first ones). If ``False``, always use the first
+        origin and magnitude.
+    """
+    def __init__(self, catalog, preferred=True):
+        self.preferred = preferred
+        self.events = list(catalog.events)
+        self.key = self._get_key(catalog)
+        origins = []
+        magnitudes = []
+        for event in self.events:
+            origin = magnitude = None
+            if preferred:
+                origin = event.preferred_origin()
+                magnitude = event.preferred_magnitude()
+            if origin is None and event.origins:
+                origin = event.origins[0]
+            if magnitude is None and event.magnitudes:
+                magnitude = event.magnitudes[0]
+            origins.append(origin)
+            magnitudes.append(magnitude)
+        # origins are needed to compare times of non default precision
+        self._origins = origins
+        self.has_origin = np.array([o is not None for o in origins],
+                                   dtype=np.bool_)
+        qualities = [o.quality if o is not None else None for o in origins]
+        self.has_quality = np.array([bool(q) for q in qualities],
+                                    dtype=np.bool_)
+
+        values = {}
+        values["latitude"] = [o.latitude if o is not None else None
+                              for o in origins]
+        values["longitude"] = [o.longitude if o is not None else None
+                               for o in origins]
+        values["depth"] = [o.depth if o is not None else None
+                           for o in origins]
+        values["magnitude"] = [m.mag if m is not None else None
+                               for m in magnitudes]
+        for key in QUALITY_KEYS:
+            values[key] = [q.get(key) if q is not None else None
+                           for q in qualities]
+        times = [o.time if o is not None else None for o in origins]
+
+        self.missing = {}
+        self.missing["time"] = np.array([t is None for t in times],
+                                        dtype=np.bool_)
+        for key in FLOAT_KEYS:
+            self.missing[key] = np.array([v is None for v in values[key]],
+                                         dtype=np.bool_)
+        self.time_precision = np.array(
+            [t.precision if t is not None else 6 for t in times],
+            dtype=np.int8)
+        magnitude_types = [(m.magnitude_type or "") if m is not None else ""
+                           for m in magnitudes]
+
+        dtype = [(native_str("time"), native_str("M8[us]"))]
+        dtype += [(native_str(key), np.float64) for key in FLOAT_KEYS]
+        dtype.append((native_str("magnitude_type"),
+                      native_str("U%d" % max([1] + list(
+                          map(len, magnitude_types))))))
+        self.array = np.zeros(len(self.events), dtype=dtype)
+        self.array["time"] = _round_to_microseconds(np.array(
+            [t._ns if t is not None else 0 for t in times], dtype=np.int64))
+        self.array["time"][self.missing["time"]] = np.datetime64("NaT")
+        for key in FLOAT_KEYS:
+            self.array[key] = [np.nan if v is None else v
+                               for v in values[key]]
+        self.array["magnitude_type"] = magnitude_types
+
+    def _get_key(self, catalog):
+        """
+        Key identifying the state of a catalog the table is built for.
+
+        Attribute changes of event type objects are detected by a global
+        counter, changes of lists by the identities of the contained objects.
+        """
+        key = [base._attribute_changes, id(catalog.events)]
+        for event in catalog.events:
+            key.append(id(event))
+            key.append(len(event.origins))
+            key.append(id(event.origins[0]) if event.origins else 0)
+            key.append(len(event.magnitudes))
+            key.append(id(event.magnitudes[0]) if event.magnitudes else 0)
+        return key
+
+    def is_valid(self, catalog):
+        """
+        Check if the table is up to date with the given catalog.
+
+        :rtype: bool
+        """
+        return self._get_key(catalog) == self.key
+
+    def compare(self, key, operator, value):
+        """
+        Compare a column with a value following the rules of
+        :meth:`~obspy.core.event.Catalog.filter`.
+
+        :type key: str
+        :param key: Column to compare, ``"time"``, ``"magnitude"`` or an
+            origin or origin quality value.
+        :type operator: str
+        :param operator: One of ``"<"``, ``"<="``, ``">"`` and ``">="``.
+        :type value: str
+        :param value: Value to compare with.
+        :rtype: :class:`numpy.ndarray` of bool
+        :returns: Mask of all events matching the rule.
+        """
+        if key == "time":
+            value = UTCDateTime(value)
+            column = self.array["time"].view(np.int64)
+            other = _round_to_microseconds(np.int64(value._ns))
+        elif key in FLOAT_KEYS:
+            column = self.array[key]
+            other = float(value)
+        else:
+            raise KeyError(key)
+        if operator == "<":
+            mask = column < other
+        elif operator == "<=":
+            mask = column <= other
+        elif operator == ">":
+            mask = column > other
+        elif operator == ">=":
+            mask = column >= other
+        else:
+            raise KeyError(operator)
+        # missing values match "<" and "<=" rules but no other rules
+        missing = self.missing[key]
+        if operator in ("<", "<="):
+            mask |= missing
+        else:
+            mask &= ~missing
+
+        if key == "time":
+            # times are only stored with microsecond precision, compare
+            # others using UTCDateTime
+            if value.precision == 6:
+                fallback = (self.time_precision != 6) & ~missing
+            else:
+                fallback = ~missing
+            for i in np.flatnonzero(fallback):
+                mask[i] = _compare(self._origins[i].time, operator, value)
+
+        if key == "magnitude":
+            mask &= ~missing & (column != 0)
+        elif key in QUALITY_KEYS:
+            mask &= self.has_quality
+        else:
+            mask &= self.has_origin
+        return mask
+
+    def argsort(self, keys, reverse=False):
+        """
+        Return the indices that sort the events by the given columns.
+
+        Events without a value are sorted to the end, or to the beginning if
+        ``reverse`` is ``True``. The order of events with equal values is
+        preserved.
+
+        :type keys: list of str
+        :param keys: Columns to sort by, by the first one first and then by
+            the second one and so on.
+        :type reverse: bool
+        :param reverse: Sort in descending order.
+        :rtype: :class:`numpy.ndarray`
+        """
+        # np.lexsort sorts by the last key first
+        columns = [self.array[key] for key in keys[::-1]]
+        if not reverse:
+            return np.lexsort(columns)
+        # sort the reversed columns and map the indices back to keep the
+        # order of equal values
+        order = np.lexsort([column[::-1] for column in columns])[::-1]
+        return len(self.events) - 1 - order
+
+    def reorder(self, order, catalog):
+        """
+        Reorder the rows of the table after the events of the catalog have
+        been reordered accordingly.
+
+        :type order: :class:`numpy.ndarray`
+        :param order: New order of the rows, e.g. from :meth:`argsort`.
+        """
+        self.events = [self.events[i] for i in order]
+        self._origins = [self._origins[i] for i in order]
+        self.array = self.array[order]
+        self.has_origin = self.has_origin[order]
+        self.has_quality = self.has_quality[order]
+        self.time_precision = self.time_precision[order]
+        for key, missing in self.missing.items():
+            self.missing[key] = missing[order]
+        self.key = self._get_key(catalog)
+
+
+def _compare(value_1, operator, value_2):
+    """
+    Compare two values, ``None`` matches ``"<"`` and ``"<="`` rules.
+    """
+    if value_1 is None:
+        return operator in ("<", "<=")
+    if operator == "<":
+        return value_1 < value_2
+    elif operator == "<=":
+        return value_1 <= value_2
+    elif operator == ">":
+        return value_1 > value_2
+    return value_1 >= value_2
+
+
+def _round_to_microseconds(ns):
+    """
+    Round nanoseconds to microseconds like ``round(ns, -3) // 1000``, i.e.
+    half to even.
+    """
+    us, remainder = np.divmod(ns, 1000)
+    return us + ((remainder > 500) | ((remainder == 500) & (us % 2 == 1)))
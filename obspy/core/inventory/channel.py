@@ -220,6 +220,46 @@ class Channel(BaseNode):
         warnings.warn(msg, ObsPyDeprecationWarning)
         self.equipments = [value]
 
+    def __eq__(self, other):
+        if isinstance(other, Channel):
+            # make sure lazily loaded responses are compared
+            self._load_response()
+            other._load_response()
+        return super(Channel, self).__eq__(other)
+
+    def __setstate__(self, state):
+        # response used to be a plain attribute
+        if "response" in state:
+            state["_response"] = state.pop("response")
+        self.__dict__.update(state)
+
+    @property
+    def response(self):
+        self._load_response()
+        return self._response
+
+    @response.setter
+    def response(self, value):
+        self._response = value
+
+    def _set_lazy_response(self, loader):
+        """
+        Defer creating the response until it is first accessed.
+
+        Used by readers to skip parsing responses that are never used.
+
+        :type loader: callable
+        :param loader: Function without arguments returning the
+            :class:`~obspy.core.inventory.response.Response` of the channel.
+            Has to be picklable, e.g. a :func:`functools.partial` of a
+            module level function.
+        """
+        self._response = _LazyResponse(loader)
+
+    def _load_response(self):
+        if isinstance(self._response, _LazyResponse):
+            self._response = self._response.loader()
+
     def __str__(self):
         ret = (
             "Channel '{id}', Location '{location}' {description}\n"
@@ -255,7 +295,7 @@ class Channel(BaseNode):
                         self.sensor.type, self.sensor.description)
                         if self.sensor else ""),
                 response=("\tResponse information available"
-                          if self.response else ""))
+                          if self._response is not None else ""))
         return ret
 
     def _repr_pretty_(self, p, cycle):
@@ -459,6 +499,22 @@ class Channel(BaseNode):
             outfile=outfile)
 
 
+class _LazyResponse(object):
+    """
+    Placeholder for a response of a channel that is created on first access.
+    """
+    __slots__ = ("loader",)
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getstate__(self):
+        return self.loader
+
+    def __setstate__(self, state):
+        self.loader = state
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod(exclude_empty=True)
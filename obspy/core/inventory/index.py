@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Lookup indexes for inventory objects.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from bisect import bisect_right
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from obspy.core.utcdatetime import UTCDateTime
+from obspy.geodetics import locations2degrees
+
+
+def _latlon2unit_vectors(latitudes, longitudes):
+    """
+    Convert geographic coordinates in degrees to unit vectors of shape
+    ``(N, 3)``.
+    """
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    return np.column_stack([np.cos(lat) * np.cos(lon),
+                            np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+class SpatialIndex(object):
+    """
+    Spatial index over the stations of an inventory.
+
+    Station coordinates are mapped to unit vectors on the sphere and stored
+    in a :class:`scipy.spatial.cKDTree`, so that nearest neighbour and radius
+    queries only visit a small part of all stations. Straight line distances
+    between unit vectors are a monotonic function of the great circle
+    distance, results are refined with
+    :func:`~obspy.geodetics.base.locations2degrees` so they are identical to
+    the distance checks of
+    :meth:`~obspy.core.inventory.inventory.Inventory.select`.
+
+    The index is usually not used directly but created on demand by
+    :class:`~obspy.core.inventory.inventory.Inventory` and rebuilt whenever
+    networks, stations or station coordinates change (see
+    :meth:`is_valid`). Checking the index is linear in the number of
+    stations, a rebuild additionally reads all station coordinates and
+    builds a new tree (about as expensive as a few unindexed
+    :meth:`~obspy.core.inventory.inventory.Inventory.select` calls), so
+    avoid interleaving many modifications of an inventory with queries.
+
+    :type inventory: :class:`~obspy.core.inventory.inventory.Inventory`
+    :param inventory: Inventory to index.
+    """
+    def __init__(self, inventory):
+        self.key = self._get_key(inventory)
+        self.stations = [
+            sta for net in inventory.networks for sta in net.stations
+            if sta.latitude is not None and sta.longitude is not None]
+        # stations without coordinates always pass distance checks
+        self.unlocated = [sta for net in inventory.networks
+                          for sta in net.stations
+                          if sta.latitude is None or sta.longitude is None]
+        self.latitudes = np.array([sta.latitude for sta in self.stations],
+                                  dtype=np.float64)
+        self.longitudes = np.array([sta.longitude for sta in self.stations],
+                                   dtype=np.float64)
+        if self.stations:
+            self.kd_tree = cKDTree(
+                _latlon2unit_vectors(self.latitudes, self.longitudes),
+                leafsize=10)
+        else:
+            self.kd_tree = None
+
+    def __len__(self):
+        return len(self.stations)
+
+    @staticmethod
+    def _get_key(inventory):
+        # identities of all networks and stations and the number of
+        # coordinate changes of every station (cheap to compute even for
+        # large inventories)
+        return [(id(net), tuple((id(sta), sta._coordinate_version)
+                                for sta in net.stations))
+                for net in inventory.networks]
+
+    def is_valid(self, inventory):
+        """
+        Check whether the index still matches the inventory, i.e. that no
+        network or station has been added, removed or replaced and that no
+        station coordinates have changed.
+
+        :rtype: bool
+        """
+        return self.key == self._get_key(inventory)
+
+    def query_radius(self, latitude, longitude, minradius=None,
+                     maxradius=None):
+        """
+        Get stations within a distance range from a point.
+
+        :type latitude: float
+        :param latitude: Latitude of the point in degrees.
+        :type longitude: float
+        :param longitude: Longitude of the point in degrees.
+        :type minradius: float
+        :param minradius: Minimum distance in degrees.
+        :type maxradius: float
+        :param maxradius: Maximum distance in degrees.
+        :rtype: tuple of list and :class:`numpy.ndarray`
+        :returns: Matching stations and their distances in degrees (stations
+            without coordinates are not included).
+        """
+        if self.kd_tree is None:
+            return [], np.empty(0)
+        if maxradius is None or maxradius >= 180.0:
+            candidates = np.arange(len(self.stations))
+        else:
+            point = _latlon2unit_vectors([latitude], [longitude])[0]
+            chord = 2.0 * np.sin(np.radians(max(maxradius, 0.0)) / 2.0)
+            # small margin, exact check is done below
+            candidates = np.array(sorted(self.kd_tree.query_ball_point(
+                point, chord * (1 + 1e-9) + 1e-12)), dtype=np.intp)
+        distances = np.atleast_1d(locations2degrees(
+            latitude, longitude, self.latitudes[candidates],
+            self.longitudes[candidates]))
+        mask = np.ones(len(candidates), dtype=np.bool_)
+        if minradius is not None:
+            mask &= distances >= minradius
+        if maxradius is not None:
+            mask &= distances <= maxradius
+        candidates = candidates[mask]
+        return [self.stations[i] for i in candidates], distances[mask]
+
+    def query_nearest(self, latitude, longitude, k=1):
+        """
+        Get the stations closest to a point.
+
+        :type latitude: float
+        :param latitude: Latitude of the point in degrees.
+        :type longitude: float
+        :param longitude: Longitude of the point in degrees.
+        :type k: int
+        :param k: Number of stations.
+        :rtype: tuple of list and :class:`numpy.ndarray`
+        :returns: Up to ``k`` stations sorted by distance and their distances
+            in degrees.
+        """
+        if self.kd_tree is None or k < 1:
+            return [], np.empty(0)
+        k = min(k, len(self.stations))
+        point = _latlon2unit_vectors([latitude], [longitude])[0]
+        _, indices = self.kd_tree.query(point, k=k)
+        indices = np.atleast_1d(indices)
+        distances = np.atleast_1d(locations2degrees(
+            latitude, longitude, self.latitudes[indices],
+            self.longitudes[indices]))
+        order = np.argsort(distances, kind="mergesort")
+        return [self.stations[indices[i]] for i in order], distances[order]
+
+
+class SEEDIdIndex(object):
+    """
+    Index of all channels of an inventory by SEED ID.
+
+    Every SEED ID maps to the epochs of the matching channels sorted by start
+    date, so that finding the channels of a SEED ID at a given time is a
+    dictionary lookup followed by a bisection instead of a scan over all
+    channels of a network. It is used by
+    :meth:`~obspy.core.inventory.inventory.Inventory.get_response` and
+    :meth:`~obspy.core.inventory.inventory.Inventory.get_channel_metadata`
+    (and thus by e.g.
+    :meth:`~obspy.core.stream.Stream.attach_response` and
+    :meth:`~obspy.core.stream.Stream.remove_response`).
+
+    The index is built on first use and rebuilt whenever networks are added,
+    removed or replaced (see :meth:`is_valid`), when stations have been
+    added to or removed from a network with the network code of a lookup,
+    when channels have been added to or removed from a station with the
+    network and station code of a lookup or when a channel found in a
+    lookup has been modified (see :meth:`get_channels`). Callers fall back
+    to a full scan if a lookup does not give any match, so e.g. stations
+    whose codes are changed in place are found as well.
+
+    :type inventory: :class:`~obspy.core.inventory.inventory.Inventory`
+    :param inventory: Inventory to index.
+    """
+    def __init__(self, inventory):
+        self.key = self._get_key(inventory)
+        # station lists of all networks and channel lists of all stations by
+        # codes, only checked for the codes involved in a lookup
+        self._networks = {}
+        self._stations = {}
+        for net in inventory.networks:
+            self._networks.setdefault(net.code, []).append(
+                (net, id(net.stations), len(net.stations)))
+            for sta in net.stations:
+                self._stations.setdefault((net.code, sta.code), []).append(
+                    (sta, id(sta.channels), len(sta.channels)))
+        epochs = {}
+        position = 0
+        for net in inventory.networks:
+            for sta in net.stations:
+                for cha in sta.channels:
+                    seed_id = (net.code, sta.code, cha.location_code,
+                               cha.code)
+                    epochs.setdefault(seed_id, []).append((
+                        _start_key(cha.start_date), position, net, sta, cha,
+                        cha.start_date, cha.end_date))
+                    position += 1
+        self._epochs = {}
+        for seed_id, entries in epochs.items():
+            entries.sort(key=lambda x: (x[0], x[1]))
+            self._epochs[seed_id] = ([x[0] for x in entries], entries)
+        self._length = position
+
+    def __len__(self):
+        return self._length
+
+    @staticmethod
+    def _get_key(inventory):
+        # identities of all networks, cheap to check before every lookup
+        return tuple(map(id, inventory.networks))
+
+    def is_valid(self, inventory):
+        """
+        Check whether the index still matches the inventory, i.e. that no
+        network has been added, removed or replaced.
+
+        :rtype: bool
+        """
+        return self.key == self._get_key(inventory)
+
+    def get_channels(self, seed_id, datetime=None):
+        """
+        Get all channels with a given SEED ID that do not start after a
+        given time.
+
+        Channels are grouped by network and sorted in the order they appear
+        in the inventory. End dates (and station or network epochs) are not
+        checked.
+
+        :type seed_id: str
+        :param seed_id: SEED ID string of channel.
+        :type datetime: :class:`~obspy.core.utcdatetime.UTCDateTime`
+        :param datetime: Time of interest. All epochs are returned if not
+            given.
+        :rtype: list of tuple or ``None``
+        :returns: List of ``(network, [(station, channel), ...])`` tuples or
+            ``None`` if any of the channels, the stations of the networks or
+            the channels of the stations with the codes of the SEED ID have
+            been modified since the index was built.
+        """
+        key = tuple(seed_id.split("."))
+        for items, get_list in (
+                (self._networks.get(key[0], ()), lambda x: x.stations),
+                (self._stations.get(key[:2], ()), lambda x: x.channels)):
+            for obj, list_id, list_len in items:
+                list_ = get_list(obj)
+                if id(list_) != list_id or len(list_) != list_len:
+                    return None
+        try:
+            starts, entries = self._epochs[key]
+        except KeyError:
+            return []
+        if isinstance(datetime, UTCDateTime):
+            entries = entries[:bisect_right(starts, datetime.ns)]
+        result = []
+        for _, _, net, sta, cha, start, end in sorted(
+                entries, key=lambda x: x[1]):
+            if (net.code, sta.code, cha.location_code, cha.code) != key or \
+                    cha.start_date is not start or cha.end_date is not end or \
+                    not any(c is cha for c in sta.channels):
+                return None
+            if result and result[-1][0] is net:
+                result[-1][1].append((sta, cha))
+            else:
+                result.append((net, [(sta, cha)]))
+        return result
+
+
+def _start_key(start_date):
+    """
+    Sort key of a start date, open start dates come first.
+    """
+    if start_date is None:
+        return float("-inf")
+    return start_date.ns
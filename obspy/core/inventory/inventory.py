@@ -26,6 +26,7 @@ from obspy.core.util.decorator import map_example_filename, uncompress_file
 from obspy.core.util.misc import buffered_load_entry_point
 from obspy.core.util.obspy_types import ObsPyException, ZeroSamplingRate
 
+from .index import SEEDIdIndex, SpatialIndex
 from .network import Network
 from .util import _unified_content_strings, _textwrap, _response_plot_label
 
@@ -171,6 +172,13 @@ class Inventory(ComparingObject):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # lookup indexes are rebuilt on demand
+        state.pop("_spatial_index", None)
+        state.pop("_seed_id_index", None)
+        return state
+
     def __add__(self, other):
         new = copy.deepcopy(self)
         new += other
@@ -429,18 +437,10 @@ class Inventory(ComparingObject):
         :rtype: :class:`~obspy.core.inventory.response.Response`
         :returns: Response for time series specified by input arguments.
         """
-        network, _, _, _ = seed_id.split(".")
-
-        responses = []
-        for net in self.networks:
-            if net.code != network:
-                continue
-            try:
-                responses.append(net.get_response(seed_id, datetime))
-            except Exception:
-                pass
+        msg = "Found more than one matching response. Returning first."
+        responses = self._find_channel_info(
+            seed_id, datetime, Network._find_responses, msg)
         if len(responses) > 1:
-            msg = "Found more than one matching response. Returning first."
             warnings.warn(msg)
         elif len(responses) < 1:
             msg = "No matching response information found."
@@ -459,25 +459,80 @@ class Inventory(ComparingObject):
         :return: Dictionary containing coordinates and orientation (latitude,
             longitude, elevation, azimuth, dip)
         """
-        network, _, _, _ = seed_id.split(".")
-
-        metadata = []
-        for net in self.networks:
-            if net.code != network:
-                continue
-            try:
-                metadata.append(net.get_channel_metadata(seed_id, datetime))
-            except Exception:
-                pass
+        msg = "Found more than one matching channel metadata. Returning first."
+        metadata = self._find_channel_info(
+            seed_id, datetime, Network._find_channel_metadata, msg)
         if len(metadata) > 1:
-            msg = ("Found more than one matching channel metadata. "
-                   "Returning first.")
             warnings.warn(msg)
         elif len(metadata) < 1:
             msg = "No matching channel metadata found."
             raise Exception(msg)
         return metadata[0]
 
+    def _get_seed_id_index(self):
+        """
+        Return the SEED ID index of all channels, (re)building it if
+        necessary.
+
+        :rtype: :class:`~obspy.core.inventory.index.SEEDIdIndex`
+        """
+        index = self.__dict__.get("_seed_id_index")
+        if index is None or not index.is_valid(self):
+            index = SEEDIdIndex(self)
+            self._seed_id_index = index
+        return index
+
+    def _find_channel_info(self, seed_id, datetime, find, msg):
+        """
+        Look up information of the channels matching a SEED ID in all
+        networks.
+
+        Candidate channels are taken from the SEED ID index, if that does not
+        give any match all networks are searched (and the index is discarded
+        if that finds anything).
+
+        :type find: function
+        :param find: Unbound :class:`~obspy.core.inventory.network.Network`
+            method returning a list of matches for a SEED ID, time and
+            (optionally) candidate channels of the network.
+        :type msg: str
+        :param msg: Warning to show if a network has more than one match.
+        :rtype: list
+        :returns: First match of every network with any matches.
+        """
+        channels = self._get_seed_id_index().get_channels(seed_id, datetime)
+        if channels is None:
+            # indexed channels were modified in place
+            self._seed_id_index = SEEDIdIndex(self)
+            channels = self._seed_id_index.get_channels(seed_id, datetime)
+        results = self.__first_matches(
+            [find(net, seed_id, datetime, channels=channels_)
+             for net, channels_ in channels], msg)
+        if results:
+            return results
+        network, _, _, _ = seed_id.split(".")
+        results = self.__first_matches(
+            [find(net, seed_id, datetime) for net in self.networks
+             if net.code == network], msg)
+        if results:
+            # channels were added in place
+            self.__dict__.pop("_seed_id_index", None)
+        return results
+
+    @staticmethod
+    def __first_matches(matches, msg):
+        """
+        Return the first match of every network, warning about networks with
+        more than one match.
+        """
+        results = []
+        for matches_ in matches:
+            if len(matches_) > 1:
+                warnings.warn(msg)
+            if matches_:
+                results.append(matches_[0])
+        return results
+
     def get_coordinates(self, seed_id, datetime=None):
         """
         Return coordinates for a given channel.
@@ -633,6 +688,18 @@ class Inventory(ComparingObject):
             maximum number of degrees from the geographic point defined by the
             latitude and longitude parameters.
         """
+        # use the spatial index to skip stations outside of the distance
+        # range, matching stations are checked exactly again below
+        candidates = None
+        if latitude is not None and longitude is not None and \
+                (minradius is not None or maxradius is not None):
+            index = self._get_spatial_index()
+            stations, _ = index.query_radius(
+                latitude, longitude,
+                minradius=None if minradius is None else minradius - 1e-6,
+                maxradius=None if maxradius is None else maxradius + 1e-6)
+            candidates = set(id(sta) for sta in stations + index.unlocated)
+
         networks = []
         for net in self.networks:
             # skip if any given criterion is not matched
@@ -647,6 +714,12 @@ class Inventory(ComparingObject):
 
             has_stations = bool(net.stations)
 
+            if candidates is not None:
+                stations = [sta for sta in net.stations
+                            if id(sta) in candidates]
+                net = copy.copy(net)
+                net.stations = stations
+
             net_ = net.select(
                 station=station, location=location, channel=channel, time=time,
                 starttime=starttime, endtime=endtime,
@@ -665,6 +738,108 @@ class Inventory(ComparingObject):
         inv.networks = networks
         return inv
 
+    def _get_spatial_index(self):
+        """
+        Return the spatial index of all stations, (re)building it if
+        necessary.
+
+        :rtype: :class:`~obspy.core.inventory.index.SpatialIndex`
+        """
+        index = self.__dict__.get("_spatial_index")
+        if index is None or not index.is_valid(self):
+            index = SpatialIndex(self)
+            self._spatial_index = index
+        return index
+
+    def _select_stations(self, stations):
+        """
+        Return a shallow copy of the inventory with only the given station
+        objects.
+        """
+        station_ids = set(id(sta) for sta in stations)
+        networks = []
+        for net in self.networks:
+            stations_ = [sta for sta in net.stations if id(sta) in station_ids]
+            if not stations_:
+                continue
+            net_ = copy.copy(net)
+            net_.stations = stations_
+            networks.append(net_)
+        inv = copy.copy(self)
+        inv.networks = networks
+        return inv
+
+    def nearest(self, latitude, longitude, k=1):
+        """
+        Return a copy of the inventory with only the stations closest to a
+        geographic point.
+
+        Uses a spatial index over all stations that is built on first use and
+        rebuilt automatically after networks, stations or station
+        coordinates were changed, so repeated queries (e.g. for every event
+        of a catalog) do not have to compute distances to all stations.
+
+        .. rubric:: Example
+
+        >>> from obspy import read_inventory
+        >>> inv = read_inventory()
+        >>> for net in inv.nearest(48.0, 12.0, k=2):
+        ...     for sta in net:
+        ...         print(net.code, sta.code, sta.start_date)
+        GR FUR 2006-12-16T00:00:00.000000Z
+        BW RJOB 2001-05-15T00:00:00.000000Z
+
+        Every station epoch counts as a separate station. Stations and
+        networks stay in the order of the original inventory, distances can
+        be computed with
+        :func:`~obspy.geodetics.base.locations2degrees`. Like
+        :meth:`select`, the returned object is based on a shallow copy of the
+        original object.
+
+        :type latitude: float
+        :param latitude: Latitude of the point in degrees.
+        :type longitude: float
+        :param longitude: Longitude of the point in degrees.
+        :type k: int
+        :param k: Number of stations to return.
+        :rtype: :class:`Inventory`
+        """
+        stations, _ = self._get_spatial_index().query_nearest(
+            latitude, longitude, k=k)
+        return self._select_stations(stations)
+
+    def within(self, latitude, longitude, radius):
+        """
+        Return a copy of the inventory with only the stations and channels
+        within a distance from a geographic point.
+
+        Shortcut for :meth:`select` with ``latitude``, ``longitude`` and
+        ``maxradius``, which uses a spatial index for distance selections
+        (see :meth:`nearest`).
+
+        .. rubric:: Example
+
+        >>> from obspy import read_inventory
+        >>> inv = read_inventory()
+        >>> for net in inv.within(48.0, 12.0, 1.0):
+        ...     for sta in net:
+        ...         print(net.code, sta.code, sta.start_date)
+        GR FUR 2006-12-16T00:00:00.000000Z
+        BW RJOB 2001-05-15T00:00:00.000000Z
+        BW RJOB 2006-12-13T00:00:00.000000Z
+        BW RJOB 2007-12-17T00:00:00.000000Z
+
+        :type latitude: float
+        :param latitude: Latitude of the point in degrees.
+        :type longitude: float
+        :param longitude: Longitude of the point in degrees.
+        :type radius: float
+        :param radius: Maximum distance in degrees.
+        :rtype: :class:`Inventory`
+        """
+        return self.select(latitude=latitude, longitude=longitude,
+                           maxradius=radius)
+
     def remove(self, network='*', station='*', location='*', channel='*',
                keep_empty=False):
         r"""
@@ -236,19 +236,7 @@ class Network(BaseNode):
         :rtype: :class:`~obspy.core.inventory.response.Response`
         :returns: Response for time series specified by input arguments.
         """
-        network, station, location, channel = seed_id.split(".")
-        if self.code != network:
-            responses = []
-        else:
-            channels = [cha for sta in self.stations for cha in sta.channels
-                        if sta.code == station and
-                        cha.code == channel and
-                        cha.location_code == location and
-                        (cha.start_date is None or
-                         cha.start_date <= datetime) and
-                        (cha.end_date is None or cha.end_date >= datetime)]
-            responses = [cha.response for cha in channels
-                         if cha.response is not None]
+        responses = self._find_responses(seed_id, datetime)
         if len(responses) > 1:
             msg = "Found more than one matching response. Returning first."
             warnings.warn(msg)
@@ -257,6 +245,32 @@ class Network(BaseNode):
             raise Exception(msg)
         return responses[0]
 
+    def _find_responses(self, seed_id, datetime, channels=None):
+        """
+        Return all responses matching a SEED ID at a given time.
+
+        :type channels: list of tuple
+        :param channels: Candidate ``(station, channel)`` pairs of this
+            network to check (e.g. from a
+            :class:`~obspy.core.inventory.index.SEEDIdIndex`). All channels
+            of the network are checked if not given.
+        """
+        network, station, location, channel = seed_id.split(".")
+        if self.code != network:
+            return []
+        if channels is None:
+            channels = [(sta, cha) for sta in self.stations
+                        for cha in sta.channels]
+        channels = [cha for sta, cha in channels
+                    if sta.code == station and
+                    cha.code == channel and
+                    cha.location_code == location and
+                    (cha.start_date is None or
+                     cha.start_date <= datetime) and
+                    (cha.end_date is None or cha.end_date >= datetime)]
+        return [cha.response for cha in channels
+                if cha.response is not None]
+
     def get_channel_metadata(self, seed_id, datetime=None):
         """
         Return basic metadata for a given channel.
@@ -269,55 +283,7 @@ class Network(BaseNode):
         :return: Dictionary containing coordinates and orientation (latitude,
             longitude, elevation, azimuth, dip)
         """
-        network, station, location, channel = seed_id.split(".")
-        metadata = []
-        if self.code != network:
-            pass
-        elif self.start_date and self.start_date > datetime:
-            pass
-        elif self.end_date and self.end_date < datetime:
-            pass
-        else:
-            for sta in self.stations:
-                # skip wrong station
-                if sta.code != station:
-                    continue
-                # check datetime only if given
-                if datetime:
-                    # skip if start date before given datetime
-                    if sta.start_date and sta.start_date > datetime:
-                        continue
-                    # skip if end date before given datetime
-                    if sta.end_date and sta.end_date < datetime:
-                        continue
-                for cha in sta.channels:
-                    # skip wrong channel
-                    if cha.code != channel:
-                        continue
-                    # skip wrong location
-                    if cha.location_code != location:
-                        continue
-                    # check datetime only if given
-                    if datetime:
-                        # skip if start date before given datetime
-                        if cha.start_date and cha.start_date > datetime:
-                            continue
-                        # skip if end date before given datetime
-                        if cha.end_date and cha.end_date < datetime:
-                            continue
-                    # prepare coordinates
-                    data = {}
-                    for key in ('latitude', 'longitude', 'elevation'):
-                        value = getattr(cha, key, None)
-                        # if channel latitude/longitude/elevation is not given
-                        # use station information
-                        if value is None:
-                            value = getattr(sta, key, None)
-                        data[key] = value
-                    data['local_depth'] = cha.depth
-                    data['azimuth'] = cha.azimuth
-                    data['dip'] = cha.dip
-                    metadata.append(data)
+        metadata = self._find_channel_metadata(seed_id, datetime)
         if len(metadata) > 1:
             msg = ("Found more than one matching channel metadata. "
                    "Returning first.")
@@ -327,6 +293,69 @@ class Network(BaseNode):
             raise Exception(msg)
         return metadata[0]
 
+    def _find_channel_metadata(self, seed_id, datetime=None, channels=None):
+        """
+        Return basic metadata of all channels matching a SEED ID (at a given
+        time).
+
+        :type channels: list of tuple
+        :param channels: Candidate ``(station, channel)`` pairs of this
+            network to check (e.g. from a
+            :class:`~obspy.core.inventory.index.SEEDIdIndex`). All channels
+            of the network are checked if not given.
+        """
+        network, station, location, channel = seed_id.split(".")
+        metadata = []
+        if self.code != network:
+            return metadata
+        elif self.start_date and self.start_date > datetime:
+            return metadata
+        elif self.end_date and self.end_date < datetime:
+            return metadata
+        if channels is None:
+            channels = [(sta, cha) for sta in self.stations
+                        for cha in sta.channels]
+        for sta, cha in channels:
+            # skip wrong station
+            if sta.code != station:
+                continue
+            # check datetime only if given
+            if datetime:
+                # skip if start date before given datetime
+                if sta.start_date and sta.start_date > datetime:
+                    continue
+                # skip if end date before given datetime
+                if sta.end_date and sta.end_date < datetime:
+                    continue
+            # skip wrong channel
+            if cha.code != channel:
+                continue
+            # skip wrong location
+            if cha.location_code != location:
+                continue
+            # check datetime only if given
+            if datetime:
+                # skip if start date before given datetime
+                if cha.start_date and cha.start_date > datetime:
+                    continue
+                # skip if end date before given datetime
+                if cha.end_date and cha.end_date < datetime:
+                    continue
+            # prepare coordinates
+            data = {}
+            for key in ('latitude', 'longitude', 'elevation'):
+                value = getattr(cha, key, None)
+                # if channel latitude/longitude/elevation is not given
+                # use station information
+                if value is None:
+                    value = getattr(sta, key, None)
+                data[key] = value
+            data['local_depth'] = cha.depth
+            data['azimuth'] = cha.azimuth
+            data['dip'] = cha.dip
+            metadata.append(data)
+        return metadata
+
     def get_coordinates(self, seed_id, datetime=None):
         """
         Return coordinates and orientation for a given channel.
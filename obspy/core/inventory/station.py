@@ -37,6 +37,10 @@ class Station(BaseNode):
         single station epoch with the station's creation and termination dates
         as the epoch start and end dates.
     """
+    # counts changes of the coordinates of a station after its creation,
+    # used to invalidate spatial indexes of inventories
+    _coordinate_version = 0
+
     def __init__(self, code, latitude, longitude, elevation, channels=None,
                  site=None, vault=None, geology=None, equipments=None,
                  operators=None, creation_date=None, termination_date=None,
@@ -120,6 +124,8 @@ class Station(BaseNode):
         self.latitude = latitude
         self.longitude = longitude
         self.elevation = elevation
+        # the initial coordinates are no change
+        self._coordinate_version = 0
         self.channels = channels or []
         self.site = site if site is not None else Site()
         self.vault = vault
@@ -162,6 +168,14 @@ class Station(BaseNode):
             raise ValueError(msg)
         self._selected_number_of_channels = value
 
+    def __eq__(self, other):
+        # the number of coordinate changes is bookkeeping, not content
+        if not isinstance(other, self.__class__):
+            return False
+        skip = "_coordinate_version"
+        return ({k: v for k, v in self.__dict__.items() if k != skip} ==
+                {k: v for k, v in other.__dict__.items() if k != skip})
+
     def __str__(self):
         contents = self.get_contents()
         ret = ("Station {station_name}\n"
@@ -316,6 +330,7 @@ class Station(BaseNode):
             self._longitude = value
         else:
             self._longitude = Longitude(value)
+        self._coordinate_version += 1
 
     @property
     def latitude(self):
@@ -327,6 +342,7 @@ class Station(BaseNode):
             self._latitude = value
         else:
             self._latitude = Latitude(value)
+        self._coordinate_version += 1
 
     @property
     def elevation(self):
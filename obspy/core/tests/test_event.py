@@ -16,8 +16,8 @@ import numpy as np
 
 from obspy import UTCDateTime, read_events
 from obspy.core.event import (Catalog, Comment, CreationInfo, Event,
-                              FocalMechanism, Magnitude, Origin, Pick,
-                              ResourceIdentifier, WaveformStreamID)
+                              FocalMechanism, Magnitude, Origin, OriginQuality,
+                              Pick, ResourceIdentifier, WaveformStreamID)
 from obspy.core.event.source import farfield
 from obspy.core.util import (
     BASEMAP_VERSION, CARTOPY_VERSION, PROJ4_VERSION, MATPLOTLIB_VERSION)
@@ -483,6 +483,140 @@ class CatalogTestCase(unittest.TestCase):
             self.assertTrue(all(event in cat_smaller
                                 for event in cat_bigger_inverse))
 
+    def test_filter_missing_values(self):
+        """
+        Test filtering events with missing and zero values and times of
+        different precision.
+        """
+        events = [Event(), Event(origins=[Origin()]),
+                  Event(origins=[Origin(
+                      time=UTCDateTime(2012, 1, 1), latitude=10.0,
+                      quality=OriginQuality(used_phase_count=10))],
+                        magnitudes=[Magnitude(mag=0.0)]),
+                  Event(origins=[Origin(time=UTCDateTime(
+                      2012, 1, 1, 0, 0, 0, 123, precision=3))],
+                        magnitudes=[Magnitude(mag=5.0)])]
+        cat = Catalog(events)
+
+        def filtered(*args, **kwargs):
+            return [events.index(ev) for ev in cat.filter(*args, **kwargs)]
+
+        # missing values match "<" and "<=" rules if there is an origin
+        self.assertEqual(filtered("latitude < 20"), [1, 2, 3])
+        self.assertEqual(filtered("latitude >= 5"), [2])
+        self.assertEqual(filtered("latitude >= 5", inverse=True), [0, 1, 3])
+        # magnitudes of zero never match
+        self.assertEqual(filtered("magnitude < 6"), [3])
+        # quality values only match if the quality is set
+        self.assertEqual(filtered("used_phase_count < 20"), [2])
+        self.assertEqual(filtered("used_phase_count > 20"), [])
+        # times are compared with the precision of the origin times
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self.assertEqual(filtered("time > 2012-01-01"), [])
+            self.assertEqual(filtered("time >= 2012-01-01"), [2, 3])
+            self.assertEqual(filtered("time < 2012-01-01T00:00:00.000001"),
+                             [1, 2])
+            self.assertEqual(filtered("time < 2012-01-01T00:00:00.0006"),
+                             [1, 2, 3])
+        self.assertEqual(filtered("time <= 2012-01-01", "latitude > 0"), [2])
+        with self.assertRaises(ValueError):
+            cat.filter("mag < 3")
+        with self.assertRaises(ValueError):
+            cat.filter("magnitude<3")
+
+    def test_to_table(self):
+        """
+        Test the table of origin and magnitude values of a catalog.
+        """
+        cat = read_events()
+        table = cat.to_table()
+        self.assertEqual(len(table), 3)
+        for row, event in zip(table, cat):
+            origin = event.preferred_origin() or event.origins[0]
+            magnitude = event.preferred_magnitude() or event.magnitudes[0]
+            self.assertEqual(UTCDateTime(str(row["time"])), origin.time)
+            self.assertEqual(row["latitude"], origin.latitude)
+            self.assertEqual(row["longitude"], origin.longitude)
+            self.assertEqual(row["magnitude"], magnitude.mag)
+            self.assertEqual(row["magnitude_type"], magnitude.magnitude_type)
+        # missing values
+        cat.append(Event())
+        table = cat.to_table()
+        self.assertEqual(len(table), 4)
+        self.assertTrue(np.isnat(table["time"][-1]))
+        self.assertTrue(np.isnan(table["depth"][-1]))
+        self.assertEqual(table["magnitude_type"][-1], "")
+        # preferred origins are used if set
+        origin = Origin(time=UTCDateTime(2000, 1, 1))
+        cat[0].origins.append(origin)
+        cat[0].preferred_origin_id = origin.resource_id
+        self.assertEqual(cat.to_table()["time"][0],
+                         np.datetime64("2000-01-01"))
+        self.assertNotEqual(cat.to_table(preferred=False)["time"][0],
+                            np.datetime64("2000-01-01"))
+        # the returned array is a copy
+        table = cat.to_table()
+        table["magnitude"] = 0
+        self.assertEqual(cat.to_table()["magnitude"][0], 4.4)
+
+    def test_table_cache(self):
+        """
+        Test that the cached table is updated after changes of the catalog.
+        """
+        cat = read_events()
+        table = cat._get_table()
+        self.assertIs(cat._get_table(), table)
+        self.assertEqual(len(cat.filter("magnitude > 4")), 2)
+        # creating new objects does not invalidate the tables
+        Catalog([Event(origins=[Origin()])])
+        self.assertIs(cat._get_table(), table)
+        # changed attributes
+        cat[0].magnitudes[0].mag = 3.5
+        self.assertIsNot(cat._get_table(), table)
+        self.assertEqual(len(cat.filter("magnitude > 4")), 1)
+        cat[2].origins[0].quality.used_phase_count = 100
+        self.assertEqual(len(cat.filter("used_phase_count > 99")), 1)
+        cat[2].origins[0]["depth"] = 1e6
+        self.assertEqual(len(cat.filter("depth > 999999")), 1)
+        # changed lists
+        cat.events.append(cat[1].copy())
+        self.assertEqual(len(cat.filter("magnitude > 4")), 2)
+        cat[1].magnitudes.insert(0, Magnitude(mag=1.0))
+        self.assertEqual(len(cat.filter("magnitude > 4")), 1)
+        cat.events = cat.events[:1]
+        self.assertEqual(len(cat.filter("magnitude > 0")), 1)
+        # tables are not pickled or copied
+        cat._get_table()
+        self.assertNotIn("_tables", pickle.loads(pickle.dumps(cat)).__dict__)
+        self.assertNotIn("_tables", cat.copy().__dict__)
+
+    def test_sort(self):
+        """
+        Test sorting the events of a catalog.
+        """
+        cat = read_events()
+        cat.append(Event())
+        events = list(cat)
+        self.assertIs(cat.sort(), cat)
+        self.assertEqual(cat.events, [events[i] for i in (2, 1, 0, 3)])
+        cat.sort(keys=["time"], reverse=True)
+        self.assertEqual(cat.events, [events[i] for i in (3, 0, 1, 2)])
+        # sorting keeps filtering in sync
+        self.assertEqual(list(cat.filter("magnitude > 4")),
+                         [events[0], events[1]])
+        cat.sort(keys=["magnitude_type", "magnitude"])
+        self.assertEqual(cat.events, [events[i] for i in (3, 2, 1, 0)])
+        # equal values keep their order
+        cat = Catalog([Event(magnitudes=[Magnitude(mag=1.0)])
+                       for _i in range(5)])
+        events = list(cat)
+        self.assertEqual(cat.sort(["magnitude"]).events, events)
+        self.assertEqual(
+            cat.sort(["magnitude"], reverse=True).events, events)
+        self.assertRaises(ValueError, cat.sort, ["foo"])
+        self.assertRaises(ValueError, cat.sort, "time")
+
     def test_catalog_resource_id(self):
         """
         See #662
@@ -34,6 +34,7 @@ from obspy.core.util.testing import ImageComparison
 from obspy.core.inventory import (Channel, Inventory, Network, Response,
                                   Station)
 from obspy.core.inventory.util import _unified_content_strings
+from obspy.geodetics import locations2degrees
 
 
 class InventoryTestCase(unittest.TestCase):
@@ -529,6 +530,201 @@ class InventoryTestCase(unittest.TestCase):
         # exist.
         self.assertEqual(len(inv.select(network="RR")), 0)
 
+    def test_spatial_index(self):
+        """
+        Tests nearest(), within() and distance selections with select()
+        against brute force distances.
+        """
+        rng = np.random.RandomState(815)
+        networks = []
+        for i in range(10):
+            stations = []
+            for j in range(50):
+                sta = Station("S%02d" % j, rng.uniform(-90, 90),
+                              rng.uniform(-180, 180), 0.0)
+                sta.channels = [Channel("BHZ", "", sta.latitude + 0.01,
+                                        sta.longitude, 0.0, 0.0)]
+                stations.append(sta)
+            networks.append(Network("N%d" % i, stations=stations))
+        inv = Inventory(networks=networks)
+
+        def in_range(obj, lat, lon, minradius, maxradius):
+            dist = locations2degrees(lat, lon, obj.latitude, obj.longitude)
+            return ((minradius is None or dist >= minradius) and
+                    (maxradius is None or dist <= maxradius))
+
+        def codes(inv_):
+            return sorted((net.code, sta.code) for net in inv_ for sta in net)
+
+        for lat, lon, minradius, maxradius in [
+                (10, 20, None, 30), (-45, 170, 20, 60), (80, -10, 100, None),
+                (0, 0, 0, 180), (30, 30, None, 0.001)]:
+            # stations and their channels both have to be in range
+            expected = sorted(
+                (net.code, sta.code) for net in inv for sta in net
+                if in_range(sta, lat, lon, minradius, maxradius) and
+                in_range(sta[0], lat, lon, minradius, maxradius))
+            got = inv.select(latitude=lat, longitude=lon,
+                             minradius=minradius, maxradius=maxradius)
+            self.assertEqual(codes(got), expected)
+            self.assertTrue(all(len(sta) == 1 for net in got for sta in net))
+            if minradius is None:
+                self.assertEqual(
+                    codes(inv.within(lat, lon, maxradius)),
+                    codes(inv.select(latitude=lat, longitude=lon,
+                                     maxradius=maxradius)))
+            distances = sorted(
+                (locations2degrees(lat, lon, sta.latitude, sta.longitude),
+                 net.code, sta.code) for net in inv for sta in net)
+            for k in (1, 7):
+                self.assertEqual(codes(inv.nearest(lat, lon, k=k)),
+                                 sorted(x[1:] for x in distances[:k]))
+        self.assertEqual(len(inv.nearest(0, 0, k=1000)), 10)
+        self.assertEqual(len(inv.nearest(0, 0, k=0)), 0)
+        # original inventory is untouched
+        self.assertEqual(sum(len(net) for net in inv), 500)
+
+        # index is reused and rebuilt after modifications
+        index = inv._get_spatial_index()
+        self.assertIs(inv._get_spatial_index(), index)
+        sta = Station("NEW", 10.0, 20.0, 0.0)
+        inv[3].stations.append(sta)
+        self.assertIsNot(inv._get_spatial_index(), index)
+        self.assertEqual(codes(inv.nearest(10.0, 20.0)), [("N3", "NEW")])
+        sta.latitude = -10.0
+        self.assertEqual(codes(inv.nearest(-10.0, 20.0)), [("N3", "NEW")])
+        self.assertNotIn(("N3", "NEW"), codes(inv.nearest(10.0, 20.0)))
+        # creating or reading other stations does not invalidate the index
+        index = inv._get_spatial_index()
+        Station("OTHER", 1.0, 2.0, 0.0)
+        read_inventory()
+        self.assertIs(inv._get_spatial_index(), index)
+        # changed coordinates do not affect comparisons
+        sta2 = Station("NEW", -10.0, 20.0, 0.0)
+        self.assertEqual(sta, sta2)
+        inv.networks = inv.networks[:3]
+        self.assertNotIn(("N3", "NEW"), codes(inv.nearest(-10.0, 20.0)))
+        # index is not copied along
+        inv2 = inv.copy()
+        self.assertNotIn("_spatial_index", inv2.__dict__)
+        self.assertEqual(inv2, inv)
+        # empty inventory
+        self.assertEqual(len(Inventory().nearest(0, 0)), 0)
+        self.assertEqual(len(Inventory().within(0, 0, 10)), 0)
+
+    def test_seed_id_index(self):
+        """
+        Tests lookups of responses and channel metadata via the SEED ID index
+        against full scans of all networks.
+        """
+        t0 = UTCDateTime(2010, 1, 1)
+        networks = []
+        for i in range(3):
+            stations = []
+            for j in range(20):
+                sta = Station("S%02d" % j, 10.0 * i, j, 0.0)
+                for k in range(5):
+                    # consecutive epochs, the last one is open ended
+                    cha = Channel("BHZ", "00", 10.0 * i, j, 0.0, float(k),
+                                  start_date=t0 + k * 1000,
+                                  end_date=None if k == 4 else
+                                  t0 + (k + 1) * 1000 - 1,
+                                  azimuth=float(k), dip=-90.0)
+                    cha.response = Response(resource_id="%d.%d.%d" % (
+                        i, j, k))
+                    sta.channels.append(cha)
+                stations.append(sta)
+            networks.append(Network("N%d" % i, stations=stations))
+        inv = Inventory(networks=networks)
+
+        def scan(seed_id, datetime):
+            net = [net_ for net_ in inv if net_.code == seed_id[:2]][0]
+            return (net.get_response(seed_id, datetime),
+                    net.get_channel_metadata(seed_id, datetime))
+
+        for seed_id in ("N0.S00.00.BHZ", "N1.S07.00.BHZ", "N2.S19.00.BHZ"):
+            for dt in (0, 999, 1000, 2500, 3999, 4000, 10000):
+                response, metadata = scan(seed_id, t0 + dt)
+                self.assertIs(inv.get_response(seed_id, t0 + dt), response)
+                self.assertEqual(
+                    inv.get_channel_metadata(seed_id, t0 + dt), metadata)
+                self.assertEqual(inv.get_orientation(seed_id, t0 + dt)[
+                    "azimuth"], min(dt // 1000, 4))
+        index = inv._get_seed_id_index()
+        self.assertEqual(len(index), 300)
+        self.assertIs(inv._get_seed_id_index(), index)
+        for seed_id, dt in (("N0.S00.00.BHZ", -1), ("N0.S00.00.BHN", 0),
+                            ("N0.S20.00.BHZ", 0), ("N3.S00.00.BHZ", 0)):
+            with self.assertRaises(Exception) as e:
+                inv.get_response(seed_id, t0 + dt)
+            self.assertEqual(str(e.exception),
+                             "No matching response information found.")
+            with self.assertRaises(Exception) as e:
+                inv.get_channel_metadata(seed_id, t0 + dt)
+            self.assertEqual(str(e.exception),
+                             "No matching channel metadata found.")
+        # without a time all epochs match metadata queries
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            metadata = inv.get_channel_metadata("N1.S03.00.BHZ")
+        self.assertEqual(metadata["azimuth"], 0.0)
+        self.assertEqual(len(w), 1)
+        # overlapping epochs in two networks with the same code
+        inv.networks.append(copy.deepcopy(inv[1]))
+        self.assertIsNot(inv._get_seed_id_index(), index)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            response = inv.get_response("N1.S03.00.BHZ", t0 + 1500)
+        self.assertIs(response, inv[1][3][1].response)
+        self.assertEqual(len(w), 1)
+        self.assertEqual(str(w[0].message),
+                         "Found more than one matching response. "
+                         "Returning first.")
+        inv.networks.pop()
+
+        # in place modifications of channels are picked up
+        cha = inv[0][5][2]
+        cha.location_code = "10"
+        self.assertEqual(
+            inv.get_orientation("N0.S05.10.BHZ", t0 + 2500)["azimuth"], 2.0)
+        with self.assertRaises(Exception):
+            inv.get_response("N0.S05.00.BHZ", t0 + 2500)
+        inv[0][5].channels.remove(cha)
+        with self.assertRaises(Exception):
+            inv.get_response("N0.S05.10.BHZ", t0 + 2500)
+        inv[0][5].channels.append(cha)
+        self.assertIs(inv.get_response("N0.S05.10.BHZ", t0 + 2500),
+                      cha.response)
+        cha.start_date -= 1000
+        self.assertIs(inv.get_response("N0.S05.10.BHZ", t0 + 1500),
+                      cha.response)
+        # matching epochs appended to an indexed station are not missed
+        index = inv._get_seed_id_index()
+        self.assertIs(inv.get_response("N2.S04.00.BHZ", t0 + 2500),
+                      inv[2][4][2].response)
+        cha = copy.deepcopy(inv[2][4][2])
+        cha.response = Response(resource_id="appended")
+        inv[2][4].channels.insert(0, cha)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            response = inv.get_response("N2.S04.00.BHZ", t0 + 2500)
+        self.assertIs(response, cha.response)
+        self.assertEqual(len(w), 1)
+        self.assertEqual(str(w[0].message),
+                         "Found more than one matching response. "
+                         "Returning first.")
+        self.assertIsNot(inv._get_seed_id_index(), index)
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            self.assertEqual(inv.get_channel_metadata(
+                "N2.S04.00.BHZ", t0 + 2500), inv[2].get_channel_metadata(
+                "N2.S04.00.BHZ", t0 + 2500))
+        self.assertEqual(len(w), 2)
+        # index is not copied along
+        inv2 = inv.copy()
+        self.assertNotIn("_seed_id_index", inv2.__dict__)
+        self.assertEqual(inv2, inv)
+
     def test_util_unified_content_string(self):
         """
         Tests helper routine that compresses inventory content lists.
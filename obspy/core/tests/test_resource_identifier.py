@@ -18,6 +18,7 @@ import itertools
 import multiprocessing.pool
 import pickle
 import sys
+import threading
 import unittest
 import warnings
 
@@ -696,6 +697,139 @@ class ResourceIdentifierTestCase(unittest.TestCase):
         rid3 = rid2.get_quakeml_id()
         self.assertEqual(rid2, rid3)
 
+    def test_plain_ids(self):
+        """
+        Tests that no objects are bound to resource ids within the plain_ids
+        context and that events can be scoped afterwards.
+        """
+        cat1 = create_diverse_catalog()
+        bytes_io = io.BytesIO()
+        cat1.write(bytes_io, 'quakeml')
+        del cat1
+        gc.collect()
+        self.assertEqual(len(self.id_order), 0)
+        with ResourceIdentifier.plain_ids():
+            bytes_io.seek(0)
+            cat = read_events(bytes_io)
+            cat2 = pickle.loads(pickle.dumps(cat))
+            cat3 = cat.copy()
+            obj = UTCDateTime()
+            rid = ResourceIdentifier(referred_object=obj)
+        self.assertEqual(len(self.id_order), 0)
+        self.assertEqual(len(self.id_object_map), 0)
+        self.assertIsNone(rid.get_referred_object())
+        # preferred objects are still found
+        for ev in (cat[0], cat2[0], cat3[0]):
+            self.assertIs(ev.preferred_origin(), ev.origins[-1])
+            self.assertIs(ev.preferred_magnitude(), ev.magnitudes[-1])
+            self.assertIs(ev.preferred_focal_mechanism(),
+                          ev.focal_mechanisms[-1])
+        # scoping the events binds the resource ids
+        for ev in cat:
+            ev.scope_resource_ids()
+        self.assertGreater(len(self.id_order), 0)
+        self.test_arrivals_refer_to_picks_in_same_event([cat])
+        self.test_preferred_origin([cat])
+        # contexts can be nested
+        with ResourceIdentifier.plain_ids():
+            with ResourceIdentifier.plain_ids():
+                pass
+            rid = ResourceIdentifier(referred_object=obj)
+        self.assertIsNone(rid.get_referred_object())
+        rid = ResourceIdentifier(referred_object=obj)
+        self.assertIs(rid.get_referred_object(), obj)
+
+    def test_plain_ids_thread_local(self):
+        """
+        Tests that the plain_ids context of one thread does not affect
+        binding and scoping of resource ids in other threads.
+        """
+        entered = threading.Event()
+        release = threading.Event()
+        results = {}
+
+        def other_thread():
+            with ResourceIdentifier.plain_ids():
+                entered.set()
+                release.wait(10)
+                obj = UTCDateTime()
+                rid = ResourceIdentifier(referred_object=obj)
+                results["rid"] = rid.get_referred_object()
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        try:
+            self.assertTrue(entered.wait(10))
+            # the other thread is within the context
+            obj = UTCDateTime()
+            rid = ResourceIdentifier(referred_object=obj)
+            self.assertIs(rid.get_referred_object(), obj)
+            rid2 = ResourceIdentifier()
+            rid2.set_referred_object(obj)
+            self.assertIs(rid2.get_referred_object(), obj)
+            ev = event.Event()
+            ev.origins.append(event.Origin())
+            ev.preferred_origin_id = ev.origins[0].resource_id.id
+            ev.scope_resource_ids()
+            self.assertEqual(ev.preferred_origin_id._parent_key,
+                             _ResourceKey.get_resource_key(id(ev)))
+            self.assertIs(ev.preferred_origin_id.get_referred_object(),
+                          ev.origins[0])
+        finally:
+            release.set()
+            thread.join()
+        # the context was still active in the other thread
+        self.assertIsNone(results["rid"])
+
+    def test_id_order_is_bounded(self):
+        """
+        Tests that the list of objects bound to a resource id does not grow
+        without bounds if objects are bound and deleted repeatedly.
+        """
+        rid = ResourceIdentifier('some_id')
+        kept = []
+        for i in range(1000):
+            obj = UTCDateTime(i)
+            rid.set_referred_object(obj, warn=False)
+            # binding the same object again does not add an entry
+            rid.set_referred_object(obj, warn=False)
+            if i % 100 == 0:
+                kept.append(obj)
+            del obj
+        rid_list = self.id_order[rid._resource_key]
+        self.assertLessEqual(len(rid_list), 2 * len(kept) + 8)
+        # the newest existing object is still found
+        self.assertIs(ResourceIdentifier('some_id').get_referred_object(),
+                      kept[-1])
+        kept.pop()
+        self.assertIs(ResourceIdentifier('some_id').get_referred_object(),
+                      kept[-1])
+
+    def test_copying_and_pickling_does_not_register_new_ids(self):
+        """
+        Tests that copying or unpickling event type objects does not create
+        and bind additional resource ids.
+        """
+        pick = event.Pick(time=UTCDateTime(0),
+                          time_errors=event.QuantityError(uncertainty=0.1))
+        keys = len(_ResourceKey._singleton_cache)
+        self.assertEqual(len(self.id_order), 1)
+        for pick2 in (copy.deepcopy(pick), pickle.loads(pickle.dumps(pick))):
+            self.assertEqual(pick2, pick)
+            self.assertEqual(pick2.time_errors.uncertainty, 0.1)
+            self.assertIsNot(pick2.time_errors, pick.time_errors)
+            self.assertEqual(len(self.id_order), 1)
+            self.assertIs(pick2.resource_id.get_referred_object(), pick)
+        self.assertEqual(len(_ResourceKey._singleton_cache), keys)
+        # resource keys are only valid within one Python run and not pickled
+        rid = ResourceIdentifier('some_id')
+        rid.set_referred_object(pick, parent=pick)
+        state = rid.__getstate__()
+        self.assertNotIn('_resource_key__', state)
+        self.assertNotIn('_parent_key__', state)
+        rid2 = pickle.loads(pickle.dumps(rid))
+        self.assertIs(rid2._resource_key, rid._resource_key)
+
 
 def get_instances(obj, cls=None, is_attr=None, has_attr=None):
     """
@@ -42,11 +42,12 @@ DEFAULT_MODULES = ['clients.filesystem', 'core', 'db', 'geodetics', 'imaging',
                    'io.cnv', 'io.css', 'io.dmx', 'io.focmec', 'io.iaspei',
                    'io.gcf', 'io.gse2', 'io.json', 'io.kinemetrics', 'io.kml',
                    'io.mseed', 'io.ndk', 'io.nied', 'io.nlloc', 'io.nordic',
-                   'io.pdas', 'io.pde', 'io.quakeml', 'io.reftek', 'io.rg16',
-                   'io.sac', 'io.scardec', 'io.seg2', 'io.segy', 'io.seisan',
-                   'io.sh', 'io.shapefile', 'io.seiscomp', 'io.stationtxt',
-                   'io.stationxml', 'io.wav', 'io.win', 'io.xseed', 'io.y',
-                   'io.zmap', 'realtime', 'scripts', 'signal', 'taup']
+                   'io.obspybin', 'io.pdas', 'io.pde', 'io.quakeml',
+                   'io.reftek', 'io.rg16', 'io.sac', 'io.scardec', 'io.seg2',
+                   'io.segy', 'io.seisan', 'io.sh', 'io.shapefile',
+                   'io.seiscomp', 'io.stationtxt', 'io.stationxml', 'io.wav',
+                   'io.win', 'io.xseed', 'io.y', 'io.zmap', 'realtime',
+                   'scripts', 'signal', 'taup']
 NETWORK_MODULES = ['clients.arclink', 'clients.earthworm', 'clients.fdsn',
                    'clients.iris', 'clients.neic', 'clients.nrl',
                    'clients.seedlink', 'clients.seishub', 'clients.syngine']
@@ -416,6 +417,27 @@ def _read_from_plugin(plugin_type, filename, format=None, **kwargs):
     """
     Reads a single file from a plug-in's readFormat function.
     """
+    format_ep = _get_format_entry_point(plugin_type, filename, format=format)
+    try:
+        # search readFormat for given entry point
+        read_format = buffered_load_entry_point(
+            format_ep.dist.key,
+            'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
+            'readFormat')
+    except ImportError:
+        msg = "Format \"%s\" is not supported. Supported types: %s"
+        raise TypeError(msg % (format_ep.name,
+                               ', '.join(ENTRY_POINTS[plugin_type])))
+    # read
+    list_obj = read_format(filename, **kwargs)
+    return list_obj, format_ep.name
+
+
+def _get_format_entry_point(plugin_type, filename, format=None):
+    """
+    Returns the entry point of the format of a single file, either detected
+    via the plug-ins' isFormat functions or given via ``format``.
+    """
     if isinstance(filename, (str, native_str)):
         if not os.path.exists(filename):
             msg = "[Errno 2] No such file or directory: '{}'".format(
@@ -455,19 +477,7 @@ def _read_from_plugin(plugin_type, filename, format=None, **kwargs):
         except (KeyError, IndexError):
             msg = "Format \"%s\" is not supported. Supported types: %s"
             raise TypeError(msg % (format, ', '.join(eps)))
-    # file format should be known by now
-    try:
-        # search readFormat for given entry point
-        read_format = buffered_load_entry_point(
-            format_ep.dist.key,
-            'obspy.plugin.%s.%s' % (plugin_type, format_ep.name),
-            'readFormat')
-    except ImportError:
-        msg = "Format \"%s\" is not supported. Supported types: %s"
-        raise TypeError(msg % (format_ep.name, ', '.join(eps)))
-    # read
-    list_obj = read_format(filename, **kwargs)
-    return list_obj, format_ep.name
+    return format_ep
 
 
 def get_script_dir_name():
@@ -496,6 +506,7 @@ def make_format_plugin_table(group="waveform", method="read", numspaces=4,
     KML       :mod:`obspy.io.kml` :func:`obspy.io.kml.core._write_kml`
     NLLOC_OBS :mod:`...io.nlloc` :func:`obspy.io.nlloc.core.write_nlloc_obs`
     NORDIC    :mod:`obspy.io.nordic` :func:`obspy.io.nordic.core.write_select`
+    OBSPYBIN  :mod:`...io.obspybin` :func:`..._write_obspybin_catalog`
     QUAKEML :mod:`...io.quakeml` :func:`obspy.io.quakeml.core._write_quakeml`
     SC3ML   :mod:`...io.seiscomp` :func:`obspy.io.seiscomp.event._write_sc3ml`
     SCARDEC   :mod:`obspy.io.scardec`
@@ -11,9 +11,10 @@ Various additional utilities for ObsPy.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
-from future.utils import PY2
+from future.utils import PY2, native_str
 
 import contextlib
+import gc
 import inspect
 import io
 import itertools
@@ -450,6 +451,23 @@ def TemporaryWorkingDirectory():  # noqa --> this name is IMHO ok for a CM
             warnings.warn(e.__repr__())
 
 
+@contextlib.contextmanager
+def _gc_paused():
+    """
+    A context manager that pauses the cyclic garbage collector.
+
+    Creating a large number of objects triggers many collections otherwise,
+    which take about as long as creating the objects.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
 def factorize_int(x):
     """
     Calculate prime factorization of integer.
@@ -726,34 +744,39 @@ def _yield_resource_id_parent_attr(obj):
     Specialized form of _yield_obj_parent_attr for getting ResourceIdentifiers.
 
     This function makes some assumptions because only resource_identifiers are
-    being sought in order to improve efficiency.
+    being sought in order to improve efficiency. The objects are traversed
+    depth first with an explicit stack, values that cannot contain resource
+    identifiers are skipped.
     """
     from obspy.core.event import ResourceIdentifier
+    from obspy.core.event.base import QuantityError
+    from obspy.core.utcdatetime import UTCDateTime
 
+    skip_types = (str, native_str, bytes, int, float, UTCDateTime,
+                  QuantityError)
     ids = set()  # id cache to avoid circular references
+    stack = [(obj, None, None)]
 
-    def func(obj, parent=None, attr=None):
-        if obj is None or not (hasattr(obj, '__dict__') or
-                               isinstance(obj, (list, tuple))):
-            return  # stop iteration
+    while stack:
+        obj, parent, attr = stack.pop()
+        if obj is None or isinstance(obj, skip_types):
+            continue
+        is_sequence = isinstance(obj, (list, tuple))
+        if not (is_sequence or hasattr(obj, '__dict__')):
+            continue
         id_tuple = (id(obj), id(parent))
-        if id_tuple not in ids:
-            ids.add(id_tuple)
-            # Yield object, parent, and attr if desired conditions are met
-            if isinstance(obj, ResourceIdentifier):
-                yield (obj, parent, attr)
-            # Iterate through basic built-in types.
-            elif isinstance(obj, (list, tuple)):
-                for val in obj:
-                    for out in func(val, obj, attr):
-                        yield out
-            # Iterate through non built-in object attributes.
-            elif hasattr(obj, '__dict__'):
-                for item, val in obj.__dict__.items():
-                    for out in func(val, obj, item):
-                        yield out
-
-    return func(obj)
+        if id_tuple in ids:
+            continue
+        ids.add(id_tuple)
+        # Yield object, parent, and attr if desired conditions are met
+        if isinstance(obj, ResourceIdentifier):
+            yield (obj, parent, attr)
+        # Push items in reversed order to keep the order of the recursion.
+        elif is_sequence:
+            stack.extend((val, obj, attr) for val in reversed(obj))
+        else:
+            items = list(obj.__dict__.items())
+            stack.extend((val, obj, item) for item, val in reversed(items))
 
 
 def _seed_id_map(
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for writing XML documents with lxml shared by several I/O plugins.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+from lxml import etree
+
+
+def _write_indented(xf, element, level):
+    """
+    Write an element to an :class:`lxml.etree.xmlfile` indented like in a
+    pretty printed document at the given nesting level.
+    """
+    if hasattr(etree, "indent"):
+        # lxml >= 4.5
+        etree.indent(element, level=level)
+    else:
+        _indent(element, level)
+    element.tail = None
+    xf.write("\n" + "  " * level)
+    xf.write(element)
+
+
+def _indent(element, level):
+    """
+    Indent the children of an element like lxml's pretty printing does,
+    elements with text content are left alone.
+    """
+    children = list(element)
+    if not children or element.text or any(child.tail for child in children):
+        return
+    indentation = "\n" + "  " * (level + 1)
+    element.text = indentation
+    for child in children:
+        _indent(child, level + 1)
+        child.tail = indentation
+    children[-1].tail = "\n" + "  " * level
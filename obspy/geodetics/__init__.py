@@ -13,8 +13,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
 
-from .base import (calc_vincenty_inverse, degrees2kilometers,
-                   gps2dist_azimuth, inside_geobounds,
+from .base import (calc_vincenty_direct, calc_vincenty_inverse,
+                   calc_vincenty_inverse_many, degrees2kilometers,
+                   gps2dist_azimuth, gps2dist_azimuth_many, inside_geobounds,
                    kilometer2degrees, kilometers2degrees, locations2degrees)
 from .flinnengdahl import FlinnEngdahl
 
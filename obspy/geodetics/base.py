@@ -285,6 +285,315 @@ def gps2dist_azimuth(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
             raise e
 
 
+def _vincenty_sigma(dlon, sin_u1, cos_u1, sin_u2, cos_u2, f):
+    """
+    Terms of Vincenty's inverse formulae for given longitude differences on
+    the auxiliary sphere.
+    """
+    sin_dlon, cos_dlon = np.sin(dlon), np.cos(dlon)
+    sin_sigma = np.sqrt(
+        (cos_u2 * sin_dlon) ** 2 +
+        (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_dlon) ** 2)
+    cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_dlon
+    sigma = np.arctan2(sin_sigma, cos_sigma)
+    sin_alpha = np.where(sin_sigma == 0, 0.0,
+                         cos_u1 * cos_u2 * sin_dlon / sin_sigma)
+    sqr_cos_alpha = 1 - sin_alpha * sin_alpha
+    # equatorial lines have cos(alpha) == 0
+    cos2sigma_m = np.where(sqr_cos_alpha == 0, 0.0,
+                           cos_sigma - 2 * sin_u1 * sin_u2 / sqr_cos_alpha)
+    return (sin_dlon, cos_dlon, sin_sigma, cos_sigma, sigma, sin_alpha,
+            sqr_cos_alpha, cos2sigma_m)
+
+
+def _vincenty_inverse_arrays(lat1, lon1, lat2, lon2, a, f,
+                             chunk_size=32768):
+    """
+    Vectorized Vincenty inverse solution, returns arrays of distance and
+    both azimuths (NaN where the iteration does not converge).
+
+    Points are processed in chunks small enough for the temporary arrays to
+    stay in the CPU cache.
+    """
+    lat1, lon1, lat2, lon2 = np.broadcast_arrays(
+        *[np.asarray(x, dtype=np.float64) for x in (lat1, lon1, lat2, lon2)])
+    for lat, name in ((lat1, 'lat1'), (lat2, 'lat2')):
+        if np.any(np.abs(lat) > 90):
+            msg = '{} out of bounds! (-90 <= {} <=90)'.format(name, name)
+            raise ValueError(msg)
+    shape = lat1.shape
+    lat1, lon1, lat2, lon2 = [x.ravel() for x in (lat1, lon1, lat2, lon2)]
+    results = [np.empty(lat1.size) for _ in range(3)]
+    for i in range(0, lat1.size, chunk_size):
+        chunk = slice(i, i + chunk_size)
+        for result, values in zip(results, _vincenty_inverse_flat(
+                lat1[chunk], lon1[chunk], lat2[chunk], lon2[chunk], a, f)):
+            result[chunk] = values
+    return tuple(result.reshape(shape) for result in results)
+
+
+def _vincenty_inverse_flat(lat1, lon1, lat2, lon2, a, f, maxiter=200):
+    """
+    Vincenty inverse solution for one-dimensional arrays of points.
+    """
+    b = a * (1 - f)
+    # longitude difference in -pi to pi range
+    omega = np.radians((lon2 - lon1 + 180.0) % 360.0 - 180.0)
+    u_1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    u_2 = np.arctan((1 - f) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u_1), np.cos(u_1)
+    sin_u2, cos_u2 = np.sin(u_2), np.cos(u_2)
+
+    dlon = omega.copy()
+    # indices of points that did not converge yet, only these are iterated
+    active = np.arange(dlon.size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(maxiter):
+            if not active.size:
+                break
+            _, _, sin_sigma, cos_sigma, sigma, sin_alpha, sqr_cos_alpha, \
+                cos2sigma_m = _vincenty_sigma(
+                    dlon[active], sin_u1[active], cos_u1[active],
+                    sin_u2[active], cos_u2[active], f)
+            c = (f / 16) * sqr_cos_alpha * (4 + f * (4 - 3 * sqr_cos_alpha))
+            new_dlon = omega[active] + (1 - c) * f * sin_alpha * (
+                sigma + c * sin_sigma * (
+                    cos2sigma_m + c * cos_sigma *
+                    (-1 + 2 * cos2sigma_m ** 2)))
+            converged = np.abs(new_dlon - dlon[active]) < 1e-12
+            dlon[active] = new_dlon
+            active = active[~converged]
+
+        sin_dlon, cos_dlon, sin_sigma, cos_sigma, sigma, _, sqr_cos_alpha, \
+            cos2sigma_m = _vincenty_sigma(dlon, sin_u1, cos_u1, sin_u2,
+                                          cos_u2, f)
+        u2 = sqr_cos_alpha * (a * a - b * b) / (b * b)
+        _a = 1 + (u2 / 16384) * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+        _b = (u2 / 1024) * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+        delta_sigma = _b * sin_sigma * (
+            cos2sigma_m + (_b / 4) * (
+                cos_sigma * (-1 + 2 * cos2sigma_m ** 2) - (_b / 6) *
+                cos2sigma_m * (-3 + 4 * sin_sigma ** 2) *
+                (-3 + 4 * cos2sigma_m ** 2)))
+        dist = b * _a * (sigma - delta_sigma)
+        alpha12 = np.arctan2(
+            cos_u2 * sin_dlon, cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_dlon)
+        alpha21 = np.arctan2(
+            cos_u1 * sin_dlon, -sin_u1 * cos_u2 + cos_u1 * sin_u2 * cos_dlon)
+    alpha12 = np.degrees(alpha12) % 360.0
+    alpha21 = (np.degrees(alpha21) + 180.0) % 360.0
+
+    # diverging iterations for nearly antipodal points
+    failed = (np.abs(dlon) > np.pi) | np.isnan(dist)
+    failed[active] = True
+    identical = (np.isclose(lat1, lat2, rtol=1e-9, atol=0) &
+                 np.isclose(lon1, lon2, rtol=1e-9, atol=0))
+    failed &= ~identical
+    for values in (dist, alpha12, alpha21):
+        values[failed] = np.nan
+        values[identical] = 0.0
+    return dist, alpha12, alpha21
+
+
+def calc_vincenty_inverse_many(lat1, lon1, lat2, lon2, a=WGS84_A,
+                               f=WGS84_F):
+    """
+    Vectorized Vincenty Inverse Solution of Geodesics on the Ellipsoid.
+
+    Same as :func:`calc_vincenty_inverse`, but for arrays of points.
+    Coordinates are broadcast against each other, so the distances from one
+    point to many points (one-to-many) or a full distance matrix
+    (many-to-many, e.g. ``lat1[:, None]`` and ``lat2[None, :]``) can be
+    computed in one call. All points are iterated at once with numpy, which
+    is orders of magnitude faster than looping over
+    :func:`calc_vincenty_inverse` (a distance matrix of 1000 x 10000 points
+    takes a few seconds).
+
+    >>> import numpy as np
+    >>> from obspy.geodetics import calc_vincenty_inverse_many
+    >>> dist, az, baz = calc_vincenty_inverse_many(
+    ...     0, 0, [10, 20], np.array([[5], [10]]))
+    >>> dist.shape
+    (2, 2)
+    >>> for values in zip(dist.ravel(), az.ravel(), baz.ravel()):
+    ...     print("%.1f %.3f %.3f" % values)
+    1236762.9 26.455 206.892
+    2278541.3 13.552 194.434
+    1565109.1 44.752 225.629
+    2466421.1 25.652 207.419
+
+    :param lat1: Latitude(s) of point A in degrees (positive for northern,
+        negative for southern hemisphere)
+    :type lat1: float or :class:`numpy.ndarray`
+    :param lon1: Longitude(s) of point A in degrees (positive for eastern,
+        negative for western hemisphere)
+    :type lon1: float or :class:`numpy.ndarray`
+    :param lat2: Latitude(s) of point B in degrees (positive for northern,
+        negative for southern hemisphere)
+    :type lat2: float or :class:`numpy.ndarray`
+    :param lon2: Longitude(s) of point B in degrees (positive for eastern,
+        negative for western hemisphere)
+    :type lon2: float or :class:`numpy.ndarray`
+    :param a: Radius of Earth in m. Uses the value for WGS84 by default.
+    :param f: Flattening of Earth. Uses the value for WGS84 by default.
+    :return: Arrays of (great circle distance in m, azimuth A->B in degrees,
+        azimuth B->A in degrees). Values are NaN for nearly antipodal points
+        for which the iteration does not converge (see
+        :func:`gps2dist_azimuth_many` for a function handling these
+        points).
+    :rtype: tuple of three :class:`numpy.ndarray`
+    """
+    return _vincenty_inverse_arrays(lat1, lon1, lat2, lon2, a, f)
+
+
+def calc_vincenty_direct(lat1, lon1, azimuth, distance, a=WGS84_A,
+                         f=WGS84_F):
+    """
+    Vincenty Direct Solution of Geodesics on the Ellipsoid.
+
+    Computes the position of the point at a given distance and azimuth from
+    a starting point and the azimuth back to the starting point. All
+    arguments can be arrays, which are broadcast against each other (e.g.
+    points along a great circle or at a given distance in all directions).
+
+    >>> from obspy.geodetics import (calc_vincenty_direct,
+    ...                              calc_vincenty_inverse_many)
+    >>> dist, az, baz = calc_vincenty_inverse_many(0, 0, 10, [5, 10])
+    >>> lat2, lon2, baz2 = calc_vincenty_direct(0, 0, az, dist)
+    >>> for values in zip(lat2, lon2, baz2):
+    ...     print("%.6f %.6f %.3f" % values)
+    10.000000 5.000000 206.892
+    10.000000 10.000000 225.629
+
+    :param lat1: Latitude(s) of starting point in degrees
+    :type lat1: float or :class:`numpy.ndarray`
+    :param lon1: Longitude(s) of starting point in degrees
+    :type lon1: float or :class:`numpy.ndarray`
+    :param azimuth: Azimuth(s) at the starting point in degrees
+    :type azimuth: float or :class:`numpy.ndarray`
+    :param distance: Distance(s) along the geodesic in m
+    :type distance: float or :class:`numpy.ndarray`
+    :param a: Radius of Earth in m. Uses the value for WGS84 by default.
+    :param f: Flattening of Earth. Uses the value for WGS84 by default.
+    :return: Arrays of (latitude of end point in degrees, longitude of end
+        point in degrees in -180 to 180 range, azimuth from end point back to
+        starting point in degrees)
+    :rtype: tuple of three :class:`numpy.ndarray`
+    """
+    lat1, lon1, azimuth, distance = [
+        np.array(x, dtype=np.float64) for x in
+        np.broadcast_arrays(lat1, lon1, azimuth, distance)]
+    if np.any(np.abs(lat1) > 90):
+        raise ValueError('lat1 out of bounds! (-90 <= lat1 <=90)')
+    b = a * (1 - f)
+    alpha1 = np.radians(azimuth)
+    sin_alpha1, cos_alpha1 = np.sin(alpha1), np.cos(alpha1)
+    u_1 = np.arctan((1 - f) * np.tan(np.radians(lat1)))
+    sin_u1, cos_u1 = np.sin(u_1), np.cos(u_1)
+    sigma1 = np.arctan2(np.tan(u_1), cos_alpha1)
+    sin_alpha = cos_u1 * sin_alpha1
+    sqr_cos_alpha = 1 - sin_alpha * sin_alpha
+    u2 = sqr_cos_alpha * (a * a - b * b) / (b * b)
+    _a = 1 + (u2 / 16384) * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    _b = (u2 / 1024) * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+
+    sigma = distance / (b * _a)
+    for _ in range(200):
+        cos2sigma_m = np.cos(2 * sigma1 + sigma)
+        sin_sigma, cos_sigma = np.sin(sigma), np.cos(sigma)
+        delta_sigma = _b * sin_sigma * (
+            cos2sigma_m + (_b / 4) * (
+                cos_sigma * (-1 + 2 * cos2sigma_m ** 2) - (_b / 6) *
+                cos2sigma_m * (-3 + 4 * sin_sigma ** 2) *
+                (-3 + 4 * cos2sigma_m ** 2)))
+        last_sigma = sigma
+        sigma = distance / (b * _a) + delta_sigma
+        if np.all(np.abs(sigma - last_sigma) < 1e-12):
+            break
+    sin_sigma, cos_sigma = np.sin(sigma), np.cos(sigma)
+    cos2sigma_m = np.cos(2 * sigma1 + sigma)
+
+    tmp = sin_u1 * sin_sigma - cos_u1 * cos_sigma * cos_alpha1
+    lat2 = np.arctan2(
+        sin_u1 * cos_sigma + cos_u1 * sin_sigma * cos_alpha1,
+        (1 - f) * np.sqrt(sin_alpha * sin_alpha + tmp * tmp))
+    dlon = np.arctan2(sin_sigma * sin_alpha1,
+                      cos_u1 * cos_sigma - sin_u1 * sin_sigma * cos_alpha1)
+    c = (f / 16) * sqr_cos_alpha * (4 + f * (4 - 3 * sqr_cos_alpha))
+    dlon = dlon - (1 - c) * f * sin_alpha * (
+        sigma + c * sin_sigma * (
+            cos2sigma_m + c * cos_sigma * (-1 + 2 * cos2sigma_m ** 2)))
+    lon2 = (lon1 + np.degrees(dlon) + 180.0) % 360.0 - 180.0
+    alpha2 = np.arctan2(sin_alpha, -tmp)
+    baz = (np.degrees(alpha2) + 180.0) % 360.0
+    return np.degrees(lat2), lon2, baz
+
+
+def gps2dist_azimuth_many(lat1, lon1, lat2, lon2, a=WGS84_A, f=WGS84_F):
+    """
+    Vectorized version of :func:`gps2dist_azimuth`.
+
+    Uses :func:`calc_vincenty_inverse_many` for all points. Nearly antipodal
+    points for which Vincenty's formulae do not converge are computed with
+    `geographiclib <http://geographiclib.sf.net>`_ (Karney's algorithm) if
+    it is installed, otherwise a warning is shown and the same fallback
+    values as in :func:`gps2dist_azimuth` are used.
+
+    >>> import numpy as np
+    >>> from obspy.geodetics import gps2dist_azimuth_many
+    >>> event_lats = np.array([10.0, -30.0])
+    >>> event_lons = np.array([20.0, 150.0])
+    >>> station_lats = np.array([48.2, 35.0, 0.0])
+    >>> station_lons = np.array([11.3, 139.0, -70.0])
+    >>> dist, az, baz = gps2dist_azimuth_many(
+    ...     event_lats[:, None], event_lons[:, None],
+    ...     station_lats[None, :], station_lons[None, :])
+    >>> print(dist.shape)
+    (2, 3)
+    >>> for row in dist:
+    ...     print(" ".join("%.1f" % (value / 1e3) for value in row))
+    4312.6 11906.5 10018.3
+    15980.8 7286.7 14641.4
+
+    :param lat1: Latitude(s) of point A in degrees
+    :type lat1: float or :class:`numpy.ndarray`
+    :param lon1: Longitude(s) of point A in degrees
+    :type lon1: float or :class:`numpy.ndarray`
+    :param lat2: Latitude(s) of point B in degrees
+    :type lat2: float or :class:`numpy.ndarray`
+    :param lon2: Longitude(s) of point B in degrees
+    :type lon2: float or :class:`numpy.ndarray`
+    :param a: Radius of Earth in m. Uses the value for WGS84 by default.
+    :param f: Flattening of Earth. Uses the value for WGS84 by default.
+    :return: Arrays of (great circle distance in m, azimuth A->B in degrees,
+        azimuth B->A in degrees), broadcast shape of the inputs.
+    :rtype: tuple of three :class:`numpy.ndarray`
+    """
+    dist, az, baz = _vincenty_inverse_arrays(lat1, lon1, lat2, lon2, a, f)
+    failed = np.isnan(dist)
+    if failed.any():
+        lat1, lon1, lat2, lon2 = np.broadcast_arrays(lat1, lon1, lat2, lon2)
+        if HAS_GEOGRAPHICLIB:
+            geod = Geodesic(a=a, f=f)
+            for index in zip(*np.nonzero(failed)):
+                result = geod.Inverse(lat1[index], lon1[index], lat2[index],
+                                      lon2[index])
+                dist[index] = result['s12']
+                az[index] = result['azi1'] % 360
+                baz[index] = result['azi2'] + 180
+        else:
+            msg = ("Catching unstable calculation on antipodes. "
+                   "The currently used Vincenty's Inverse formulae "
+                   "has known limitations for two nearly antipodal points. "
+                   "Install the Python module 'geographiclib' to solve this "
+                   "issue.")
+            warnings.warn(msg)
+            dist[failed] = 20004314.5
+            az[failed] = 0.0
+            baz[failed] = 0.0
+    return dist, az, baz
+
+
 def kilometers2degrees(kilometer, radius=6371):
     """
     Convenience function to convert kilometers to degrees assuming a perfectly
@@ -8,9 +8,11 @@ import unittest
 import warnings
 import numpy as np
 
-from obspy.geodetics import (calc_vincenty_inverse, degrees2kilometers,
-                             gps2dist_azimuth, inside_geobounds,
-                             kilometer2degrees, locations2degrees)
+from obspy.geodetics import (calc_vincenty_direct, calc_vincenty_inverse,
+                             calc_vincenty_inverse_many, degrees2kilometers,
+                             gps2dist_azimuth, gps2dist_azimuth_many,
+                             inside_geobounds, kilometer2degrees,
+                             locations2degrees)
 from obspy.geodetics.base import HAS_GEOGRAPHICLIB
 from obspy.core import AttribDict
 
@@ -178,6 +180,117 @@ class UtilGeodeticsTestCase(unittest.TestCase):
         self.assertAlmostEqual(azi1, calc_azi1, 5)
         self.assertAlmostEqual(bazi, calc_bazi, 5)
 
+    def test_calc_vincenty_inverse_many(self):
+        """
+        Test vectorized Vincenty inverse against the scalar version.
+        """
+        rng = np.random.RandomState(815)
+        lat1, lat2 = rng.uniform(-90, 90, (2, 500))
+        lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+        # some special cases: identical points, equator, meridian, poles,
+        # longitudes out of -180 to 180 range
+        lat1[:6] = [10.0, 0.0, 0.0, 30.0, 90.0, 10.0]
+        lon1[:6] = [20.0, 0.0, 10.0, 40.0, 0.0, 350.0]
+        lat2[:6] = [10.0, 0.0, 50.0, -30.0, -20.0, 10.0]
+        lon2[:6] = [20.0, 40.0, 10.0, 40.0, 30.0, -5.0]
+        dist, az, baz = calc_vincenty_inverse_many(lat1, lon1, lat2, lon2)
+        self.assertEqual(dist.shape, (500, ))
+        for i in range(500):
+            try:
+                expected = calc_vincenty_inverse(lat1[i], lon1[i], lat2[i],
+                                                 lon2[i])
+            except StopIteration:
+                self.assertTrue(np.isnan(dist[i]))
+                continue
+            # scalar version iterates with a relative tolerance of 1e-9
+            self.assertAlmostEqual(dist[i], expected[0], delta=0.05)
+            for got, exp in ((az[i], expected[1]), (baz[i], expected[2])):
+                self.assertAlmostEqual((got - exp + 180) % 360 - 180, 0, 5)
+        self.assertEqual([dist[0], az[0], baz[0]], [0.0, 0.0, 0.0])
+        # nearly antipodal points do not converge
+        dist, az, baz = calc_vincenty_inverse_many(0, 0, 0.5, 179.7)
+        self.assertTrue(np.isnan(dist) and np.isnan(az) and np.isnan(baz))
+        # one-to-many and many-to-many
+        dist, _, _ = calc_vincenty_inverse_many(
+            lat1[:3, None], lon1[:3, None], lat2[None, :4], lon2[None, :4])
+        self.assertEqual(dist.shape, (3, 4))
+        self.assertAlmostEqual(
+            dist[1, 2], calc_vincenty_inverse(lat1[1], lon1[1], lat2[2],
+                                              lon2[2])[0], delta=0.05)
+        # row "C" of table II of Vincenty's paper
+        dist, az, baz = calc_vincenty_inverse_many(
+            [dms2dec(35.0, 16.0, 11.24862)], 0.0,
+            dms2dec(67.0, 22.0, 14.77638), dms2dec(137.0, 47.0, 28.31435),
+            a=6378388.000, f=1.0 / 297.0)
+        self.assertAlmostEqual(dist[0], 8084823.839, 2)
+        self.assertAlmostEqual(az[0], dms2dec(15.0, 44.0, 23.74850), 5)
+        self.assertAlmostEqual(baz[0], dms2dec(144.0, 55.0, 39.92147) + 180,
+                               5)
+        self.assertRaises(ValueError, calc_vincenty_inverse_many,
+                          [0, 91], 0, 0, 0)
+
+    def test_calc_vincenty_direct(self):
+        """
+        Test Vincenty direct against table II of Vincenty's paper and as
+        inverse of Vincenty inverse.
+        """
+        # rows "B" and "C"
+        lat2, lon2, baz = calc_vincenty_direct(
+            [dms2dec(37.0, 19.0, 54.95367), dms2dec(35.0, 16.0, 11.24862)],
+            0.0,
+            [dms2dec(95.0, 27.0, 59.63089), dms2dec(15.0, 44.0, 23.74850)],
+            [4085966.703, 8084823.839], a=6378388.000, f=1.0 / 297.0)
+        np.testing.assert_allclose(
+            lat2, [dms2dec(26.0, 7.0, 42.83946), dms2dec(67.0, 22.0,
+                                                         14.77638)],
+            rtol=0, atol=1e-8)
+        np.testing.assert_allclose(
+            lon2, [dms2dec(41.0, 28.0, 35.50729), dms2dec(137.0, 47.0,
+                                                          28.31435)],
+            rtol=0, atol=1e-8)
+        np.testing.assert_allclose(
+            baz, [dms2dec(118, 5.0, 58.96161) + 180,
+                  dms2dec(144.0, 55.0, 39.92147) + 180], rtol=0, atol=1e-8)
+        # roundtrip
+        rng = np.random.RandomState(815)
+        lat1 = rng.uniform(-89, 89, 200)
+        lon1 = rng.uniform(-180, 180, 200)
+        azimuth = rng.uniform(0, 360, 200)
+        distance = rng.uniform(0, 19e6, 200)
+        lat2, lon2, baz = calc_vincenty_direct(lat1, lon1, azimuth, distance)
+        self.assertTrue(np.all(np.abs(lon2) <= 180))
+        dist, az, baz2 = calc_vincenty_inverse_many(lat1, lon1, lat2, lon2)
+        ok = ~np.isnan(dist)
+        self.assertGreater(ok.sum(), 190)
+        np.testing.assert_allclose(dist[ok], distance[ok], rtol=0, atol=1e-3)
+        np.testing.assert_allclose(
+            (az[ok] - azimuth[ok] + 180) % 360 - 180, 0, rtol=0, atol=1e-8)
+        np.testing.assert_allclose(
+            (baz2[ok] - baz[ok] + 180) % 360 - 180, 0, rtol=0, atol=1e-8)
+
+    def test_gps2dist_azimuth_many(self):
+        """
+        Test vectorized gps2dist_azimuth against the scalar version.
+        """
+        lat1 = np.array([[10.0], [-30.0], [0.0]])
+        lon1 = np.array([[20.0], [150.0], [0.0]])
+        lat2 = np.array([48.2, 35.0, 0.0, 0.5])
+        lon2 = np.array([11.3, 139.0, -70.0, 179.7])
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            dist, az, baz = gps2dist_azimuth_many(lat1, lon1, lat2, lon2)
+            expected = [[gps2dist_azimuth(lat1[i, 0], lon1[i, 0], lat2[j],
+                                          lon2[j]) for j in range(4)]
+                        for i in range(3)]
+        if not HAS_GEOGRAPHICLIB:
+            self.assertEqual(len(w), 2)
+        self.assertEqual(dist.shape, (3, 4))
+        expected = np.array(expected)
+        np.testing.assert_allclose(dist, expected[:, :, 0], rtol=0,
+                                   atol=0.05)
+        np.testing.assert_allclose(az, expected[:, :, 1], rtol=0, atol=1e-6)
+        np.testing.assert_allclose(baz, expected[:, :, 2], rtol=0, atol=1e-6)
+
     @unittest.skipIf(HAS_GEOGRAPHICLIB, 'Module geographiclib is installed, '
                                         'not using calc_vincenty_inverse')
     def test_gps_2_dist_azimuth_bug150(self):
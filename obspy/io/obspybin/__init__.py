@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+obspy.io.obspybin - Binary cache format for ObsPy
+=================================================
+
+OBSPYBIN is a compact binary format for quickly storing and reloading ObsPy
+objects, e.g. to cache a large inventory or a catalog with millions of picks
+between runs of short-lived processes instead of parsing StationXML or QuakeML
+again every time. It does not use
+:mod:`pickle`, so files can be read safely and independently of the Python
+and ObsPy versions that wrote them.
+
+Files consist of a small JSON header followed by a number of aligned
+:class:`numpy.ndarray` columns, which can optionally be memory-mapped.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+
+Usage Example
+-------------
+
+Inventories are written and read with the regular ObsPy functions:
+
+>>> from obspy import read_inventory
+>>> from obspy.core.util import NamedTemporaryFile
+>>> inv = read_inventory()
+>>> with NamedTemporaryFile(suffix=".bin") as tf:
+...     inv.write(tf.name, format="OBSPYBIN")
+...     inv2 = read_inventory(tf.name)
+>>> inv2 == inv
+True
+
+Catalogs work the same way:
+
+>>> from obspy import read_events
+>>> cat = read_events()
+>>> with NamedTemporaryFile(suffix=".bin") as tf:
+...     cat.write(tf.name, format="OBSPYBIN")
+...     cat2 = read_events(tf.name)
+>>> cat2 == cat
+True
+
+See :func:`obspy.io.obspybin.inventory._read_obspybin_inventory` and
+:func:`obspy.io.obspybin.event._read_obspybin_catalog` for additional options
+when reading.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod(exclude_empty=True)
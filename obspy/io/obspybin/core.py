@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+OBSPYBIN container functions used for all kinds of objects.
+
+A file starts with the magic bytes ``OBSPYBIN``, the format version (uint32)
+and the length (uint64) of a UTF-8 encoded JSON header, all little endian.
+The header describes the kind of stored object, some metadata and the
+arrays that follow it. Every array starts at a multiple of 64 bytes after
+the end of the header.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import json
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from obspy import UTCDateTime
+from obspy.core.event import ResourceIdentifier
+
+
+MAGIC = b"OBSPYBIN"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct(native_str("<8sIQ"))
+_ALIGNMENT = 64
+
+
+def _is_obspybin(path_or_file_object, kind=None):
+    """
+    Check whether a file is an OBSPYBIN file.
+
+    :param path_or_file_object: File name or file like object.
+    :type kind: str
+    :param kind: If given, additionally check that the file contains this
+        kind of object (e.g. ``"inventory"``).
+    :rtype: bool
+    """
+    if hasattr(path_or_file_object, "read"):
+        position = path_or_file_object.tell()
+        try:
+            header = _read_header(path_or_file_object)
+        except Exception:
+            return False
+        finally:
+            path_or_file_object.seek(position, 0)
+    else:
+        try:
+            with open(path_or_file_object, "rb") as fh:
+                header = _read_header(fh)
+        except Exception:
+            return False
+    return kind is None or header["kind"] == kind
+
+
+def _read_header(fh):
+    """
+    Read the header of an OBSPYBIN file and return it as a dictionary.
+
+    The file position is left at the end of the header.
+    """
+    magic, version, length = _PREAMBLE.unpack(fh.read(_PREAMBLE.size))
+    if magic != MAGIC:
+        raise ValueError("Not an OBSPYBIN file.")
+    if version > FORMAT_VERSION:
+        msg = ("OBSPYBIN file has format version %d, only versions up to %d "
+               "can be read.") % (version, FORMAT_VERSION)
+        raise ValueError(msg)
+    header = json.loads(fh.read(length).decode("utf-8"))
+    header["header_end"] = _PREAMBLE.size + length
+    header["data_offset"] = _aligned(header["header_end"])
+    return header
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _write_container(path_or_file_object, kind, metadata, arrays):
+    """
+    Write an OBSPYBIN file.
+
+    :param path_or_file_object: File name or file like object.
+    :type kind: str
+    :param kind: Kind of the stored object.
+    :type metadata: dict
+    :param metadata: JSON serializable metadata.
+    :type arrays: dict of :class:`numpy.ndarray`
+    :param arrays: Arrays to store.
+    """
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        arrays[name] = array
+        specs[name] = {"dtype": array.dtype.str, "shape": array.shape,
+                       "offset": offset}
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"kind": kind, "metadata": metadata,
+                         "arrays": specs}, sort_keys=True).encode("utf-8")
+    if hasattr(path_or_file_object, "write"):
+        fh = path_or_file_object
+    else:
+        fh = open(path_or_file_object, "wb")
+    try:
+        fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        fh.write(header)
+        start = _aligned(_PREAMBLE.size + len(header))
+        position = _PREAMBLE.size + len(header)
+        for name in sorted(arrays, key=lambda x: specs[x]["offset"]):
+            fh.write(b"\x00" * (start + specs[name]["offset"] - position))
+            fh.write(arrays[name].tobytes())
+            position = start + specs[name]["offset"] + arrays[name].nbytes
+    finally:
+        if fh is not path_or_file_object:
+            fh.close()
+
+
+def _read_container(path_or_file_object, mmap=False):
+    """
+    Read an OBSPYBIN file.
+
+    :param path_or_file_object: File name or file like object.
+    :type mmap: bool
+    :param mmap: Memory-map the file instead of reading it into memory
+        (only possible for file names).
+    :rtype: tuple
+    :returns: Kind of the stored object, metadata and dictionary of arrays.
+    """
+    if hasattr(path_or_file_object, "read"):
+        header = _read_header(path_or_file_object)
+        # skip padding between header and data
+        data = path_or_file_object.read()[
+            header["data_offset"] - header["header_end"]:]
+        data = np.frombuffer(data, dtype=np.uint8)
+    elif mmap:
+        with open(path_or_file_object, "rb") as fh:
+            header = _read_header(fh)
+        data = np.memmap(path_or_file_object, dtype=np.uint8, mode="r",
+                         offset=header["data_offset"])
+    else:
+        with open(path_or_file_object, "rb") as fh:
+            header = _read_header(fh)
+            fh.seek(header["data_offset"], 0)
+            data = np.frombuffer(fh.read(), dtype=np.uint8)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(native_str(spec["dtype"]))
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        array = data[spec["offset"]:spec["offset"] + count * dtype.itemsize]
+        arrays[name] = array.view(dtype).reshape(spec["shape"])
+    return header["kind"], header["metadata"], arrays
+
+
+class _Table(object):
+    """
+    Table of unique strings or binary blobs stored as two arrays, the
+    concatenated data and the offsets of all items (with one more entry than
+    items). Items are referenced by their index, ``-1`` stands for ``None``.
+
+    Blobs are compressed individually with zlib.
+    """
+    def __init__(self, compress=False):
+        self.compress = compress
+        self.items = []
+        self._indices = {}
+
+    def add(self, item):
+        """
+        Add an item if not yet in the table and return its index.
+        """
+        if item is None:
+            return -1
+        try:
+            return self._indices[item]
+        except KeyError:
+            index = len(self.items)
+            self._indices[item] = index
+            self.items.append(item)
+            return index
+
+    def to_arrays(self, name, arrays):
+        """
+        Add data and offset arrays of the table to a dictionary of arrays.
+        """
+        if self.compress:
+            items = [zlib.compress(item) for item in self.items]
+        else:
+            items = [item.encode("utf-8") for item in self.items]
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(item) for item in items])
+        arrays[name + "_data"] = np.frombuffer(b"".join(items),
+                                               dtype=np.uint8)
+        arrays[name + "_offsets"] = offsets
+
+    @staticmethod
+    def strings_from_arrays(name, arrays):
+        """
+        Return all strings of a table.
+
+        :rtype: list of str
+        """
+        data = arrays[name + "_data"].tobytes()
+        offsets = arrays[name + "_offsets"].tolist()
+        return [data[start:end].decode("utf-8")
+                for start, end in zip(offsets[:-1], offsets[1:])]
+
+    @staticmethod
+    def blobs_from_arrays(name, arrays):
+        """
+        Return (views of) the compressed data of all blobs of a table, use
+        :func:`_decompress` to get the original data.
+
+        :rtype: list of :class:`numpy.ndarray`
+        """
+        data = arrays[name + "_data"]
+        offsets = arrays[name + "_offsets"].tolist()
+        return [data[start:end]
+                for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _decompress(blob):
+    """
+    Return the original data of a blob.
+
+    :type blob: :class:`numpy.ndarray`
+    :rtype: bytes
+    """
+    return zlib.decompress(blob.tobytes())
+
+
+_SIMPLE_TYPES = (str, native_str, bytes, int, bool)
+
+
+def _equal(a, b):
+    """
+    Check whether two objects are identical including all attributes of
+    numbers with uncertainties, precision of times etc.
+
+    Resource identifiers are compared by their id only.
+    """
+    if a is b:
+        return True
+    if type(a) is not type(b):
+        return False
+    if type(a) in _SIMPLE_TYPES:
+        return a == b
+    if isinstance(a, UTCDateTime):
+        return a.ns == b.ns and a.precision == b.precision
+    if isinstance(a, ResourceIdentifier):
+        return a.id == b.id
+    if isinstance(a, float):
+        if a != b and not (math.isnan(a) and math.isnan(b)):
+            return False
+        return _equal(getattr(a, "__dict__", {}), getattr(b, "__dict__", {}))
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(map(_equal, a, b))
+    if isinstance(a, dict):
+        if len(a) != len(b):
+            return False
+        for key, value in a.items():
+            if key not in b:
+                return False
+            other = b[key]
+            # inlined fast path of the most common cases
+            if value is other:
+                continue
+            if type(value) in _SIMPLE_TYPES and type(other) is type(value):
+                if value != other:
+                    return False
+            elif type(value) is float and type(other) is float:
+                if value != other and not (value != value and
+                                           other != other):
+                    return False
+            elif not _equal(value, other):
+                return False
+        return True
+    if hasattr(a, "__dict__"):
+        return _equal(a.__dict__, b.__dict__)
+    return a == b
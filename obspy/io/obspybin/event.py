@@ -0,0 +1,602 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+OBSPYBIN catalog read and write support.
+
+All attributes of events, origins, arrivals, magnitudes and picks, including
+uncertainties and nested objects like creation information, waveform ids or
+origin qualities, are stored in columns. The columns are derived from the
+attributes of the event type classes, e.g. the author of the creation
+information of picks is stored in the column ``pick.creation_info.author``.
+Strings and resource ids are stored once in a string table.
+
+Everything else of an event, origin, arrival, magnitude or pick (e.g.
+comments, custom tags, event descriptions or amplitudes and focal
+mechanisms of events) is stored as a QuakeML fragment of that object
+(without the child objects stored in columns), which is only parsed when
+reading the file if it exists.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import numpy as np
+from lxml import etree
+
+from obspy import UTCDateTime
+from obspy.core.event import (Arrival, Catalog, Event, Magnitude, Origin,
+                              Pick, ResourceIdentifier)
+from obspy.core.event.base import QuantityError
+from obspy.core.event.resourceid import _ResourceKey
+from obspy.core.util.misc import _gc_paused, _yield_resource_id_parent_attr
+from obspy.io.quakeml import core as quakeml
+from .core import _decompress, _equal, _is_obspybin, _read_container, \
+    _Table, _write_container
+
+
+NO_TIME = np.iinfo(np.int64).min
+NO_INT = np.iinfo(np.int64).min
+
+# levels of objects stored in columns, their classes and the attributes
+# with child objects that are stored in columns of another level
+_LEVELS = ("event", "origin", "arrival", "magnitude", "pick")
+_CLASSES = {"event": Event, "origin": Origin, "arrival": Arrival,
+            "magnitude": Magnitude, "pick": Pick}
+_CHILDREN = {"event": ("origins", "magnitudes", "picks"),
+             "origin": ("arrivals",), "arrival": (), "magnitude": (),
+             "pick": ()}
+_CHILD_LEVELS = {"origins": "origin", "magnitudes": "magnitude",
+                 "picks": "pick", "arrivals": "arrival"}
+_QUANTITY_ERROR_KEYS = ("uncertainty", "lower_uncertainty",
+                        "upper_uncertainty", "confidence_level")
+_KINDS = {float: "float", int: "int", bool: "bool", UTCDateTime: "time"}
+_DTYPES = {"string": np.int32, "float": np.float64, "int": np.int64,
+           "bool": np.int8, "time": np.int64, "object": np.int8}
+
+
+def _is_obspybin_catalog(path_or_file_object):
+    """
+    Check whether a file is an OBSPYBIN file containing a catalog.
+
+    :param path_or_file_object: File name or file like object.
+    :rtype: bool
+    """
+    return _is_obspybin(path_or_file_object, kind="catalog")
+
+
+def _is_event_type(type_):
+    return hasattr(type_, "_properties")
+
+
+def _get_columns(cls, prefix=""):
+    """
+    Return the columns of all attributes of an event type class.
+
+    Attributes of nested objects are stored in columns named
+    ``<attribute>.<attribute of nested object>``, the column of the
+    attribute itself only tells whether the nested object exists.
+
+    :rtype: list of tuple
+    :returns: Name and kind of every column.
+    """
+    columns = []
+    for name, type_ in cls._properties:
+        name = prefix + name
+        if type_ is QuantityError:
+            columns.extend((name + "." + key, "float")
+                           for key in _QUANTITY_ERROR_KEYS)
+        elif _is_event_type(type_):
+            columns.append((name, "object"))
+            columns.extend(_get_columns(type_, name + "."))
+        else:
+            columns.append((name, _KINDS.get(type_, "string")))
+    return columns
+
+
+def _get_resource_id_paths(cls, path=()):
+    """
+    Return the paths of all resource id attributes of an event type class,
+    e.g. ``("creation_info", "author_uri")``.
+    """
+    paths = []
+    for name, type_ in cls._properties:
+        if type_ is ResourceIdentifier:
+            paths.append(path + (name,))
+        elif _is_event_type(type_) and type_ is not QuantityError:
+            paths.extend(_get_resource_id_paths(type_, path + (name,)))
+    return paths
+
+
+def _get_values(objects, cls, prefix, values):
+    """
+    Get the values of all columns of a list of objects (or ``None``) as
+    lists of values by column name.
+    """
+    for name, type_ in cls._properties:
+        column = [obj.__dict__.get(name) if obj is not None else None
+                  for obj in objects]
+        name = prefix + name
+        if type_ is QuantityError:
+            column = [value if isinstance(value, QuantityError) else None
+                      for value in column]
+            for key in _QUANTITY_ERROR_KEYS:
+                values[name + "." + key] = [
+                    value.__dict__.get(key) if value is not None else None
+                    for value in column]
+        elif _is_event_type(type_):
+            column = [value if type(value) is type_ else None
+                      for value in column]
+            values[name] = [value is not None for value in column]
+            _get_values(column, type_, name + ".", values)
+        else:
+            values[name] = column
+
+
+def _to_arrays(level, columns, values, strings, arrays):
+    """
+    Convert lists of values to arrays of the given level.
+
+    Values that cannot be stored in a column (e.g. of an unexpected type)
+    are stored as ``None``, which is detected when comparing the objects
+    created from the columns with the original ones. Columns without any
+    values are not stored at all.
+    """
+    for name, kind in columns:
+        key = "%s.%s" % (level, name)
+        column = values[name]
+        if kind == "object":
+            if not any(column):
+                continue
+        elif all(value is None for value in column):
+            continue
+        if kind == "string":
+            column = [strings.add(value.id) if isinstance(
+                          value, ResourceIdentifier)
+                      else strings.add(value) if isinstance(
+                          value, (str, native_str))
+                      else -1 for value in column]
+        elif kind == "float":
+            column = [value if type(value) is float else np.nan
+                      for value in column]
+        elif kind == "int":
+            column = [value if type(value) is int and
+                      NO_INT < value <= np.iinfo(np.int64).max else NO_INT
+                      for value in column]
+        elif kind == "bool":
+            column = [int(value) if type(value) is bool else -1
+                      for value in column]
+        elif kind == "time":
+            times = [value if isinstance(value, UTCDateTime) else None
+                     for value in column]
+            # nanoseconds since 1970 can exceed the range of int64, so
+            # seconds and nanoseconds are stored separately
+            arrays[key + ":ns"] = np.array(
+                [0 if value is None else value.ns % 10 ** 9
+                 for value in times], dtype=np.int32)
+            arrays[key + ":precision"] = np.array(
+                [6 if value is None else value.precision
+                 for value in times], dtype=np.int8)
+            column = [NO_TIME if value is None else value.ns // 10 ** 9
+                      for value in times]
+        arrays[key] = np.array(column, dtype=_DTYPES[kind])
+
+
+class _Builder(object):
+    """
+    Creates event type objects from columns of values.
+
+    Objects are created from a copy of the attributes of a default object
+    instead of calling their constructors and property setters, which is a
+    lot faster. Whenever that does not give the same result as for the
+    original object, the object is stored as a QuakeML fragment instead, see
+    :func:`_write_obspybin_catalog`.
+
+    Times are cached, so that equal times of different objects share one
+    :class:`~obspy.core.utcdatetime.UTCDateTime` object.
+    """
+    def __init__(self, arrays, strings):
+        self.arrays = arrays
+        self.strings = strings
+        self._times = {}
+        self._templates = {}
+
+    def _template(self, cls):
+        try:
+            return self._templates[cls]
+        except KeyError:
+            pass
+        if "resource_id" in getattr(cls, "_property_dict", {}):
+            obj = cls(force_resource_id=False)
+        else:
+            obj = cls()
+        template = obj.__dict__
+        lists = [key for key, value in template.items()
+                 if isinstance(value, list)]
+        self._templates[cls] = (template, lists)
+        return self._templates[cls]
+
+    def _column(self, key, rows):
+        """
+        Return a column as array, ``None`` if the file does not contain it.
+        """
+        column = self.arrays.get(key)
+        if column is not None and rows is not None:
+            column = column[rows]
+        return column
+
+    def _values(self, key, kind, type_, rows, count):
+        """
+        Return the Python values of a column.
+        """
+        column = self._column(key, rows)
+        if column is None:
+            return [None] * count
+        values = column.tolist()
+        if kind == "float":
+            return [None if value != value else value for value in values]
+        elif kind == "int":
+            return [None if value == NO_INT else value for value in values]
+        elif kind == "bool":
+            return [None if value < 0 else bool(value) for value in values]
+        elif kind == "time":
+            return self._time_objects(
+                values, self._column(key + ":ns", rows).tolist(),
+                self._column(key + ":precision", rows).tolist())
+        strings = self.strings
+        if type_ is ResourceIdentifier:
+            return [self._resource_id(strings[value]) if value >= 0
+                    else None for value in values]
+        return [strings[value] if value >= 0 else None for value in values]
+
+    @staticmethod
+    def _resource_id(id):
+        # equivalent to ResourceIdentifier(id) but without the checks
+        rid = ResourceIdentifier.__new__(ResourceIdentifier)
+        rid.__dict__.update(fixed=True, id=id)
+        return rid
+
+    def _time_objects(self, seconds, nanoseconds, precisions):
+        times = self._times
+        objects = []
+        for value, ns, precision in zip(seconds, nanoseconds, precisions):
+            if value == NO_TIME:
+                objects.append(None)
+                continue
+            key = (value * 10 ** 9 + ns, precision)
+            time = times.get(key)
+            if time is None:
+                time = UTCDateTime(ns=key[0])
+                if precision != 6:
+                    time.precision = precision
+                times[key] = time
+            objects.append(time)
+        return objects
+
+    def _quantity_errors(self, key, rows, count):
+        template, _ = self._template(QuantityError)
+        new = QuantityError.__new__
+        columns = [self._values(key + "." + name, "float", float, rows,
+                                count) for name in _QUANTITY_ERROR_KEYS]
+        objects = []
+        for row in zip(*columns):
+            obj = new(QuantityError)
+            attributes = template.copy()
+            attributes.update(zip(_QUANTITY_ERROR_KEYS, row))
+            obj.__dict__.update(attributes)
+            objects.append(obj)
+        return objects
+
+    def objects(self, cls, prefix, rows=None, count=None):
+        """
+        Create objects of an event type class from columns.
+
+        :type prefix: str
+        :param prefix: Prefix of the column names of the objects.
+        :type rows: :class:`numpy.ndarray`
+        :param rows: Indices of the rows to create objects for, all rows if
+            not given.
+        :type count: int
+        :param count: Number of objects, needed if no rows are given.
+        """
+        if rows is not None:
+            count = len(rows)
+        columns = {}
+        for name, type_ in cls._properties:
+            key = prefix + name
+            if type_ is QuantityError:
+                columns[name] = self._quantity_errors(key, rows, count)
+            elif _is_event_type(type_):
+                values = [None] * count
+                present = self._column(key, rows)
+                if present is not None:
+                    indices = np.flatnonzero(present == 1)
+                    nested = self.objects(
+                        type_, key + ".",
+                        indices if rows is None else rows[indices])
+                    for i, obj in zip(indices.tolist(), nested):
+                        values[i] = obj
+                columns[name] = values
+            else:
+                columns[name] = self._values(
+                    key, _KINDS.get(type_, "string"), type_, rows, count)
+
+        template, lists = self._template(cls)
+        names = list(columns)
+        new = cls.__new__
+        objects = []
+        for row in zip(*[columns[name] for name in names]):
+            attributes = template.copy()
+            for key in lists:
+                attributes[key] = []
+            attributes.update(zip(names, row))
+            obj = new(cls)
+            obj.__dict__.update(attributes)
+            objects.append(obj)
+        return objects
+
+
+class _FragmentPickler(quakeml.Pickler):
+    """
+    QuakeML writer for fragments, which keeps resource ids as they are.
+    """
+    def _id(self, obj):
+        return obj.id
+
+
+def _without_children(level, obj):
+    """
+    Return a shallow copy of an object without the child objects that are
+    stored in columns of other levels.
+    """
+    children = _CHILDREN[level]
+    if not children:
+        return obj
+    copy = obj.__class__.__new__(obj.__class__)
+    copy.__dict__.update(obj.__dict__)
+    for name in children:
+        copy.__dict__[name] = []
+    return copy
+
+
+def _to_fragment(level, obj):
+    """
+    Serialize an object (without child objects of other levels) as QuakeML.
+
+    Custom namespaces are declared on the root element, so that custom tags
+    of the object are found when reading it again.
+    """
+    pickler = _FragmentPickler()
+    obj = _without_children(level, obj)
+    element = getattr(pickler, "_" + level)(obj)
+    pickler._collect_namespaces(obj)
+    root = etree.Element("{%s}quakeml" % quakeml.NSMAP_QUAKEML["q"],
+                         nsmap=pickler._get_namespace_map())
+    root.append(element)
+    return etree.tostring(root)
+
+
+def _from_fragment(level, fragment):
+    """
+    Read an object serialized with :func:`_to_fragment`.
+    """
+    root = etree.fromstring(fragment)
+    unpickler = quakeml.Unpickler()
+    unpickler._set_namespaces(root)
+    if level == "origin":
+        return unpickler._origin(root[0], arrivals=[])
+    return getattr(unpickler, "_" + level)(root[0])
+
+
+def _scope_resource_ids(obj, paths, parent_key):
+    """
+    Scope the resource ids of an object created from columns like
+    :meth:`~obspy.core.event.Event.scope_resource_ids`.
+
+    Only the known resource id attributes of the object are looked at, which
+    is a lot faster than searching all attributes for resource ids.
+    """
+    for path in paths:
+        value = obj
+        for name in path:
+            value = value.__dict__.get(name)
+            if value is None:
+                break
+        else:
+            if path == ("resource_id",):
+                value.set_referred_object(obj, parent=parent_key, warn=False)
+            else:
+                value._parent_key = parent_key
+                value._object_id = None
+
+
+def _scope_fragment_resource_ids(obj, parent_key):
+    """
+    Scope the resource ids of an object read from a fragment like
+    :meth:`~obspy.core.event.Event.scope_resource_ids`.
+    """
+    for resource_id, parent, attr in _yield_resource_id_parent_attr(obj):
+        if attr == "resource_id":
+            resource_id.set_referred_object(parent, parent=parent_key,
+                                            warn=False)
+        else:
+            resource_id._parent_key = parent_key
+            resource_id._object_id = None
+
+
+def _attributes(level, obj):
+    """
+    Return the attributes of an object that are compared when writing.
+    """
+    attributes = dict(obj.__dict__)
+    for name in _CHILDREN[level]:
+        attributes.pop(name, None)
+    # not written to any format
+    attributes.pop("_format", None)
+    return attributes
+
+
+def _write_obspybin_catalog(catalog, path_or_file_object, **kwargs):
+    """
+    Write a catalog to an OBSPYBIN file.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        the :meth:`~obspy.core.event.Catalog.write` method of an ObsPy
+        :class:`~obspy.core.event.Catalog` object, call this instead.
+
+    :type catalog: :class:`~obspy.core.event.Catalog`
+    :param catalog: The catalog to write.
+    :param path_or_file_object: File name or file like object.
+    """
+    objects = dict((level, []) for level in _LEVELS)
+    objects["event"] = list(catalog.events)
+    # number of child objects of every object, e.g. "event:origin_count"
+    counts = {}
+    for parent in ("event", "origin"):
+        for name in _CHILDREN[parent]:
+            level = _CHILD_LEVELS[name]
+            children = [obj.__dict__[name] for obj in objects[parent]]
+            counts["%s:%s_count" % (parent, level)] = list(map(len, children))
+            for items in children:
+                objects[level].extend(items)
+
+    strings = _Table()
+    blobs = _Table(compress=True)
+    arrays = {}
+    for level in _LEVELS:
+        cls = _CLASSES[level]
+        columns = _get_columns(cls)
+        values = {}
+        _get_values(objects[level], cls, "", values)
+        _to_arrays(level, columns, values, strings, arrays)
+
+    # everything not reproduced by the columns goes into a fragment
+    builder = _Builder(arrays, strings.items)
+    for level in _LEVELS:
+        expected = builder.objects(_CLASSES[level], level + ".",
+                                   count=len(objects[level]))
+        fragments = []
+        for obj, expected_obj in zip(objects[level], expected):
+            if _equal(_attributes(level, obj),
+                      _attributes(level, expected_obj)):
+                fragments.append(-1)
+            else:
+                fragments.append(blobs.add(_to_fragment(level, obj)))
+        arrays[level + ":fragment"] = np.array(fragments, dtype=np.int32)
+    for key, values in counts.items():
+        arrays[key] = np.array(values, dtype=np.int64)
+    strings.to_arrays("strings", arrays)
+    blobs.to_arrays("blobs", arrays)
+
+    # metadata of the catalog as QuakeML document without events
+    header = Catalog(resource_id=catalog.resource_id,
+                     description=catalog.description,
+                     comments=catalog.comments,
+                     creation_info=catalog.creation_info)
+    if hasattr(catalog, "extra"):
+        header.extra = catalog.extra
+    metadata = {"catalog": _FragmentPickler().dumps(header).decode("utf-8")}
+    _write_container(path_or_file_object, "catalog", metadata, arrays)
+
+
+def _read_obspybin_catalog(path_or_file_object, mmap=False, **kwargs):
+    """
+    Read a catalog from an OBSPYBIN file.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        ObsPy :func:`~obspy.core.event.read_events` function, call this
+        instead.
+
+    All events are scoped (see
+    :meth:`~obspy.core.event.Event.scope_resource_ids`), which takes a
+    considerable part of the time for large catalogs. Read the file within
+    :meth:`ResourceIdentifier.plain_ids()
+    <obspy.core.event.resourceid.ResourceIdentifier.plain_ids>` to skip this
+    if the resource ids are not used to look up objects.
+
+    :param path_or_file_object: File name or file like object.
+    :type mmap: bool
+    :param mmap: Memory-map the file instead of reading it into memory. Only
+        possible for file names.
+    :rtype: :class:`~obspy.core.event.Catalog`
+    """
+    kind, metadata, arrays = _read_container(path_or_file_object, mmap=mmap)
+    if kind != "catalog":
+        msg = "OBSPYBIN file does not contain a catalog but a '%s'." % kind
+        raise ValueError(msg)
+    strings = _Table.strings_from_arrays("strings", arrays)
+    blobs = _Table.blobs_from_arrays("blobs", arrays)
+
+    builder = _Builder(arrays, strings)
+    objects = {}
+    # ids of all objects read from fragments
+    fragment_objects = set()
+    with _gc_paused():
+        for level in _LEVELS:
+            count = len(arrays[level + ":fragment"])
+            objects[level] = builder.objects(_CLASSES[level], level + ".",
+                                             count=count)
+            fragments = arrays[level + ":fragment"]
+            for i in np.flatnonzero(fragments >= 0).tolist():
+                obj = _from_fragment(level, _decompress(blobs[fragments[i]]))
+                objects[level][i] = obj
+                fragment_objects.add(id(obj))
+
+        for parent, name in (("origin", "arrivals"), ("event", "origins"),
+                             ("event", "magnitudes"), ("event", "picks")):
+            children = objects[_CHILD_LEVELS[name]]
+            start = 0
+            counts = arrays["%s:%s_count" % (parent, _CHILD_LEVELS[name])]
+            for obj, count in zip(objects[parent], counts.tolist()):
+                obj.__dict__[name] = children[start:start + count]
+                start += count
+        events = objects["event"]
+        if not ResourceIdentifier._plain_ids:
+            _scope_catalog(events, fragment_objects)
+
+    catalog = quakeml.Unpickler().loads(metadata["catalog"].encode("utf-8"))
+    catalog.events = events
+    return catalog
+
+
+def _scope_catalog(events, fragment_objects):
+    """
+    Scope the resource ids of all events read from a file.
+
+    :type fragment_objects: set
+    :param fragment_objects: Ids of all objects read from fragments.
+    """
+    paths = dict((level, _get_resource_id_paths(cls))
+                 for level, cls in _CLASSES.items())
+
+    def scope(obj, level, parent_key):
+        if id(obj) in fragment_objects:
+            _scope_fragment_resource_ids(obj, parent_key)
+        else:
+            _scope_resource_ids(obj, paths[level], parent_key)
+
+    for event in events:
+        if id(event) in fragment_objects:
+            event.scope_resource_ids()
+            continue
+        parent_key = _ResourceKey.get_resource_key(id(event))
+        scope(event, "event", parent_key)
+        for origin in event.origins:
+            scope(origin, "origin", parent_key)
+            if id(origin) in fragment_objects:
+                # arrivals have been scoped with the origin
+                continue
+            for arrival in origin.arrivals:
+                scope(arrival, "arrival", parent_key)
+        for magnitude in event.magnitudes:
+            scope(magnitude, "magnitude", parent_key)
+        for pick in event.picks:
+            scope(pick, "pick", parent_key)
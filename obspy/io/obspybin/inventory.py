@@ -0,0 +1,518 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+OBSPYBIN inventory read and write support.
+
+Codes, coordinates, epochs and a few other commonly used attributes of all
+networks, stations and channels are stored in columns. Anything else of a
+network, station or channel (e.g. comments, operators or custom tags) is
+stored as a StationXML fragment of that object, which is only parsed when
+reading the file if it exists. Responses are stored as compressed StationXML
+fragments as well, identical responses only once, and are parsed lazily on
+first access by default.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import functools
+
+import numpy as np
+from lxml import etree
+
+from obspy import UTCDateTime
+from obspy.core.inventory import (Azimuth, Channel, ClockDrift, Dip,
+                                  Distance, Equipment, Inventory, Latitude,
+                                  Longitude, Network, SampleRate, Site,
+                                  Station)
+from obspy.core.inventory.channel import _LazyResponse
+from obspy.core.util.misc import _gc_paused
+from obspy.io.stationxml import core as stationxml
+from .core import _decompress, _equal, _read_container, _is_obspybin, \
+    _Table, _write_container
+
+
+NO_TIME = np.iinfo(np.int64).min
+
+_NAMESPACE = "http://www.fdsn.org/xml/station/1"
+
+# columns of every level and their kind
+_COLUMNS = {
+    "network": [
+        ("code", "string"), ("start_date", "time"), ("end_date", "time"),
+        ("restricted_status", "string"), ("description", "string"),
+        ("total_number_of_stations", "int"),
+        ("selected_number_of_stations", "int")],
+    "station": [
+        ("code", "string"), ("latitude", "float"), ("longitude", "float"),
+        ("elevation", "float"), ("elevation_unit", "string"),
+        ("start_date", "time"), ("end_date", "time"),
+        ("restricted_status", "string"), ("site_name", "string"),
+        ("creation_date", "time"), ("total_number_of_channels", "int"),
+        ("selected_number_of_channels", "int")],
+    "channel": [
+        ("code", "string"), ("location_code", "string"),
+        ("latitude", "float"), ("longitude", "float"),
+        ("elevation", "float"), ("elevation_unit", "string"),
+        ("depth", "float"), ("depth_unit", "string"),
+        ("azimuth", "float"), ("dip", "float"), ("sample_rate", "float"),
+        ("clock_drift_in_seconds_per_sample", "float"),
+        ("start_date", "time"), ("end_date", "time"),
+        ("restricted_status", "string"), ("types", "string"),
+        ("sensor_type", "string"), ("sensor_description", "string"),
+        ("calibration_units", "string"),
+        ("calibration_units_description", "string")],
+}
+_DTYPES = {"string": np.int32, "float": np.float64, "time": np.int64,
+           "int": np.int64}
+
+
+def _is_obspybin_inventory(path_or_file_object):
+    """
+    Check whether a file is an OBSPYBIN file containing an inventory.
+
+    :param path_or_file_object: File name or file like object.
+    :rtype: bool
+    """
+    return _is_obspybin(path_or_file_object, kind="inventory")
+
+
+def _ns(tagname):
+    return "{%s}%s" % (_NAMESPACE, tagname)
+
+
+def _to_fragment(write, *args):
+    """
+    Serialize an object with a StationXML writer function.
+
+    Custom namespaces are declared on the root element, so that custom tags
+    of the object are found when reading it again.
+    """
+    nsmap = {None: _NAMESPACE}
+    root = etree.Element("FDSNStationXML", nsmap=nsmap)
+    write(root, *args)
+    namespaces = set()
+    for element in root.iter():
+        namespaces.update(element.nsmap.values())
+    namespaces.discard(_NAMESPACE)
+    if namespaces:
+        # prefixes "ns0", "ns1", ... are reserved by lxml
+        for i, namespace in enumerate(sorted(namespaces)):
+            nsmap["custom%d" % i] = namespace
+        root = etree.Element("FDSNStationXML", nsmap=nsmap)
+        write(root, *args)
+    return etree.tostring(root)
+
+
+def _from_fragment(fragment):
+    """
+    Return the element of an object serialized with :func:`_to_fragment`.
+    """
+    return etree.fromstring(fragment)[0]
+
+
+def _read_response_blob(blob):
+    """
+    Read a response stored with :func:`_write_obspybin_inventory`.
+
+    :type blob: :class:`numpy.ndarray`
+    :rtype: :class:`~obspy.core.inventory.response.Response`
+    """
+    response = stationxml._read_response(
+        _from_fragment(_decompress(blob)), _ns)
+    response._attempt_to_fix_units()
+    return response
+
+
+def _get_fields(level, obj):
+    """
+    Get the values of all columns of a network, station or channel.
+    """
+    fields = {}
+    for name, kind in _COLUMNS[level]:
+        if name == "types":
+            value = "\n".join(obj.types) if obj.types else None
+        elif name == "site_name":
+            value = obj.site.name if obj.site is not None else None
+        elif name in ("sensor_type", "sensor_description"):
+            value = getattr(obj.sensor, name[7:], None)
+        elif name.endswith("_unit"):
+            value = getattr(obj, name[:-5])
+            value = value.unit if value is not None else None
+        else:
+            value = getattr(obj, name)
+        if kind == "time" and value is not None:
+            value = value.ns
+        elif kind == "float" and value is not None:
+            value = float(value)
+        fields[name] = value
+    return fields
+
+
+class _Builder(object):
+    """
+    Creates networks, stations and channels from columns of values.
+
+    Objects (including numbers with uncertainties) are created from a copy
+    of the attributes of a default object instead of calling their
+    constructors and property setters, which is a lot faster. Whenever that
+    does not give the same result as for the original object (e.g. after
+    changes to these classes), the object is stored as a StationXML fragment
+    instead, see :func:`_write_obspybin_inventory`.
+
+    Times are cached, so that equal times of different objects share one
+    :class:`~obspy.core.utcdatetime.UTCDateTime` object.
+    """
+    def __init__(self):
+        self._times = {}
+        self._templates = {}
+        for cls, args in ((Network, ("",)), (Station, ("", 0, 0, 0)),
+                          (Channel, ("", "", 0, 0, 0, 0)), (Site, ()),
+                          (Equipment, ())):
+            self._add_template(cls, cls(*args))
+        for cls in (Latitude, Longitude, Distance, Azimuth, Dip, SampleRate,
+                    ClockDrift):
+            self._add_template(cls, cls(0.0))
+
+    def _add_template(self, cls, obj):
+        template = obj.__dict__
+        lists = [key for key, value in template.items()
+                 if isinstance(value, list)]
+        self._templates[cls] = (template, lists)
+
+    def _objects(self, cls, columns):
+        """
+        Create one object per row of a dictionary mapping attribute names to
+        columns.
+        """
+        template, lists = self._templates[cls]
+        names = list(columns)
+        new = cls.__new__
+        objects = []
+        for row in zip(*[columns[name] for name in names]):
+            attributes = template.copy()
+            for key in lists:
+                attributes[key] = []
+            attributes.update(zip(names, row))
+            obj = new(cls)
+            obj.__dict__ = attributes
+            objects.append(obj)
+        return objects
+
+    def _floats(self, cls, values, units=None):
+        template, _ = self._templates[cls]
+        new = float.__new__
+        objects = []
+        for value in values:
+            if value is None:
+                objects.append(None)
+                continue
+            obj = new(cls, value)
+            obj.__dict__ = template.copy()
+            objects.append(obj)
+        if units is not None:
+            for obj, unit in zip(objects, units):
+                if obj is not None:
+                    obj._unit = unit
+        return objects
+
+    def _time_objects(self, values):
+        times = self._times
+        objects = []
+        for ns in values:
+            if ns is None:
+                objects.append(None)
+                continue
+            time = times.get(ns)
+            if time is None:
+                time = times[ns] = UTCDateTime(ns=ns)
+            objects.append(time)
+        return objects
+
+    def network(self, c):
+        """
+        Create networks from a dictionary of columns.
+        """
+        return self._objects(Network, {
+            "_code": c["code"],
+            "start_date": self._time_objects(c["start_date"]),
+            "end_date": self._time_objects(c["end_date"]),
+            "restricted_status": c["restricted_status"],
+            "description": c["description"],
+            "_total_number_of_stations": c["total_number_of_stations"],
+            "_selected_number_of_stations":
+                c["selected_number_of_stations"]})
+
+    def station(self, c):
+        """
+        Create stations from a dictionary of columns.
+        """
+        return self._objects(Station, {
+            "_code": c["code"],
+            "_latitude": self._floats(Latitude, c["latitude"]),
+            "_longitude": self._floats(Longitude, c["longitude"]),
+            "_elevation": self._floats(Distance, c["elevation"],
+                                       c["elevation_unit"]),
+            "start_date": self._time_objects(c["start_date"]),
+            "end_date": self._time_objects(c["end_date"]),
+            "restricted_status": c["restricted_status"],
+            "site": self._objects(Site, {"name": c["site_name"]}),
+            "_creation_date": self._time_objects(c["creation_date"]),
+            "_total_number_of_channels": c["total_number_of_channels"],
+            "_selected_number_of_channels":
+                c["selected_number_of_channels"]})
+
+    def channel(self, c):
+        """
+        Create channels from a dictionary of columns.
+        """
+        sensors = self._objects(Equipment, {
+            "type": c["sensor_type"],
+            "description": c["sensor_description"]})
+        for i, sensor in enumerate(sensors):
+            if sensor.type is None and sensor.description is None:
+                sensors[i] = None
+        return self._objects(Channel, {
+            "_code": c["code"], "_location_code": c["location_code"],
+            "_latitude": self._floats(Latitude, c["latitude"]),
+            "_longitude": self._floats(Longitude, c["longitude"]),
+            "_elevation": self._floats(Distance, c["elevation"],
+                                       c["elevation_unit"]),
+            "_depth": self._floats(Distance, c["depth"], c["depth_unit"]),
+            "_azimuth": self._floats(Azimuth, c["azimuth"]),
+            "_dip": self._floats(Dip, c["dip"]),
+            "_sample_rate": self._floats(SampleRate, c["sample_rate"]),
+            "_clock_drift_in_seconds_per_sample": self._floats(
+                ClockDrift, c["clock_drift_in_seconds_per_sample"]),
+            "start_date": self._time_objects(c["start_date"]),
+            "end_date": self._time_objects(c["end_date"]),
+            "restricted_status": c["restricted_status"],
+            "types": [value.split("\n") if value is not None else []
+                      for value in c["types"]],
+            "sensor": sensors,
+            "calibration_units": c["calibration_units"],
+            "calibration_units_description":
+                c["calibration_units_description"]})
+
+
+def _write_obspybin_inventory(inventory, path_or_file_object, **kwargs):
+    """
+    Write an inventory to an OBSPYBIN file.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        the :meth:`~obspy.core.inventory.inventory.Inventory.write` method of
+        an ObsPy :class:`~obspy.core.inventory.inventory.Inventory` object,
+        call this instead.
+
+    :type inventory: :class:`~obspy.core.inventory.inventory.Inventory`
+    :param inventory: The inventory to write.
+    :param path_or_file_object: File name or file like object.
+    """
+    builder = _Builder()
+    strings = _Table()
+    blobs = _Table(compress=True)
+    columns = dict((level, dict((name, []) for name, _ in _COLUMNS[level]))
+                   for level in _COLUMNS)
+    fragments = dict((level, []) for level in _COLUMNS)
+    counts = {"network": [], "station": []}
+    responses = []
+    response_indices = {}
+    writers = {"network": stationxml._write_network,
+               "station": stationxml._write_station,
+               "channel": stationxml._write_channel}
+    # attributes with child objects, stored separately
+    children = {"network": "_stations", "station": "channels",
+                "channel": "_response"}
+
+    def add(level, obj):
+        fields = _get_fields(level, obj)
+        for name, value in fields.items():
+            columns[level][name].append(value)
+        # everything not covered by the columns goes into a fragment
+        attributes = dict(obj.__dict__)
+        attributes.pop(children[level])
+        expected = getattr(builder, level)(
+            dict((name, [value]) for name, value in fields.items()))[0]
+        expected = dict(expected.__dict__)
+        expected.pop(children[level])
+        if _equal(attributes, expected):
+            fragments[level].append(-1)
+        else:
+            fragments[level].append(blobs.add(
+                _to_fragment(writers[level], obj, level)))
+
+    def add_response(response):
+        if response is None:
+            return -1
+        # channels often share response objects (or loaders of responses)
+        if id(response) in response_indices:
+            return response_indices[id(response)][1]
+        if isinstance(response, _LazyResponse):
+            loader = response.loader
+            if id(loader) in response_indices:
+                return response_indices[id(loader)][1]
+            if isinstance(loader, functools.partial) and \
+                    loader.func is _read_response_blob:
+                # response read from an OBSPYBIN file but not yet parsed
+                fragment = _decompress(loader.args[0])
+            else:
+                fragment = _to_fragment(stationxml._write_response,
+                                        loader())
+            index = blobs.add(fragment)
+            response_indices[id(loader)] = (loader, index)
+        else:
+            index = blobs.add(_to_fragment(stationxml._write_response,
+                                           response))
+        response_indices[id(response)] = (response, index)
+        return index
+
+    for net in inventory.networks:
+        add("network", net)
+        counts["network"].append(len(net.stations))
+        for sta in net.stations:
+            add("station", sta)
+            counts["station"].append(len(sta.channels))
+            for cha in sta.channels:
+                add("channel", cha)
+                responses.append(add_response(cha._response))
+
+    arrays = {}
+    for level, columns_ in columns.items():
+        for name, kind in _COLUMNS[level]:
+            values = columns_[name]
+            if kind == "string":
+                values = [strings.add(value) for value in values]
+            elif kind == "float":
+                values = [np.nan if value is None else value
+                          for value in values]
+            elif kind == "time":
+                # nanoseconds since 1970 can exceed the range of int64 (e.g.
+                # for end dates far in the future), so seconds and
+                # nanoseconds are stored separately
+                arrays["%s_%s_ns" % (level, name)] = np.array(
+                    [0 if value is None else value % 10 ** 9
+                     for value in values], dtype=np.int32)
+                values = [NO_TIME if value is None else value // 10 ** 9
+                          for value in values]
+            else:
+                values = [-1 if value is None else value for value in values]
+            arrays["%s_%s" % (level, name)] = np.array(
+                values, dtype=_DTYPES[kind])
+        arrays["%s_fragment" % level] = np.array(fragments[level],
+                                                 dtype=np.int32)
+    arrays["network_station_count"] = np.array(counts["network"],
+                                               dtype=np.int64)
+    arrays["station_channel_count"] = np.array(counts["station"],
+                                               dtype=np.int64)
+    arrays["channel_response"] = np.array(responses, dtype=np.int32)
+    strings.to_arrays("strings", arrays)
+    blobs.to_arrays("blobs", arrays)
+
+    metadata = {
+        "source": inventory.source, "sender": inventory.sender,
+        "module": inventory.module, "module_uri": inventory.module_uri,
+        "created": (str(inventory.created)
+                    if inventory.created is not None else None),
+        "extra": None}
+    if hasattr(inventory, "extra"):
+        metadata["extra"] = _to_fragment(
+            stationxml._write_extra, inventory).decode("utf-8")
+    _write_container(path_or_file_object, "inventory", metadata, arrays)
+
+
+def _read_obspybin_inventory(path_or_file_object, mmap=False,
+                             lazy_responses=True, **kwargs):
+    """
+    Read an inventory from an OBSPYBIN file.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        ObsPy :func:`~obspy.core.inventory.inventory.read_inventory` function,
+        call this instead.
+
+    :param path_or_file_object: File name or file like object.
+    :type mmap: bool
+    :param mmap: Memory-map the file instead of reading it into memory. Only
+        possible for file names. Responses that are read lazily are then
+        only read from the file on access.
+    :type lazy_responses: bool
+    :param lazy_responses: Parse responses only on first access of the
+        ``response`` attribute of a channel.
+    :rtype: :class:`~obspy.core.inventory.inventory.Inventory`
+    """
+    kind, metadata, arrays = _read_container(path_or_file_object, mmap=mmap)
+    if kind != "inventory":
+        msg = "OBSPYBIN file does not contain an inventory but a '%s'." % kind
+        raise ValueError(msg)
+    strings = _Table.strings_from_arrays("strings", arrays)
+    blobs = _Table.blobs_from_arrays("blobs", arrays)
+
+    def column(level, name, kind):
+        values = arrays["%s_%s" % (level, name)].tolist()
+        if kind == "string":
+            return [strings[i] if i >= 0 else None for i in values]
+        elif kind == "float":
+            return [None if value != value else value for value in values]
+        elif kind == "time":
+            nanoseconds = arrays["%s_%s_ns" % (level, name)].tolist()
+            return [None if value == NO_TIME else value * 10 ** 9 + ns
+                    for value, ns in zip(values, nanoseconds)]
+        return [None if value == -1 else value for value in values]
+
+    builder = _Builder()
+    readers = {"network": stationxml._read_network,
+               "station": stationxml._read_station,
+               "channel": stationxml._read_channel}
+    objects = {}
+    with _gc_paused():
+        for level, columns in _COLUMNS.items():
+            objects[level] = getattr(builder, level)(dict(
+                (name, column(level, name, kind)) for name, kind in columns))
+            fragments = arrays["%s_fragment" % level]
+            for i in np.nonzero(fragments >= 0)[0].tolist():
+                objects[level][i] = readers[level](
+                    _from_fragment(_decompress(blobs[fragments[i]])), _ns)
+
+        channels = objects["channel"]
+        # channels sharing a response share the loader of the response
+        loaders = {}
+        for cha, response in zip(channels,
+                                 arrays["channel_response"].tolist()):
+            if response < 0:
+                cha.response = None
+            elif lazy_responses:
+                if response not in loaders:
+                    loaders[response] = functools.partial(
+                        _read_response_blob, blobs[response])
+                cha._set_lazy_response(loaders[response])
+            else:
+                cha.response = _read_response_blob(blobs[response])
+    stations = objects["station"]
+    start = 0
+    for sta, count in zip(stations,
+                          arrays["station_channel_count"].tolist()):
+        sta.channels = channels[start:start + count]
+        start += count
+    networks = objects["network"]
+    start = 0
+    for net, count in zip(networks,
+                          arrays["network_station_count"].tolist()):
+        net.stations = stations[start:start + count]
+        start += count
+
+    inv = Inventory(networks=networks, source=metadata["source"],
+                    sender=metadata["sender"], module=metadata["module"],
+                    module_uri=metadata["module_uri"],
+                    created=(UTCDateTime(metadata["created"])
+                             if metadata["created"] is not None else None))
+    if metadata["extra"] is not None:
+        stationxml._read_extra(
+            etree.fromstring(metadata["extra"].encode("utf-8")), inv)
+    return inv
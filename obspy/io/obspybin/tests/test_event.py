@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test suite for the OBSPYBIN catalog reader and writer.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import io
+import os
+import unittest
+
+from obspy import UTCDateTime, read_events, read_inventory
+from obspy.core.event import (Arrival, Catalog, Comment, CreationInfo, Event,
+                              Magnitude, Origin, OriginQuality, Pick,
+                              ResourceIdentifier, WaveformStreamID)
+from obspy.core.event.base import QuantityError
+from obspy.core.util.base import NamedTemporaryFile
+from obspy.io.obspybin.core import _equal, _read_container
+from obspy.io.obspybin.event import (_is_obspybin_catalog,
+                                     _read_obspybin_catalog)
+
+
+class ObsPyBinCatalogTestCase(unittest.TestCase):
+    """
+    Test cases for catalogs in the OBSPYBIN format.
+    """
+    def setUp(self):
+        obspy_dir = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        self.quakeml_data = os.path.join(obspy_dir, "io", "quakeml", "tests",
+                                         "data")
+
+    def _write(self, catalog):
+        buf = io.BytesIO()
+        catalog.write(buf, format="OBSPYBIN")
+        buf.seek(0, 0)
+        return buf
+
+    def _roundtrip(self, catalog, **kwargs):
+        return _read_obspybin_catalog(self._write(catalog), **kwargs)
+
+    def _fragment_counts(self, catalog):
+        _, _, arrays = _read_container(self._write(catalog))
+        return dict((level, int((arrays[level + ":fragment"] >= 0).sum()))
+                    for level in ("event", "origin", "arrival", "magnitude",
+                                  "pick"))
+
+    def _assert_identical(self, catalog_1, catalog_2):
+        """
+        Compare all attributes of all events, unlike ``==`` also the
+        precision of times, the order of attributes of custom tags etc.
+        """
+        self.assertEqual(catalog_1, catalog_2)
+        for event_1, event_2 in zip(catalog_1, catalog_2):
+            attributes_1 = dict(event_1.__dict__)
+            attributes_2 = dict(event_2.__dict__)
+            attributes_1.pop("_format", None)
+            attributes_2.pop("_format", None)
+            self.assertTrue(_equal(attributes_1, attributes_2))
+
+    def _create_catalog(self, count=10):
+        """
+        Create a catalog of events with picks and arrivals that can be
+        stored entirely in columns.
+        """
+        t = UTCDateTime(2018, 1, 1, 12)
+        events = []
+        for i in range(3):
+            origin = Origin(time=t + i, latitude=10.5, longitude=-20.0,
+                            depth=5000.0, depth_errors={"uncertainty": 200.0},
+                            evaluation_mode="manual",
+                            quality=OriginQuality(used_phase_count=count),
+                            creation_info=CreationInfo(
+                                author="me", creation_time=t))
+            picks = []
+            for j in range(count):
+                pick = Pick(time=t + i + j * 0.01, phase_hint="P",
+                            waveform_id=WaveformStreamID(
+                                "XX", "ST%02d" % j, "", "HHZ"),
+                            time_errors=QuantityError(uncertainty=0.01,
+                                                      confidence_level=95.0),
+                            polarity="positive", evaluation_mode="automatic")
+                picks.append(pick)
+                origin.arrivals.append(Arrival(
+                    pick_id=pick.resource_id, phase="P", time_residual=-0.1,
+                    distance=0.5 * j, time_weight=1.0))
+            magnitude = Magnitude(mag=2.5 + i, magnitude_type="ML",
+                                  origin_id=origin.resource_id,
+                                  station_count=count)
+            events.append(Event(
+                origins=[origin], magnitudes=[magnitude], picks=picks,
+                preferred_origin_id=origin.resource_id,
+                preferred_magnitude_id=magnitude.resource_id,
+                event_type="earthquake"))
+        return Catalog(events, description="test")
+
+    def test_roundtrip(self):
+        """
+        Test writing and reading the QuakeML test files.
+        """
+        filenames = ["neries_events.xml", "iris_events.xml", "usgs_event.xml",
+                     "preferred.xml", "qml-example-1.2-RC3.xml",
+                     "quakeml_1.2_arrival.xml", "quakeml_1.2_data_used.xml",
+                     "quakeml_1.2_event.xml",
+                     "quakeml_1.2_focalmechanism.xml",
+                     "quakeml_1.2_magnitude.xml", "quakeml_1.2_origin.xml",
+                     "quakeml_1.2_pick.xml",
+                     "quakeml_1.2_stationmagnitude.xml"]
+        for filename in filenames:
+            catalog = read_events(os.path.join(self.quakeml_data, filename))
+            catalog_2 = self._roundtrip(catalog)
+            self._assert_identical(catalog_2, catalog)
+            self.assertEqual(catalog_2.resource_id, catalog.resource_id)
+            self.assertEqual(catalog_2.creation_info, catalog.creation_info)
+
+    def test_columns(self):
+        """
+        Test that regular events are stored entirely in columns, with all
+        details of times and uncertainties.
+        """
+        catalog = self._create_catalog()
+        pick = catalog[0].picks[0]
+        pick.time = UTCDateTime(ns=1514808000123456789, precision=9)
+        pick.time_errors.lower_uncertainty = 0.005
+        catalog[1].origins[0].quality = None
+        catalog[2].magnitudes[0].mag = 0.0
+        self.assertEqual(self._fragment_counts(catalog),
+                         {"event": 0, "origin": 0, "arrival": 0,
+                          "magnitude": 0, "pick": 0})
+        catalog_2 = self._roundtrip(catalog)
+        self._assert_identical(catalog_2, catalog)
+        pick_2 = catalog_2[0].picks[0]
+        self.assertEqual(pick_2.time.ns, pick.time.ns)
+        self.assertEqual(pick_2.time.precision, 9)
+        self.assertEqual(pick_2.time_errors.lower_uncertainty, 0.005)
+        self.assertIsNone(catalog_2[1].origins[0].quality)
+        # times before 1970 and far in the future
+        for time in (UTCDateTime(1500, 1, 1, 0, 0, 0, 5),
+                     UTCDateTime(2500, 1, 1, 0, 0, 0, 5)):
+            pick.time = time
+            self.assertEqual(self._roundtrip(catalog)[0].picks[0].time, time)
+
+    def test_fragments(self):
+        """
+        Test that only objects with attributes that cannot be stored in
+        columns are stored as QuakeML fragments.
+        """
+        catalog = self._create_catalog()
+        catalog[0].comments.append(Comment(text="comment"))
+        catalog[1].origins[0].arrivals[3].comments.append(
+            Comment(text="comment"))
+        catalog[2].picks[4].extra = {
+            "custom": {"value": "1", "namespace": "http://test.org/ns/1"}}
+        catalog[2].magnitudes[0].comments.append(Comment(text="comment"))
+        self.assertEqual(self._fragment_counts(catalog),
+                         {"event": 1, "origin": 0, "arrival": 1,
+                          "magnitude": 1, "pick": 1})
+        catalog_2 = self._roundtrip(catalog)
+        self.assertEqual(catalog_2, catalog)
+        self.assertEqual(catalog_2[0].comments[0].text, "comment")
+        self.assertEqual(
+            catalog_2[1].origins[0].arrivals[3].comments[0].text, "comment")
+        self.assertEqual(catalog_2[2].picks[4].extra.custom.value, "1")
+        # fragments keep the child objects stored in columns
+        self.assertEqual(len(catalog_2[0].picks), 10)
+        self.assertEqual(len(catalog_2[0].origins[0].arrivals), 10)
+
+    def test_resource_ids(self):
+        """
+        Test that resource ids of the read events refer to the read objects.
+        """
+        catalog = self._create_catalog()
+        catalog[1].comments.append(Comment(text="comment"))
+        for catalog_2 in (self._roundtrip(catalog),
+                          self._roundtrip(self._roundtrip(catalog))):
+            for event in catalog_2:
+                origin = event.origins[0]
+                self.assertIs(event.preferred_origin(), origin)
+                self.assertIs(event.preferred_magnitude(),
+                              event.magnitudes[0])
+                self.assertIs(event.magnitudes[0].origin_id
+                              .get_referred_object(), origin)
+                for arrival, pick in zip(origin.arrivals, event.picks):
+                    self.assertIs(arrival.pick_id.get_referred_object(),
+                                  pick)
+        # without registering the resource ids, the preferred objects are
+        # still found
+        with ResourceIdentifier.plain_ids():
+            catalog_2 = self._roundtrip(catalog)
+        self.assertIs(catalog_2[0].preferred_origin(),
+                      catalog_2[0].origins[0])
+
+    def test_file_names_and_mmap(self):
+        """
+        Test writing and reading files by name, also memory-mapped.
+        """
+        catalog = self._create_catalog()
+        with NamedTemporaryFile(suffix=".bin") as tf:
+            catalog.write(tf.name, format="OBSPYBIN")
+            self.assertTrue(_is_obspybin_catalog(tf.name))
+            self._assert_identical(read_events(tf.name), catalog)
+            catalog_2 = read_events(tf.name, format="OBSPYBIN", mmap=True)
+            self._assert_identical(catalog_2, catalog)
+
+    def test_empty_catalog(self):
+        """
+        Test catalogs without events and events without any objects.
+        """
+        catalog = Catalog()
+        self.assertEqual(self._roundtrip(catalog), catalog)
+        catalog.events.append(Event())
+        self._assert_identical(self._roundtrip(catalog), catalog)
+
+    def test_other_kinds(self):
+        """
+        Test that inventories are not read as catalogs.
+        """
+        buf = io.BytesIO()
+        read_inventory().write(buf, format="OBSPYBIN")
+        buf.seek(0, 0)
+        self.assertFalse(_is_obspybin_catalog(buf))
+        with self.assertRaises(ValueError) as e:
+            _read_obspybin_catalog(buf)
+        self.assertIn("'inventory'", str(e.exception))
+
+
+def suite():
+    return unittest.makeSuite(ObsPyBinCatalogTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Test suite for the OBSPYBIN reader and writer.
+
+:copyright:
+    The ObsPy Development Team (devs@obspy.org)
+:license:
+    GNU Lesser General Public License, Version 3
+    (https://www.gnu.org/copyleft/lesser.html)
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import io
+import os
+import pickle
+import struct
+import unittest
+
+import numpy as np
+
+from obspy import UTCDateTime, read_inventory
+from obspy.core.inventory import Comment, Inventory, Network
+from obspy.core.inventory.channel import _LazyResponse
+from obspy.core.util import AttribDict
+from obspy.core.util.base import NamedTemporaryFile
+from obspy.io.obspybin.core import (FORMAT_VERSION, MAGIC, _is_obspybin,
+                                    _read_container, _write_container)
+from obspy.io.obspybin.inventory import (_is_obspybin_inventory,
+                                         _read_obspybin_inventory)
+
+
+class ObsPyBinTestCase(unittest.TestCase):
+    """
+    Test cases for the OBSPYBIN format.
+    """
+    def setUp(self):
+        obspy_dir = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__)))))
+        self.core_data = os.path.join(obspy_dir, "core", "tests", "data")
+        self.stationxml_data = os.path.join(obspy_dir, "io", "stationxml",
+                                            "tests", "data")
+
+    def _write(self, inv):
+        buf = io.BytesIO()
+        inv.write(buf, format="OBSPYBIN")
+        buf.seek(0, 0)
+        return buf
+
+    def _roundtrip(self, inv, **kwargs):
+        return _read_obspybin_inventory(self._write(inv), **kwargs)
+
+    def test_roundtrip(self):
+        """
+        Test writing and reading inventories with all kinds of metadata.
+        """
+        filenames = [
+            os.path.join(self.core_data, "IU_ANMO_BH.xml"),
+            os.path.join(self.core_data, "AU.MEEK.xml"),
+            os.path.join(self.stationxml_data, "full_random_stationxml.xml"),
+            os.path.join(self.stationxml_data,
+                         "stationxml_with_availability.xml"),
+            os.path.join(self.stationxml_data,
+                         "channel_without_coordinates.xml"),
+            os.path.join(self.stationxml_data,
+                         "minimal_station_with_microseconds.xml")]
+        for filename in filenames:
+            inv = read_inventory(filename)
+            for lazy_responses in (True, False):
+                inv2 = self._roundtrip(inv, lazy_responses=lazy_responses)
+                self.assertEqual(inv2, inv, msg=filename)
+        inv = read_inventory()
+        self.assertEqual(self._roundtrip(inv), inv)
+
+    def test_fragments(self):
+        """
+        Test that metadata not stored in columns is preserved.
+        """
+        inv = read_inventory()
+        inv[0].comments.append(Comment("network comment"))
+        inv[0][0].comments.append(Comment("station comment"))
+        inv[0][0][0].latitude.lower_uncertainty = 0.1
+        inv.extra = AttribDict({"custom": {
+            "value": "inventory", "namespace": "http://example.com/custom"}})
+        inv2 = self._roundtrip(inv)
+        self.assertEqual(inv2, inv)
+        self.assertEqual(inv2[0].comments[0].value, "network comment")
+        self.assertEqual(inv2[0][0].comments[0].value, "station comment")
+        self.assertEqual(inv2[0][0][0].latitude.lower_uncertainty, 0.1)
+        self.assertEqual(inv2.extra.custom.value, "inventory")
+        # objects without such metadata are unaffected
+        self.assertEqual(inv2[0][0][1].comments, [])
+        _, _, arrays = _read_container(self._write(inv))
+        self.assertEqual(
+            np.count_nonzero(arrays["channel_fragment"] >= 0), 1)
+        # custom tags of channels
+        inv[0][0][1].extra = AttribDict({"custom": {
+            "value": "test", "namespace": "http://example.com/custom"}})
+        inv2 = self._roundtrip(inv)
+        self.assertEqual(inv2[0][0][1].extra.custom.value, "test")
+        self.assertEqual(inv2[0][0][1].extra.custom.namespace,
+                         "http://example.com/custom")
+
+    def test_dates(self):
+        """
+        Test that dates including nanoseconds and dates far in the future
+        are preserved.
+        """
+        inv = read_inventory()
+        cha = inv[0][0][0]
+        cha.start_date = UTCDateTime(ns=1262304000123456789)
+        cha.end_date = UTCDateTime(2599, 12, 31, 23, 59, 59)
+        inv[0][0].creation_date = UTCDateTime(1950, 1, 1)
+        inv[0][1].end_date = None
+        inv2 = self._roundtrip(inv)
+        self.assertEqual(inv2, inv)
+        self.assertEqual(inv2[0][0][0].start_date.ns, cha.start_date.ns)
+        self.assertEqual(inv2[0][0][0].end_date, cha.end_date)
+        self.assertIsNone(inv2[0][1].end_date)
+
+    def test_lazy_responses(self):
+        """
+        Test that responses are only parsed on access and that shared
+        responses are stored once.
+        """
+        inv = read_inventory(os.path.join(self.core_data, "IU_ANMO_BH.xml"))
+        for cha in inv[0][0]:
+            cha.response = inv[0][0][0].response
+        buf = self._write(inv)
+        _, _, arrays = _read_container(buf)
+        self.assertEqual(len(set(arrays["channel_response"].tolist())), 1)
+        buf.seek(0, 0)
+        inv2 = read_inventory(buf)
+        cha = inv2[0][0][1]
+        self.assertIsInstance(cha._response, _LazyResponse)
+        self.assertEqual(cha.response, inv[0][0][1].response)
+        self.assertNotIsInstance(cha._response, _LazyResponse)
+        # responses are not shared after reading
+        self.assertIsNot(inv2[0][0][0].response, cha.response)
+        # inventories with unparsed responses can be pickled and written
+        inv3 = pickle.loads(pickle.dumps(inv2, protocol=-1))
+        self.assertEqual(inv3, inv)
+        buf2 = io.BytesIO()
+        inv2.write(buf2, format="OBSPYBIN")
+        self.assertEqual(buf2.getvalue(), buf.getvalue())
+
+    def test_file_names_and_mmap(self):
+        """
+        Test writing and reading files by name, also memory-mapped.
+        """
+        inv = read_inventory(os.path.join(self.core_data, "IU_ANMO_BH.xml"))
+        with NamedTemporaryFile(suffix=".bin") as tf:
+            inv.write(tf.name, format="OBSPYBIN")
+            self.assertTrue(_is_obspybin_inventory(tf.name))
+            self.assertEqual(read_inventory(tf.name), inv)
+            inv2 = read_inventory(tf.name, format="OBSPYBIN", mmap=True)
+            self.assertEqual(inv2, inv)
+
+    def test_empty_inventory(self):
+        """
+        Test inventories without and with empty networks.
+        """
+        inv = Inventory(networks=[], source="test")
+        self.assertEqual(self._roundtrip(inv), inv)
+        inv.networks.append(Network("XX"))
+        self.assertEqual(self._roundtrip(inv), inv)
+
+    def test_is_obspybin(self):
+        """
+        Test detection of OBSPYBIN files.
+        """
+        buf = self._write(read_inventory())
+        self.assertTrue(_is_obspybin(buf))
+        self.assertTrue(_is_obspybin_inventory(buf))
+        self.assertFalse(_is_obspybin(buf, kind="catalog"))
+        # file position is not changed
+        self.assertEqual(buf.tell(), 0)
+        self.assertFalse(_is_obspybin(io.BytesIO(b"OBSPY")))
+        filename = os.path.join(self.core_data, "IU_ANMO_BH.xml")
+        self.assertFalse(_is_obspybin(filename))
+        self.assertFalse(_is_obspybin_inventory(filename))
+
+    def test_container(self):
+        """
+        Test the container with arrays of different types and alignment.
+        """
+        arrays = {"a": np.arange(3, dtype=np.int8),
+                  "b": np.linspace(0, 1, 7).reshape(7, 1),
+                  "c": np.array([], dtype=np.int32)}
+        buf = io.BytesIO()
+        _write_container(buf, "test", {"x": [1, 2]}, dict(arrays))
+        buf.seek(0, 0)
+        kind, metadata, arrays2 = _read_container(buf)
+        self.assertEqual(kind, "test")
+        self.assertEqual(metadata, {"x": [1, 2]})
+        self.assertEqual(sorted(arrays2), ["a", "b", "c"])
+        for name, array in arrays.items():
+            self.assertEqual(arrays2[name].dtype, array.dtype)
+            np.testing.assert_array_equal(arrays2[name], array)
+
+    def test_unsupported_files(self):
+        """
+        Test error messages for files of newer versions or other kinds.
+        """
+        buf = io.BytesIO()
+        _write_container(buf, "catalog", {}, {})
+        buf.seek(0, 0)
+        with self.assertRaises(ValueError) as e:
+            _read_obspybin_inventory(buf)
+        self.assertIn("'catalog'", str(e.exception))
+        data = bytearray(buf.getvalue())
+        data[len(MAGIC):len(MAGIC) + 4] = struct.pack(
+            native_str("<I"), FORMAT_VERSION + 1)
+        with self.assertRaises(ValueError) as e:
+            _read_obspybin_inventory(io.BytesIO(bytes(data)))
+        self.assertIn("format version", str(e.exception))
+
+
+def suite():
+    return unittest.makeSuite(ObsPyBinTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
@@ -23,7 +23,9 @@ by a distributed team in a transparent collaborative manner.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
+import datetime
 import inspect
 import io
 import os
@@ -45,12 +47,17 @@ from obspy.core.event import (Amplitude, Arrival, Axis, Catalog, Comment,
                               WaveformStreamID)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict, Enum
+from obspy.core.util.misc import _gc_paused
+from obspy.core.util.xmlwrapper import _write_indented
 
 QUAKEML_ROOTTAG_REGEX = r'^{(http://quakeml.org/xmlns/quakeml/([^}]*))}quakeml'
 NS_QUAKEML_PATTERN = 'http://quakeml.org/xmlns/quakeml/{version}'
 NS_QUAKEML_BED_PATTERN = 'http://quakeml.org/xmlns/bed/{version}'
 NSMAP_QUAKEML = {None: NS_QUAKEML_BED_PATTERN.format(version="1.2"),
                  'q': NS_QUAKEML_PATTERN.format(version="1.2")}
+_UTCDATETIME_REGEX = re.compile(
+    r'^(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6}))?Z?$')
+_EPOCH = datetime.datetime(1970, 1, 1)
 
 
 def _get_first_child_namespace(element):
@@ -64,6 +71,39 @@ def _get_first_child_namespace(element):
     return etree.QName(element.tag).namespace
 
 
+def _get_namespace(element):
+    """
+    Helper function returning the namespace of an element or ``None``.
+    """
+    tag = element.tag
+    if tag[:1] == "{":
+        return tag[1:tag.index("}")]
+    return None
+
+
+def _utcdatetime(text):
+    """
+    Helper function converting a string to an UTCDateTime.
+
+    Times given with at most microseconds, the usual case in QuakeML, are
+    converted directly, which is a lot faster than the generic parser of
+    UTCDateTime. All other strings are passed on to UTCDateTime.
+    """
+    match = _UTCDATETIME_REGEX.match(text)
+    if match is not None:
+        try:
+            delta = datetime.datetime(
+                *map(int, match.groups()[:6])) - _EPOCH
+        except ValueError:
+            pass
+        else:
+            fraction = match.group(7) or ""
+            ns = (delta.days * 86400 + delta.seconds) * 1000000000 + \
+                int(fraction.ljust(9, "0"))
+            return UTCDateTime(ns=ns)
+    return UTCDateTime(text)
+
+
 def _xml_doc_from_anything(source):
     """
     Helper function attempting to create an xml etree element from either a
@@ -132,6 +172,8 @@ class Unpickler(object):
     """
     def __init__(self, xml_doc=None):
         self.xml_doc = xml_doc
+        # children of elements by tag, see _xpath()
+        self._children = {}
 
     @property
     def xml_root(self):
@@ -144,14 +186,34 @@ class Unpickler(object):
         """
         Reads QuakeML file into ObsPy catalog object.
 
-        :type file: str
-        :param file: File name to read.
+        Files are parsed incrementally event by event.
+
+        :type file: str or file
+        :param file: File name or file like object to read.
         :rtype: :class:`~obspy.core.event.Catalog`
         :returns: ObsPy Catalog object.
         """
+        if hasattr(file, "read") or (
+                isinstance(file, (str, native_str)) and os.path.isfile(file)):
+            return self._load_incrementally(file)
         self.xml_doc = _xml_doc_from_anything(file)
         return self._deserialize()
 
+    def iterload(self, file):
+        """
+        Reads a QuakeML file event by event.
+
+        Only one event at a time is kept in memory (unless the events are
+        kept by the caller), metadata of the catalog is skipped.
+
+        :type file: str or file
+        :param file: File name or file like object to read.
+        :rtype: generator of :class:`~obspy.core.event.Event`
+        """
+        for event in self._iterparse(file):
+            yield event
+        self.xml_doc = None
+
     def loads(self, string):
         """
         Parses QuakeML string into ObsPy catalog object.
@@ -178,6 +240,8 @@ class Unpickler(object):
                 return False
             return None
         try:
+            if convert_to is UTCDateTime:
+                return _utcdatetime(text)
             return convert_to(text)
         except Exception:
             msg = "Could not convert %s to type %s. Returning None."
@@ -197,21 +261,29 @@ class Unpickler(object):
             warnings.warn(msg)
 
     def _xpath(self, xpath, element=None, namespace=None):
+        """
+        Return all child elements of the given name.
+
+        Only simple element names are supported. Instead of evaluating an
+        XPath expression the children are looked up directly, in the
+        namespace of the parent element if no namespace is given.
+        """
         if element is None:
             element = self.xml_root
-
-        namespaces = None
-        if namespace:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": namespace}
-        elif hasattr(element, "nsmap") and None in element.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": element.nsmap[None]}
-        elif hasattr(self, "nsmap") and None in self.nsmap:
-            xpath = "b:%s" % xpath
-            namespaces = {"b": self.nsmap[None]}
-
-        return element.xpath(xpath, namespaces=namespaces)
+        if namespace is not None and namespace != _get_namespace(element):
+            return list(element.iterchildren("{%s}%s" % (namespace, xpath)))
+        # most elements are searched for many names, so collect all children
+        # in the namespace of the element by name once
+        try:
+            children = self._children[element]
+        except KeyError:
+            children = {}
+            namespace = _get_namespace(element)
+            start = len(namespace) + 2 if namespace else 0
+            for child in element.iterchildren("{%s}*" % (namespace or "")):
+                children.setdefault(child.tag[start:], []).append(child)
+            self._children[element] = children
+        return children.get(xpath, [])
 
     def _comments(self, parent):
         obj = []
@@ -898,6 +970,13 @@ class Unpickler(object):
         self._extra(element, obj)
         return obj
 
+    def _set_namespaces(self, root):
+        root_namespace, quakeml_version = re.match(
+            QUAKEML_ROOTTAG_REGEX, root.tag).groups()
+        self._quakeml_namespaces = [
+            root_namespace,
+            NS_QUAKEML_BED_PATTERN.format(version=quakeml_version)]
+
     def _deserialize(self):
         # check node "quakeml/eventParameters" for global namespace
         try:
@@ -905,11 +984,76 @@ class Unpickler(object):
             catalog_el = self._xpath('eventParameters', namespace=namespace)[0]
         except IndexError:
             raise Exception("Not a QuakeML compatible file or string")
-        root_namespace, quakeml_version = re.match(
-            QUAKEML_ROOTTAG_REGEX, self.xml_root.tag).groups()
-        self._quakeml_namespaces = [
-            root_namespace,
-            NS_QUAKEML_BED_PATTERN.format(version=quakeml_version)]
+        self._set_namespaces(self.xml_root)
+        events = []
+        for event_el in self._xpath('event', catalog_el):
+            with _gc_paused():
+                event = self._event(event_el)
+            # the children of the elements of an event are not needed anymore
+            self._children.clear()
+            if event is not None:
+                events.append(event)
+        catalog = self._catalog(catalog_el, events)
+        self._children.clear()
+        return catalog
+
+    def _iterparse(self, file):
+        """
+        Parse a QuakeML document incrementally and yield all events.
+
+        Every event element is removed from the document once its event was
+        created, so the memory usage does not grow with the number of events.
+        Afterwards ``xml_doc`` is the rest of the document, i.e. the
+        ``quakeml`` element with all metadata of the catalog.
+
+        :param file: File name or file like object.
+        """
+        self.xml_doc = None
+        self._children.clear()
+        context = etree.iterparse(file, events=("start", "end"),
+                                  tag=("{*}quakeml", "{*}event"))
+        root = None
+        for action, element in context:
+            if root is None and action == "start":
+                # the first reported element has to be the root element
+                if element.getparent() is not None:
+                    break
+                try:
+                    self._set_namespaces(element)
+                except AttributeError:
+                    break
+                root = element
+                continue
+            if action != "end" or element is root:
+                continue
+            # only events directly below eventParameters
+            catalog_el = element.getparent()
+            if catalog_el is None or catalog_el.getparent() is not root or \
+                    etree.QName(catalog_el).localname != "eventParameters" \
+                    or _get_namespace(catalog_el) != _get_namespace(element):
+                continue
+            with _gc_paused():
+                event = self._event(element)
+            self._children.clear()
+            catalog_el.remove(element)
+            if event is not None:
+                yield event
+        if root is None:
+            raise Exception("Not a QuakeML compatible file or string")
+        self.xml_doc = root
+
+    def _load_incrementally(self, file):
+        events = list(self._iterparse(file))
+        try:
+            namespace = _get_first_child_namespace(self.xml_root)
+            catalog_el = self._xpath('eventParameters', namespace=namespace)[0]
+        except IndexError:
+            raise Exception("Not a QuakeML compatible file or string")
+        catalog = self._catalog(catalog_el, events)
+        self._children.clear()
+        return catalog
+
+    def _catalog(self, catalog_el, events):
         # create catalog
         catalog = Catalog(force_resource_id=False)
         # add any custom namespace abbreviations of root element to Catalog
@@ -918,91 +1062,99 @@ class Unpickler(object):
         catalog.description = self._xpath2obj('description', catalog_el)
         catalog.comments = self._comments(catalog_el)
         catalog.creation_info = self._creation_info(catalog_el)
-        # loop over all events
-        for event_el in self._xpath('event', catalog_el):
-            # create new Event object
-            event = Event(force_resource_id=False)
-            # optional event attributes
-            event.preferred_origin_id = \
-                self._xpath2obj('preferredOriginID', event_el)
-            event.preferred_magnitude_id = \
-                self._xpath2obj('preferredMagnitudeID', event_el)
-            event.preferred_focal_mechanism_id = \
-                self._xpath2obj('preferredFocalMechanismID', event_el)
-            event_type = self._xpath2obj('type', event_el)
-            # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
-            # event type. Will be replaced with 'not reported'.
-            if event_type == "null":
-                event_type = "not reported"
-            # USGS event types contain '_' which is not compliant with
-            # the QuakeML standard
-            if isinstance(event_type, str):
-                event_type = event_type.replace("_", " ")
-            try:
-                event.event_type = event_type
-            except ValueError:
-                msg = "Event type '%s' does not comply " % event_type
-                msg += "with QuakeML standard -- event will be ignored."
-                warnings.warn(msg, UserWarning)
-                continue
-            self._set_enum('typeCertainty', event_el,
-                           event, 'event_type_certainty')
-            event.creation_info = self._creation_info(event_el)
-            event.event_descriptions = self._event_description(event_el)
-            event.comments = self._comments(event_el)
-            # origins
-            event.origins = []
-            for origin_el in self._xpath('origin', event_el):
-                # Have to be created before the origin is created to avoid a
-                # rare issue where a warning is read when the same event is
-                # read twice - the warnings does not occur if two referred
-                # to objects compare equal - for this the arrivals have to
-                # be bound to the event before the resource id is assigned.
-                arrivals = []
-                for arrival_el in self._xpath('arrival', origin_el):
-                    arrival = self._arrival(arrival_el)
-                    arrivals.append(arrival)
-
-                origin = self._origin(origin_el, arrivals=arrivals)
-
-                # append origin with arrivals
-                event.origins.append(origin)
-            # magnitudes
-            event.magnitudes = []
-            for magnitude_el in self._xpath('magnitude', event_el):
-                magnitude = self._magnitude(magnitude_el)
-                event.magnitudes.append(magnitude)
-            # station magnitudes
-            event.station_magnitudes = []
-            for magnitude_el in self._xpath('stationMagnitude', event_el):
-                magnitude = self._station_magnitude(magnitude_el)
-                event.station_magnitudes.append(magnitude)
-            # picks
-            event.picks = []
-            for pick_el in self._xpath('pick', event_el):
-                pick = self._pick(pick_el)
-                event.picks.append(pick)
-            # amplitudes
-            event.amplitudes = []
-            for el in self._xpath('amplitude', event_el):
-                amp = self._amplitude(el)
-                event.amplitudes.append(amp)
-            # focal mechanisms
-            event.focal_mechanisms = []
-            for fm_el in self._xpath('focalMechanism', event_el):
-                fm = self._focal_mechanism(fm_el)
-                event.focal_mechanisms.append(fm)
-            # finally append newly created event to catalog
-            event.resource_id = event_el.get('publicID')
-            self._extra(event_el, event)
-            # bind event scoped resource IDs to this event
-            event.scope_resource_ids()
-            catalog.append(event)
-
+        catalog.events = events
         catalog.resource_id = catalog_el.get('publicID')
         self._extra(catalog_el, catalog)
         return catalog
 
+    def _event(self, event_el):
+        """
+        Converts an etree.Element into an Event object.
+
+        Returns ``None`` if the event type is invalid.
+
+        :type event_el: etree.Element
+        :rtype: :class:`~obspy.core.event.Event`
+        """
+        # create new Event object
+        event = Event(force_resource_id=False)
+        # optional event attributes
+        event.preferred_origin_id = \
+            self._xpath2obj('preferredOriginID', event_el)
+        event.preferred_magnitude_id = \
+            self._xpath2obj('preferredMagnitudeID', event_el)
+        event.preferred_focal_mechanism_id = \
+            self._xpath2obj('preferredFocalMechanismID', event_el)
+        event_type = self._xpath2obj('type', event_el)
+        # Change for QuakeML 1.2RC4. 'null' is no longer acceptable as an
+        # event type. Will be replaced with 'not reported'.
+        if event_type == "null":
+            event_type = "not reported"
+        # USGS event types contain '_' which is not compliant with
+        # the QuakeML standard
+        if isinstance(event_type, str):
+            event_type = event_type.replace("_", " ")
+        try:
+            event.event_type = event_type
+        except ValueError:
+            msg = "Event type '%s' does not comply " % event_type
+            msg += "with QuakeML standard -- event will be ignored."
+            warnings.warn(msg, UserWarning)
+            return None
+        self._set_enum('typeCertainty', event_el,
+                       event, 'event_type_certainty')
+        event.creation_info = self._creation_info(event_el)
+        event.event_descriptions = self._event_description(event_el)
+        event.comments = self._comments(event_el)
+        # origins
+        event.origins = []
+        for origin_el in self._xpath('origin', event_el):
+            # Have to be created before the origin is created to avoid a
+            # rare issue where a warning is read when the same event is
+            # read twice - the warnings does not occur if two referred
+            # to objects compare equal - for this the arrivals have to
+            # be bound to the event before the resource id is assigned.
+            arrivals = []
+            for arrival_el in self._xpath('arrival', origin_el):
+                arrival = self._arrival(arrival_el)
+                arrivals.append(arrival)
+
+            origin = self._origin(origin_el, arrivals=arrivals)
+
+            # append origin with arrivals
+            event.origins.append(origin)
+        # magnitudes
+        event.magnitudes = []
+        for magnitude_el in self._xpath('magnitude', event_el):
+            magnitude = self._magnitude(magnitude_el)
+            event.magnitudes.append(magnitude)
+        # station magnitudes
+        event.station_magnitudes = []
+        for magnitude_el in self._xpath('stationMagnitude', event_el):
+            magnitude = self._station_magnitude(magnitude_el)
+            event.station_magnitudes.append(magnitude)
+        # picks
+        event.picks = []
+        for pick_el in self._xpath('pick', event_el):
+            pick = self._pick(pick_el)
+            event.picks.append(pick)
+        # amplitudes
+        event.amplitudes = []
+        for el in self._xpath('amplitude', event_el):
+            amp = self._amplitude(el)
+            event.amplitudes.append(amp)
+        # focal mechanisms
+        event.focal_mechanisms = []
+        for fm_el in self._xpath('focalMechanism', event_el):
+            fm = self._focal_mechanism(fm_el)
+            event.focal_mechanisms.append(fm)
+        # finally append newly created event to catalog
+        event.resource_id = event_el.get('publicID')
+        self._extra(event_el, event)
+        # bind event scoped resource IDs to this event
+        event.scope_resource_ids()
+        return event
+
     def _extra(self, element, obj):
         """
         Add information stored in custom tags/attributes in obj.extra.
@@ -1079,21 +1231,28 @@ class Pickler(object):
         """
         Writes ObsPy Catalog into given file.
 
-        :type catalog: :class:`~obspy.core.event.Catalog`
-        :param catalog: ObsPy Catalog object.
-        :type file: str
-        :param file: File name.
+        The file is written event by event, so that events can also be
+        given by a generator without keeping all of them in memory.
+
+        :type catalog: :class:`~obspy.core.event.Catalog` or iterable of
+            :class:`~obspy.core.event.Event`
+        :param catalog: ObsPy Catalog object or events.
+        :type file: str or file
+        :param file: File name or file-like object opened in binary mode.
         """
-        fh = open(file, 'wt')
-        fh.write(self._serialize(catalog))
-        fh.close()
+        if hasattr(file, "write"):
+            self._write(catalog, file)
+        else:
+            with open(file, 'wb') as fh:
+                self._write(catalog, fh)
 
     def dumps(self, catalog):
         """
         Returns QuakeML string of given ObsPy Catalog object.
 
-        :type catalog: :class:`~obspy.core.event.Catalog`
-        :param catalog: ObsPy Catalog object.
+        :type catalog: :class:`~obspy.core.event.Catalog` or iterable of
+            :class:`~obspy.core.event.Event`
+        :param catalog: ObsPy Catalog object or events.
         :rtype: str
         :returns: QuakeML formatted string.
         """
@@ -1236,6 +1395,29 @@ class Pickler(object):
                        "left empty.") % type_
                 raise ValueError(msg)
 
+    def _collect_namespaces(self, obj):
+        """
+        Registers the namespaces of custom tags of an event type object and
+        of all objects contained in it.
+        """
+        extra = getattr(obj, "extra", None)
+        if extra:
+            self._collect_custom_namespaces(extra)
+        for name in getattr(obj, "_containers", []):
+            for item in getattr(obj, name):
+                self._collect_namespaces(item)
+        for name, _ in getattr(obj, "_properties", []):
+            value = getattr(obj, name)
+            if hasattr(value, "_properties"):
+                self._collect_namespaces(value)
+
+    def _collect_custom_namespaces(self, obj):
+        for item in obj.values():
+            self._add_namespace(item["namespace"])
+            value = item["value"]
+            if isinstance(value, compatibility.collections_abc.Mapping):
+                self._collect_custom_namespaces(value)
+
     def _get_namespace_map(self):
         nsmap = self.ns_dict.copy()
         _i = 0
@@ -1730,74 +1912,155 @@ class Pickler(object):
         self._extra(focal_mechanism, element)
         return element
 
+    def _event(self, event):
+        """
+        Converts an Event into etree.Element object.
+
+        :type event: :class:`~obspy.core.event.Event`
+        :rtype: etree.Element
+        """
+        event_el = etree.Element(
+            'event', attrib={'publicID': self._id(event.resource_id)})
+        # optional event attributes
+        if hasattr(event, "preferred_origin_id"):
+            self._str(event.preferred_origin_id, event_el,
+                      'preferredOriginID')
+        if hasattr(event, "preferred_magnitude_id"):
+            self._str(event.preferred_magnitude_id, event_el,
+                      'preferredMagnitudeID')
+        if hasattr(event, "preferred_focal_mechanism_id"):
+            self._str(event.preferred_focal_mechanism_id, event_el,
+                      'preferredFocalMechanismID')
+        # event type and event type certainty also are optional attributes.
+        if hasattr(event, "event_type"):
+            self._str(event.event_type, event_el, 'type')
+        if hasattr(event, "event_type_certainty"):
+            self._str(event.event_type_certainty, event_el,
+                      'typeCertainty')
+        # event descriptions
+        for description in event.event_descriptions:
+            el = etree.Element('description')
+            self._str(description.text, el, 'text')
+            self._str(description.type, el, 'type')
+            self._extra(description, el)
+            event_el.append(el)
+        self._comments(event.comments, event_el)
+        self._creation_info(event.creation_info, event_el)
+        # origins
+        for origin in event.origins:
+            event_el.append(self._origin(origin))
+        # magnitudes
+        for magnitude in event.magnitudes:
+            event_el.append(self._magnitude(magnitude))
+        # station magnitudes
+        for magnitude in event.station_magnitudes:
+            event_el.append(self._station_magnitude(magnitude))
+        # picks
+        for pick in event.picks:
+            event_el.append(self._pick(pick))
+        # amplitudes
+        for amp in event.amplitudes:
+            event_el.append(self._amplitude(amp))
+        # focal mechanisms
+        for focal_mechanism in event.focal_mechanisms:
+            event_el.append(self._focal_mechanism(focal_mechanism))
+        self._extra(event, event_el)
+        return event_el
+
     def _serialize(self, catalog, pretty_print=True):
         """
         Converts a Catalog object into XML string.
         """
-        catalog_el = etree.Element('eventParameters', attrib={'publicID':
-                                   self._id(catalog.resource_id)})
-        # optional catalog parameters
+        buf = io.BytesIO()
+        self._write(catalog, buf, pretty_print=pretty_print)
+        return buf.getvalue()
+
+    def _write(self, catalog, fh, pretty_print=True):
+        """
+        Writes a QuakeML document to a file-like object event by event.
+
+        Only the elements of a single event are kept in memory. The output
+        is the same as pretty printing the element tree of the whole
+        document, except for the order of the namespace declarations of the
+        root element and repeated declarations of custom namespaces on the
+        events using them.
+
+        :type catalog: :class:`~obspy.core.event.Catalog` or iterable of
+            :class:`~obspy.core.event.Event`
+        :param catalog: Catalog or events to write. Events of an iterable
+            are only requested when they are written, custom namespaces of
+            them that are not given via ``nsmap`` are declared on the event
+            elements instead of the root element.
+        :param fh: File-like object opened in binary mode.
+        """
+        is_catalog = isinstance(catalog, Catalog)
+        if is_catalog:
+            events = catalog.events
+            # declare all custom namespaces in the root element
+            for event in events:
+                self._collect_namespaces(event)
+        else:
+            events = catalog
+            catalog = Catalog()
+        # optional catalog parameters, custom tags of the catalog are
+        # written after the events
+        header_el = etree.Element('eventParameters')
         if catalog.description:
-            self._str(catalog.description, catalog_el, 'description')
-        self._comments(catalog.comments, catalog_el)
-        self._creation_info(catalog.creation_info, catalog_el)
-        for event in catalog:
-            # create event node
-            event_el = etree.Element(
-                'event', attrib={'publicID': self._id(event.resource_id)})
-            # optional event attributes
-            if hasattr(event, "preferred_origin_id"):
-                self._str(event.preferred_origin_id, event_el,
-                          'preferredOriginID')
-            if hasattr(event, "preferred_magnitude_id"):
-                self._str(event.preferred_magnitude_id, event_el,
-                          'preferredMagnitudeID')
-            if hasattr(event, "preferred_focal_mechanism_id"):
-                self._str(event.preferred_focal_mechanism_id, event_el,
-                          'preferredFocalMechanismID')
-            # event type and event type certainty also are optional attributes.
-            if hasattr(event, "event_type"):
-                self._str(event.event_type, event_el, 'type')
-            if hasattr(event, "event_type_certainty"):
-                self._str(event.event_type_certainty, event_el,
-                          'typeCertainty')
-            # event descriptions
-            for description in event.event_descriptions:
-                el = etree.Element('description')
-                self._str(description.text, el, 'text')
-                self._str(description.type, el, 'type')
-                self._extra(description, el)
-                event_el.append(el)
-            self._comments(event.comments, event_el)
-            self._creation_info(event.creation_info, event_el)
-            # origins
-            for origin in event.origins:
-                event_el.append(self._origin(origin))
-            # magnitudes
-            for magnitude in event.magnitudes:
-                event_el.append(self._magnitude(magnitude))
-            # station magnitudes
-            for magnitude in event.station_magnitudes:
-                event_el.append(self._station_magnitude(magnitude))
-            # picks
-            for pick in event.picks:
-                event_el.append(self._pick(pick))
-            # amplitudes
-            for amp in event.amplitudes:
-                event_el.append(self._amplitude(amp))
-            # focal mechanisms
-            for focal_mechanism in event.focal_mechanisms:
-                event_el.append(self._focal_mechanism(focal_mechanism))
-            self._extra(event, event_el)
-            # add event node to catalog
-            catalog_el.append(event_el)
-        self._extra(catalog, catalog_el)
+            self._str(catalog.description, header_el, 'description')
+        self._comments(catalog.comments, header_el)
+        self._creation_info(catalog.creation_info, header_el)
+        extra_el = etree.Element('eventParameters')
+        self._extra(catalog, extra_el)
+        attrib = {'publicID': self._id(catalog.resource_id)}
+        attrib.update(extra_el.attrib)
         nsmap = self._get_namespace_map()
+        # Elements are moved into a tree with the namespaces of the root
+        # element before they are written to use the same prefixes.
         root_el = etree.Element('{%s}quakeml' % NSMAP_QUAKEML['q'],
                                 nsmap=nsmap)
-        root_el.append(catalog_el)
-        return etree.tostring(root_el, pretty_print=pretty_print,
-                              encoding="utf-8", xml_declaration=True)
+        parent_el = etree.SubElement(root_el, 'eventParameters')
+
+        def write(element, parent_el=parent_el):
+            parent_el.append(element)
+            parent_el.remove(element)
+            if pretty_print:
+                _write_indented(xf, element, 2)
+            else:
+                xf.write(element)
+
+        with etree.xmlfile(fh, encoding="utf-8") as xf:
+            xf.write_declaration()
+            with xf.element(root_el.tag, nsmap=nsmap):
+                if pretty_print:
+                    xf.write("\n  ")
+                with xf.element('eventParameters', attrib=attrib):
+                    for element in list(header_el):
+                        write(element)
+                    for event in events:
+                        if is_catalog:
+                            write(self._event(event))
+                            continue
+                        # declare namespaces not declared in the root
+                        # element on the event element
+                        self._collect_namespaces(event)
+                        event_nsmap = dict(
+                            item for item in self._get_namespace_map().items()
+                            if item[1] not in nsmap.values())
+                        if not event_nsmap:
+                            write(self._event(event))
+                            continue
+                        event_parent_el = etree.SubElement(
+                            root_el, 'eventParameters', nsmap=event_nsmap)
+                        write(self._event(event), event_parent_el)
+                        root_el.remove(event_parent_el)
+                    for element in list(extra_el):
+                        write(element)
+                    if pretty_print:
+                        xf.write("\n  ")
+                if pretty_print:
+                    xf.write("\n")
+        if pretty_print:
+            fh.write(b"\n")
 
 
 def _read_quakeml(filename):
@@ -1826,15 +2089,43 @@ def _read_quakeml(filename):
     return Unpickler().load(filename)
 
 
+def _iread_quakeml(filename):
+    """
+    Reads a QuakeML file and yields the contained events one at a time.
+
+    .. warning::
+        This function should NOT be called directly, it registers via the
+        ObsPy :func:`~obspy.core.event.iread_events` function, call this
+        instead.
+
+    :type filename: str
+    :param filename: QuakeML file to be read.
+    :rtype: generator of :class:`~obspy.core.event.Event`
+
+    .. rubric:: Example
+
+    >>> from obspy.core.event import iread_events
+    >>> for event in iread_events('/path/to/iris_events.xml'):
+    ...     print(event.short_str())
+    2011-03-11T05:46:24.120000Z | +38.297, +142.373 | 9.1 MW
+    2006-09-10T04:26:33.610000Z |  +9.614, +121.961 | 9.8 MS
+    """
+    return Unpickler().iterload(filename)
+
+
 def _write_quakeml(catalog, filename, validate=False, nsmap=None,
                    **kwargs):  # @UnusedVariable
     """
     Writes a QuakeML file.
 
+    The file is written incrementally, event by event.
+
     .. warning::
         This function should NOT be called directly, it registers via the
         the :meth:`~obspy.core.event.Catalog.write` method of an
         ObsPy :class:`~obspy.core.event.Catalog` object, call this instead.
+        To write events from a generator without collecting them in a
+        Catalog use :meth:`Pickler.dump`.
 
     :type catalog: :class:`~obspy.core.event.catalog.Catalog`
     :param catalog: The ObsPy Catalog object to write.
@@ -1851,18 +2142,21 @@ def _write_quakeml(catalog, filename, validate=False, nsmap=None,
     nsmap_ = getattr(catalog, "nsmap", {})
     if nsmap:
         nsmap_.update(nsmap)
-    xml_doc = Pickler(nsmap=nsmap_).dumps(catalog)
-
-    if validate is True and not _validate(io.BytesIO(xml_doc)):
-        raise AssertionError(
-            "The final QuakeML file did not pass validation.")
-
-    # Open filehandler or use an existing file like object
-    try:
-        with open(filename, 'wb') as fh:
-            fh.write(xml_doc)
-    except TypeError:
-        filename.write(xml_doc)
+    pickler = Pickler(nsmap=nsmap_)
+
+    if validate is True:
+        xml_doc = pickler.dumps(catalog)
+        if not _validate(io.BytesIO(xml_doc)):
+            raise AssertionError(
+                "The final QuakeML file did not pass validation.")
+        # Open filehandler or use an existing file like object
+        try:
+            with open(filename, 'wb') as fh:
+                fh.write(xml_doc)
+        except TypeError:
+            filename.write(xml_doc)
+    else:
+        pickler.dump(catalog, filename)
 
 
 def _read_seishub_event_xml(filename):
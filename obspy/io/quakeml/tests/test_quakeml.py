@@ -11,15 +11,17 @@ import warnings
 
 from lxml import etree
 
-from obspy.core.event import (Catalog, Event, FocalMechanism, Magnitude,
-                              MomentTensor, Origin, Pick, ResourceIdentifier,
-                              Tensor, WaveformStreamID, read_events,
-                              EventDescription)
+from obspy.core.event import (Catalog, Comment, Event, FocalMechanism,
+                              Magnitude, MomentTensor, Origin, Pick,
+                              ResourceIdentifier,
+                              Tensor, WaveformStreamID, iread_events,
+                              read_events, EventDescription)
 from obspy.core.utcdatetime import UTCDateTime
 from obspy.core.util import AttribDict
 from obspy.core.util.base import NamedTemporaryFile
 from obspy.core.util.testing import compare_xml_strings
-from obspy.io.quakeml.core import Pickler, _read_quakeml, _write_quakeml
+from obspy.io.quakeml.core import (Pickler, Unpickler, _read_quakeml,
+                                   _utcdatetime, _write_quakeml)
 
 
 # lxml < 2.3 seems not to ship with RelaxNG schema parser and namespace support
@@ -1202,6 +1204,133 @@ class QuakeMLTestCase(unittest.TestCase):
         self.assertIn(('custom1', custom1), cat2.extra.items())
         self.assertIn(('custom2', custom2), cat2.extra.items())
 
+    def test_iread_events(self):
+        """
+        Test reading QuakeML files event by event.
+        """
+        filenames = [self.neries_filename,
+                     os.path.join(self.path, 'iris_events.xml'),
+                     os.path.join(self.path, 'qml-example-1.2-RC3.xml'),
+                     os.path.join(self.path, 'quakeml_1.2_origin.xml')]
+        for filename in filenames:
+            cat = read_events(filename)
+            events = list(iread_events(filename))
+            self.assertEqual(events, cat.events, msg=filename)
+            for event in events:
+                self.assertEqual(event._format, "QUAKEML")
+            with open(filename, "rb") as fh:
+                self.assertEqual(list(iread_events(fh)), cat.events)
+        with open(self.neries_filename, "rb") as fh:
+            events = iread_events(fh, format="QUAKEML")
+            self.assertEqual(next(events), self.neries_catalog[0])
+        # formats without an incremental reader
+        with NamedTemporaryFile() as tf:
+            self.neries_catalog.write(tf.name, format="ZMAP")
+            events = list(iread_events(tf.name))
+            # ZMAP files are read with random resource identifiers
+            self.assertEqual([event.short_str() for event in events],
+                             [event.short_str() for event in
+                              read_events(tf.name).events])
+            self.assertEqual(len(events), 3)
+            self.assertEqual(events[0]._format, "ZMAP")
+
+    def test_incremental_load(self):
+        """
+        Test that reading files incrementally and reading strings at once
+        result in the same catalog.
+        """
+        for filename in os.listdir(self.path):
+            if filename.startswith("invalid"):
+                continue
+            filename = os.path.join(self.path, filename)
+            with open(filename, "rb") as fh:
+                data = fh.read()
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("ignore")
+                cat = Unpickler().load(filename)
+                cat2 = Unpickler().loads(data)
+            self.assertEqual(cat, cat2, msg=filename)
+            self.assertEqual(getattr(cat, "extra", None),
+                             getattr(cat2, "extra", None), msg=filename)
+            self.assertEqual(cat.nsmap, cat2.nsmap, msg=filename)
+        with self.assertRaises(Exception):
+            Unpickler().load(io.BytesIO(b"<xml>test</xml>"))
+
+    def test_utcdatetime_parsing(self):
+        """
+        Test the fast path for parsing ISO 8601 times.
+        """
+        times = ["2012-04-04T14:21:42.300000Z", "2012-04-04T14:21:42Z",
+                 "2012-04-04T14:21:42.3", "1970-01-01T00:00:00.000001Z",
+                 "1893-02-28T23:59:59.999999Z", "2599-12-31T23:59:59Z",
+                 "2012-04-04T14:21:42.1234567Z", "2012-04-04 14:21:42",
+                 "2012-04-04T14:21:42+01:00", "2012-095T14:21:42"]
+        for text in times:
+            self.assertEqual(_utcdatetime(text), UTCDateTime(text),
+                             msg=text)
+            self.assertEqual(_utcdatetime(text).ns, UTCDateTime(text).ns,
+                             msg=text)
+        with self.assertRaises(ValueError):
+            _utcdatetime("2012-13-04T14:21:42Z")
+
+    def test_incremental_writing(self):
+        """
+        Tests that the event by event written document is identical to the
+        pretty printed element tree of the whole document.
+        """
+        parser = etree.XMLParser(remove_blank_text=True)
+        for filename in ["qml-example-1.2-RC3.xml", "usgs_event.xml",
+                         "iris_events.xml", "neries_events.xml"]:
+            filename = os.path.join(self.path, filename)
+            cat = _read_quakeml(filename)
+            cat.comments.append(Comment(text="catalog comment"))
+            cat.description = "catalog description"
+            data = Pickler().dumps(cat)
+            tree = etree.parse(io.BytesIO(data), parser)
+            # custom namespaces are declared in the root element and
+            # additionally on the events using them
+            for element in tree.getroot().iter("{*}event"):
+                etree.cleanup_namespaces(element)
+            expected = etree.tostring(tree, pretty_print=True,
+                                      xml_declaration=True, encoding="utf-8")
+            self.assertEqual(
+                etree.tostring(etree.parse(io.BytesIO(data)),
+                               method="c14n"),
+                etree.tostring(etree.parse(io.BytesIO(expected)),
+                               method="c14n"))
+            if b"xmlns:ns0" not in data:
+                self.assertEqual(data, expected)
+
+    def test_write_events_from_generator(self):
+        """
+        Tests writing events that are not collected in a catalog.
+        """
+        filename = os.path.join(self.path, "qml-example-1.2-RC3.xml")
+        cat = _read_quakeml(filename)
+        cat.events += self.neries_catalog.events
+        cat[0].extra = AttribDict({
+            'public': {'value': 'test',
+                       'namespace': 'http://some-page.de/xmlns/1.0'}})
+        created = []
+
+        def events():
+            for event in cat:
+                created.append(event)
+                yield event
+
+        buf = io.BytesIO()
+        Pickler().dump(events(), buf)
+        self.assertEqual(len(created), len(cat))
+        cat2 = _read_quakeml(io.BytesIO(buf.getvalue()))
+        self.assertEqual(cat2.events, cat.events)
+        self.assertEqual(cat2[0].extra.public.value, 'test')
+        # same via a file name and for an empty generator
+        with NamedTemporaryFile() as tf:
+            Pickler().dump(iter(cat), tf.name)
+            self.assertEqual(_read_quakeml(tf.name).events, cat.events)
+            Pickler().dump(iter([]), tf.name)
+            self.assertEqual(len(_read_quakeml(tf.name)), 0)
+
 
 def suite():
     return unittest.makeSuite(QuakeMLTestCase, 'test')
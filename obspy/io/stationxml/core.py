@@ -14,6 +14,8 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import copy
+import functools
+import gzip
 import inspect
 import io
 import math
@@ -27,6 +29,7 @@ import obspy
 from obspy.core import compatibility
 from obspy.core.util import AttribDict
 from obspy.core.util.deprecation_helpers import ObsPyDeprecationWarning
+from obspy.core.util.xmlwrapper import _write_indented
 from obspy.core.util.obspy_types import (ComplexWithUncertainties,
                                          FloatWithUncertaintiesAndUnit)
 from obspy.core.inventory import (CoefficientsTypeResponseStage,
@@ -144,23 +147,69 @@ def validate_stationxml(path_or_object):
     return (True, ())
 
 
-def _read_stationxml(path_or_file_object):
+def _read_stationxml(path_or_file_object, lazy_responses=False):
     """
     Function reading a StationXML file.
 
+    The file is parsed incrementally and the elements of every station are
+    freed once the station has been read, so that memory usage stays close to
+    the size of the resulting inventory even for very large files.
+
     :param path_or_file_object: File name or file like object.
+    :type lazy_responses: bool
+    :param lazy_responses: If ``True``, responses are not parsed while
+        reading. Instead, the (compact) raw XML of every response is kept and
+        only parsed when the ``response`` attribute of the channel is first
+        accessed. This makes reading response level files a lot faster and
+        reduces memory usage if only some of the responses are needed. Note
+        that problems in the response information are only reported on
+        access then.
     """
-    root = etree.parse(path_or_file_object).getroot()
-
     # Fix the namespace as its not always the default namespace. Will need
     # to be adjusted if the StationXML format gets another revision!
     namespace = "http://www.fdsn.org/xml/station/1"
 
-    stationxml_version = root.attrib.get('schemaVersion')
-
     def _ns(tagname):
         return "{%s}%s" % (namespace, tagname)
 
+    # raw XML of all lazily read responses, identical responses share memory
+    response_cache = {} if lazy_responses else None
+
+    root = None
+    networks = []
+    stations = []
+    context = etree.iterparse(
+        path_or_file_object, events=("start", "end"),
+        tag=(_ns("FDSNStationXML"), _ns("Network"), _ns("Station")))
+    with warnings.catch_warnings():
+        for event, element in context:
+            if event == "start":
+                if root is None:
+                    root = element
+                    if root.attrib.get('schemaVersion') == '1.0':
+                        warnings.filterwarnings(
+                            'ignore',
+                            'Setting Numerator/Denominator with a unit is '
+                            'deprecated.', ObsPyDeprecationWarning)
+                continue
+            if element.tag == _ns("Station"):
+                stations.append(_read_station(element, _ns, response_cache))
+            elif element.tag == _ns("Network"):
+                # already read stations were removed from the tree
+                network = _read_network(element, _ns)
+                network.stations = stations
+                networks.append(network)
+                stations = []
+            else:
+                continue
+            # free memory of all elements read so far
+            element.clear()
+            element.getparent().remove(element)
+
+    if root is None or root.tag != _ns("FDSNStationXML"):
+        msg = "Not a StationXML file."
+        raise ValueError(msg)
+
     # Source and Created field must exist in a StationXML.
     source = root.find(_ns("Source")).text
     created = obspy.UTCDateTime(root.find(_ns("Created")).text)
@@ -170,16 +219,6 @@ def _read_stationxml(path_or_file_object):
     module = _tag2obj(root, _ns("Module"), str)
     module_uri = _tag2obj(root, _ns("ModuleURI"), str)
 
-    networks = []
-    with warnings.catch_warnings():
-        if stationxml_version == '1.0':
-            warnings.filterwarnings(
-                'ignore',
-                'Setting Numerator/Denominator with a unit is deprecated.',
-                ObsPyDeprecationWarning)
-        for network in root.findall(_ns("Network")):
-            networks.append(_read_network(network, _ns))
-
     inv = obspy.core.inventory.Inventory(networks=networks, source=source,
                                          sender=sender, created=created,
                                          module=module, module_uri=module_uri)
@@ -244,7 +283,7 @@ def _read_network(net_element, _ns):
     return network
 
 
-def _read_station(sta_element, _ns):
+def _read_station(sta_element, _ns, response_cache=None):
     longitude = _read_floattype(sta_element, _ns("Longitude"), Longitude,
                                 datum=True)
     latitude = _read_floattype(sta_element, _ns("Latitude"), Latitude,
@@ -282,7 +321,7 @@ def _read_station(sta_element, _ns):
         # Skip empty channels.
         if not channel.items() and not channel.attrib:
             continue
-        cha = _read_channel(channel, _ns)
+        cha = _read_channel(channel, _ns, response_cache)
         # Might be None in case the channel could not be parsed.
         if cha is None:
             # This is None if, and only if, one of the coordinates could not
@@ -359,11 +398,15 @@ def _read_floattype_list(parent, tag, cls, unit=False, datum=False,
     return objs
 
 
-def _read_channel(cha_element, _ns):
+def _read_channel(cha_element, _ns, response_cache=None):
     """
     Returns either a :class:`~obspy.core.inventory.channel.Channel` object or
     ``None``.
 
+    If ``response_cache`` is given (a dictionary), the response is not parsed
+    but stored as raw XML to be read on first access, see
+    :func:`_read_lazy_response`.
+
     It should return ``None`` if and only if it did not manage to
     successfully create a :class:`~obspy.core.inventory.channel.Channel`
     object which can only happen if one of the coordinates is not set. All the
@@ -439,12 +482,47 @@ def _read_channel(cha_element, _ns):
         channel.equipments.append(_read_equipment(equipment, _ns))
     # Finally parse the response.
     response = cha_element.find(_ns("Response"))
-    if response is not None:
+    if response is None:
+        pass
+    elif response_cache is not None:
+        raw = etree.tostring(response, with_tail=False)
+        raw = response_cache.setdefault(raw, raw)
+        channel._set_lazy_response(functools.partial(
+            _read_lazy_response, raw,
+            cha_element.getroottree().getroot().attrib.get('schemaVersion')))
+    else:
         channel.response = _read_response(response, _ns)
         channel.response._attempt_to_fix_units()
     return channel
 
 
+def _read_lazy_response(raw, stationxml_version=None):
+    """
+    Read a response from the raw XML stored by :func:`_read_channel`.
+
+    :type raw: bytes
+    :param raw: Serialized ``Response`` element.
+    :type stationxml_version: str
+    :param stationxml_version: Version of the file the response was read
+        from.
+    :rtype: :class:`~obspy.core.inventory.response.Response`
+    """
+    namespace = "http://www.fdsn.org/xml/station/1"
+
+    def _ns(tagname):
+        return "{%s}%s" % (namespace, tagname)
+
+    with warnings.catch_warnings():
+        if stationxml_version == '1.0':
+            warnings.filterwarnings(
+                'ignore',
+                'Setting Numerator/Denominator with a unit is deprecated.',
+                ObsPyDeprecationWarning)
+        response = _read_response(etree.fromstring(raw), _ns)
+    response._attempt_to_fix_units()
+    return response
+
+
 def _read_response(resp_element, _ns):
     response = obspy.core.inventory.response.Response()
     response.resource_id = resp_element.attrib.get('resourceId')
@@ -872,9 +950,15 @@ def _read_phone(phone_element, _ns):
 
 
 def _write_stationxml(inventory, file_or_file_object, validate=False,
-                      nsmap=None, level="response", **kwargs):
+                      nsmap=None, level="response", compress=False,
+                      **kwargs):
     """
     Writes an inventory object to a buffer.
+
+    The document is written incrementally, station by station, so that the
+    memory needed for the XML elements does not grow with the size of the
+    inventory.
+
     :type inventory: :class:`~obspy.core.inventory.Inventory`
     :param inventory: The inventory instance to be written.
     :param file_or_file_object: The file or file-like object to be written to.
@@ -885,7 +969,9 @@ def _write_stationxml(inventory, file_or_file_object, validate=False,
     :type nsmap: dict
     :param nsmap: Additional custom namespace abbreviation mappings
         (e.g. `{"edb": "http://erdbeben-in-bayern.de/xmlns/0.1"}`).
-
+    :type compress: bool
+    :param compress: If True, the document is gzip compressed while it is
+        written. Defaults to False.
     """
     if nsmap is None:
         nsmap = {}
@@ -896,58 +982,124 @@ def _write_stationxml(inventory, file_or_file_object, validate=False,
         raise ValueError(msg)
 
     nsmap[None] = "http://www.fdsn.org/xml/station/1"
-    attrib = {"schemaVersion": SCHEMA_VERSION}
-
-    root = etree.Element("FDSNStationXML", attrib=attrib, nsmap=nsmap)
-
-    etree.SubElement(root, "Source").text = inventory.source
-    if inventory.sender:
-        etree.SubElement(root, "Sender").text = inventory.sender
-
-    # Undocumented flag that does not write the module flags. Useful for
-    # testing. It is undocumented because it should not be used publicly.
-    if kwargs.get("_suppress_module_tags", False):
-        pass
-    else:
-        etree.SubElement(root, "Module").text = inventory.module
-        etree.SubElement(root, "ModuleURI").text = inventory.module_uri
-
-    etree.SubElement(root, "Created").text = str(inventory.created)
 
     if level not in ["network", "station", "channel", "response"]:
         raise ValueError("Requested stationXML write level is unsupported.")
 
-    for network in inventory.networks:
-        _write_network(root, network, level)
-
-    # Add custom namespace tags to root element
-    _write_extra(root, inventory)
-
-    tree = root.getroottree()
+    # Register all namespaces. This allows for additional namespaces to be
+    # added to an inventory that was not created by reading a StationXML
+    # file.
+    for prefix, ns in nsmap.items():
+        if prefix and ns:
+            etree.register_namespace(prefix, ns)
 
     # The validation has to be done after parsing once again so that the
     # namespaces are correctly assembled.
     if validate is True:
         buf = io.BytesIO()
-        tree.write(buf)
+        _write_stationxml_document(inventory, buf, nsmap, level, **kwargs)
         buf.seek(0)
         validates, errors = validate_stationxml(buf)
-        buf.close()
         if validates is False:
             msg = "The created file fails to validate.\n"
             for err in errors:
                 msg += "\t%s\n" % err
             raise Exception(msg)
+        data = buf.getvalue()
+        buf.close()
+
+        def write_document(fh):
+            fh.write(data)
+    else:
+        def write_document(fh):
+            _write_stationxml_document(inventory, fh, nsmap, level,
+                                       **kwargs)
+
+    if compress:
+        if hasattr(file_or_file_object, "write"):
+            fh = gzip.GzipFile(fileobj=file_or_file_object, mode="wb")
+        else:
+            fh = gzip.open(file_or_file_object, "wb")
+        with fh:
+            write_document(fh)
+    elif hasattr(file_or_file_object, "write"):
+        write_document(file_or_file_object)
+    else:
+        with open(file_or_file_object, "wb") as fh:
+            write_document(fh)
 
-    # Register all namespaces with the tree. This allows for
-    # additional namespaces to be added to an inventory that
-    # was not created by reading a StationXML file.
-    for prefix, ns in nsmap.items():
-        if prefix and ns:
-            etree.register_namespace(prefix, ns)
 
-    tree.write(file_or_file_object, pretty_print=True, xml_declaration=True,
-               encoding="UTF-8")
+def _write_stationxml_document(inventory, fh, nsmap, level, **kwargs):
+    """
+    Write a StationXML document to a file-like object element by element.
+
+    The output is the same as pretty printing the element tree of the whole
+    document, except for the order of namespace declarations of the root
+    element and repeated declarations of custom namespaces.
+    """
+    attrib = {"schemaVersion": SCHEMA_VERSION}
+    # Header elements and custom namespace tags of the root element are
+    # created in a root element that is not written itself, the root
+    # element is opened with its attributes and namespaces instead.
+    root = etree.Element("FDSNStationXML", attrib=attrib)
+
+    etree.SubElement(root, "Source").text = inventory.source
+    if inventory.sender:
+        etree.SubElement(root, "Sender").text = inventory.sender
+
+    # Undocumented flag that does not write the module flags. Useful for
+    # testing. It is undocumented because it should not be used publicly.
+    if kwargs.get("_suppress_module_tags", False):
+        pass
+    else:
+        etree.SubElement(root, "Module").text = inventory.module
+        etree.SubElement(root, "ModuleURI").text = inventory.module_uri
+
+    etree.SubElement(root, "Created").text = str(inventory.created)
+
+    # Add custom namespace tags to root element
+    extra = etree.Element("FDSNStationXML")
+    _write_extra(extra, inventory)
+    attrib = dict(root.attrib)
+    attrib.update(extra.attrib)
+    nsmap = dict(nsmap)
+    for prefix, ns in extra.nsmap.items():
+        if ns not in nsmap.values():
+            nsmap[prefix] = ns
+
+    with etree.xmlfile(fh, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element(root.tag, attrib=attrib, nsmap=nsmap):
+            for element in root:
+                _write_indented(xf, element, 1)
+            for network in inventory.networks:
+                _write_network_incrementally(xf, network, level)
+            for element in extra:
+                _write_indented(xf, element, 1)
+            xf.write("\n")
+    fh.write(b"\n")
+
+
+def _write_network_incrementally(xf, network, level):
+    """
+    Write a network to an :class:`lxml.etree.xmlfile`, station by station.
+    """
+    parent = etree.Element("FDSNStationXML")
+    _write_network(parent, network, "network")
+    network_elem = parent[0]
+    if level == "network" or not network.stations:
+        _write_indented(xf, network_elem, 1)
+        return
+    xf.write("\n  ")
+    with xf.element(network_elem.tag, attrib=dict(network_elem.attrib)):
+        for element in network_elem:
+            _write_indented(xf, element, 2)
+        for station in network.stations:
+            _write_station(parent, station, level)
+            _write_indented(xf, parent[-1], 2)
+            # free the elements of all written stations
+            del parent[-1]
+        xf.write("\n  ")
 
 
 def _get_base_node_attributes(element):
@@ -14,9 +14,11 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 
 import fnmatch
+import gzip
 import inspect
 import io
 import os
+import pickle
 import re
 import unittest
 import warnings
@@ -28,6 +30,7 @@ from obspy.core.util.deprecation_helpers import ObsPyDeprecationWarning
 from obspy.core.inventory import (Inventory, Network, ResponseStage)
 from obspy.core.inventory.util import DataAvailability
 from obspy.core.util.base import NamedTemporaryFile
+from obspy.core.util.xmlwrapper import _indent
 from lxml import etree
 import obspy.io.stationxml.core
 
@@ -1287,6 +1290,109 @@ class StationXMLTestCase(unittest.TestCase):
         self.assertEqual(
             lats, [-53.12, 44.77, 63.39, 12.46, -13.16, -84.44, 43.9, -88.41])
 
+    def test_lazy_responses(self):
+        """
+        Tests reading responses only on first access.
+        """
+        from obspy.core.inventory.channel import _LazyResponse
+        for filename in ["IRIS_single_channel_with_response.xml",
+                         "IRIS_single_channel_with_response_custom_tags.xml",
+                         "full_random_stationxml.xml",
+                         "full_random_stationxml_1_0.xml",
+                         "stationxml_BK.CMB.__.LKS.xml",
+                         "stationxml_IU.ANTO.30.LDO.xml"]:
+            filename = os.path.join(self.data_dir, filename)
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                inv = obspy.read_inventory(filename, format="STATIONXML")
+            with warnings.catch_warnings(record=True) as w_lazy:
+                warnings.simplefilter("always")
+                inv_lazy = obspy.read_inventory(
+                    filename, format="STATIONXML", lazy_responses=True)
+                channels = [cha for net in inv_lazy for sta in net
+                            for cha in sta]
+                self.assertTrue(all(
+                    isinstance(cha._response, _LazyResponse)
+                    for cha in channels if cha._response is not None))
+                # pickling and copying keeps responses unparsed
+                inv_lazy2 = pickle.loads(pickle.dumps(inv_lazy))
+                self.assertIsInstance(inv_lazy2[0][0][0]._response,
+                                      _LazyResponse)
+                self.assertEqual(inv_lazy2, inv)
+                self.assertEqual(inv_lazy.copy(), inv)
+                self.assertIsInstance(inv_lazy[0][0][0]._response,
+                                      _LazyResponse)
+                # accessing the response parses it
+                for cha in channels:
+                    response = cha.response
+                    self.assertIs(cha.response, response)
+                self.assertEqual(inv_lazy, inv)
+            self.assertEqual([str(w_.message) for w_ in w_lazy],
+                             [str(w_.message) for w_ in w])
+
+        # identical responses are only stored once
+        with open(os.path.join(
+                self.data_dir, "IRIS_single_channel_with_response.xml"),
+                "rb") as fh:
+            data = fh.read()
+        start = data.index(b"<Channel ")
+        end = data.index(b"</Channel>") + len(b"</Channel>")
+        data = data[:end] + data[start:end].replace(
+            b'locationCode="10"', b'locationCode="20"') + data[end:]
+        inv = obspy.read_inventory(io.BytesIO(data), format="STATIONXML",
+                                   lazy_responses=True)
+        cha1, cha2 = inv[0][0]
+        self.assertIs(cha1._response.loader.args[0],
+                      cha2._response.loader.args[0])
+        self.assertEqual(cha1.response, cha2.response)
+        self.assertIsNot(cha1.response, cha2.response)
+
+    def test_incremental_writing(self):
+        """
+        Tests that the station by station written document is identical to
+        the pretty printed element tree of the whole document.
+        """
+        parser = etree.XMLParser(remove_blank_text=True)
+        for filename in ["IRIS_single_channel_with_response.xml",
+                         "full_random_stationxml.xml",
+                         "stationxml_with_availability.xml"]:
+            filename = os.path.join(self.data_dir, filename)
+            inv = obspy.read_inventory(filename, format="STATIONXML")
+            inv += obspy.read_inventory()
+            inv.networks.append(Network("XX"))
+            for level in ["network", "station", "channel", "response"]:
+                buf = io.BytesIO()
+                inv.write(buf, format="STATIONXML", level=level)
+                tree = etree.parse(io.BytesIO(buf.getvalue()), parser)
+                expected = etree.tostring(tree, pretty_print=True,
+                                          xml_declaration=True,
+                                          encoding="UTF-8")
+                self.assertEqual(buf.getvalue(), expected)
+                # fallback for lxml versions without etree.indent()
+                root = tree.getroot()
+                expected = etree.tostring(root, pretty_print=True)
+                _indent(root, 0)
+                self.assertEqual(etree.tostring(root) + b"\n", expected)
+
+    def test_write_compressed(self):
+        """
+        Tests gzip compressing StationXML while writing it.
+        """
+        inv = obspy.read_inventory()
+        buf = io.BytesIO()
+        inv.write(buf, format="STATIONXML")
+        buf_gz = io.BytesIO()
+        inv.write(buf_gz, format="STATIONXML", compress=True)
+        # the file object is not closed
+        self.assertFalse(buf_gz.closed)
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(
+            buf_gz.getvalue())).read(), buf.getvalue())
+        with NamedTemporaryFile(suffix=".xml.gz") as tf:
+            inv.write(tf.name, format="STATIONXML", compress=True)
+            with gzip.open(tf.name, "rb") as fh:
+                self.assertEqual(fh.read(), buf.getvalue())
+            self.assertEqual(obspy.read_inventory(tf.name), inv)
+
 
 def suite():
     return unittest.makeSuite(StationXMLTestCase, "test")
@@ -34,6 +34,11 @@ REALTIME_PROCESS_FUNCTIONS = {
     'tauc': (signal.tauc, 2),
     'mwpintegral': (signal.mwpintegral, 1),
     'kurtosis': (signal.kurtosis, 3),
+    'recstalta': (signal.recursive_sta_lta, 1),
+    'classicstalta': (signal.classic_sta_lta, 3),
+    'delayedstalta': (signal.delayed_sta_lta, 2),
+    'zdetect': (signal.z_detect, 2),
+    'carlstatrig': (signal.carl_sta_trig, 5),
 }
 
 
@@ -28,6 +28,7 @@ import math
 import sys
 
 import numpy as np
+from scipy.signal import lfilter
 
 from obspy.core.trace import Trace, UTCDateTime
 from obspy.realtime.rtmemory import RtMemory
@@ -635,3 +636,361 @@ def kurtosis(trace, win=3.0, rtmemory_list=None):
     rtmemory_k4_bar.input[0] = k4_bar_last
 
     return kappa4
+
+
+def _lagged(data, lag, history):
+    """
+    Return data delayed by ``lag`` samples.
+
+    Samples from before the start of ``data`` are taken from the end of
+    ``history``, which has to hold at least ``lag`` samples of the previously
+    processed data.
+    """
+    npts = np.size(data)
+    start = np.size(history) - lag
+    return np.concatenate((history[start:start + min(npts, lag)],
+                           data[:max(0, npts - lag)]))
+
+
+def _moving_sum(data, width, rtmemory, exclusive=False):
+    """
+    Compute a running sum over the last ``width`` samples.
+
+    The sum is updated incrementally from the previous packet, so the cost is
+    proportional to the length of ``data`` and not to ``width``.
+
+    :type data: numpy.ndarray
+    :param data: New data packet.
+    :type width: int
+    :param width: Window length in samples.
+    :type rtmemory: :class:`~obspy.realtime.rtmemory.RtMemory`
+    :param rtmemory: Persistent memory holding the last ``width`` samples and
+        the running sum.
+    :type exclusive: bool, optional
+    :param exclusive: If ``True``, the window ends at the sample preceding
+        the current one, otherwise it includes the current sample.
+    :rtype: numpy.ndarray
+    :return: Running sums for every sample of ``data``.
+    """
+    if not rtmemory.initialized:
+        rtmemory.initialize(np.float64, width, 1, 0, 0)
+    last_sum = rtmemory.output[0]
+    sums = last_sum + np.cumsum(data - _lagged(data, width, rtmemory.input))
+    rtmemory.output[0] = sums[-1]
+    rtmemory.update_input(data)
+    if exclusive:
+        sums = np.concatenate(([last_sum], sums[:-1]))
+    return sums
+
+
+def _init_trigger_state(trace, rtmemory_list, num, size_output):
+    """
+    Common argument checks and state setup of the STA/LTA style triggers.
+
+    The first :class:`~obspy.realtime.rtmemory.RtMemory` object of the list
+    holds scalar state in its output array, with the number of samples
+    processed so far stored at index ``0``.
+    """
+    if not isinstance(trace, Trace):
+        msg = "trace parameter must be an obspy.core.trace.Trace object."
+        raise ValueError(msg)
+
+    if not rtmemory_list:
+        rtmemory_list = [RtMemory() for _i in range(num)]
+
+    rtmemory = rtmemory_list[0]
+    if not rtmemory.initialized:
+        rtmemory.initialize(np.float64, 0, size_output, 0, 0)
+
+    return rtmemory_list
+
+
+def _window_samples(trace, seconds, name):
+    """
+    Convert a window length in seconds to a (positive) number of samples.
+    """
+    nsamp = int(seconds * trace.stats.sampling_rate)
+    if not nsamp > 0:
+        msg = "%s parameter not specified or shorter than one sample." % name
+        raise ValueError(msg)
+    return nsamp
+
+
+def recursive_sta_lta(trace, sta, lta, rtmemory_list=None):
+    """
+    Recursive STA/LTA characteristic function for sequential data packets.
+
+    Gives the same result as
+    :func:`obspy.signal.trigger.recursive_sta_lta` applied to the
+    concatenated data, but only the filter state is carried from one packet
+    to the next.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type sta: float
+    :param sta: Length of short time average window in seconds.
+    :type lta: float
+    :param lta: Length of long time average window in seconds.
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    rtmemory_list = _init_trigger_state(trace, rtmemory_list, 1, 3)
+    nsta = _window_samples(trace, sta, 'sta')
+    nlta = _window_samples(trace, lta, 'lta')
+
+    sample = np.require(trace.data, np.float64)
+    npts = np.size(sample)
+    if npts < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+    count, sta_last, lta_last = rtmemory.output
+
+    csta = 1. / nsta
+    clta = 1. / nlta
+    sq = sample ** 2
+    if count == 0:
+        # first sample is skipped by the batch version
+        sq[0] = 0.
+    # first order recursive filters, initial conditions from previous packet
+    sta_, _ = lfilter([csta], [1., csta - 1.], sq,
+                      zi=[(1. - csta) * sta_last])
+    lta_, _ = lfilter([clta], [1., clta - 1.], sq,
+                      zi=[(1. - clta) * lta_last])
+
+    charfct = np.zeros(npts, dtype=np.float64)
+    idx = lta_ > 0
+    charfct[idx] = sta_[idx] / lta_[idx]
+    charfct[:max(0, nlta - int(count))] = 0.
+
+    rtmemory.output[:] = (count + npts, sta_[-1], lta_[-1])
+
+    return charfct
+
+
+def classic_sta_lta(trace, sta, lta, rtmemory_list=None):
+    """
+    Classic STA/LTA characteristic function for sequential data packets.
+
+    Gives the same result as :func:`obspy.signal.trigger.classic_sta_lta`
+    applied to the concatenated data. The window sums are updated from the
+    previous packet, so the processing cost only depends on the packet
+    length.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type sta: float
+    :param sta: Length of short time average window in seconds.
+    :type lta: float
+    :param lta: Length of long time average window in seconds.
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    rtmemory_list = _init_trigger_state(trace, rtmemory_list, 3, 1)
+    nsta = _window_samples(trace, sta, 'sta')
+    nlta = _window_samples(trace, lta, 'lta')
+
+    sample = np.require(trace.data, np.float64)
+    npts = np.size(sample)
+    if npts < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+    count = int(rtmemory.output[0])
+
+    sq = sample ** 2
+    sta_ = _moving_sum(sq, nsta, rtmemory_list[1]) / nsta
+    lta_ = _moving_sum(sq, nlta, rtmemory_list[2]) / nlta
+
+    # avoid division by zero by setting zero values to tiny float
+    dtiny = np.finfo(0.0).tiny
+    lta_[lta_ < dtiny] = dtiny
+    charfct = sta_ / lta_
+    charfct[:max(0, nlta - 1 - count)] = 0.
+
+    rtmemory.output[0] = count + npts
+
+    return charfct
+
+
+def delayed_sta_lta(trace, sta, lta, rtmemory_list=None):
+    """
+    Delayed STA/LTA characteristic function for sequential data packets.
+
+    Corresponds to :func:`obspy.signal.trigger.delayed_sta_lta`, with
+    samples before the first packet taken as zero (the batch version wraps
+    around to the end of the data array instead).
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type sta: float
+    :param sta: Length of short time average window in seconds.
+    :type lta: float
+    :param lta: Length of long time average window in seconds.
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    rtmemory_list = _init_trigger_state(trace, rtmemory_list, 2, 3)
+    nsta = _window_samples(trace, sta, 'sta')
+    nlta = _window_samples(trace, lta, 'lta')
+
+    sample = np.require(trace.data, np.float64)
+    npts = np.size(sample)
+    if npts < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+    count, sta_last, lta_last = rtmemory.output
+
+    rtmemory_sq = rtmemory_list[1]
+    if not rtmemory_sq.initialized:
+        rtmemory_sq.initialize(np.float64, nsta + nlta + 1, 0, 0, 0)
+    history = rtmemory_sq.input
+
+    sq = sample ** 2
+    sta_ = sta_last + np.cumsum(
+        (sq + _lagged(sq, nsta, history)) / nsta)
+    lta_ = lta_last + np.cumsum(
+        (_lagged(sq, nsta + 1, history) +
+         _lagged(sq, nsta + nlta + 1, history)) / nlta)
+    rtmemory_sq.update_input(sq)
+
+    rtmemory.output[:] = (count + npts, sta_[-1], lta_[-1])
+
+    # mute start (sta set to 0 and lta set to 1 in batch version)
+    nmute = max(0, nlta + nsta + 50 - int(count))
+    sta_[:nmute] = 0.
+    lta_[:nmute] = 1.
+    return sta_ / lta_
+
+
+def z_detect(trace, sta, rtmemory_list=None):
+    """
+    Z-detector characteristic function for sequential data packets.
+
+    Corresponds to :func:`obspy.signal.trigger.z_detect`. As future data is
+    not known, mean and standard deviation of the short time average are
+    taken from all data processed so far (instead of the whole trace), so
+    that the result for the last sample matches the batch version.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type sta: float
+    :param sta: Length of short time average window in seconds.
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+
+    .. seealso:: [Withers1998]_, p. 99
+    """
+    rtmemory_list = _init_trigger_state(trace, rtmemory_list, 2, 3)
+    nsta = _window_samples(trace, sta, 'sta')
+
+    sample = np.require(trace.data, np.float64)
+    npts = np.size(sample)
+    if npts < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+    count, sum_last, sum_sq_last = rtmemory.output
+
+    sta_ = _moving_sum(sample ** 2, nsta, rtmemory_list[1], exclusive=True)
+    sta_[:max(0, nsta - int(count))] = 0.
+
+    # running mean and standard deviation of the short time average
+    num = count + np.arange(1, npts + 1)
+    sums = sum_last + np.cumsum(sta_)
+    sums_sq = sum_sq_last + np.cumsum(sta_ ** 2)
+    mean = sums / num
+    std = np.sqrt(np.maximum(sums_sq / num - mean ** 2, 0.))
+
+    rtmemory.output[:] = (count + npts, sums[-1], sums_sq[-1])
+
+    charfct = np.zeros(npts, dtype=np.float64)
+    idx = std > 0
+    charfct[idx] = (sta_[idx] - mean[idx]) / std[idx]
+    return charfct
+
+
+def carl_sta_trig(trace, sta, lta, ratio, quiet, rtmemory_list=None):
+    """
+    carlSTAtrig characteristic function for sequential data packets.
+
+    eta = star - (ratio * ltar) - abs(sta - lta) - quiet
+
+    Gives the same result as :func:`obspy.signal.trigger.carl_sta_trig`
+    applied to the concatenated data.
+
+    :type trace: :class:`~obspy.core.trace.Trace`
+    :param trace: :class:`~obspy.core.trace.Trace` object to append to this
+        RtTrace
+    :type sta: float
+    :param sta: Length of short time average window in seconds.
+    :type lta: float
+    :param lta: Length of long time average window in seconds.
+    :type ratio: float
+    :param ratio: as ratio gets smaller, carl_sta_trig gets more sensitive
+    :type quiet: float
+    :param quiet: as quiet gets smaller, carl_sta_trig gets more sensitive
+    :type rtmemory_list: list of :class:`~obspy.realtime.rtmemory.RtMemory`,
+        optional
+    :param rtmemory_list: Persistent memory used by this process for specified
+        trace.
+    :rtype: NumPy :class:`numpy.ndarray`
+    :return: Processed trace data from appended Trace object.
+    """
+    rtmemory_list = _init_trigger_state(trace, rtmemory_list, 5, 2)
+    nsta = _window_samples(trace, sta, 'sta')
+    nlta = _window_samples(trace, lta, 'lta')
+
+    sample = np.require(trace.data, np.float64)
+    npts = np.size(sample)
+    if npts < 1:
+        return sample
+
+    rtmemory = rtmemory_list[0]
+    count, lta_last = rtmemory.output
+    count = int(count)
+    # number of leading samples that are zero padded in the batch version
+    npad_sta = max(0, nsta - count)
+    npad_lta = max(0, nlta - count)
+
+    sta_ = _moving_sum(sample, nsta, rtmemory_list[1], exclusive=True) / nsta
+    sta_[:npad_sta] = 0.
+    # lta is delayed by one sample relative to the sta
+    lta_ = _moving_sum(sta_, nlta, rtmemory_list[2], exclusive=True) / nlta
+    lta_[:npad_lta] = 0.
+    lta_ = np.concatenate(([lta_last], lta_))
+    lta_last = lta_[-1]
+    lta_ = lta_[:-1]
+    # average of abs diff between trace and lta
+    star = _moving_sum(np.abs(sample - lta_), nsta, rtmemory_list[3],
+                       exclusive=True) / nsta
+    star[:npad_sta] = 0.
+    ltar = _moving_sum(star, nlta, rtmemory_list[4], exclusive=True) / nlta
+    ltar[:npad_lta] = 0.
+
+    rtmemory.output[:] = (count + npts, lta_last)
+
+    eta = star - (ratio * ltar) - abs(sta_ - lta_) - quiet
+    eta[:npad_lta] = -1.0
+    return eta
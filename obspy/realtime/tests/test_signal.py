@@ -13,7 +13,8 @@ import numpy as np
 
 from obspy import read
 from obspy.core.stream import Stream
-from obspy.realtime import RtTrace, signal
+from obspy.realtime import RtMemory, RtTrace, signal
+from obspy.signal import trigger
 
 
 # some debug flags
@@ -188,6 +189,111 @@ class RealTimeSignalTestCase(unittest.TestCase):
         np.testing.assert_almost_equal(self.filt_trace_data,
                                        self.rt_trace.data)
 
+    def test_recursive_sta_lta(self):
+        """
+        Testing recursive STA/LTA against batch processing.
+        """
+        trace = self.orig_trace.copy()
+        df = trace.stats.sampling_rate
+        options = {'sta': 2, 'lta': 10}
+        # filtering manual
+        self.filt_trace_data = trigger.recursive_sta_lta(
+            trace.data, int(2 * df), int(10 * df))
+        # filtering real time
+        process_list = [('recstalta', options)]
+        self._run_rt_process(process_list)
+        # check results
+        np.testing.assert_almost_equal(self.filt_trace_data,
+                                       self.rt_trace.data)
+
+    def test_classic_sta_lta(self):
+        """
+        Testing classic STA/LTA against batch processing.
+        """
+        trace = self.orig_trace.copy()
+        df = trace.stats.sampling_rate
+        options = {'sta': 2, 'lta': 10}
+        # filtering manual
+        self.filt_trace_data = trigger.classic_sta_lta(
+            trace.data, int(2 * df), int(10 * df))
+        # filtering real time
+        process_list = [('classicstalta', options)]
+        self._run_rt_process(process_list)
+        # check results
+        np.testing.assert_almost_equal(self.filt_trace_data,
+                                       self.rt_trace.data)
+
+    def test_delayed_sta_lta(self):
+        """
+        Testing delayed STA/LTA against batch processing.
+        """
+        trace = self.orig_trace.copy()
+        df = trace.stats.sampling_rate
+        options = {'sta': 2, 'lta': 10}
+        # batch version wraps around to the end of the data at the start
+        trace.data[-300:] = 0.0
+        self.orig_trace_chunks = trace / NUM_PACKETS
+        # filtering manual
+        self.filt_trace_data = trigger.delayed_sta_lta(
+            trace.data, int(2 * df), int(10 * df))
+        # filtering real time
+        process_list = [('delayedstalta', options)]
+        self._run_rt_process(process_list)
+        # check results
+        np.testing.assert_almost_equal(self.filt_trace_data,
+                                       self.rt_trace.data)
+
+    def test_z_detect(self):
+        """
+        Testing z-detector, only the last sample is expected to match batch
+        processing.
+        """
+        trace = self.orig_trace.copy()
+        df = trace.stats.sampling_rate
+        options = {'sta': 2}
+        # filtering manual
+        self.filt_trace_data = signal.z_detect(trace.copy(), **options)
+        # filtering real time
+        process_list = [('zdetect', options)]
+        self._run_rt_process(process_list)
+        # check results
+        np.testing.assert_almost_equal(self.filt_trace_data,
+                                       self.rt_trace.data)
+        batch = trigger.z_detect(trace.data, int(2 * df))
+        self.assertAlmostEqual(batch[-1], self.rt_trace.data[-1])
+
+    def test_carl_sta_trig(self):
+        """
+        Testing carl_sta_trig against batch processing.
+        """
+        trace = self.orig_trace.copy()
+        df = trace.stats.sampling_rate
+        options = {'sta': 2, 'lta': 10, 'ratio': 0.8, 'quiet': 0.8}
+        # filtering manual
+        self.filt_trace_data = trigger.carl_sta_trig(
+            trace.data, int(2 * df), int(10 * df), 0.8, 0.8)
+        # filtering real time
+        process_list = [('carlstatrig', options)]
+        self._run_rt_process(process_list)
+        # check results
+        np.testing.assert_almost_equal(
+            self.filt_trace_data / np.abs(self.filt_trace_data).max(),
+            self.rt_trace.data / np.abs(self.filt_trace_data).max())
+
+    def test_sta_lta_packet_state(self):
+        """
+        Trigger state is carried in the RtMemory list when calling the
+        processing function directly on consecutive packets.
+        """
+        rtmemory_list = [RtMemory() for _i in range(3)]
+        results = []
+        for tr in self.orig_trace / 20:
+            results.append(signal.classic_sta_lta(
+                tr, sta=2, lta=10, rtmemory_list=rtmemory_list))
+        expected = signal.classic_sta_lta(self.orig_trace.copy(), sta=2,
+                                          lta=10)
+        np.testing.assert_almost_equal(np.concatenate(results), expected)
+
     def test_mwp_integral(self):
         """
         Testing mwpintegral functions.
@@ -23,6 +23,7 @@ from future.builtins import *  # NOQA
 
 import math
 import warnings
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 from scipy.integrate import cumtrapz
@@ -849,10 +850,151 @@ def dump(pow_map, apow_map, i):
     np.savez('apow_map_%d.npz' % i, apow_map)
 
 
+def _fk_maps_per_window(stream, windows, spoint, nsamp, nfft, nlow, nf,
+                        tap, deltaf, time_shift_table, grdpts_x, grdpts_y,
+                        prewhiten, method):
+    """
+    Generator of relative and absolute power maps of the sliding windows of
+    :func:`array_processing`, using the C beamformer window by window.
+    """
+    nstat = len(stream)
+    # to speed up the routine a bit we estimate all steering vectors in advance
+    steer = np.empty((nf, grdpts_x, grdpts_y, nstat), dtype=np.complex128)
+    clibsignal.calcSteer(nstat, grdpts_x, grdpts_y, nf, nlow,
+                         deltaf, time_shift_table, steer)
+    _r = np.empty((nf, nstat, nstat), dtype=np.complex128)
+    ft = np.empty((nstat, nf), dtype=np.complex128)
+    relpow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
+    abspow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
+    for offset, _ in windows:
+        try:
+            for i, tr in enumerate(stream):
+                dat = tr.data[spoint[i] + offset:
+                              spoint[i] + offset + nsamp]
+                dat = (dat - dat.mean()) * tap
+                ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
+        except IndexError:
+            break
+        ft = np.ascontiguousarray(ft, np.complex128)
+        relpow_map.fill(0.)
+        abspow_map.fill(0.)
+        # computing the covariances of the signal at different receivers
+        dpow = 0.
+        for i in range(nstat):
+            for j in range(i, nstat):
+                _r[:, i, j] = ft[i, :] * ft[j, :].conj()
+                if method == 1:
+                    _r[:, i, j] /= np.abs(_r[:, i, j].sum())
+                if i != j:
+                    _r[:, j, i] = _r[:, i, j].conjugate()
+                else:
+                    dpow += np.abs(_r[:, i, j].sum())
+        dpow *= nstat
+        if method == 1:
+            # P(f) = 1/(e.H R(f)^-1 e)
+            for n in range(nf):
+                _r[n, :, :] = np.linalg.pinv(_r[n, :, :], rcond=1e-6)
+
+        errcode = clibsignal.generalizedBeamformer(
+            relpow_map, abspow_map, steer, _r, nstat, prewhiten,
+            grdpts_x, grdpts_y, nf, dpow, method)
+        if errcode != 0:
+            msg = 'generalizedBeamforming exited with error %d'
+            raise Exception(msg % errcode)
+        yield relpow_map, abspow_map
+
+
+def _fk_maps_batched(stream, windows, spoint, nsamp, nfft, nlow, nf, tap,
+                     deltaf, time_shift_table, grdpts_x, grdpts_y, prewhiten,
+                     method, batch_size, threads, single_precision):
+    """
+    Generator of relative and absolute power maps of the sliding windows of
+    :func:`array_processing`, processing batches of windows with vectorized
+    NumPy routines (optionally in a thread pool).
+
+    Same results as :func:`_fk_maps_per_window` (up to floating point
+    accuracy). For conventional beamforming the cross spectral matrix of a
+    window is ``R = ft ft^H``, so that ``e^H R e = |e^H ft|^2`` can be
+    evaluated without setting up ``R``.
+    """
+    if batch_size < 1:
+        msg = "batch_size must be a positive integer."
+        raise ValueError(msg)
+    nstat = len(stream)
+    cdtype = np.complex64 if single_precision else np.complex128
+    # steering vectors for all frequencies and grid points, computed once
+    # from the time shift table and shared by all batches, shape
+    # (nf, grdpts_x * grdpts_y, nstat)
+    freqs = (nlow + np.arange(nf)) * deltaf
+    wtau = 2. * math.pi * freqs[:, np.newaxis, np.newaxis] * \
+        time_shift_table.reshape(nstat, -1).T[np.newaxis, :, :]
+    steer = np.exp(-1j * wtau).astype(cdtype)
+    steer_conj = steer.conj()
+    # the data windows are cut before all processing to be able to use
+    # fancy indexing
+    npts_min = min(len(tr) - spoint[i] for i, tr in enumerate(stream))
+    windows = [w for w in windows if w[0] + nsamp <= npts_min]
+    offsets = np.array([w[0] for w in windows], dtype=np.int64)
+    sample_index = np.arange(nsamp)
+
+    def _process_batch(batch_offsets):
+        nwin = len(batch_offsets)
+        index = batch_offsets[:, np.newaxis] + sample_index[np.newaxis, :]
+        # spectra of all windows, shape (nwin, nf, nstat)
+        ft = np.empty((nwin, nf, nstat), dtype=cdtype)
+        for i, tr in enumerate(stream):
+            dat = tr.data[spoint[i] + index]
+            dat = (dat - dat.mean(axis=1)[:, np.newaxis]) * tap
+            ft[:, :, i] = np.fft.rfft(dat, nfft, axis=1)[:, nlow:nlow + nf]
+        if method == 1:
+            # P(f) = 1/(e.H R(f)^-1 e)
+            _r = ft[:, :, :, np.newaxis] * ft[:, :, np.newaxis, :].conj()
+            _r /= np.abs(_r.sum(axis=1))[:, np.newaxis, :, :]
+            # pseudo inverses of all windows and frequencies at once
+            _r = np.linalg.pinv(_r, rcond=1e-6).astype(cdtype, copy=False)
+            power = np.matmul(steer_conj[np.newaxis], _r)
+            power *= steer[np.newaxis]
+            power = 1. / np.abs(power.sum(axis=-1))
+            dpow = np.ones(nwin)
+        else:
+            # P(f) = e.H R(f) e = |e.H ft(f)|^2
+            power = np.matmul(steer_conj[np.newaxis],
+                              ft[:, :, :, np.newaxis])[..., 0]
+            power = power.real ** 2 + power.imag ** 2
+            dpow = nstat * (ft.real ** 2 + ft.imag ** 2).sum(axis=(1, 2))
+        # scale for each frequency individually
+        if prewhiten == 1:
+            inv_fac = 1. / (power.max(axis=2) * nf * nstat)
+        else:
+            inv_fac = 1. / dpow[:, np.newaxis]
+        relpow = (power * inv_fac[:, :, np.newaxis]).sum(axis=1)
+        abspow = power.sum(axis=1)
+        shape = (nwin, grdpts_x, grdpts_y)
+        return (np.require(relpow, np.float64).reshape(shape),
+                np.require(abspow, np.float64).reshape(shape))
+
+    batches = [offsets[i:i + batch_size]
+               for i in range(0, len(offsets), batch_size)]
+    if threads > 1 and len(batches) > 1:
+        pool = ThreadPool(min(threads, len(batches)))
+        try:
+            for relpow, abspow in pool.imap(_process_batch, batches):
+                for maps in zip(relpow, abspow):
+                    yield maps
+        finally:
+            pool.terminate()
+    else:
+        for batch in batches:
+            relpow, abspow = _process_batch(batch)
+            for maps in zip(relpow, abspow):
+                yield maps
+
+
 def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
                      sl_s, semb_thres, vel_thres, frqlow, frqhigh, stime,
                      etime, prewhiten, verbose=False, coordsys='lonlat',
-                     timestamp='mlabday', method=0, store=None):
+                     timestamp='mlabday', method=0, store=None,
+                     batch_size=None, threads=1, single_precision=False):
     """
     Method for Seismic-Array-Beamforming/FK-Analysis/Capon
 
@@ -904,11 +1046,24 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
         second arguments and the iteration number as third argument. Useful for
         storing or plotting the map for each iteration. For this purpose the
         dump function of this module can be used.
+    :type batch_size: int
+    :param batch_size: If set, the sliding windows are processed in batches
+        of this many windows with vectorized NumPy routines (cross spectral
+        matrices of all windows of a batch at once, steering vectors computed
+        only once) instead of calling the C beamformer window by window.
+        Memory usage grows linearly with the batch size.
+    :type threads: int
+    :param threads: Number of threads used to process batches concurrently
+        (only used if ``batch_size`` is set).
+    :type single_precision: bool
+    :param single_precision: Use single precision floating point numbers for
+        spectra and steering vectors in batch mode (only used if
+        ``batch_size`` is set). Roughly halves memory usage and computing
+        time at the cost of accuracy.
     :return: :class:`numpy.ndarray` of timestamp, relative relpow, absolute
         relpow, backazimuth, slowness
     """
     res = []
-    eotr = True
 
     # check that sampling rates do not vary
     fs = stream[0].stats.sampling_rate
@@ -935,7 +1090,6 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
     #
     # loop with a sliding window over the dat trace array and apply bbfk
     #
-    nstat = len(stream)
     fs = stream[0].stats.sampling_rate
     nsamp = int(win_len * fs)
     nstep = int(nsamp * win_frac)
@@ -948,53 +1102,30 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
     nlow = max(1, nlow)  # avoid using the offset
     nhigh = min(nfft // 2 - 1, nhigh)  # avoid using nyquist
     nf = nhigh - nlow + 1  # include upper and lower frequency
-    # to speed up the routine a bit we estimate all steering vectors in advance
-    steer = np.empty((nf, grdpts_x, grdpts_y, nstat), dtype=np.complex128)
-    clibsignal.calcSteer(nstat, grdpts_x, grdpts_y, nf, nlow,
-                         deltaf, time_shift_table, steer)
-    _r = np.empty((nf, nstat, nstat), dtype=np.complex128)
-    ft = np.empty((nstat, nf), dtype=np.complex128)
-    newstart = stime
     # 0.22 matches 0.2 of historical C bbfk.c
     tap = cosine_taper(nsamp, p=0.22)
+    # start offsets (in samples) and start times of all sliding windows
+    windows = []
     offset = 0
-    relpow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    abspow_map = np.empty((grdpts_x, grdpts_y), dtype=np.float64)
-    while eotr:
-        try:
-            for i, tr in enumerate(stream):
-                dat = tr.data[spoint[i] + offset:
-                              spoint[i] + offset + nsamp]
-                dat = (dat - dat.mean()) * tap
-                ft[i, :] = np.fft.rfft(dat, nfft)[nlow:nlow + nf]
-        except IndexError:
+    newstart = stime
+    while True:
+        windows.append((offset, newstart))
+        if (newstart + (nsamp + nstep) / fs) > etime:
             break
-        ft = np.ascontiguousarray(ft, np.complex128)
-        relpow_map.fill(0.)
-        abspow_map.fill(0.)
-        # computing the covariances of the signal at different receivers
-        dpow = 0.
-        for i in range(nstat):
-            for j in range(i, nstat):
-                _r[:, i, j] = ft[i, :] * ft[j, :].conj()
-                if method == 1:
-                    _r[:, i, j] /= np.abs(_r[:, i, j].sum())
-                if i != j:
-                    _r[:, j, i] = _r[:, i, j].conjugate()
-                else:
-                    dpow += np.abs(_r[:, i, j].sum())
-        dpow *= nstat
-        if method == 1:
-            # P(f) = 1/(e.H R(f)^-1 e)
-            for n in range(nf):
-                _r[n, :, :] = np.linalg.pinv(_r[n, :, :], rcond=1e-6)
+        offset += nstep
+        newstart += nstep / fs
 
-        errcode = clibsignal.generalizedBeamformer(
-            relpow_map, abspow_map, steer, _r, nstat, prewhiten,
-            grdpts_x, grdpts_y, nf, dpow, method)
-        if errcode != 0:
-            msg = 'generalizedBeamforming exited with error %d'
-            raise Exception(msg % errcode)
+    if batch_size is None:
+        maps = _fk_maps_per_window(
+            stream, windows, spoint, nsamp, nfft, nlow, nf, tap, deltaf,
+            time_shift_table, grdpts_x, grdpts_y, prewhiten, method)
+    else:
+        maps = _fk_maps_batched(
+            stream, windows, spoint, nsamp, nfft, nlow, nf, tap, deltaf,
+            time_shift_table, grdpts_x, grdpts_y, prewhiten, method,
+            batch_size, threads, single_precision)
+
+    for (offset, newstart), (relpow_map, abspow_map) in zip(windows, maps):
         ix, iy = np.unravel_index(relpow_map.argmax(), relpow_map.shape)
         relpow, abspow = relpow_map[ix, iy], abspow_map[ix, iy]
         if store is not None:
@@ -1013,11 +1144,6 @@ def array_processing(stream, win_len, win_frac, sll_x, slm_x, sll_y, slm_y,
                                  slow]))
             if verbose:
                 print(newstart, (newstart + (nsamp / fs)), res[-1][1:])
-        if (newstart + (nsamp + nstep) / fs) > etime:
-            eotr = False
-        offset += nstep
-
-        newstart += nstep / fs
     res = np.array(res)
     if timestamp == 'julsec':
         pass
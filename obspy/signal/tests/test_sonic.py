@@ -22,7 +22,7 @@ class SonicTestCase(unittest.TestCase):
     Test fk analysis, main function is sonic() in array_analysis.py
     """
 
-    def array_processing(self, prewhiten, method):
+    def array_processing(self, prewhiten, method, **kwargs):
         np.random.seed(2348)
 
         geometry = np.array([[0.0, 0.0, 0.0],
@@ -88,8 +88,8 @@ class SonicTestCase(unittest.TestCase):
 
         args = (st, win_len, step_frac, sll_x, slm_x, sll_y, slm_y, sl_s,
                 semb_thres, vel_thres, frqlow, frqhigh, stime, etime)
-        kwargs = dict(prewhiten=prewhiten, coordsys='xy', verbose=False,
-                      method=method)
+        kwargs.update(dict(prewhiten=prewhiten, coordsys='xy',
+                           verbose=False, method=method))
         out = array_processing(*args, **kwargs)
         if False:  # 1 for debugging
             print('\n', out[:, 1:])
@@ -149,6 +149,53 @@ class SonicTestCase(unittest.TestCase):
         # XXX relative tolerance should be lower!
         self.assertTrue(np.allclose(ref, out[:, 1:], rtol=4e-5))
 
+    def test_sonic_batch(self):
+        """
+        Batched processing gives the same results as processing window by
+        window.
+        """
+        for prewhiten in (0, 1):
+            for method in (0, 1):
+                ref = self.array_processing(prewhiten=prewhiten,
+                                            method=method)
+                for kwargs in ({'batch_size': 1}, {'batch_size': 4},
+                               {'batch_size': 2, 'threads': 3}):
+                    out = self.array_processing(prewhiten=prewhiten,
+                                                method=method, **kwargs)
+                    np.testing.assert_allclose(out, ref, rtol=1e-8)
+
+    def test_sonic_batch_single_precision(self):
+        """
+        Batched processing in single precision, only checked for beamforming
+        as Capon is too badly conditioned for the test data.
+        """
+        for prewhiten in (0, 1):
+            ref = self.array_processing(prewhiten=prewhiten, method=0)
+            out = self.array_processing(prewhiten=prewhiten, method=0,
+                                        batch_size=3, single_precision=True)
+            np.testing.assert_allclose(out, ref, rtol=1e-5)
+
+    def test_sonic_batch_store(self):
+        """
+        The store function gets called for every window in batch mode.
+        """
+        def get_store(results):
+            def store(relpow_map, abspow_map, offset):
+                results.append((relpow_map.copy(), abspow_map.copy(), offset))
+            return store
+
+        ref = []
+        calls = []
+        self.array_processing(prewhiten=0, method=0, store=get_store(ref))
+        self.array_processing(prewhiten=0, method=0, store=get_store(calls),
+                              batch_size=4)
+        self.assertEqual(len(calls), len(ref))
+        for (relpow, abspow, offset), (relpow2, abspow2, offset2) in zip(
+                calls, ref):
+            self.assertEqual(offset, offset2)
+            np.testing.assert_allclose(relpow, relpow2, rtol=1e-8)
+            np.testing.assert_allclose(abspow, abspow2, rtol=1e-8)
+
     def test_get_spoint(self):
         stime = UTCDateTime(1970, 1, 1, 0, 0)
         etime = UTCDateTime(1970, 1, 1, 0, 0) + 10
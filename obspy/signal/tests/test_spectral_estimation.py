@@ -11,6 +11,8 @@ from future.utils import native_str
 import gzip
 import io
 import os
+import shutil
+import tempfile
 import unittest
 import warnings
 from copy import deepcopy
@@ -26,7 +28,8 @@ from obspy.core.util.obspy_types import ObsPyException
 from obspy.core.util.testing import (
     ImageComparison, ImageComparisonException, MATPLOTLIB_VERSION)
 from obspy.io.xseed import Parser
-from obspy.signal.spectral_estimation import (PPSD, welch_taper, welch_window)
+from obspy.signal.spectral_estimation import (PPSD, PPSDArchive, welch_taper,
+                                              welch_window, calculate_ppsds)
 from obspy.signal.spectral_estimation import earthquake_models
 
 
@@ -929,6 +932,242 @@ class PsdTestCase(unittest.TestCase):
                 ppsd.add_npz(temp_path)
             self.assertIn('Loading PPSD results', str(context.exception))
 
+    def test_ppsd_batch(self):
+        """
+        Test batched processing of PPSD segments against processing of single
+        segments.
+        """
+        st = read(os.path.join(self.path, 'IUANMO.seed'))
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        paz = {'gain': 86298.5, 'zeros': [0, 0],
+               'poles': [-59.4313, -22.7121 + 27.1065j, -22.7121 + 27.1065j,
+                         -0.0048004, -0.073199],
+               'sensitivity': 3.3554 * 10 ** 9}
+        for metadata in [paz, inv]:
+            expected = PPSD(st[0].stats, metadata)
+            expected.add(st)
+            # batch size not a divisor of the number of segments
+            ppsd = PPSD(st[0].stats, metadata)
+            self.assertTrue(ppsd.add(st, batch_size=7))
+            self.assertEqual(ppsd._times_processed,
+                             expected._times_processed)
+            np.testing.assert_allclose(ppsd.psd_values, expected.psd_values,
+                                       rtol=1e-5)
+            np.testing.assert_array_equal(ppsd.current_histogram,
+                                          expected.current_histogram)
+            # adding the same data again is detected in batched mode, too
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                self.assertFalse(ppsd.add(st, batch_size=7))
+
+    def test_ppsd_batch_size_invalid(self):
+        """
+        Batch sizes smaller than one are rejected instead of silently
+        dropping all segments.
+        """
+        st = read(os.path.join(self.path, 'IUANMO.seed'))
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        ppsd = PPSD(st[0].stats, inv)
+        for batch_size in (0, -1):
+            with self.assertRaises(ValueError):
+                ppsd.add(st, batch_size=batch_size)
+            with self.assertRaises(ValueError):
+                calculate_ppsds([], inv, batch_size=batch_size)
+        self.assertEqual(len(ppsd._times_processed), 0)
+        tempdir = tempfile.mkdtemp()
+        try:
+            archive = PPSDArchive(os.path.join(tempdir, 'archive'),
+                                  stats=st[0].stats, metadata=inv)
+            with self.assertRaises(ValueError):
+                archive.append(st, batch_size=0)
+            self.assertEqual(len(archive), 0)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_calculate_ppsds(self):
+        """
+        Test parallel computation of PPSDs for a set of files.
+        """
+        filename = os.path.join(self.path, 'IUANMO.seed')
+        st = read(filename)
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        expected = PPSD(st[0].stats, inv)
+        expected.add(st)
+        ppsds = calculate_ppsds([filename], inv, processes=2, batch_size=10)
+        self.assertEqual(list(ppsds.keys()), [st[0].id])
+        ppsd = ppsds[st[0].id]
+        self.assertEqual(ppsd._times_processed, expected._times_processed)
+        np.testing.assert_allclose(ppsd.psd_values, expected.psd_values,
+                                   rtol=1e-5)
+        # also works with wildcards
+        ppsds = calculate_ppsds(os.path.join(self.path, 'IUANMO.se*d'), inv,
+                                processes=1)
+        self.assertEqual(ppsds[st[0].id]._times_processed,
+                         expected._times_processed)
+        # warnings of the workers are not lost, e.g. for missing responses
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            ppsds = calculate_ppsds([filename], Inventory(networks=[],
+                                                          source=""),
+                                    processes=1)
+        self.assertEqual(ppsds, {})
+        messages = [str(w_.message) for w_ in w]
+        prefix = "%s (%s): " % (filename, st[0].id)
+        self.assertTrue(all(msg.startswith(prefix) for msg in messages))
+        self.assertIn(prefix + "No psd segments could be computed, channel "
+                      "is skipped.", messages)
+        self.assertTrue(any("response" in msg for msg in messages))
+
+    def test_ppsd_compact(self):
+        """
+        Test compact mode with histograms stored per time bucket.
+        """
+        st = read(os.path.join(self.path, 'IUANMO.seed'))
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        expected = PPSD(st[0].stats, inv)
+        expected.add(st)
+        # time selection aligned with buckets of three hours
+        restrictions = [{}, {'time_of_weekday': [(-1, 0, 12)]},
+                        {'endtime': UTCDateTime(2010, 1, 1, 6)}]
+
+        ppsd = PPSD(st[0].stats, inv, compact=True, bucket_length=3 * 3600)
+        ppsd.add(st)
+        self.assertEqual(ppsd._binned_psds, [])
+        self.assertEqual(len(ppsd._bucket_histograms), 8)
+        self.assertEqual(ppsd._times_processed, expected._times_processed)
+        for kwargs in restrictions:
+            expected.calculate_histogram(**kwargs)
+            ppsd.calculate_histogram(**kwargs)
+            np.testing.assert_array_equal(ppsd.current_histogram,
+                                          expected.current_histogram)
+            np.testing.assert_array_equal(ppsd.current_times_used,
+                                          expected.current_times_used)
+        # time selection that needs individual psds
+        with self.assertRaises(ValueError):
+            ppsd.calculate_histogram(
+                starttime=UTCDateTime(2010, 1, 1, 4, 30))
+        with self.assertRaises(ValueError):
+            ppsd.psd_values
+
+        # with individual psds spilled to disk
+        restrictions.append({'starttime': UTCDateTime(2010, 1, 1, 4, 30)})
+        with NamedTemporaryFile() as tf:
+            ppsd = PPSD(st[0].stats, inv, compact=True,
+                        bucket_length=3 * 3600, psd_store=tf.name)
+            ppsd.add(st)
+            np.testing.assert_array_equal(ppsd.psd_values,
+                                          expected.psd_values)
+            for kwargs in restrictions:
+                expected.calculate_histogram(**kwargs)
+                ppsd.calculate_histogram(**kwargs)
+                np.testing.assert_array_equal(ppsd.current_histogram,
+                                              expected.current_histogram)
+            # saved as regular PPSD
+            with NamedTemporaryFile(suffix='.npz') as tf2:
+                ppsd.save_npz(tf2.name)
+                ppsd = PPSD.load_npz(tf2.name)
+            expected.calculate_histogram()
+            np.testing.assert_array_equal(ppsd.current_histogram,
+                                          expected.current_histogram)
+
+    def test_ppsd_archive(self):
+        """
+        Test appending to and reading from an on-disk PPSD archive.
+        """
+        st = read(os.path.join(self.path, 'IUANMO.seed'))
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        expected = PPSD(st[0].stats, inv)
+        expected.add(st)
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, 'archive')
+            with self.assertRaises(ValueError):
+                PPSDArchive(path)
+            archive = PPSDArchive(path, stats=st[0].stats, metadata=inv)
+            self.assertEqual(len(archive), 0)
+            # append second half of the day first, then first half
+            t = st[0].stats.starttime + 12 * 3600
+            self.assertTrue(archive.append(st.slice(starttime=t)))
+            self.assertTrue(archive.append(st.slice(endtime=t + 1800)))
+            self.assertEqual(len(archive), len(expected._times_processed))
+            # data already present is skipped
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                self.assertFalse(archive.append(st))
+            # reopen archive
+            archive = PPSDArchive(path)
+            self.assertEqual(archive.id, expected.id)
+            with self.assertRaises(ValueError):
+                archive.append(st)
+            # time range query
+            times, psds = archive.get_psds(starttime=t, endtime=t + 3600)
+            self.assertEqual(len(times), 3)
+            np.testing.assert_array_equal(times, expected.times_processed[
+                24:27])
+            np.testing.assert_array_equal(psds, expected.psd_values[24:27])
+            # histograms
+            for kwargs in ({}, {'starttime': t},
+                           {'time_of_weekday': [(-1, 2, 5)]}):
+                expected.calculate_histogram(**kwargs)
+                np.testing.assert_array_equal(
+                    archive.calculate_histogram(chunk_size=5, **kwargs),
+                    expected.current_histogram)
+            ppsd = archive.to_ppsd()
+            self.assertEqual(ppsd._times_processed,
+                             expected._times_processed)
+            expected.calculate_histogram()
+            np.testing.assert_array_equal(ppsd.current_histogram,
+                                          expected.current_histogram)
+        finally:
+            shutil.rmtree(tempdir)
+
+    def test_ppsd_archive_interrupted_append(self):
+        """
+        Orphaned and partial records of an interrupted append must not
+        shift later psds against their times.
+        """
+        st = read(os.path.join(self.path, 'IUANMO.seed'))
+        inv = read_inventory(os.path.join(self.path, 'IUANMO.xml'))
+        expected = PPSD(st[0].stats, inv)
+        expected.add(st)
+        nbins = len(expected.period_bin_centers)
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, 'archive')
+            archive = PPSDArchive(path, stats=st[0].stats, metadata=inv)
+            t = st[0].stats.starttime + 12 * 3600
+            self.assertTrue(archive.append(st.slice(endtime=t + 1800)))
+            num = len(archive)
+            # simulate interrupted appends: two orphaned psd rows plus a
+            # partial one, and partial rows in the other files
+            with open(os.path.join(path, archive.PSDS), 'ab') as fh:
+                fh.write(np.ones((2, nbins), dtype=np.float32).tobytes())
+                fh.write(b'\x01' * 7)
+            for filename in (archive.TIMES, archive.TIMES_DATA,
+                             archive.TIMES_GAPS):
+                with open(os.path.join(path, filename), 'ab') as fh:
+                    fh.write(b'\x01' * 3)
+            self.assertEqual(len(archive), num)
+            self.assertTrue(archive.append(st.slice(starttime=t)))
+            self.assertEqual(len(archive), len(expected._times_processed))
+            times, psds = archive.get_psds()
+            expected_psds = dict(zip(expected._times_processed,
+                                     expected.psd_values))
+            self.assertEqual(len(times), len(expected_psds))
+            for time, psd in zip(times, psds):
+                np.testing.assert_array_equal(
+                    psd, expected_psds[time._ns])
+            # partial records were dropped
+            for filename, nbytes in ((archive.PSDS, 4 * nbins),
+                                     (archive.TIMES, 8),
+                                     (archive.TIMES_DATA, 16),
+                                     (archive.TIMES_GAPS, 16)):
+                self.assertEqual(
+                    os.path.getsize(os.path.join(path, filename)) % nbytes,
+                    0)
+        finally:
+            shutil.rmtree(tempdir)
+
 
 def suite():
     return unittest.makeSuite(PsdTestCase, 'test')
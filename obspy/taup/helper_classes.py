@@ -8,7 +8,8 @@ from __future__ import (absolute_import, division, print_function,
 from future.builtins import *  # NOQA
 from future.utils import native_str
 
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
+import sys
 
 import numpy as np
 
@@ -55,6 +56,22 @@ TimeDistGeo = np.dtype([
 ])
 
 
+"""
+Holds the time, distance, ray parameter and angles of an arrival together
+with the index of the requested distance it belongs to, see
+:meth:`~obspy.taup.seismic_phase.SeismicPhase.calc_time_many`.
+"""
+ArrivalRecord = np.dtype([
+    (native_str('distance_index'), np.int_),
+    (native_str('distance'), np.float_),
+    (native_str('time'), np.float_),
+    (native_str('purist_dist'), np.float_),
+    (native_str('ray_param'), np.float_),
+    (native_str('takeoff_angle'), np.float_),
+    (native_str('incident_angle'), np.float_),
+])
+
+
 """
 Tracks critical points (discontinuities or reversals in slowness gradient)
 within slowness and velocity models.
@@ -182,3 +199,100 @@ class Arrival(object):
         Return the purist distance in degrees.
         """
         return self.purist_dist * 180.0 / np.pi
+
+
+class SeismicPhaseCache(object):
+    """
+    Least recently used cache for fully set up
+    :class:`~obspy.taup.seismic_phase.SeismicPhase` objects.
+
+    The cache is bounded by the estimated memory usage of the cached phases
+    (their arrays and lists; the depth corrected models they refer to are
+    shared with the depth cache of the model and are not counted).
+
+    :param max_bytes: Maximum estimated memory usage of cached phases in
+        bytes.
+    :type max_bytes: int
+
+    :ivar hits: Number of lookups that were answered from the cache.
+    :vartype hits: int
+    :ivar misses: Number of lookups that needed to set up a new phase.
+    :vartype misses: int
+    :ivar evictions: Number of phases that were removed from the cache to
+        stay below ``max_bytes``.
+    :vartype evictions: int
+    :ivar nbytes: Current estimated memory usage of cached phases in bytes.
+    :vartype nbytes: int
+    """
+    def __init__(self, max_bytes=32 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __str__(self):
+        return ("SeismicPhaseCache: %d phases, %d/%d bytes, %d hits, %d "
+                "misses (hit rate %.1f%%), %d evictions") % (
+                    len(self), self.nbytes, self.max_bytes, self.hits,
+                    self.misses, 100 * self.hit_rate, self.evictions)
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of lookups that were answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+        return self.hits / lookups
+
+    def get(self, key, factory):
+        """
+        Get the phase for the given key, setting it up with ``factory`` if it
+        is not in the cache.
+
+        :param key: Hashable key identifying the phase, e.g. a tuple of
+            model, source depth, receiver depth and phase name.
+        :param factory: Callable without arguments returning the phase.
+        """
+        try:
+            phase, size = self._cache.pop(key)
+        except KeyError:
+            self.misses += 1
+            phase = factory()
+            size = self._estimate_nbytes(phase)
+            self.nbytes += size
+        else:
+            self.hits += 1
+        # (re-)insert as most recently used item
+        self._cache[key] = (phase, size)
+        while self.nbytes > self.max_bytes and self._cache:
+            _, (_, size_) = self._cache.popitem(last=False)
+            self.nbytes -= size_
+            self.evictions += 1
+        return phase
+
+    def clear(self):
+        """
+        Remove all phases from the cache and reset the statistics.
+        """
+        self._cache.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _estimate_nbytes(phase):
+        nbytes = sys.getsizeof(phase)
+        for value in vars(phase).values():
+            if isinstance(value, np.ndarray):
+                nbytes += value.nbytes
+            elif isinstance(value, (list, dict, str)):
+                nbytes += sys.getsizeof(value)
+        return nbytes
@@ -22,7 +22,7 @@ import obspy.geodetics.base as geodetics
 
 
 def get_ray_paths(inventory, catalog, phase_list=['P'],
-                  coordinate_system='XYZ', taup_model='iasp91'):
+                  coordinate_system='XYZ', taup_model='iasp91', processes=1):
     """
     This function returns lat, lon, depth coordinates from an event
     location to all stations in the inventory object
@@ -33,6 +33,9 @@ def get_ray_paths(inventory, catalog, phase_list=['P'],
     :param coordinate_system: can be either 'XYZ' or 'RTP'.
     :param taup_model: the taup model for which the greatcircle paths are
                   computed
+    :param processes: number of worker processes used to compute the paths,
+        see :meth:`~obspy.taup.tau.TauPyModel.get_ray_paths_geo_many`
+        (``None`` uses all CPUs)
     :returns: a list of tuples
         ``[(gcircle, phase_name, station_label, event_timestamp,
         event_magnitude, event_id, origin_id), ...]``. ``gcircle`` is an array
@@ -106,34 +109,35 @@ def get_ray_paths(inventory, catalog, phase_list=['P'],
     else:
         model = taup_model
 
-    # now loop through all stations and source combinations
+    # now compute paths for all stations and source combinations
     r_earth = model.model.radius_of_planet
+    n_events = len(evlats)
+    all_arrivals = model.get_ray_paths_geo_many(
+        np.tile(evdepths, len(stlats)), np.tile(evlats, len(stlats)),
+        np.tile(evlons, len(stlats)), np.repeat(stlats, n_events),
+        np.repeat(stlons, n_events), phase_list=phase_list, resample=True,
+        processes=processes)
     greatcircles = []
-    for stlat, stlon, stlabel in zip(stlats, stlons, stlabels):
-        for evlat, evlon, evdepth_km, time, magnitude, event_id, origin_id \
-                in zip(evlats, evlons, evdepths, times, magnitudes, event_ids,
-                       origin_ids):
-            arrivals = model.get_ray_paths_geo(
-                evdepth_km, evlat, evlon, stlat, stlon, phase_list=phase_list,
-                resample=True)
-            if len(arrivals) == 0:
-                continue
-
-            for arr in arrivals:
-                radii = (r_earth - arr.path['depth']) / r_earth
-                thetas = np.radians(90. - arr.path['lat'])
-                phis = np.radians(arr.path['lon'])
-
-                if coordinate_system == 'RTP':
-                    gcircle = np.array([radii, thetas, phis])
-
-                if coordinate_system == 'XYZ':
-                    gcircle = np.array([radii * np.sin(thetas) * np.cos(phis),
-                                        radii * np.sin(thetas) * np.sin(phis),
-                                        radii * np.cos(thetas)])
-
-                greatcircles.append((gcircle, arr.name, stlabel, time,
-                                     magnitude, event_id, origin_id))
+    for i, arrivals in enumerate(all_arrivals):
+        stlabel = stlabels[i // n_events]
+        j = i % n_events
+        time, magnitude, event_id, origin_id = \
+            times[j], magnitudes[j], event_ids[j], origin_ids[j]
+        for arr in arrivals:
+            radii = (r_earth - arr.path['depth']) / r_earth
+            thetas = np.radians(90. - arr.path['lat'])
+            phis = np.radians(arr.path['lon'])
+
+            if coordinate_system == 'RTP':
+                gcircle = np.array([radii, thetas, phis])
+
+            if coordinate_system == 'XYZ':
+                gcircle = np.array([radii * np.sin(thetas) * np.cos(phis),
+                                    radii * np.sin(thetas) * np.sin(phis),
+                                    radii * np.cos(thetas)])
+
+            greatcircles.append((gcircle, arr.name, stlabel, time,
+                                 magnitude, event_id, origin_id))
 
     return greatcircles
 
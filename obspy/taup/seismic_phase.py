@@ -16,8 +16,8 @@ import numpy as np
 
 from obspy.core.util.obspy_types import Enum
 
-from .helper_classes import (Arrival, SlownessModelError, TauModelError,
-                             TimeDist)
+from .helper_classes import (Arrival, ArrivalRecord, SlownessModelError,
+                             TauModelError, TimeDist)
 
 from .c_wrappers import clibtau
 
@@ -1034,6 +1034,179 @@ class SeismicPhase(object):
                 self._settings["max_recursion"]))
         return arrivals
 
+    def calc_time_many(self, degrees):
+        """
+        Calculate arrival times for this phase at many distances at once.
+
+        Gives the same results as calling :meth:`calc_time` for every
+        distance, but the refinement of arrivals by shooting rays is done for
+        all distances at once.
+
+        :param degrees: Epicentral distances in degrees.
+        :type degrees: :class:`numpy.ndarray` or list of float
+        :returns: Arrivals for all distances, sorted by distance index (and by
+            time for each distance).
+        :rtype: :class:`numpy.ndarray` (dtype = :const:`ArrivalRecord`)
+        """
+        degrees = np.atleast_1d(np.asarray(degrees, dtype=np.float64))
+        r_dist = np.empty(100, dtype=np.float64)
+        r_ray_num = np.empty(100, dtype=np.int32)
+
+        distance_index = []
+        search_dist = []
+        ray_index = []
+        for i, degree in enumerate(degrees):
+            phase_count = clibtau.seismic_phase_calc_time_inner_loop(
+                float(degree),
+                self.max_distance,
+                self.dist,
+                self.ray_param,
+                r_dist,
+                r_ray_num,
+                len(self.dist)
+            )
+            distance_index.extend([i] * phase_count)
+            search_dist.extend(r_dist[:phase_count])
+            ray_index.extend(r_ray_num[:phase_count])
+
+        result = np.empty(len(distance_index), dtype=ArrivalRecord)
+        if not len(result):
+            return result
+        result['distance_index'] = distance_index
+        result['distance'] = degrees[result['distance_index']]
+        time, dist, ray_param, special = self._refine_arrivals(
+            np.array(search_dist, dtype=np.float64),
+            np.array(ray_index, dtype=np.int_), REFINE_DIST_RADIAN_TOL,
+            self._settings["max_recursion"])
+        result['time'] = time
+        result['purist_dist'] = dist
+        result['ray_param'] = ray_param
+        result['takeoff_angle'] = self._calc_takeoff_angles(ray_param)
+        result['incident_angle'] = self._calc_incident_angles(ray_param)
+        # the degenerate case in linear_interp_arrival() sets angles to zero
+        result['takeoff_angle'][special] = 0
+        result['incident_angle'][special] = 0
+        order = np.lexsort((result['time'], result['distance_index']))
+        return result[order]
+
+    def _refine_arrivals(self, search_dist, ray_index, tolerance,
+                         recursion_limit):
+        """
+        Vectorized version of :meth:`refine_arrival`.
+
+        :returns: Arrays of time, purist distance, ray parameter and a
+            boolean array marking the degenerate case of
+            :meth:`linear_interp_arrival`.
+        """
+        # left and right estimates as (time, dist, ray_param, ray_index)
+        left = [self.time[ray_index], self.dist[ray_index],
+                self.ray_param[ray_index], ray_index.copy()]
+        right = [self.time[ray_index + 1], self.dist[ray_index + 1],
+                 self.ray_param[ray_index + 1], ray_index.copy()]
+        out_time = np.empty(len(search_dist))
+        out_dist = np.empty(len(search_dist))
+        out_ray_param = np.empty(len(search_dist))
+        out_special = np.zeros(len(search_dist), dtype=np.bool_)
+        can_shoot = not (self.name.endswith('kmps') or
+                         any(phase in self.name
+                             for phase in ['Pdiff', 'Sdiff', 'Pn', 'Sn']))
+        active = np.arange(len(search_dist))
+        while len(active):
+            sd = search_dist[active]
+            left_ = [x[active] for x in left]
+            right_ = [x[active] for x in right]
+            new = self._linear_interp_arrivals(sd, left_, right_)
+            if recursion_limit <= 0 or not can_shoot:
+                done = np.ones(len(active), dtype=np.bool_)
+            else:
+                shoot = self._shoot_rays(new[2])
+                go_left = (left_[1] - sd) * (sd - shoot[1]) > 0
+                # search between left and shoot or between shoot and right
+                for x, s in zip(right, shoot):
+                    x[active[go_left]] = s[go_left]
+                for x, s in zip(left, shoot):
+                    x[active[~go_left]] = s[~go_left]
+                done = np.abs(shoot[1] - new[1]) < tolerance
+                new = self._linear_interp_arrivals(
+                    sd[done], [x[active[done]] for x in left],
+                    [x[active[done]] for x in right])
+            finished = active[done]
+            out_time[finished] = new[0]
+            out_dist[finished] = new[1]
+            out_ray_param[finished] = new[2]
+            out_special[finished] = new[4]
+            active = active[~done]
+            recursion_limit -= 1
+        return out_time, out_dist, out_ray_param, out_special
+
+    def _linear_interp_arrivals(self, search_dist, left, right):
+        """
+        Vectorized version of :meth:`linear_interp_arrival`.
+
+        :returns: Arrays of time, purist distance, ray parameter, ray
+            parameter index and a boolean array marking the degenerate case.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            time = ((search_dist - left[1]) / (right[1] - left[1]) *
+                    (right[0] - left[0])) + left[0]
+            ray_param = ((search_dist - right[1]) / (left[1] - right[1]) *
+                         (left[2] - right[2])) + right[2]
+        dist = search_dist.copy()
+        index = left[3].copy()
+        # left estimate is exactly at the search distance
+        at_left = left[1] == search_dist
+        time[at_left] = left[0][at_left]
+        ray_param[at_left] = left[2][at_left]
+        # degenerate case
+        special = (left[3] == 0) & (search_dist == self.dist[0])
+        time[special] = self.time[0]
+        ray_param[special] = self.ray_param[0]
+        index[special] = 0
+        invalid = np.isnan(time) & ~at_left & ~special
+        if invalid.any():
+            i = invalid.nonzero()[0][0]
+            msg = ('Time is NaN, search=%f leftDist=%f leftTime=%f '
+                   'rightDist=%f rightTime=%f')
+            raise RuntimeError(msg % (search_dist[i], left[1][i], left[0][i],
+                                      right[1][i], right[0][i]))
+        return time, dist, ray_param, index, special
+
+    def _shoot_rays(self, ray_param):
+        """
+        Vectorized version of :meth:`shoot_ray`.
+
+        :returns: Arrays of time, purist distance, ray parameter and ray
+            parameter index.
+        """
+        if ((ray_param < self.min_ray_param) |
+                (self.max_ray_param < ray_param)).any():
+            raise RuntimeError('Please contact the developers. This '
+                               'error should not occur.')
+        # index of the ray parameter interval, see shoot_ray()
+        below = self.ray_param[1:][np.newaxis, :] < ray_param[:, np.newaxis]
+        ray_param_index = np.where(below.any(axis=1), below.argmax(axis=1),
+                                   len(self.ray_param) - 2)
+
+        tau_model = self.tau_model
+        s_mod = tau_model.s_mod
+        times_branches = self.calc_branch_mult(tau_model)
+        time = np.zeros(len(ray_param))
+        dist = np.zeros(len(ray_param))
+        if not len(ray_param):
+            return time, dist, ray_param, ray_param_index
+        for j in range(tau_model.tau_branches.shape[1]):
+            for k, is_p_wave in ((0, s_mod.p_wave), (1, s_mod.s_wave)):
+                if times_branches[k, j] == 0:
+                    continue
+                br = tau_model.get_tau_branch(j, is_p_wave)
+                top_layer = s_mod.layer_number_below(br.top_depth, is_p_wave)
+                bot_layer = s_mod.layer_number_above(br.bot_depth, is_p_wave)
+                td = br.calc_time_dist(s_mod, top_layer, bot_layer, ray_param,
+                                       allow_turn_in_layer=True)
+                time += times_branches[k, j] * td['time']
+                dist += times_branches[k, j] * td['dist']
+        return time, dist, ray_param, ray_param_index
+
     def calc_pierce(self, degrees):
         """
         Calculate pierce points for this phase.
@@ -1448,6 +1621,49 @@ class SeismicPhase(object):
 
         return takeoff_angle
 
+    def _calc_takeoff_angles(self, ray_params):
+        """
+        Vectorized version of :meth:`calc_takeoff_angle`.
+        """
+        if self.name.endswith('kmps'):
+            return np.zeros(len(ray_params))
+        v_mod = self.tau_model.s_mod.v_mod
+        if self.down_going[0]:
+            takeoff_velocity = v_mod.evaluate_below(self.source_depth,
+                                                    self.name[0])
+        else:
+            takeoff_velocity = v_mod.evaluate_above(self.source_depth,
+                                                    self.name[0])
+        takeoff_angle = np.degrees(np.arcsin(np.clip(
+            takeoff_velocity * ray_params /
+            (self.tau_model.radius_of_planet - self.source_depth), -1.0, 1.0)))
+        if not self.down_going[0]:
+            # upgoing, so angle is in 90-180 range
+            takeoff_angle = 180 - takeoff_angle
+        return takeoff_angle
+
+    def _calc_incident_angles(self, ray_params):
+        """
+        Vectorized version of :meth:`calc_incident_angle`.
+        """
+        if self.name.endswith('kmps'):
+            return np.zeros(len(ray_params))
+        v_mod = self.tau_model.s_mod.v_mod
+        last_leg = self.legs[-2][0]
+        if self.down_going[-1]:
+            incident_velocity = v_mod.evaluate_above(self.receiver_depth,
+                                                     last_leg)
+        else:
+            incident_velocity = v_mod.evaluate_below(self.receiver_depth,
+                                                     last_leg)
+        incident_angle = np.degrees(np.arcsin(np.clip(
+            incident_velocity * ray_params /
+            (self.tau_model.radius_of_planet - self.receiver_depth),
+            -1.0, 1.0)))
+        if self.down_going[-1]:
+            incident_angle = 180 - incident_angle
+        return incident_angle
+
     def calc_incident_angle(self, ray_param):
         if self.name.endswith('kmps'):
             return 0
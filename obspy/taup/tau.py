@@ -6,8 +6,10 @@ High-level interface to travel-time calculation routines.
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 from future.builtins import *  # NOQA
+from future.utils import native_str
 
 import copy
+from multiprocessing import Pool, cpu_count
 import warnings
 
 import matplotlib as mpl
@@ -16,12 +18,13 @@ from matplotlib.cm import get_cmap
 import matplotlib.text
 import numpy as np
 
-from .helper_classes import Arrival
+from .helper_classes import Arrival, ArrivalRecord, SeismicPhaseCache
 from .tau_model import TauModel
 from .taup_path import TauPPath
 from .taup_pierce import TauPPierce
 from .taup_time import TauPTime
 from .taup_geo import calc_dist, add_geo_to_arrivals
+from .travel_time_table import build_travel_time_table
 from .utils import parse_phase_list
 import obspy.geodetics.base as geodetics
 
@@ -586,7 +589,7 @@ class TauPyModel(object):
     """
 
     def __init__(self, model="iasp91", verbose=False, planet_flattening=0.0,
-                 cache=None):
+                 cache=None, phase_cache=None):
         """
         Loads an already created TauPy model.
 
@@ -608,6 +611,19 @@ class TauPyModel(object):
             behave correctly. If ``False`` is specified, then no cache will be
             used.
         :type cache: :class:`collections.OrderedDict` or bool
+        :param phase_cache: Cache for set up seismic phases (parsed phase
+            names with summed branches for a given source and receiver depth).
+            Phases are shared by :meth:`get_travel_times`,
+            :meth:`get_pierce_points`, :meth:`get_ray_paths` and the methods
+            building on them, so that repeated calculations for the same
+            depths and phases only have to do the actual arrival search. If
+            not given, a
+            :class:`~obspy.taup.helper_classes.SeismicPhaseCache` with default
+            size is used, it can be accessed as ``phase_cache`` attribute (e.g.
+            for hit rate statistics). A cache can be shared by multiple
+            models. If ``False`` is specified, then no cache will be used.
+        :type phase_cache:
+            :class:`~obspy.taup.helper_classes.SeismicPhaseCache` or bool
 
         Usage:
 
@@ -623,6 +639,11 @@ class TauPyModel(object):
         self.verbose = verbose
         self.model = TauModel.from_file(model, cache=cache)
         self.planet_flattening = planet_flattening
+        if phase_cache is None:
+            phase_cache = SeismicPhaseCache()
+        elif phase_cache is False:
+            phase_cache = None
+        self.phase_cache = phase_cache
 
     def get_travel_times(self, source_depth_in_km, distance_in_degree=None,
                          phase_list=("ttall",), receiver_depth_in_km=0.0):
@@ -649,11 +670,105 @@ class TauPyModel(object):
         # might be useful, but also difficult: several arrivals can have the
         # same phase.
         tt = TauPTime(self.model, phase_list, source_depth_in_km,
-                      distance_in_degree, receiver_depth_in_km)
+                      distance_in_degree, receiver_depth_in_km,
+                      phase_cache=self.phase_cache)
         tt.run()
         return Arrivals(sorted(tt.arrivals, key=lambda x: x.time),
                         model=self.model)
 
+    def get_travel_times_many(self, source_depth_in_km, distances_in_degree,
+                              phase_list=("ttall",), receiver_depth_in_km=0.0):
+        """
+        Return travel times of every given phase for many distances.
+
+        The model is corrected for the source depth and the phases are set up
+        only once and arrivals are searched for all distances at once, which
+        is much faster than calling :meth:`get_travel_times` for every
+        distance.
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel(model="iasp91")
+        >>> arrivals = model.get_travel_times_many(
+        ...     10, [40, 60, 90], phase_list=["P", "S"])
+        >>> for arr in arrivals:
+        ...     print(arr['distance'], arr['phase'], round(arr['time'], 2))
+        40.0 P 454.74
+        40.0 S 821.13
+        60.0 P 606.67
+        60.0 S 1099.99
+        90.0 P 779.66
+        90.0 S 1432.91
+
+        :param source_depth_in_km: Source depth in km
+        :type source_depth_in_km: float
+        :param distances_in_degree: Epicentral distances in degrees.
+        :type distances_in_degree: :class:`numpy.ndarray` or list of float
+        :param phase_list: List of phases for which travel times should be
+            calculated.
+        :type phase_list: list of str
+        :param receiver_depth_in_km: Receiver depth in km
+        :type receiver_depth_in_km: float
+
+        :return: Structured array with one entry per arrival, sorted by
+            distance and time. Fields are the ones of
+            :const:`~obspy.taup.helper_classes.ArrivalRecord`
+            (``distance_index`` is the index of the distance in
+            ``distances_in_degree``, ``distance`` in degrees, ``time`` in
+            seconds, ``purist_dist`` in radians, ``ray_param`` in seconds per
+            radian, ``takeoff_angle`` and ``incident_angle`` in degrees) and
+            ``phase`` with the phase name.
+        :rtype: :class:`numpy.ndarray`
+        """
+        tt = TauPTime(self.model, phase_list, source_depth_in_km, None,
+                      receiver_depth_in_km, phase_cache=self.phase_cache)
+        tt.depth_correct(source_depth_in_km, receiver_depth_in_km)
+        tt.recalc_phases()
+        name_length = max([len(phase.name) for phase in tt.phases] + [1])
+        dtype = np.dtype(ArrivalRecord.descr +
+                         [(native_str('phase'), np.str_, name_length)])
+        results = []
+        for phase in tt.phases:
+            arrivals = phase.calc_time_many(distances_in_degree)
+            result = np.empty(len(arrivals), dtype=dtype)
+            for name in ArrivalRecord.names:
+                result[name] = arrivals[name]
+            result['phase'] = phase.name
+            results.append(result)
+        if not results:
+            return np.empty(0, dtype=dtype)
+        result = np.concatenate(results)
+        # stable sort, arrivals with same time stay in order of phases
+        order = np.lexsort((result['time'], result['distance_index']))
+        return result[order]
+
+    def build_travel_time_table(self, phases, depths, distances):
+        """
+        Precompute first arrival travel times on a depth/distance grid.
+
+        The returned table can be saved to disk and answers vectorized,
+        interpolated travel time queries much faster than
+        :meth:`get_travel_times`, see
+        :class:`~obspy.taup.travel_time_table.TravelTimeTable`.
+
+        >>> from obspy.taup import TauPyModel
+        >>> import numpy as np
+        >>> model = TauPyModel(model="iasp91")
+        >>> table = model.build_travel_time_table(
+        ...     ["P", "S"], depths=np.arange(0, 51, 5),
+        ...     distances=np.arange(0, 90.1, 0.5))  # doctest: +SKIP
+        >>> table.save("iasp91_p_s.npz")  # doctest: +SKIP
+
+        :param phases: Phases to tabulate (receiver depth is always zero).
+        :type phases: list of str
+        :param depths: Source depths in km (strictly increasing).
+        :type depths: :class:`numpy.ndarray` or list of float
+        :param distances: Epicentral distances in degrees (strictly
+            increasing).
+        :type distances: :class:`numpy.ndarray` or list of float
+        :rtype: :class:`~obspy.taup.travel_time_table.TravelTimeTable`
+        """
+        return build_travel_time_table(self, phases, depths, distances)
+
     def get_pierce_points(self, source_depth_in_km, distance_in_degree,
                           phase_list=("ttall",), receiver_depth_in_km=0.0):
         """
@@ -676,7 +791,8 @@ class TauPyModel(object):
         :rtype: :class:`Arrivals`
         """
         pp = TauPPierce(self.model, phase_list, source_depth_in_km,
-                        distance_in_degree, receiver_depth_in_km)
+                        distance_in_degree, receiver_depth_in_km,
+                        phase_cache=self.phase_cache)
         pp.run()
         return Arrivals(sorted(pp.arrivals, key=lambda x: x.time),
                         model=self.model)
@@ -703,7 +819,8 @@ class TauPyModel(object):
         :rtype: :class:`Arrivals`
         """
         rp = TauPPath(self.model, phase_list, source_depth_in_km,
-                      distance_in_degree, receiver_depth_in_km)
+                      distance_in_degree, receiver_depth_in_km,
+                      phase_cache=self.phase_cache)
         rp.run()
         return Arrivals(sorted(rp.arrivals, key=lambda x: x.time),
                         model=self.model)
@@ -883,6 +1000,158 @@ class TauPyModel(object):
 
         return arrivals
 
+    def get_ray_paths_geo_many(self, source_depths_in_km,
+                               source_latitudes_in_deg,
+                               source_longitudes_in_deg,
+                               receiver_latitudes_in_deg,
+                               receiver_longitudes_in_deg,
+                               phase_list=("ttall",), resample=False,
+                               processes=None):
+        """
+        Return ray paths for many source-receiver pairs in parallel.
+
+        Equivalent to calling :meth:`get_ray_paths_geo` for every pair, but
+        the pairs are distributed over a pool of worker processes. The model
+        is handed to every worker only once (on platforms that fork new
+        processes it is not copied at all) and pairs are grouped by source
+        depth so that the phase cache of every worker is effective. This is
+        intended for large numbers of paths, e.g. for ray coverage maps.
+
+        >>> from obspy.taup import TauPyModel
+        >>> model = TauPyModel(model="iasp91")
+        >>> paths = model.get_ray_paths_geo_many(
+        ...     [10, 10, 30], [0, 0, 10], [0, 0, 20], [30, 40, 50],
+        ...     [30, 40, 50], phase_list=["P"],
+        ...     processes=2)  # doctest: +SKIP
+        >>> for arrivals in paths:  # doctest: +SKIP
+        ...     print(len(arrivals[0].path))
+
+        Source and receiver coordinates can be scalars or arrays, which are
+        broadcast against each other (e.g. one source and many receivers).
+        See :meth:`get_ray_paths_geo` for a description of the remaining
+        parameters.
+
+        .. note::
+
+            To avoid sending the full seismic phases back from the worker
+            processes, the ``phase`` attribute of the returned arrivals is
+            ``None``.
+
+        :param processes: Number of worker processes, defaults to the number
+            of CPUs. If ``1``, everything is computed in the current process.
+        :type processes: int
+        :return: List with one :class:`Arrivals` object per source-receiver
+            pair.
+        :rtype: list of :class:`Arrivals`
+        """
+        return self._get_geo_many(
+            "get_ray_paths", source_depths_in_km, source_latitudes_in_deg,
+            source_longitudes_in_deg, receiver_latitudes_in_deg,
+            receiver_longitudes_in_deg, phase_list, resample, processes)
+
+    def get_pierce_points_geo_many(self, source_depths_in_km,
+                                   source_latitudes_in_deg,
+                                   source_longitudes_in_deg,
+                                   receiver_latitudes_in_deg,
+                                   receiver_longitudes_in_deg,
+                                   phase_list=("ttall",), resample=False,
+                                   processes=None):
+        """
+        Return pierce points for many source-receiver pairs in parallel.
+
+        See :meth:`get_ray_paths_geo_many` and :meth:`get_pierce_points_geo`.
+
+        :return: List with one :class:`Arrivals` object per source-receiver
+            pair.
+        :rtype: list of :class:`Arrivals`
+        """
+        return self._get_geo_many(
+            "get_pierce_points", source_depths_in_km, source_latitudes_in_deg,
+            source_longitudes_in_deg, receiver_latitudes_in_deg,
+            receiver_longitudes_in_deg, phase_list, resample, processes)
+
+    def _get_geo_many(self, method, source_depths_in_km,
+                      source_latitudes_in_deg, source_longitudes_in_deg,
+                      receiver_latitudes_in_deg, receiver_longitudes_in_deg,
+                      phase_list, resample, processes):
+        pairs = np.broadcast_arrays(
+            *[np.atleast_1d(np.asarray(x, dtype=np.float64))
+              for x in (source_depths_in_km, source_latitudes_in_deg,
+                        source_longitudes_in_deg, receiver_latitudes_in_deg,
+                        receiver_longitudes_in_deg)])
+        pairs = np.column_stack([x.ravel() for x in pairs])
+        if not geodetics.HAS_GEOGRAPHICLIB:
+            msg = "Not able to evaluate geographic positions of ray " + \
+                  "paths or pierce points. Arrivals objects will not be " + \
+                  "modified. Install the Python module 'geographiclib' " + \
+                  "to solve this issue."
+            warnings.warn(msg)
+        if not len(pairs):
+            return []
+        phase_list = list(phase_list)
+        # group pairs with same source depth, they share the same depth
+        # corrected model and phases
+        order = np.argsort(pairs[:, 0], kind="mergesort")
+        if processes == 1:
+            _geo_many_worker_init(self)
+            try:
+                results = _geo_many_worker(
+                    (method, pairs[order], phase_list, resample))
+            finally:
+                _geo_many_worker_init(None)
+        else:
+            processes = processes or cpu_count()
+            pool = Pool(processes=processes, initializer=_geo_many_worker_init,
+                        initargs=(self,))
+            try:
+                # several chunks per worker for load balancing
+                n_chunks = min(len(pairs), 4 * processes)
+                chunks = np.array_split(order, n_chunks)
+                results = []
+                for result in pool.imap(
+                        _geo_many_worker,
+                        [(method, pairs[chunk], phase_list, resample)
+                         for chunk in chunks]):
+                    results.extend(result)
+                pool.close()
+                pool.join()
+            finally:
+                pool.terminate()
+        output = [None] * len(pairs)
+        for i, arrivals in zip(order, results):
+            output[i] = Arrivals(arrivals, model=self.model)
+        return output
+
+
+def _geo_many_worker_init(model):
+    global _geo_many_worker_model
+    _geo_many_worker_model = model
+
+
+def _geo_many_worker(args):
+    """
+    Compute ray paths or pierce points for an array of source-receiver pairs
+    (rows of source depth, source latitude/longitude and receiver
+    latitude/longitude).
+    """
+    method, pairs, phase_list, resample = args
+    model = _geo_many_worker_model
+    radius = model.model.radius_of_planet
+    results = []
+    for depth, src_lat, src_lon, rcv_lat, rcv_lon in pairs:
+        distance = calc_dist(src_lat, src_lon, rcv_lat, rcv_lon, radius,
+                             model.planet_flattening)
+        arrivals = getattr(model, method)(depth, distance, phase_list)
+        if geodetics.HAS_GEOGRAPHICLIB:
+            arrivals = add_geo_to_arrivals(
+                arrivals, src_lat, src_lon, rcv_lat, rcv_lon, radius,
+                model.planet_flattening, resample=resample)
+        arrivals = list(arrivals)
+        for arrival in arrivals:
+            arrival.phase = None
+        results.append(arrivals)
+    return results
+
 
 def plot_travel_times(source_depth, phase_list=("ttbasic",), min_degrees=0,
                       max_degrees=180, npoints=50, model='iasp91',
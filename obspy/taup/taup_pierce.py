@@ -15,10 +15,11 @@ class TauPPierce(TauPTime):
     The methods here allow using TauPTime to calculate the pierce points
     relating to the different arrivals.
     """
-    def __init__(self, model, phase_list, depth, degrees, receiver_depth=0.0):
+    def __init__(self, model, phase_list, depth, degrees, receiver_depth=0.0,
+                 phase_cache=None):
         super(TauPPierce, self).__init__(
             model=model, phase_list=phase_list, depth=depth, degrees=degrees,
-            receiver_depth=receiver_depth)
+            receiver_depth=receiver_depth, phase_cache=phase_cache)
         self.only_turn_points = False
         self.only_rev_points = False
         self.only_under_points = False
@@ -17,7 +17,8 @@ class TauPTime(object):
     Calculate travel times for different branches using linear interpolation
     between known slowness samples.
     """
-    def __init__(self, model, phase_list, depth, degrees, receiver_depth=0.0):
+    def __init__(self, model, phase_list, depth, degrees, receiver_depth=0.0,
+                 phase_cache=None):
         self.source_depth = depth
         self.receiver_depth = receiver_depth
         self.degrees = degrees
@@ -29,6 +30,8 @@ class TauPTime(object):
         # A standard and a depth corrected model. Both are needed.
         self.model = model
         self.depth_corrected_model = self.model
+        # Optional SeismicPhaseCache to reuse phases from previous runs.
+        self.phase_cache = phase_cache
 
     def run(self):
         """
@@ -49,8 +52,12 @@ class TauPTime(object):
                 self.depth_corrected_model.source_depth != depth:
             self.depth_corrected_model = self.model.depth_correct(depth)
             self.arrivals = []
-        if receiver_depth != depth:
-            # If already split on receiver depth this does nothing.
+        if receiver_depth != depth and not any(
+                tb.top_depth == receiver_depth or
+                tb.bot_depth == receiver_depth
+                for tb in self.depth_corrected_model.tau_branches[0]):
+            # Only split if not already split on receiver depth, otherwise
+            # split_branch would just return an (expensive) copy.
             self.depth_corrected_model = \
                 self.depth_corrected_model.split_branch(receiver_depth)
             self.arrivals = []
@@ -78,15 +85,31 @@ class TauPTime(object):
             else:
                 # Didn't find it precomputed, so recalculate:
                 try:
-                    seismic_phase = SeismicPhase(temp_phase_name,
-                                                 self.depth_corrected_model,
-                                                 self.receiver_depth)
+                    seismic_phase = self.get_phase(temp_phase_name)
                     new_phases.append(seismic_phase)
                 except TauModelError:
                     print("Error with this phase, skipping it: " +
                           str(temp_phase_name))
             self.phases = new_phases
 
+    def get_phase(self, phase_name):
+        """
+        Set up the given phase for the current depth corrected model or get it
+        from the phase cache.
+        """
+        def _setup():
+            return SeismicPhase(phase_name, self.depth_corrected_model,
+                                self.receiver_depth)
+
+        if self.phase_cache is None:
+            return _setup()
+        # phases depend on the depth corrected model which is determined by
+        # the original model, source and receiver depth and (for pierce
+        # points) additional depths the model was split at
+        key = (self.model, self.source_depth, self.receiver_depth,
+               tuple(getattr(self, "add_depth", None) or ()), phase_name)
+        return self.phase_cache.get(key, _setup)
+
     def calculate(self, degrees):
         """
         Calculate the arrival times.
@@ -19,6 +19,7 @@ import numpy as np
 
 from obspy.core.util.misc import TemporaryWorkingDirectory
 from obspy.taup import TauPyModel
+from obspy.taup.helper_classes import SeismicPhaseCache
 from obspy.taup.tau import Arrivals
 from obspy.taup.taup_create import build_taup_model
 import obspy.geodetics.base as geodetics
@@ -1039,6 +1040,131 @@ class TauPyModelTestCase(unittest.TestCase):
                 self.assertEqual(arrival.name, expect[0])
                 self.assertAlmostEqual(arrival.time, expect[1], 3)
 
+    def test_get_travel_times_many(self):
+        """
+        Test travel times for many distances against single distances.
+        """
+        model = TauPyModel("iasp91")
+        distances = np.array([0.0, 1.5, 20.0, 95.0, 142.0, 180.0, 250.0])
+        for depth, receiver_depth, phase_list in [
+                (10.0, 0.0, ["ttall"]),
+                (33.0, 5.0, ["P", "Pn", "Pdiff", "PKP", "pP", "3kmps"])]:
+            arrivals = model.get_travel_times_many(
+                depth, distances, phase_list=phase_list,
+                receiver_depth_in_km=receiver_depth)
+            expected = [
+                (i, arr) for i, distance in enumerate(distances)
+                for arr in model.get_travel_times(
+                    depth, distance, phase_list=phase_list,
+                    receiver_depth_in_km=receiver_depth)]
+            self.assertEqual(len(arrivals), len(expected))
+            for got, (i, arr) in zip(arrivals, expected):
+                self.assertEqual(got['distance_index'], i)
+                self.assertEqual(got['distance'], distances[i])
+                self.assertEqual(got['phase'], arr.name)
+                np.testing.assert_allclose(
+                    [got['time'], got['ray_param'], got['purist_dist'],
+                     got['takeoff_angle'], got['incident_angle']],
+                    [arr.time, arr.ray_param, arr.purist_dist,
+                     arr.takeoff_angle, arr.incident_angle], rtol=1e-12)
+        # no arrivals
+        arrivals = model.get_travel_times_many(10.0, [10.0, 20.0],
+                                               phase_list=["Pdiff"])
+        self.assertEqual(len(arrivals), 0)
+        self.assertIn('phase', arrivals.dtype.names)
+
+    def test_phase_cache(self):
+        """
+        Test the cache for set up seismic phases.
+        """
+        model = TauPyModel("iasp91")
+        model_no_cache = TauPyModel("iasp91", phase_cache=False)
+        self.assertIsNone(model_no_cache.phase_cache)
+        cache = model.phase_cache
+        self.assertIsInstance(cache, SeismicPhaseCache)
+        self.assertEqual(len(cache), 0)
+
+        for distance in (10.0, 50.0, 50.0):
+            arrivals = model.get_travel_times(10.0, distance, ["P", "S"])
+            expected = model_no_cache.get_travel_times(10.0, distance,
+                                                       ["P", "S"])
+            self.assertEqual([(arr.name, arr.time) for arr in arrivals],
+                             [(arr.name, arr.time) for arr in expected])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(cache.hits, 4)
+        self.assertAlmostEqual(cache.hit_rate, 4.0 / 6.0)
+        # phases are shared with pierce points and ray paths
+        phase = arrivals[0].phase
+        arrivals = model.get_ray_paths(10.0, 50.0, ["P"])
+        self.assertIs(arrivals[0].phase, phase)
+        arrivals = model.get_pierce_points(10.0, 50.0, ["P"])
+        self.assertIs(arrivals[0].phase, phase)
+        self.assertEqual(cache.hits, 6)
+        # other depths are separate entries
+        model.get_travel_times(10.0, 50.0, ["P"], receiver_depth_in_km=1.0)
+        model.get_travel_times(20.0, 50.0, ["P"])
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.misses, 4)
+
+        # memory bound, only the most recently used phases are kept
+        cache = SeismicPhaseCache(max_bytes=cache.nbytes // 2)
+        model = TauPyModel("iasp91", phase_cache=cache)
+        model.get_travel_times(10.0, 50.0, ["P", "S"])
+        model.get_travel_times(20.0, 50.0, ["P", "S"])
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        self.assertEqual(cache.evictions, 4 - len(cache))
+        self.assertGreater(cache.evictions, 0)
+        model.get_travel_times(20.0, 50.0, ["S"])
+        self.assertEqual(cache.hits, 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+        self.assertEqual(cache.hits, 0)
+
+    def test_geo_many(self):
+        """
+        Test ray paths and pierce points for many source-receiver pairs
+        against single calculations.
+        """
+        model = TauPyModel("iasp91")
+        depths = [30.0, 10.0, 30.0, 10.0]
+        latitudes = [10.0, 0.0, -20.0, 45.0]
+        longitudes = [20.0, 0.0, 100.0, -120.0]
+        phase_list = ["P", "PKP", "S"]
+        for method, processes in [("get_ray_paths_geo", 1),
+                                  ("get_pierce_points_geo", 2)]:
+            with warnings.catch_warnings(record=True):
+                warnings.simplefilter("always")
+                results = getattr(model, method + "_many")(
+                    depths, latitudes, longitudes, 5.0, 5.0,
+                    phase_list=phase_list, processes=processes)
+                expected = [
+                    getattr(model, method)(depth, lat, lon, 5.0, 5.0,
+                                           phase_list=phase_list)
+                    for depth, lat, lon in zip(depths, latitudes, longitudes)]
+            self.assertEqual(len(results), 4)
+            self.assertGreater(sum(len(arrivals) for arrivals in results), 4)
+            for got, exp in zip(results, expected):
+                self.assertIsInstance(got, Arrivals)
+                self.assertEqual(len(got), len(exp))
+                for arr_got, arr_exp in zip(got, exp):
+                    self.assertIsNone(arr_got.phase)
+                    self.assertEqual(arr_got.name, arr_exp.name)
+                    self.assertEqual(arr_got.time, arr_exp.time)
+                    if method == "get_ray_paths_geo":
+                        np.testing.assert_array_equal(arr_got.path,
+                                                      arr_exp.path)
+                        self.assertIsNone(arr_got.pierce)
+                    else:
+                        np.testing.assert_array_equal(arr_got.pierce,
+                                                      arr_exp.pierce)
+                        self.assertIsNone(arr_got.path)
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            self.assertEqual(model.get_ray_paths_geo_many(
+                [], [], [], 0.0, 0.0, processes=1), [])
+
 
 def suite():
     return unittest.makeSuite(TauPyModelTestCase, 'test')
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Tests for precomputed travel time tables.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+
+import unittest
+
+import numpy as np
+
+from obspy.core.util.base import NamedTemporaryFile
+from obspy.taup import TauPyModel
+from obspy.taup.travel_time_table import TravelTimeTable
+
+
+class TravelTimeTableTestCase(unittest.TestCase):
+    """
+    Test suite for obspy.taup.travel_time_table.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TauPyModel("iasp91")
+        cls.table = cls.model.build_travel_time_table(
+            ["P", "S", "PKIKP"], depths=np.arange(0.0, 41.0, 5.0),
+            distances=np.arange(0.0, 180.1, 0.5))
+
+    def test_grid_values(self):
+        """
+        Values at grid points are the first arrivals of every phase (phases
+        are sorted like in :func:`~obspy.taup.utils.parse_phase_list`).
+        """
+        table = self.table
+        self.assertEqual(table.phases, ["P", "PKIKP", "S"])
+        self.assertEqual(table.model_name, "iasp91")
+        self.assertEqual(table.times.shape, (3, 9, 361))
+        for depth, distance in [(10.0, 20.0), (35.0, 67.5), (0.0, 150.0)]:
+            for phase in table.phases:
+                arrivals = self.model.get_travel_times(depth, distance,
+                                                       [phase])
+                time_, triplication, shadow = table.get_travel_times(
+                    phase, depth, distance, return_flags=True)
+                if arrivals:
+                    self.assertAlmostEqual(float(time_), arrivals[0].time,
+                                           places=8)
+                    self.assertFalse(shadow)
+                else:
+                    self.assertTrue(np.isnan(time_))
+                    self.assertTrue(shadow)
+        # P is triplicated at 20 degrees
+        self.assertGreater(table.counts[0, 2, 40], 1)
+        _, triplication, _ = table.get_travel_times(
+            "P", 10.0, 20.2, return_flags=True)
+        self.assertTrue(triplication)
+        # P core shadow
+        _, triplication, shadow = table.get_travel_times(
+            "P", 10.0, 120.0, return_flags=True)
+        self.assertTrue(shadow)
+        self.assertFalse(triplication)
+
+    def test_grid_nodes_and_edges(self):
+        """
+        Exact grid nodes (including the largest depth and distance) are not
+        affected by missing arrivals at neighbouring grid points.
+        """
+        table = self.table
+        depths = table.depths[:, np.newaxis]
+        distances = table.distances[np.newaxis, :]
+        for index, phase in enumerate(table.phases):
+            np.testing.assert_array_equal(
+                table.get_travel_times(phase, depths, distances),
+                table.times[index])
+        # P next to the core shadow zone
+        self.assertTrue(np.isnan(table.times[0, 2, 197]))
+        time_, _, shadow = table.get_travel_times(
+            "P", 10.0, 98.0, return_flags=True)
+        self.assertAlmostEqual(
+            time_, self.model.get_travel_times(10.0, 98.0, ["P"])[0].time,
+            places=8)
+        self.assertFalse(shadow)
+        self.assertTrue(np.isnan(table.get_travel_times("P", 10.0, 98.2)))
+        # largest depth and distance
+        for depth, distance in [(40.0, 150.3), (12.5, 180.0), (40.0, 180.0)]:
+            time_ = table.get_travel_times("PKIKP", depth, distance)
+            self.assertFalse(np.isnan(time_))
+            self.assertAlmostEqual(
+                time_, self.model.get_travel_times(
+                    depth, distance, ["PKIKP"])[0].time, delta=0.5)
+
+    def test_interpolation_accuracy(self):
+        """
+        Compare interpolated travel times against directly computed ones.
+        """
+        rng = np.random.RandomState(42)
+        depths = rng.uniform(0.0, 40.0, 50)
+        distances = rng.uniform(30.0, 90.0, 50)
+        expected = np.array([
+            self.model.get_travel_times(depth, distance, ["P"])[0].time
+            for depth, distance in zip(depths, distances)])
+        got, triplication, shadow = self.table.get_travel_times(
+            "P", depths, distances, return_flags=True)
+        self.assertFalse(triplication.any())
+        self.assertFalse(shadow.any())
+        np.testing.assert_allclose(got, expected, rtol=0, atol=0.01)
+        # broadcasting of scalar depth against distances
+        got = self.table.get_travel_times("P", 10.0, distances)
+        self.assertEqual(got.shape, distances.shape)
+
+    def test_earliest_arrival(self):
+        """
+        Phase ``None`` gives the earliest arrival of all phases.
+        """
+        distances = [10.0, 50.0, 130.0, 150.0]
+        got = self.table.get_travel_times(None, 10.0, distances)
+        expected = np.nanmin([self.table.get_travel_times(p, 10.0, distances)
+                              for p in self.table.phases], axis=0)
+        np.testing.assert_array_equal(got, expected)
+        self.assertFalse(np.isnan(got).any())
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            self.table.get_travel_times("P", 50.0, 10.0)
+        with self.assertRaises(ValueError):
+            self.table.get_travel_times("P", 10.0, -1.0)
+        with self.assertRaises(ValueError):
+            self.table.get_travel_times("Pn", 10.0, 10.0)
+        with self.assertRaises(ValueError):
+            TravelTimeTable(["P"], [10.0, 5.0], [1.0], np.zeros((1, 2, 1)),
+                            np.zeros((1, 2, 1)))
+
+    def test_save_load(self):
+        with NamedTemporaryFile(suffix=".npz") as tf:
+            self.table.save(tf.name)
+            table = TravelTimeTable.load(tf.name)
+        self.assertEqual(table.phases, self.table.phases)
+        self.assertEqual(table.model_name, self.table.model_name)
+        np.testing.assert_array_equal(table.depths, self.table.depths)
+        np.testing.assert_array_equal(table.distances, self.table.distances)
+        np.testing.assert_array_equal(table.times, self.table.times)
+        np.testing.assert_array_equal(table.counts, self.table.counts)
+
+
+def suite():
+    return unittest.makeSuite(TravelTimeTableTestCase, 'test')
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='suite')
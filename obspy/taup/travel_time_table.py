@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Precomputed tables of travel times for fast interpolated lookups.
+"""
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+from future.builtins import *  # NOQA
+from future.utils import native_str
+
+import re
+
+import numpy as np
+
+from .utils import parse_phase_list
+
+
+class TravelTimeTable(object):
+    """
+    Travel times of the first arrival of some phases on a grid of source
+    depths and epicentral distances.
+
+    Tables are computed once with
+    :meth:`~obspy.taup.tau.TauPyModel.build_travel_time_table` and can be
+    stored to and loaded from a compressed numpy binary file. Travel times
+    for arbitrary depths and distances inside the grid are bilinearly
+    interpolated, which is orders of magnitude faster than computing them
+    with :meth:`~obspy.taup.tau.TauPyModel.get_travel_times` (well below a
+    microsecond per value for vectorized queries compared to several
+    milliseconds). Accuracy depends on the grid spacing, with a spacing of
+    5 km in depth and 0.5 degrees in distance first arrival P travel times
+    for iasp91 are within 0.01 s of the exact values away from triplications
+    and within about 0.1 s close to triplications.
+
+    >>> from obspy.taup import TauPyModel
+    >>> model = TauPyModel(model="iasp91")
+    >>> table = model.build_travel_time_table(
+    ...     ["P", "S"], depths=[0, 10, 20], distances=[30, 31, 32, 33])
+    >>> print(table)  # doctest: +NORMALIZE_WHITESPACE
+    TravelTimeTable (iasp91) for 2 phase(s) (P, S),
+        depths 0.0 - 20.0 km (3 samples),
+        distances 30.0 - 33.0 deg (4 samples)
+    >>> for time in table.get_travel_times("P", 15, [30.5, 32.25]):
+    ...     print(round(time, 2))
+    372.38
+    387.77
+
+    :param phases: Phase names.
+    :type phases: list of str
+    :param depths: Source depths in km of the grid (increasing).
+    :type depths: :class:`numpy.ndarray`
+    :param distances: Epicentral distances in degrees of the grid
+        (increasing).
+    :type distances: :class:`numpy.ndarray`
+    :param times: Travel times of first arrivals in seconds with shape
+        (number of phases, number of depths, number of distances), NaN where
+        the phase does not exist.
+    :type times: :class:`numpy.ndarray`
+    :param counts: Number of arrivals of the phase at each grid point
+        (same shape as ``times``). More than one arrival means that the phase
+        is triplicated.
+    :type counts: :class:`numpy.ndarray`
+    :param model_name: Name of the model the table was computed for.
+    :type model_name: str
+    """
+    def __init__(self, phases, depths, distances, times, counts,
+                 model_name=None):
+        self.phases = [str(phase) for phase in phases]
+        self.depths = np.asarray(depths, dtype=np.float64)
+        self.distances = np.asarray(distances, dtype=np.float64)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.uint8)
+        self.model_name = model_name
+        shape = (len(self.phases), len(self.depths), len(self.distances))
+        if self.times.shape != shape or self.counts.shape != shape:
+            msg = "Shape of times/counts does not match phases and grid."
+            raise ValueError(msg)
+        for grid in (self.depths, self.distances):
+            if not len(grid) or np.any(np.diff(grid) <= 0):
+                msg = "Depths and distances must be strictly increasing."
+                raise ValueError(msg)
+
+    def __str__(self):
+        return ("TravelTimeTable (%s) for %d phase(s) (%s),\n"
+                "\tdepths %.1f - %.1f km (%d samples),\n"
+                "\tdistances %.1f - %.1f deg (%d samples)") % (
+                    self.model_name, len(self.phases),
+                    ", ".join(self.phases), self.depths[0], self.depths[-1],
+                    len(self.depths), self.distances[0], self.distances[-1],
+                    len(self.distances))
+
+    def _repr_pretty_(self, p, cycle):
+        p.text(str(self))
+
+    def save(self, filename):
+        """
+        Save the table as a compressed numpy binary (npz format).
+
+        :param filename: Name of output file.
+        :type filename: str
+        """
+        np.savez_compressed(
+            filename, phases=np.array(self.phases, dtype=np.str_),
+            depths=self.depths, distances=self.distances, times=self.times,
+            counts=self.counts,
+            model_name=np.array(self.model_name or "", dtype=np.str_))
+
+    @staticmethod
+    def load(filename):
+        """
+        Load a table saved with :meth:`TravelTimeTable.save`.
+
+        :param filename: Name of npz file.
+        :type filename: str
+        :rtype: :class:`TravelTimeTable`
+        """
+        with np.load(filename) as data:
+            return TravelTimeTable(
+                phases=data["phases"].tolist(), depths=data["depths"],
+                distances=data["distances"], times=data["times"],
+                counts=data["counts"],
+                model_name=data["model_name"].item() or None)
+
+    @staticmethod
+    def _grid_weights(grid, values, name):
+        """
+        Get indices of the left grid point and interpolation weights of the
+        right grid point for linear interpolation.
+        """
+        if np.any((values < grid[0]) | (values > grid[-1])):
+            msg = "%s out of range of the table (%g - %g)." % (
+                name, grid[0], grid[-1])
+            raise ValueError(msg)
+        if len(grid) == 1:
+            return np.zeros(values.shape, dtype=np.intp), \
+                np.zeros(values.shape)
+        index = np.searchsorted(grid, values, side="right") - 1
+        index = np.clip(index, 0, len(grid) - 2)
+        weight = (values - grid[index]) / (grid[index + 1] - grid[index])
+        return index, weight
+
+    def get_travel_times(self, phase, source_depth_in_km, distance_in_degree,
+                         return_flags=False):
+        """
+        Interpolate travel times of the first arrival of a phase.
+
+        Depths and distances can be scalars or arrays (which are broadcast
+        against each other). Travel times are NaN if the phase does not exist
+        at any of the grid points used for interpolation (e.g. in a shadow
+        zone).
+
+        :param phase: Phase name. If ``None``, the earliest arrival of all
+            phases in the table is used.
+        :type phase: str
+        :param source_depth_in_km: Source depth(s) in km.
+        :type source_depth_in_km: float or :class:`numpy.ndarray`
+        :param distance_in_degree: Epicentral distance(s) in degrees.
+        :type distance_in_degree: float or :class:`numpy.ndarray`
+        :param return_flags: Whether to additionally return flags for
+            triplications (phase has more than one arrival at any of the
+            surrounding grid points, so later arrivals are not represented in
+            the table) and shadow zones (no interpolated time available).
+        :type return_flags: bool
+        :returns: Array of travel times in seconds, or tuple of travel times
+            and boolean arrays of triplication and shadow zone flags if
+            ``return_flags`` is ``True``.
+        """
+        if phase is None:
+            times = self.times
+            # np.nanmin warns for all-NaN slices, which are legitimate here
+            times = np.where(np.isnan(times), np.inf, times).min(axis=0)
+            times[np.isinf(times)] = np.nan
+            counts = self.counts.max(axis=0)
+        else:
+            try:
+                index = self.phases.index(phase)
+            except ValueError:
+                msg = "Phase '%s' not in table (%s)." % (
+                    phase, ", ".join(self.phases))
+                raise ValueError(msg)
+            times = self.times[index]
+            counts = self.counts[index]
+        depths, distances = np.broadcast_arrays(
+            np.asarray(source_depth_in_km, dtype=np.float64),
+            np.asarray(distance_in_degree, dtype=np.float64))
+        i, wi = self._grid_weights(self.depths, depths, "Depth")
+        j, wj = self._grid_weights(self.distances, distances, "Distance")
+        i1 = np.minimum(i + 1, len(self.depths) - 1)
+        j1 = np.minimum(j + 1, len(self.distances) - 1)
+        result = np.zeros(depths.shape)
+        triplication = np.zeros(depths.shape, dtype=np.bool_)
+        for weight, ii, jj in (((1 - wi) * (1 - wj), i, j),
+                               ((1 - wi) * wj, i, j1),
+                               (wi * (1 - wj), i1, j),
+                               (wi * wj, i1, j1)):
+            # grid points with zero weight are skipped, they might be NaN
+            # (0 * NaN is NaN) e.g. next to a shadow zone
+            used = weight > 0
+            result += np.where(used, weight * times[ii, jj], 0.0)
+            triplication |= used & (counts[ii, jj] > 1)
+        # scalar input gives scalar output
+        result, triplication = result[()], triplication[()]
+        if not return_flags:
+            return result
+        return result, triplication, np.isnan(result)
+
+
+def build_travel_time_table(model, phases, depths, distances):
+    """
+    Compute a :class:`TravelTimeTable` for a model.
+
+    See :meth:`~obspy.taup.tau.TauPyModel.build_travel_time_table`.
+    """
+    phases = parse_phase_list(phases)
+    depths = np.asarray(depths, dtype=np.float64)
+    distances = np.asarray(distances, dtype=np.float64)
+    shape = (len(phases), len(depths), len(distances))
+    times = np.full(shape, np.nan)
+    counts = np.zeros(shape, dtype=np.uint8)
+    for i, depth in enumerate(depths):
+        arrivals = model.get_travel_times_many(depth, distances,
+                                               phase_list=phases)
+        for k, phase in enumerate(phases):
+            arrivals_ = arrivals[arrivals['phase'] == native_str(phase)]
+            if not len(arrivals_):
+                continue
+            # arrivals are sorted by distance and time, so the first arrival
+            # for every distance is the first entry with that distance index
+            index, first = np.unique(arrivals_['distance_index'],
+                                     return_index=True)
+            times[k, i, index] = arrivals_['time'][first]
+            counts[k, i] = np.minimum(np.bincount(
+                arrivals_['distance_index'], minlength=len(distances)), 255)
+    model_name = getattr(model.model.s_mod.v_mod, "model_name", None)
+    # names of some of the shipped models are stored as representation of a
+    # bytes object
+    if model_name and re.match(r"^b'.*'$", model_name):
+        model_name = model_name[2:-1]
+    return TravelTimeTable(phases, depths, distances, times, counts,
+                           model_name=model_name)
@@ -313,11 +313,13 @@ ENTRY_POINTS = {
         'IMS10BULLETIN = obspy.io.iaspei.core',
         'EVT = obspy.io.sh.evt',
         'FOCMEC = obspy.io.focmec.core',
-        'HYPODDPHA = obspy.io.hypodd.pha'
+        'HYPODDPHA = obspy.io.hypodd.pha',
+        'OBSPYBIN = obspy.io.obspybin.event'
         ],
     'obspy.plugin.event.QUAKEML': [
         'isFormat = obspy.io.quakeml.core:_is_quakeml',
         'readFormat = obspy.io.quakeml.core:_read_quakeml',
+        'iterFormat = obspy.io.quakeml.core:_iread_quakeml',
         'writeFormat = obspy.io.quakeml.core:_write_quakeml',
         ],
     'obspy.plugin.event.SC3ML': [
@@ -396,6 +398,11 @@ ENTRY_POINTS = {
         'isFormat = obspy.io.hypodd.pha:_is_pha',
         'readFormat = obspy.io.hypodd.pha:_read_pha',
         ],
+    'obspy.plugin.event.OBSPYBIN': [
+        'isFormat = obspy.io.obspybin.event:_is_obspybin_catalog',
+        'readFormat = obspy.io.obspybin.event:_read_obspybin_catalog',
+        'writeFormat = obspy.io.obspybin.event:_write_obspybin_catalog',
+        ],
     'obspy.plugin.inventory': [
         'STATIONXML = obspy.io.stationxml.core',
         'INVENTORYXML = obspy.io.arclink.inventory',
@@ -408,6 +415,7 @@ ENTRY_POINTS = {
         'SEED = obspy.io.xseed.core',
         'XSEED = obspy.io.xseed.core',
         'RESP = obspy.io.xseed.core',
+        'OBSPYBIN = obspy.io.obspybin.inventory',
         ],
     'obspy.plugin.inventory.STATIONXML': [
         'isFormat = obspy.io.stationxml.core:_is_stationxml',
@@ -440,6 +448,12 @@ ENTRY_POINTS = {
     'obspy.plugin.inventory.KML': [
         'writeFormat = obspy.io.kml.core:_write_kml',
         ],
+    'obspy.plugin.inventory.OBSPYBIN': [
+        'isFormat = obspy.io.obspybin.inventory:_is_obspybin_inventory',
+        'readFormat = obspy.io.obspybin.inventory:_read_obspybin_inventory',
+        'writeFormat = obspy.io.obspybin.inventory:'
+        '_write_obspybin_inventory',
+        ],
     'obspy.plugin.inventory.SEED': [
         'isFormat = obspy.io.xseed.core:_is_seed',
         'readFormat = obspy.io.xseed.core:_read_seed',